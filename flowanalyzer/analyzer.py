@@ -8,8 +8,9 @@ import os
 import sys
 import json
 import logging
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Union
 
 # Add the modules directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
@@ -17,14 +18,39 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 from file_loader import DialogFlowFileLoader
 from flow_analyzer import FlowAnalyzer
 from gemini_client import GeminiClient
-from utils import setup_logging, create_output_directories
+from token_budget import DEFAULT_MAX_INPUT_TOKENS, PromptTooLargeError
+from async_gemini_client import AsyncGeminiClient
+from response_cache import ResponseCache
+from export_manifest import ExportManifest, MANIFEST_FILE_NAME
+from flow_partitioner import collect_flow_references, plan_units, unit_scope, build_unit_data, flow_unit_name
+from flow_graph import FlowGraph, format_findings
+from batch_runner import BatchRunner, DEFAULT_PROCESSES, discover_exports
+from conversation_replay import ConversationReplayer, format_findings as format_replay_findings
+from entity_matcher import EntityMatcher, format_findings as format_entity_findings
+from structured_report import build_report, format_markdown as format_report_markdown
+from model_backends import BACKEND_NAMES, create_backend
+from run_metrics import RunMetrics
+from context_cache import DEFAULT_CONTEXT_TTL_SECONDS
+from staging_writer import STAGING_POLICIES, STAGING_COMPRESSIONS
+from utils import setup_logging, create_output_directories, validate_flow_path
 
 class DialogFlowAnalyzer:
     """
     Main class for analyzing DialogFlow flows using Gemini LLM.
     """
     
-    def __init__(self, flow_path: str, output_path: str = "output", api_key: Optional[str] = None, env_file: Optional[str] = None):
+    def __init__(self, flow_path: str, output_path: str = "output", api_key: Optional[str] = None, env_file: Optional[str] = None,
+                 load_workers: int = 1, stream_context: bool = False, use_cache: bool = True,
+                 cache_dir: Optional[str] = None, map_reduce: bool = False, fan_out: bool = False, llm_workers: int = 4,
+                 requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 graph_check: bool = False, intent_overlap: bool = False, entity_coverage: bool = False,
+                 max_input_tokens: Optional[int] = DEFAULT_MAX_INPUT_TOKENS, exact_token_count: bool = False,
+                 over_budget: str = 'map-reduce', data_format: str = 'raw', use_snapshot: bool = True,
+                 backend: str = 'gemini', backend_url: Optional[str] = None, fake_options: Optional[Dict[str, Any]] = None,
+                 stream_response: bool = False, structured_report: bool = False, context_cache: bool = False,
+                 follow_up_questions: Optional[List[str]] = None, flow_questions: bool = False,
+                 context_ttl: float = DEFAULT_CONTEXT_TTL_SECONDS, prometheus_metrics: bool = False,
+                 staging_policy: str = 'preview', staging_compression: str = 'none'):
         """
         Initialize the DialogFlow analyzer.
         
@@ -33,11 +59,84 @@ class DialogFlowAnalyzer:
             output_path: Path for output files
             api_key: Gemini API key (if not provided, will look for environment variable)
             env_file: Path to .env file (default: looks for .env in current directory)
+            load_workers: Number of threads used to load export files (1 loads serially)
+            stream_context: Feed the consolidated file to Gemini section by section
+                instead of reading it into a single string
+            use_cache: Reuse cached Gemini responses for unchanged prompts and data
+            cache_dir: Directory of the response cache (default: <output_path>/cache)
+            map_reduce: Analyze each flow separately and merge the reports, for exports
+                that do not fit in a single request
+            fan_out: Analyze every intent and every page with a focused request and
+                aggregate the issues into a single table
+            llm_workers: Maximum number of concurrent Gemini requests in map-reduce and fan-out mode
+            requests_per_minute: Rate limit for concurrent Gemini requests (None for no limit)
+            tokens_per_minute: Input token rate limit for concurrent Gemini requests (None for no limit)
+            graph_check: Check the flow graph locally (reachability, dead ends, cycles,
+                missing references) and add the findings to the analysis prompt
+            intent_overlap: Compare the training phrases of all intents locally (overlapping
+                intents, near-duplicate phrases) and add the findings to the analysis prompt
+            entity_coverage: Match the entity synonyms in all training phrases and test case
+                inputs locally (shared synonyms, unannotated entities, unused values) and add
+                the findings to the analysis prompt
+            max_input_tokens: Input token budget per Gemini request (None for no budget)
+            exact_token_count: Count input tokens with the API instead of estimating them locally
+            over_budget: What to do when the consolidated request is over the budget:
+                'map-reduce' analyzes one flow per request instead, 'fail' stops before sending it
+            data_format: Serialization of the export data sent to Gemini: 'raw' copies the
+                export files verbatim, 'compact' minifies them and strips fields irrelevant
+                to the analysis (see compact_format)
+            use_snapshot: Keep a binary snapshot of the parsed export in <cache_dir>/snapshots
+                and load from it while the export files are unchanged
+            backend: Model backend: 'gemini', 'fake' (local stand-in, no API key needed)
+                or 'http' (model served at backend_url, e.g. by benchmarks/fake_model_server.py)
+            backend_url: Endpoint URL of the http backend
+            fake_options: Keyword arguments of the fake backend (latency, failure_rate,
+                template, ...; see model_backends.FakeBackend)
+            stream_response: Stream the single-request analysis and write the report
+                as the response arrives (to flow_analysis_report.md.partial until complete)
+            structured_report: Request the single-request analysis as JSON matching a
+                response schema, validate it, and save it indexed by flow, page and intent
+                to reports/flow_analysis_report.json next to the markdown report
+            context_cache: Upload the analysis prompt and consolidated data once as a
+                cached context, and send only the questions with the report request and
+                the follow-up questions (stats in reports/context_cache.json)
+            follow_up_questions: Questions asked about the cached context after the
+                report (answers in reports/follow_up_answers.md)
+            flow_questions: Also ask one follow-up question per flow
+            context_ttl: Lifetime of the cached context in seconds
+            prometheus_metrics: Also save the run metrics in Prometheus text format
+                (reports/run_metrics.prom, e.g. for the node_exporter textfile collector)
+            staging_policy: Staging files written for review: 'off', 'preview' (prompts,
+                context previews and responses) or 'full' (also the complete contexts)
+            staging_compression: 'none', 'gzip' or 'zstd' compression of the staging files
         """
         self.flow_path = Path(flow_path)
         self.output_path = Path(output_path)
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.env_file = env_file
+        self.stream_context = stream_context
+        self.stream_response = stream_response
+        self.structured_report = structured_report
+        self.context_cache = context_cache
+        self.follow_up_questions = follow_up_questions or []
+        self.flow_questions = flow_questions
+        self.context_ttl = context_ttl
+        
+        # Lifetime and per-request stats of the cached context (see _analyze_with_context)
+        self.context_stats: Optional[Dict[str, Any]] = None
+        self.map_reduce = map_reduce
+        self.fan_out = fan_out
+        self.llm_workers = llm_workers
+        self.graph_check = graph_check
+        self.intent_overlap = intent_overlap
+        self.entity_coverage = entity_coverage
+        self.over_budget = over_budget
+        self.compact = data_format == 'compact'
+        self.prometheus_metrics = prometheus_metrics
+        self.staging_policy = staging_policy
+        
+        # Per-stage timings, sizes, token usage and cache/retry counters of this run
+        self.metrics = RunMetrics(labels={'agent': self.flow_path.name})
         
         # Setup logging
         setup_logging(self.output_path / "logs")
@@ -51,10 +150,31 @@ class DialogFlowAnalyzer:
         self.staging_dir.mkdir(parents=True, exist_ok=True)
         self.logger.info(f"Staging directory created: {self.staging_dir}")
         
+        # Response cache shared by all Gemini requests
+        self.response_cache = None
+        if use_cache:
+            self.response_cache = ResponseCache(cache_dir or self.output_path / "cache")
+            self.logger.info(f"Response cache directory: {self.response_cache.cache_dir}")
+        
         # Initialize components
-        self.file_loader = DialogFlowFileLoader()
-        self.gemini_client = GeminiClient(self.api_key, str(self.staging_dir), self.env_file)
-        self.flow_analyzer = FlowAnalyzer(self.gemini_client)
+        snapshot_dir = Path(cache_dir or self.output_path / "cache") / "snapshots" if use_snapshot else None
+        self.file_loader = DialogFlowFileLoader(max_workers=load_workers, snapshot_dir=snapshot_dir)
+        model = None
+        if backend != 'gemini':
+            model = create_backend(backend, url=backend_url, **(fake_options or {}))
+            self.logger.info(f"Using the {backend} model backend")
+        self.gemini_client = GeminiClient(
+            self.api_key, str(self.staging_dir), self.env_file, cache=self.response_cache, model=model,
+            max_input_tokens=max_input_tokens, exact_token_count=exact_token_count, metrics=self.metrics,
+            staging_policy=staging_policy, staging_compression=staging_compression
+        )
+        self.async_gemini_client = AsyncGeminiClient(
+            self.gemini_client,
+            max_concurrency=llm_workers,
+            requests_per_minute=requests_per_minute,
+            tokens_per_minute=tokens_per_minute
+        )
+        self.flow_analyzer = FlowAnalyzer(self.gemini_client, self.async_gemini_client, compact=self.compact)
         
         # Store loaded data
         self.intents_data = {}
@@ -62,6 +182,9 @@ class DialogFlowAnalyzer:
         self.entity_types_data = {}
         self.agent_data = {}
         
+        # Training phrase and entity files left on disk by the last load (see load_export_data)
+        self.streamed_files = 0
+        
     def load_dialogflow_data(self) -> str:
         """
         Load all DialogFlow data and create a consolidated file.
@@ -73,13 +196,18 @@ class DialogFlowAnalyzer:
         
         try:
             # Create consolidated file
-            consolidated_file_path = self.file_loader.create_consolidated_file(
-                self.flow_path, 
-                self.output_path
-            )
+            with self.metrics.stage('consolidate'):
+                consolidated_file_path = self.file_loader.create_consolidated_file(
+                    self.flow_path, 
+                    self.output_path,
+                    compact=self.compact
+                )
+            stats = self.file_loader.consolidation_stats
+            self.metrics.add_stage('consolidate', bytes_read=stats.get('source_bytes', 0), bytes_written=stats.get('output_bytes', 0))
             
             # Save consolidated file info to staging
-            self._save_consolidated_file_info(consolidated_file_path)
+            if self.staging_policy != 'off':
+                self._save_consolidated_file_info(consolidated_file_path)
             
             self.logger.info(f"Consolidated file created: {consolidated_file_path}")
             return consolidated_file_path
@@ -88,6 +216,45 @@ class DialogFlowAnalyzer:
             self.logger.error(f"Error creating consolidated file: {e}")
             raise
     
+    def load_export_data(self, stream_arrays: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Load the DialogFlow export into dictionaries.
+        
+        Args:
+            stream_arrays: Leave large training phrase and entity arrays in their
+                files (see DialogFlowFileLoader.load_export); only for the local
+                checks, which iterate over them but never serialize them
+        
+        Returns:
+            Per-category load timing stats
+        """
+        self.logger.info(f"Loading DialogFlow export with {self.file_loader.max_workers} worker(s)...")
+        
+        try:
+            with self.metrics.stage('load'):
+                export_data = self.file_loader.load_export(self.flow_path, stream_arrays=stream_arrays)
+            self._record_load_stats()
+            self.streamed_files = sum(stats.get('streamed_files', 0) for stats in self.file_loader.load_stats.values())
+            
+            self.agent_data = export_data['agent']
+            self.intents_data = export_data['intents']
+            self.flows_data = export_data['flows']
+            self.entity_types_data = export_data['entity_types']
+            
+            return self.file_loader.load_stats
+            
+        except Exception as e:
+            self.logger.error(f"Error loading DialogFlow export: {e}")
+            raise
+    
+    def _record_load_stats(self) -> None:
+        """Add the bytes of the last load to the load stage (a snapshot miss writes its snapshot)."""
+        for category, stats in self.file_loader.load_stats.items():
+            if category == 'snapshot' and stats['status'] != 'hit':
+                self.metrics.add_stage('load', bytes_written=stats['bytes'])
+            else:
+                self.metrics.add_stage('load', bytes_read=stats['bytes'])
+    
     def _save_consolidated_file_info(self, consolidated_file_path: str) -> None:
         """
         Save information about the consolidated file to staging.
@@ -107,7 +274,13 @@ class DialogFlowAnalyzer:
                 
                 # Get file size
                 file_size = Path(consolidated_file_path).stat().st_size
-                f.write(f"File Size: {file_size:,} bytes ({file_size/1024:.1f} KB)\n\n")
+                f.write(f"File Size: {file_size:,} bytes ({file_size/1024:.1f} KB)\n")
+                
+                stats = self.file_loader.consolidation_stats
+                if stats:
+                    f.write(f"Format: {stats['format']}\n")
+                    f.write(f"Export Files Size: {stats['source_bytes']:,} bytes ({stats['source_bytes']/1024:.1f} KB)\n")
+                f.write("\n")
                 
                 f.write("=" * 80 + "\n")
                 f.write("END OF CONSOLIDATED FILE INFO\n")
@@ -118,12 +291,13 @@ class DialogFlowAnalyzer:
         except Exception as e:
             self.logger.error(f"Error saving consolidated file info: {e}")
     
-    def analyze_flow(self, consolidated_file_path: str) -> str:
+    def analyze_flow(self, consolidated_file_path: str, structural_findings: Optional[str] = None) -> str:
         """
         Analyze the DialogFlow flow using consolidated data.
         
         Args:
             consolidated_file_path: Path to the consolidated file
+            structural_findings: Local check findings to add to the prompt
             
         Returns:
             Path to the analysis report
@@ -132,23 +306,294 @@ class DialogFlowAnalyzer:
         
         try:
             # Load consolidated data
-            consolidated_data = self.file_loader.load_consolidated_data(consolidated_file_path)
+            if self.stream_context:
+                consolidated_data = (
+                    section.text for section in self.file_loader.iter_consolidated_sections(consolidated_file_path)
+                )
+            else:
+                consolidated_data = self.file_loader.load_consolidated_data(consolidated_file_path)
+            
+            if self.stream_response:
+                return self._stream_analysis_report(consolidated_data, structural_findings)
+            
+            if self.structured_report:
+                report = self.flow_analyzer.analyze_flow_structured(consolidated_data, structural_findings)
+                return self._save_structured_report(report)
+            
+            if self.context_cache:
+                return self._analyze_with_context(consolidated_data, structural_findings)
             
             # Generate analysis using consolidated data
-            analysis_report = self.flow_analyzer.analyze_flow(consolidated_data)
+            analysis_report = self.flow_analyzer.analyze_flow(consolidated_data, structural_findings)
             
             # Save analysis report
-            report_file = self.output_path / "reports" / "flow_analysis_report.md"
-            with open(report_file, 'w', encoding='utf-8') as f:
-                f.write(analysis_report)
-            
-            self.logger.info(f"Analysis report saved to: {report_file}")
-            return str(report_file)
+            return self._save_analysis_report(analysis_report)
             
         except Exception as e:
             self.logger.error(f"Error analyzing flow: {e}")
             raise
     
+    def analyze_flow_map_reduce(self, structural_findings: Optional[str] = None) -> str:
+        """
+        Analyze the loaded export one flow at a time and merge the reports.
+        
+        Requires load_export_data() to have been called.
+        
+        Args:
+            structural_findings: Local check findings to add to the reduce prompt
+        
+        Returns:
+            Path to the analysis report
+        """
+        self.logger.info("Analyzing DialogFlow flow in map-reduce mode...")
+        
+        try:
+            analysis_report = self.flow_analyzer.analyze_map_reduce(
+                self._export_data(), max_workers=self.llm_workers, structural_findings=structural_findings
+            )
+            
+            return self._save_analysis_report(analysis_report)
+            
+        except Exception as e:
+            self.logger.error(f"Error analyzing flow in map-reduce mode: {e}")
+            raise
+    
+    def analyze_flow_fan_out(self) -> str:
+        """
+        Analyze the loaded export one intent and one page at a time and aggregate the issues.
+        
+        The per-item status and issues are saved to reports/fan_out_results.json.
+        Requires load_export_data() to have been called.
+        
+        Returns:
+            Path to the analysis report
+        """
+        self.logger.info("Analyzing DialogFlow flow in fan-out mode...")
+        
+        try:
+            analysis_report, results = self.flow_analyzer.analyze_fan_out(self._export_data(), max_workers=self.llm_workers)
+            
+            results_file = self.output_path / "reports" / "fan_out_results.json"
+            with open(results_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            self.logger.info(f"Fan-out results saved to: {results_file}")
+            
+            return self._save_analysis_report(analysis_report)
+            
+        except Exception as e:
+            self.logger.error(f"Error analyzing flow in fan-out mode: {e}")
+            raise
+    
+    def run_graph_check(self) -> Dict[str, Any]:
+        """
+        Check the flow graph of the loaded export and save the findings.
+        
+        Requires load_export_data() to have been called.
+        
+        Returns:
+            Findings from FlowGraph.report
+        """
+        self.logger.info("Checking flow graph...")
+        
+        try:
+            graph_report = FlowGraph(self._export_data()).report()
+            
+            graph_file = self.output_path / "reports" / "flow_graph.json"
+            with open(graph_file, 'w', encoding='utf-8') as f:
+                json.dump(graph_report, f, indent=2, ensure_ascii=False)
+            
+            self.logger.info(
+                f"Flow graph: {graph_report['pages']} pages, {graph_report['edges']} transitions, "
+                f"{len(graph_report['unreachable_pages'])} unreachable, {len(graph_report['terminal_pages'])} terminal, "
+                f"{len(graph_report['exitless_cycles'])} cycle(s) without exit"
+            )
+            self.logger.info(f"Flow graph findings saved to: {graph_file}")
+            return graph_report
+            
+        except Exception as e:
+            self.logger.error(f"Error checking flow graph: {e}")
+            raise
+    
+    def run_intent_overlap(self) -> Dict[str, Any]:
+        """
+        Compare the training phrases of the loaded intents and save the findings.
+        
+        Requires load_export_data() to have been called.
+        
+        Returns:
+            Findings from IntentOverlapDetector.analyze
+        """
+        self.logger.info("Checking intent overlap...")
+        
+        # Imported here: numpy adds about 60ms to every start of the CLI
+        from intent_overlap import IntentOverlapDetector
+        
+        try:
+            overlap_report = IntentOverlapDetector().analyze(self.intents_data)
+            
+            overlap_file = self.output_path / "reports" / "intent_overlap.json"
+            with open(overlap_file, 'w', encoding='utf-8') as f:
+                json.dump(overlap_report, f, indent=2, ensure_ascii=False)
+            
+            self.logger.info(f"Intent overlap findings saved to: {overlap_file}")
+            return overlap_report
+            
+        except Exception as e:
+            self.logger.error(f"Error checking intent overlap: {e}")
+            raise
+    
+    def run_entity_coverage(self) -> Dict[str, Any]:
+        """
+        Match the entity synonyms in the loaded training phrases and the export's test cases and save the findings.
+        
+        Requires load_export_data() to have been called.
+        
+        Returns:
+            Findings from EntityMatcher.analyze
+        """
+        self.logger.info("Checking entity coverage...")
+        
+        try:
+            test_cases_path = self.flow_path / "testCases"
+            test_cases = self.file_loader.load_test_cases(test_cases_path) if test_cases_path.exists() else {}
+            coverage_report = EntityMatcher(self.entity_types_data).analyze(self.intents_data, test_cases)
+            
+            coverage_file = self.output_path / "reports" / "entity_coverage.json"
+            with open(coverage_file, 'w', encoding='utf-8') as f:
+                json.dump(coverage_report, f, indent=2, ensure_ascii=False)
+            
+            self.logger.info(f"Entity coverage findings saved to: {coverage_file}")
+            return coverage_report
+            
+        except Exception as e:
+            self.logger.error(f"Error checking entity coverage: {e}")
+            raise
+    
+    def _analysis_mode(self) -> str:
+        """Mode of a full analysis, as recorded in the run metrics."""
+        if self.fan_out:
+            return 'fan-out'
+        return 'map-reduce' if self.map_reduce else 'consolidated'
+    
+    def _export_data(self) -> Dict[str, Any]:
+        """Loaded export data in the shape returned by DialogFlowFileLoader.load_export."""
+        return {
+            'agent': self.agent_data,
+            'intents': self.intents_data,
+            'flows': self.flows_data,
+            'entity_types': self.entity_types_data
+        }
+    
+    def _save_analysis_report(self, analysis_report: str) -> str:
+        """
+        Save the analysis report.
+        
+        Args:
+            analysis_report: Report text
+            
+        Returns:
+            Path to the report file
+        """
+        report_file = self.output_path / "reports" / "flow_analysis_report.md"
+        report_bytes = analysis_report.encode('utf-8')
+        with self.metrics.stage('report_write', bytes_written=len(report_bytes)):
+            with open(report_file, 'wb') as f:
+                f.write(report_bytes)
+        
+        self.logger.info(f"Analysis report saved to: {report_file}")
+        return str(report_file)
+    
+    def _analyze_with_context(self, consolidated_data: Union[str, Iterable[str]], structural_findings: Optional[str]) -> str:
+        """
+        Analyze through a cached context and ask the follow-up questions.
+        
+        The answers are saved to reports/follow_up_answers.md and the context's
+        lifetime and per-request stats to reports/context_cache.json.
+        
+        Args:
+            consolidated_data: Consolidated data as a string or an iterable of sections
+            structural_findings: Local check findings to add to the prompt
+            
+        Returns:
+            Path to the report file
+        """
+        questions = {f"question {number}": question for number, question in enumerate(self.follow_up_questions, 1)}
+        if self.flow_questions:
+            if not self.flows_data:
+                self.load_export_data()
+            flow_names = [flow.get('config', {}).get('displayName') or flow_dir for flow_dir, flow in self.flows_data.items()]
+            questions.update(self.flow_analyzer.flow_questions(flow_names))
+        
+        analysis_report, answers, self.context_stats = self.flow_analyzer.analyze_flow_with_context(
+            consolidated_data, questions, structural_findings, ttl_seconds=self.context_ttl
+        )
+        
+        reports_dir = self.output_path / "reports"
+        with open(reports_dir / "context_cache.json", 'w', encoding='utf-8') as f:
+            json.dump(self.context_stats, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"Context cache stats saved to: {reports_dir / 'context_cache.json'}")
+        
+        if answers:
+            with open(reports_dir / "follow_up_answers.md", 'w', encoding='utf-8') as f:
+                f.write("# Follow-up Questions\n")
+                for name, answer in answers.items():
+                    f.write(f"\n## {name[0].upper() + name[1:]}\n\n> {questions[name]}\n\n{answer.strip()}\n")
+            self.logger.info(f"Follow-up answers saved to: {reports_dir / 'follow_up_answers.md'}")
+        
+        return self._save_analysis_report(analysis_report)
+    
+    def _save_structured_report(self, report: Dict[str, Any]) -> str:
+        """
+        Save a structured report as indexed JSON and as the markdown report.
+        
+        Args:
+            report: Validated report from FlowAnalyzer.analyze_flow_structured
+            
+        Returns:
+            Path to the markdown report
+        """
+        document = build_report(report, agent=self.flow_path.name)
+        report_file = self.output_path / "reports" / "flow_analysis_report.json"
+        report_bytes = json.dumps(document, indent=2, ensure_ascii=False).encode('utf-8')
+        with self.metrics.stage('report_write', bytes_written=len(report_bytes)):
+            with open(report_file, 'wb') as f:
+                f.write(report_bytes)
+        
+        self.logger.info(f"Structured report saved to: {report_file} ({len(document['issues'])} issue(s))")
+        return self._save_analysis_report(format_report_markdown(document))
+    
+    def _stream_analysis_report(self, consolidated_data: Union[str, Iterable[str]], structural_findings: Optional[str]) -> str:
+        """
+        Analyze with a streamed response, writing the report as chunks arrive.
+        
+        The report is written to flow_analysis_report.md.partial and renamed when
+        the response is complete, so an interrupted stream never looks like a report.
+        
+        Args:
+            consolidated_data: Consolidated data as a string or an iterable of sections
+            structural_findings: Local check findings to add to the prompt
+            
+        Returns:
+            Path to the report file
+        """
+        report_file = self.output_path / "reports" / "flow_analysis_report.md"
+        partial_file = report_file.with_name(report_file.name + ".partial")
+        self.logger.info(f"Streaming the analysis report to: {partial_file}")
+        
+        with open(partial_file, 'w', encoding='utf-8') as f:
+            def write_chunk(text: str) -> None:
+                # Written while the response arrives, so only the size counts towards report_write
+                f.write(text)
+                f.flush()
+                self.metrics.add_stage('report_write', bytes_written=len(text.encode('utf-8')))
+            
+            self.flow_analyzer.analyze_flow(consolidated_data, structural_findings, on_chunk=write_chunk)
+        
+        with self.metrics.stage('report_write'):
+            os.replace(partial_file, report_file)
+        self.logger.info(f"Analysis report saved to: {report_file}")
+        return str(report_file)
+    
     def run_full_analysis(self) -> Dict[str, str]:
         """
         Run the complete analysis pipeline using consolidated data.
@@ -162,8 +607,44 @@ class DialogFlowAnalyzer:
             # Load data and create consolidated file
             consolidated_file_path = self.load_dialogflow_data()
             
+            # Map-reduce, fan-out and the local checks work on the structured export data;
+            # the local checks only iterate over it, so large phrase and entity files can stay on disk
+            local_checks = self.graph_check or self.intent_overlap or self.entity_coverage
+            if self.map_reduce or self.fan_out or local_checks:
+                self.load_export_data(stream_arrays=not (self.map_reduce or self.fan_out))
+            
+            structural_findings = None
+            if local_checks:
+                findings = []
+                if self.graph_check:
+                    findings.append(format_findings(self.run_graph_check()))
+                if self.intent_overlap:
+                    from intent_overlap import format_findings as format_overlap_findings
+                    findings.append(format_overlap_findings(self.run_intent_overlap()))
+                if self.entity_coverage:
+                    findings.append(format_entity_findings(self.run_entity_coverage()))
+                structural_findings = "\n".join(section for section in findings if section)
+            
             # Analyze flow
-            analysis_file = self.analyze_flow(consolidated_file_path)
+            if self.fan_out:
+                analysis_file = self.analyze_flow_fan_out()
+            elif self.map_reduce:
+                analysis_file = self.analyze_flow_map_reduce(structural_findings)
+            else:
+                try:
+                    analysis_file = self.analyze_flow(consolidated_file_path, structural_findings)
+                except PromptTooLargeError as e:
+                    if self.over_budget != 'map-reduce':
+                        raise
+                    # Per-flow requests are the smaller representation of the same export
+                    self.logger.warning(f"{e}; falling back to map-reduce analysis")
+                    # Map-reduce serializes the export, so streamed arrays are parsed after all
+                    if not local_checks or self.streamed_files:
+                        self.load_export_data()
+                    self.map_reduce = True
+                    if structural_findings is not None:
+                        self.logger.info("Adding the local check findings to the map-reduce merge prompt")
+                    analysis_file = self.analyze_flow_map_reduce(structural_findings)
             
             results = {
                 'consolidated_file': consolidated_file_path,
@@ -171,6 +652,21 @@ class DialogFlowAnalyzer:
                 'output_directory': str(self.output_path),
                 'staging_directory': str(self.staging_dir)
             }
+            if self.graph_check:
+                results['flow_graph'] = str(self.output_path / "reports" / "flow_graph.json")
+            if self.intent_overlap:
+                results['intent_overlap'] = str(self.output_path / "reports" / "intent_overlap.json")
+            if self.entity_coverage:
+                results['entity_coverage'] = str(self.output_path / "reports" / "entity_coverage.json")
+            if self.fan_out:
+                results['fan_out_results'] = str(self.output_path / "reports" / "fan_out_results.json")
+            if self.structured_report and not self.map_reduce:
+                results['structured_report'] = str(self.output_path / "reports" / "flow_analysis_report.json")
+            if self.context_cache and not self.map_reduce:
+                results['context_cache'] = str(self.output_path / "reports" / "context_cache.json")
+                if self.follow_up_questions or self.flow_questions:
+                    results['follow_up_answers'] = str(self.output_path / "reports" / "follow_up_answers.md")
+            results.update(self.save_run_metrics('success', self._analysis_mode()))
             
             self.logger.info("Analysis completed successfully!")
             self.logger.info(f"Results: {results}")
@@ -179,61 +675,644 @@ class DialogFlowAnalyzer:
             
         except Exception as e:
             self.logger.error(f"Analysis failed: {e}")
+            self.save_run_metrics('failure', self._analysis_mode())
             raise
+    
+    
+    def run_incremental_analysis(self) -> Dict[str, str]:
+        """
+        Re-analyze only the flows, intents and entity types changed since the previous run.
+        
+        A manifest of every export file (size, mtime, content hash) is kept in the
+        output directory. The export is split into one analysis unit per flow; units
+        whose files are unchanged reuse their previous report, and only the files of
+        changed units are loaded and sent to Gemini.
+        
+        Returns:
+            Dictionary with paths to generated files
+        """
+        self.logger.info("Starting incremental DialogFlow analysis...")
+        
+        try:
+            manifest_file = self.output_path / MANIFEST_FILE_NAME
+            unit_results_file = self.output_path / "reports" / "unit_reports.json"
+            
+            previous_manifest = ExportManifest.load(manifest_file)
+            with self.metrics.stage('load'):
+                manifest = self.file_loader.scan_export(self.flow_path, previous_manifest)
+            changed_files = manifest.changed_files(previous_manifest)
+            self.logger.info(f"{len(changed_files)} export file(s) changed since the previous run")
+            
+            # Flow references are reused from the manifest unless the flow changed
+            flow_references = {}
+            changed_flows = []
+            flow_names = manifest.item_names('flows')
+            for flow_name in flow_names:
+                previous_unit = previous_manifest.units.get(flow_unit_name(flow_name))
+                flow_changed = any(path.startswith(f"flows/{flow_name}/") for path in changed_files)
+                if previous_unit and not flow_changed:
+                    flow_references[flow_name] = (
+                        set(previous_unit['references']['intents']),
+                        set(previous_unit['references']['entity_types'])
+                    )
+                else:
+                    changed_flows.append(flow_name)
+            
+            loaded_flows = {}
+            if changed_flows:
+                with self.metrics.stage('load'):
+                    loaded_flows = self.file_loader.load_selected(self.flow_path, flows=changed_flows)['flows']
+                self._record_load_stats()
+            for flow_name in changed_flows:
+                flow_references[flow_name] = collect_flow_references(loaded_flows.get(flow_name, {}))
+            
+            plan = plan_units(flow_references, manifest.item_names('intents'), manifest.item_names('entityTypes'))
+            fingerprints = {unit_name: manifest.fingerprint(unit_scope(unit_plan)) for unit_name, unit_plan in plan.items()}
+            
+            previous_results = {}
+            if unit_results_file.exists():
+                with open(unit_results_file, 'r', encoding='utf-8') as f:
+                    previous_results = json.load(f)
+            
+            changed_units = [
+                unit_name for unit_name in plan
+                if previous_results.get(unit_name, {}).get('fingerprint') != fingerprints[unit_name]
+            ]
+            self.logger.info(f"{len(changed_units)} of {len(plan)} analysis unit(s) need analysis: {changed_units}")
+            
+            # Load only what the changed units need
+            with self.metrics.stage('load'):
+                export_data = self.file_loader.load_selected(
+                    self.flow_path,
+                    flows=[plan[unit]['flow'] for unit in changed_units if plan[unit]['flow'] not in (None, *loaded_flows)],
+                    intents=[name for unit in changed_units for name in plan[unit]['intents']],
+                    entity_types=[name for unit in changed_units for name in plan[unit]['entity_types']]
+                )
+            self._record_load_stats()
+            export_data['flows'].update(loaded_flows)
+            unit_data = {unit_name: build_unit_data(plan[unit_name], export_data) for unit_name in changed_units}
+            
+            analysis_report, results = self.flow_analyzer.analyze_incremental(
+                unit_data, fingerprints, previous_results, max_workers=self.llm_workers
+            )
+            report_file = self._save_analysis_report(analysis_report)
+            
+            with open(unit_results_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+            
+            # Only record the new manifest once the analysis has succeeded
+            manifest.units = {
+                flow_unit_name(flow_name): {
+                    'references': {
+                        'intents': sorted(flow_references[flow_name][0]),
+                        'entity_types': sorted(flow_references[flow_name][1])
+                    },
+                    'fingerprint': fingerprints[flow_unit_name(flow_name)]
+                }
+                for flow_name in flow_names
+            }
+            manifest.save(manifest_file)
+            
+            results = {
+                'analysis_report': report_file,
+                'unit_reports': str(unit_results_file),
+                'manifest': str(manifest_file),
+                'output_directory': str(self.output_path),
+                'staging_directory': str(self.staging_dir)
+            }
+            results.update(self.save_run_metrics('success', 'incremental'))
+            
+            self.logger.info(f"Incremental analysis completed: {len(changed_units)} unit(s) re-analyzed")
+            self.logger.info(f"Results: {results}")
+            
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Incremental analysis failed: {e}")
+            self.save_run_metrics('failure', 'incremental')
+            raise
+    
+    def save_run_metrics(self, status: str, mode: str) -> Dict[str, str]:
+        """
+        Wait for the staging writes, then save the run record to reports/run_metrics.json
+        (and .prom when enabled).
+        
+        A failure to save is logged, never raised, so it cannot hide the outcome of the run.
+        
+        Args:
+            status: 'success' or 'failure'
+            mode: Analysis mode ('consolidated', 'map-reduce', 'fan-out' or 'incremental')
+        
+        Returns:
+            Paths of the saved files, keyed like the other results
+        """
+        # Staging writes are part of the run; wait for them before the record is taken
+        self.gemini_client.flush_staging()
+        
+        reports_dir = self.output_path / "reports"
+        prometheus_file = reports_dir / "run_metrics.prom" if self.prometheus_metrics else None
+        self.metrics.labels['mode'] = mode
+        
+        try:
+            self.metrics.save(reports_dir / "run_metrics.json", status, prometheus_file)
+        except Exception as e:
+            self.logger.error(f"Error saving run metrics: {e}")
+            return {}
+        
+        paths = {'run_metrics': str(reports_dir / "run_metrics.json")}
+        if prometheus_file:
+            paths['prometheus_metrics'] = str(prometheus_file)
+        return paths
 
 
-def main():
+def analyze_export(flow_path: str, output_path: str, options: Dict[str, Any], incremental: bool = False) -> Dict[str, str]:
     """
-    Main entry point for the DialogFlow analyzer.
+    Analyze one export of a batch (runs in a batch worker process).
+    
+    Args:
+        flow_path: Path to the DialogFlow export directory
+        output_path: Output directory of this agent
+        options: Keyword arguments of DialogFlowAnalyzer
+        incremental: Run an incremental instead of a full analysis
+    
+    Returns:
+        Dictionary with paths to generated files
     """
-    import argparse
+    if not validate_flow_path(Path(flow_path)):
+        raise ValueError(f"Not a DialogFlow export (agent.json, intents/ and flows/ expected): {flow_path}")
     
-    parser = argparse.ArgumentParser(description='Analyze DialogFlow flows using Gemini LLM')
-    parser.add_argument('flow_path', help='Path to DialogFlow export directory')
-    parser.add_argument('--output', '-o', default='output', help='Output directory (default: output)')
-    parser.add_argument('--api-key', help='Gemini API key (or set GEMINI_API_KEY environment variable)')
-    parser.add_argument('--env-file', help='Path to .env file (default: looks for .env in current directory)')
-    parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    # A worker process analyzes several agents; each one logs to its own directory
+    setup_logging(Path(output_path) / "logs", console=False, force=True)
     
-    args = parser.parse_args()
+    analyzer = DialogFlowAnalyzer(flow_path=flow_path, output_path=output_path, **options)
+    if incremental:
+        return analyzer.run_incremental_analysis()
+    return analyzer.run_full_analysis()
+
+
+def run_batch(args, options: Dict[str, Any]) -> None:
+    """
+    Analyze every export of a directory or manifest file and print the aggregate summary.
     
-    # Setup logging level
+    Args:
+        args: Parsed command line arguments
+        options: Keyword arguments of DialogFlowAnalyzer shared by all agents
+    """
+    output_path = Path(args.output)
+    setup_logging(output_path / "logs")
+    
+    exports = discover_exports(Path(args.flow_path))
+    runner = BatchRunner(
+        output_path,
+        partial(analyze_export, options=options, incremental=args.incremental),
+        processes=args.processes,
+        resume=not args.restart
+    )
+    summary = runner.run(exports)
+    
+    print("\n" + "="*50)
+    print("BATCH ANALYSIS SUMMARY")
+    print("="*50)
+    for name, entry in summary['results'].items():
+        if entry['status'] == 'completed':
+            print(f"✓ {name}: {entry['results']['analysis_report']} ({entry['seconds']:.1f}s)")
+        else:
+            print(f"✗ {name}: {entry['error']}")
+    print("\n" + "="*50)
+    print(f"Agents: {summary['agents']} ({summary['completed']} completed, {summary['failed']} failed, "
+          f"{summary['skipped']} skipped from the checkpoint)")
+    print(f"Wall time: {summary['seconds']:.1f}s for {summary['agent_seconds']:.1f}s of agent time "
+          f"with {runner.processes} process(es)")
+    print(f"Summary: {runner.summary_file}")
+    print(f"Checkpoint: {runner.checkpoint_file}")
+    print("="*50)
+    
+    if summary['failed']:
+        sys.exit(1)
+
+
+def run_replay(args) -> None:
+    """
+    Replay the export's test cases locally and print the diverging turns.
+    
+    No Gemini or Dialogflow request is made, so no API key is needed.
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    flow_path = Path(args.flow_path)
+    output_path = Path(args.output)
+    setup_logging(output_path / "logs")
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
+    create_output_directories(output_path)
+    
+    snapshot_dir = None if args.no_snapshot else Path(args.cache_dir or output_path / "cache") / "snapshots"
+    file_loader = DialogFlowFileLoader(max_workers=args.workers, snapshot_dir=snapshot_dir)
+    model = file_loader.load_model(flow_path)
+    test_cases = file_loader.load_test_cases(flow_path / "testCases") if (flow_path / "testCases").exists() else {}
+    
+    report = ConversationReplayer(model).replay_all(test_cases, max_workers=args.workers)
+    report_file = output_path / "reports" / "test_case_replay.json"
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    
+    print("\n" + "="*50)
+    print("TEST CASE REPLAY")
+    print("="*50)
+    print(format_replay_findings(report, limit=50))
+    print(f"\nReplay Report: {report_file}")
+    print("="*50)
+    
+    if report['failed']:
+        sys.exit(1)
+
+
+def run_consolidate(args) -> None:
+    """
+    Create the consolidated file of an export without analyzing it.
+    
+    No Gemini code is imported, so no API key is needed.
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    flow_path = Path(args.flow_path)
+    output_path = Path(args.output)
+    if not validate_flow_path(flow_path):
+        raise ValueError(f"Not a DialogFlow export (agent.json, intents/ and flows/ expected): {flow_path}")
+    
+    setup_logging(output_path / "logs")
+    create_output_directories(output_path)
+    
+    file_loader = DialogFlowFileLoader(max_workers=args.workers)
+    consolidated_file = file_loader.create_consolidated_file(flow_path, output_path, compact=args.data_format == 'compact')
+    
+    stats = file_loader.consolidation_stats
+    print("\n" + "="*50)
+    print("CONSOLIDATION COMPLETED")
+    print("="*50)
+    print(f"Consolidated File: {consolidated_file}")
+    print(f"Size ({stats['format']}): export files {stats['source_bytes']/1024:.1f} KB -> "
+          f"consolidated file {stats['output_bytes']/1024:.1f} KB")
+    print("="*50)
+
+
+def run_validate(args) -> None:
+    """
+    Check that an export parses and that its flows only reference existing pages, flows and intents.
+    
+    Meant for pre-commit hooks: nothing is written, no Gemini code is imported,
+    and the exit status is 1 when there are errors (or warnings with --strict).
+    
+    Args:
+        args: Parsed command line arguments
+    """
+    flow_path = Path(args.flow_path)
+    if not validate_flow_path(flow_path):
+        print(f"✗ {flow_path}: not a DialogFlow export (agent.json, intents/ and flows/ expected)")
+        sys.exit(1)
+    
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     
     try:
-        # Initialize analyzer
-        analyzer = DialogFlowAnalyzer(
-            flow_path=args.flow_path,
-            output_path=args.output,
-            api_key=args.api_key,
-            env_file=args.env_file
-        )
-        
-        # Run analysis
-        results = analyzer.run_full_analysis()
-        
-        print("\n" + "="*50)
-        print("ANALYSIS COMPLETED SUCCESSFULLY!")
-        print("="*50)
+        export_data = DialogFlowFileLoader(max_workers=args.workers).load_export(flow_path)
+    except Exception as e:
+        print(f"✗ {flow_path}: export could not be loaded: {e}")
+        sys.exit(1)
+    
+    report = FlowGraph(export_data).report()
+    errors = len(report['missing_pages']) + len(report['missing_flows']) + len(report['missing_intents'])
+    warnings = len(report['unreachable_flows']) + len(report['unreachable_pages']) + len(report['exitless_cycles'])
+    
+    findings = format_findings(report)
+    if findings:
+        print(findings)
+    print(f"{'✗' if errors or (args.strict and warnings) else '✓'} {flow_path}: {report['pages']} pages, "
+          f"{report['edges']} transitions, {errors} error(s), {warnings} warning(s)")
+    
+    if errors or (args.strict and warnings):
+        sys.exit(1)
+
+
+def check_analyze_args(parser, args) -> None:
+    """
+    Reject analyze options that cannot be combined, and resolve the options implied by others.
+    
+    Args:
+        parser: Parser of the analyze subcommand (its error() exits with status 2)
+        args: Parsed command line arguments
+    """
+    if args.incremental and (args.map_reduce or args.stream_context or args.graph_check or args.intent_overlap or args.entity_coverage):
+        parser.error("--incremental cannot be combined with --map-reduce, --stream-context, --graph-check, --intent-overlap or --entity-coverage")
+    
+    if args.fan_out and (args.map_reduce or args.incremental or args.stream_response):
+        parser.error("--fan-out cannot be combined with --map-reduce, --incremental or --stream-response")
+    
+    if args.structured_report and (args.map_reduce or args.fan_out or args.incremental or args.stream_response):
+        parser.error("--structured-report cannot be combined with --map-reduce, --fan-out, --incremental or --stream-response")
+    
+    args.context_cache = args.context_cache or bool(args.follow_up) or args.flow_questions
+    if args.context_cache and (args.map_reduce or args.fan_out or args.incremental or args.stream_response or args.structured_report):
+        parser.error("--context-cache, --follow-up and --flow-questions cannot be combined with --map-reduce, --fan-out, "
+                     "--incremental, --stream-response or --structured-report")
+    
+    if args.stream_response and (args.map_reduce or args.incremental or args.batch):
+        parser.error("--stream-response cannot be combined with --map-reduce, --incremental or --batch")
+    
+    if args.backend == 'http' and not args.backend_url:
+        parser.error("--backend http requires --backend-url")
+
+
+def print_analysis_summary(analyzer: DialogFlowAnalyzer, results: Dict[str, str], args) -> None:
+    """
+    Print the output files, timings and approach of a completed analysis.
+    
+    Args:
+        analyzer: Analyzer that ran the analysis
+        results: Paths returned by run_full_analysis or run_incremental_analysis
+        args: Parsed command line arguments
+    """
+    print("\n" + "="*50)
+    print("ANALYSIS COMPLETED SUCCESSFULLY!")
+    print("="*50)
+    if 'consolidated_file' in results:
         print(f"Consolidated File: {results['consolidated_file']}")
-        print(f"Analysis Report: {results['analysis_report']}")
-        print(f"Output Directory: {results['output_directory']}")
-        print(f"Staging Directory: {results['staging_directory']}")
+    if 'manifest' in results:
+        print(f"Export Manifest: {results['manifest']}")
+    if 'flow_graph' in results:
+        print(f"Flow Graph Findings: {results['flow_graph']}")
+    if 'intent_overlap' in results:
+        print(f"Intent Overlap Findings: {results['intent_overlap']}")
+    if 'entity_coverage' in results:
+        print(f"Entity Coverage Findings: {results['entity_coverage']}")
+    if 'fan_out_results' in results:
+        print(f"Fan-Out Results: {results['fan_out_results']}")
+    print(f"Analysis Report: {results['analysis_report']}")
+    if 'structured_report' in results:
+        print(f"Structured Report: {results['structured_report']}")
+    if 'follow_up_answers' in results:
+        print(f"Follow-up Answers: {results['follow_up_answers']}")
+    if 'context_cache' in results:
+        print(f"Context Cache Stats: {results['context_cache']}")
+    print(f"Output Directory: {results['output_directory']}")
+    print(f"Staging Directory: {results['staging_directory']}")
+    if 'run_metrics' in results:
+        print(f"Run Metrics: {results['run_metrics']}")
+    if 'prometheus_metrics' in results:
+        print(f"Prometheus Metrics: {results['prometheus_metrics']}")
+    response_stats = analyzer.gemini_client.last_response_stats
+    if response_stats and response_stats['streamed']:
+        print(f"Response Stream ({response_stats['request_id']}): first chunk after {response_stats['first_chunk_seconds']:.2f}s, "
+              f"complete after {response_stats['total_seconds']:.2f}s ({response_stats['chunks']} chunk(s))")
+    token_report = analyzer.gemini_client.last_token_report
+    consolidation_stats = analyzer.file_loader.consolidation_stats
+    if analyzer.file_loader.load_stats or analyzer.response_cache or token_report or consolidation_stats:
+        print("\n" + "="*50)
+        if consolidation_stats:
+            source_bytes = consolidation_stats['source_bytes']
+            output_bytes = consolidation_stats['output_bytes']
+            ratio = f" ({output_bytes / source_bytes:.0%} of the export)" if source_bytes else ""
+            print(f"CONSOLIDATED SIZE ({consolidation_stats['format']}): export files {source_bytes/1024:.1f} KB -> "
+                  f"consolidated file {output_bytes/1024:.1f} KB{ratio}")
+        if analyzer.file_loader.load_stats:
+            print(f"LOAD TIMINGS ({analyzer.file_loader.max_workers} worker(s)):")
+            for category, stats in analyzer.file_loader.load_stats.items():
+                if category == 'snapshot':
+                    print(f"- snapshot {stats['status']}: {stats['files']} files checked, {stats['hashed_files']} hashed, "
+                          f"{stats['bytes']/1024:.1f} KB snapshot in {stats['seconds']:.3f}s")
+                    continue
+                print(f"- {category}: {stats['items']} items, {stats['files']} files, "
+                      f"{stats['bytes']/1024:.1f} KB in {stats['seconds']:.3f}s")
+        if analyzer.response_cache:
+            cache_stats = analyzer.response_cache.stats
+            print(f"RESPONSE CACHE: {cache_stats['hits']} hit(s), {cache_stats['misses']} miss(es), "
+                  f"{cache_stats['entries']} entries ({cache_stats['size_bytes']/1024:.1f} KB)")
+        if token_report:
+            budget = f"{token_report['budget']:,}" if token_report['budget'] else "none"
+            print(f"PROMPT SIZE ({token_report['request_id']}): {'' if token_report['exact'] else '~'}"
+                  f"{token_report['tokens']:,} input tokens, budget {budget}")
+            for name, count in token_report['sections'].items():
+                print(f"- {name}: ~{count:,}")
+        context_stats = analyzer.context_stats
+        if context_stats:
+            totals = context_stats['totals']
+            if context_stats['name']:
+                state = f"cached as {context_stats['name']}"
+            elif totals['model_requests']:
+                state = "not cached, sent in full"
+            else:
+                state = "not uploaded, all responses from the response cache"
+            print(f"CONTEXT CACHE ({state}): ~{context_stats['tokens']:,} tokens, {totals['uses']} request(s), "
+                  f"{totals['cached_tokens']:,} cached input tokens (~{totals['input_tokens_saved']:,} saved), "
+                  f"{totals['storage_token_hours']:,} token-hours stored")
+            for use in context_stats['uses']:
+                print(f"- {use['request_id']}: {use['seconds']:.2f}s, {use['cached_tokens']:,} cached / "
+                      f"{use['uncached_tokens']:,} uncached input tokens")
+    run_record = analyzer.metrics.to_dict()
+    if run_record['stages']:
         print("\n" + "="*50)
+        print(f"PIPELINE STAGES ({run_record['seconds']:.2f}s):")
+        for name, stage in run_record['stages'].items():
+            sizes = ", ".join(f"{key} {value/1024:.1f} KB" for key, value in stage.items() if key.startswith('bytes_'))
+            print(f"- {name}: {stage.get('calls', 0):g} call(s) in {stage['seconds']:.3f}s" + (f", {sizes}" if sizes else ""))
+        counters = run_record['counters']
+        if counters:
+            print("- " + ", ".join(f"{key}: {value:,.0f}" for key, value in counters.items()))
+    print("\n" + "="*50)
+    if args.incremental:
+        print("INCREMENTAL APPROACH:")
+        print("✓ One analysis unit per flow, with the intents and entity types it uses")
+        print("✓ Only units changed since the previous run sent to Gemini")
+        print("✓ Full transparency through staging files")
+    elif analyzer.fan_out:
+        print("FAN-OUT APPROACH:")
+        print("✓ One focused request per intent and per page")
+        print("✓ Issues aggregated into a single table sorted by priority")
+        print("✓ Failed requests listed without stopping the others")
+    elif analyzer.map_reduce:
+        print("MAP-REDUCE APPROACH:")
+        print("✓ Export split into one analysis unit per flow")
+        print("✓ Per-flow reports merged into a single report")
+        print("✓ Full transparency through staging files")
+    else:
         print("CONSOLIDATED DATA APPROACH:")
         print("✓ All DialogFlow data combined into single file")
         print("✓ No chunking - preserves complete context")
         print("✓ Full transparency through staging files")
         print("✓ Better analysis quality with complete data")
-        print("\n" + "="*50)
+    print("\n" + "="*50)
+    if args.staging_policy == 'off':
+        print("STAGING FILES: off")
+    else:
         print("STAGING FILES CREATED:")
         print("Check the staging directory to review:")
-        print("- Consolidated file information")
-        print("- Context data sent to Gemini")
+        if 'consolidated_file' in results:
+            print("- Consolidated file information")
+        if args.staging_policy == 'full':
+            print("- Context data sent to Gemini (blobs/, one file per distinct context)")
+        else:
+            print("- Previews of the context data sent to Gemini")
         print("- Prompts used for analysis")
         print("- Gemini responses")
-        print("="*50)
+    print("="*50)
+
+
+# Subcommands of the CLI; without one, the arguments are those of analyze
+SUBCOMMANDS = ['analyze', 'consolidate', 'validate', 'replay']
+
+def main():
+    """
+    Main entry point for the DialogFlow analyzer.
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Analyze DialogFlow flows using Gemini LLM')
+    subparsers = parser.add_subparsers(dest='command', metavar='{' + ','.join(SUBCOMMANDS) + '}')
+    
+    consolidate_parser = subparsers.add_parser('consolidate', help='Only create the consolidated file (no API key needed)')
+    consolidate_parser.add_argument('flow_path', help='Path to DialogFlow export directory')
+    consolidate_parser.add_argument('--output', '-o', default='output', help='Output directory (default: output)')
+    consolidate_parser.add_argument('--workers', '-j', type=int, default=1, help='Number of parallel workers for loading export files (default: 1)')
+    consolidate_parser.add_argument('--format', choices=['raw', 'compact'], default='raw', dest='data_format', help='Export files verbatim (default) or minified JSON without fields irrelevant to the analysis')
+    
+    validate_parser = subparsers.add_parser('validate', help='Check that the export loads and has no missing references (for pre-commit hooks)')
+    validate_parser.add_argument('flow_path', help='Path to DialogFlow export directory')
+    validate_parser.add_argument('--workers', '-j', type=int, default=1, help='Number of parallel workers for loading export files (default: 1)')
+    validate_parser.add_argument('--strict', action='store_true', help='Also fail on unreachable flows and pages and cycles without exit')
+    validate_parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    
+    replay_parser = subparsers.add_parser('replay', help='Replay the test cases of the export (testCases/) through its flows locally (no API key needed)')
+    replay_parser.add_argument('flow_path', help='Path to DialogFlow export directory')
+    replay_parser.add_argument('--output', '-o', default='output', help='Output directory (default: output)')
+    replay_parser.add_argument('--workers', '-j', type=int, default=1, help='Number of parallel workers for loading export files and replaying test cases (default: 1)')
+    replay_parser.add_argument('--cache-dir', help='Cache directory holding the export snapshots (default: <output>/cache)')
+    replay_parser.add_argument('--no-snapshot', action='store_true', help='Always parse the export files instead of loading the parsed export from its snapshot in <cache dir>/snapshots')
+    replay_parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    
+    analyze_parser = subparsers.add_parser('analyze', help='Analyze the export with Gemini (default)')
+    analyze_parser.add_argument('flow_path', help='Path to DialogFlow export directory (with --batch: directory of exports or manifest file)')
+    analyze_parser.add_argument('--output', '-o', default='output', help='Output directory (default: output)')
+    analyze_parser.add_argument('--api-key', help='Gemini API key (or set GEMINI_API_KEY environment variable)')
+    analyze_parser.add_argument('--env-file', help='Path to .env file (default: looks for .env in current directory)')
+    analyze_parser.add_argument('--workers', '-j', type=int, default=1, help='Number of parallel workers for loading export files (default: 1)')
+    analyze_parser.add_argument('--stream-context', action='store_true', help='Stream the consolidated file to Gemini section by section instead of reading it whole')
+    analyze_parser.add_argument('--stream-response', action='store_true', help='Stream the Gemini response and write the report as it arrives (single-request analysis)')
+    analyze_parser.add_argument('--structured-report', action='store_true', help='Request the single-request analysis as JSON matching a response schema, validate it, and also save it indexed by flow, page and intent to reports/flow_analysis_report.json')
+    analyze_parser.add_argument('--context-cache', action='store_true', help='Upload the analysis prompt and consolidated data once as a cached context that the report and follow-up requests refer to')
+    analyze_parser.add_argument('--follow-up', action='append', default=[], metavar='QUESTION', dest='follow_up', help='Ask a follow-up question about the cached context after the report (repeatable; implies --context-cache)')
+    analyze_parser.add_argument('--flow-questions', action='store_true', help='Ask one follow-up question per flow about the cached context (implies --context-cache)')
+    analyze_parser.add_argument('--context-ttl', type=float, default=DEFAULT_CONTEXT_TTL_SECONDS, help=f'Lifetime of the cached context in seconds, extended while in use (default: {DEFAULT_CONTEXT_TTL_SECONDS})')
+    analyze_parser.add_argument('--incremental', action='store_true', help='Only re-analyze flows, intents and entity types changed since the previous run (analyzes per flow; cannot be combined with --map-reduce, --stream-context, --graph-check, --intent-overlap or --entity-coverage)')
+    analyze_parser.add_argument('--map-reduce', action='store_true', help='Analyze each flow separately and merge the reports (for exports too large for one request)')
+    analyze_parser.add_argument('--fan-out', action='store_true', help='Analyze every intent (phrase quality, coverage) and every page (handlers, reprompts) with a focused request and aggregate the issues into a single table')
+    analyze_parser.add_argument('--llm-workers', type=int, default=4, help='Maximum concurrent Gemini requests in map-reduce and fan-out mode (default: 4)')
+    analyze_parser.add_argument('--requests-per-minute', type=float, help='Rate limit for concurrent Gemini requests')
+    analyze_parser.add_argument('--tokens-per-minute', type=float, help='Input token rate limit for concurrent Gemini requests')
+    analyze_parser.add_argument('--graph-check', action='store_true', help='Check reachability, dead ends, cycles and missing references locally; the findings are saved and added to the analysis prompt (the merge prompt with --map-reduce)')
+    analyze_parser.add_argument('--intent-overlap', action='store_true', help='Find overlapping intents and near-duplicate training phrases locally (requires numpy); the findings are saved and added to the analysis prompt (the merge prompt with --map-reduce)')
+    analyze_parser.add_argument('--entity-coverage', action='store_true', help='Match entity synonyms in all training phrases and test case inputs locally (shared synonyms, unannotated entities, unused values); the findings are saved and added to the analysis prompt (the merge prompt with --map-reduce)')
+    analyze_parser.add_argument('--max-input-tokens', type=int, default=DEFAULT_MAX_INPUT_TOKENS, help=f'Input token budget per Gemini request, checked before sending (default: {DEFAULT_MAX_INPUT_TOKENS}; 0 for no budget)')
+    analyze_parser.add_argument('--exact-token-count', action='store_true', help='Count input tokens with the Gemini API instead of the local estimate')
+    analyze_parser.add_argument('--over-budget', choices=['map-reduce', 'fail'], default='map-reduce', help='When the consolidated request is over the budget: analyze per flow instead (default) or fail before sending it')
+    analyze_parser.add_argument('--format', choices=['raw', 'compact'], default='raw', dest='data_format', help='Serialization of the export data sent to Gemini: export files verbatim (default) or minified JSON without fields irrelevant to the analysis')
+    analyze_parser.add_argument('--no-cache', action='store_true', help='Always call Gemini instead of reusing cached responses')
+    analyze_parser.add_argument('--cache-dir', help='Response cache directory (default: <output>/cache)')
+    analyze_parser.add_argument('--no-snapshot', action='store_true', help='Always parse the export files instead of loading the parsed export from its snapshot in <cache dir>/snapshots')
+    analyze_parser.add_argument('--backend', choices=BACKEND_NAMES, default='gemini', help='Model backend: Gemini (default), a local fake for offline runs, or a model served over HTTP at --backend-url')
+    analyze_parser.add_argument('--backend-url', help='Endpoint of the http backend (e.g. started with benchmarks/fake_model_server.py)')
+    analyze_parser.add_argument('--fake-latency', type=float, default=0.0, help='Seconds per request of the fake backend (default: 0)')
+    analyze_parser.add_argument('--fake-failure-rate', type=float, default=0.0, help='Fraction of fake backend requests failing with a transient error (default: 0)')
+    analyze_parser.add_argument('--fake-response', help='File with the fake backend response template ({request}, {chars} and {preview} are filled in)')
+    analyze_parser.add_argument('--staging', choices=STAGING_POLICIES, default='preview', dest='staging_policy', help='Staging files written for review: none, prompts with context previews and responses (default), or also the complete contexts, stored once per content hash')
+    analyze_parser.add_argument('--staging-compression', choices=STAGING_COMPRESSIONS, default='none', help='Compress staging files with gzip or zstd (requires zstandard) (default: none)')
+    analyze_parser.add_argument('--prometheus', action='store_true', help='Also save the run metrics (reports/run_metrics.json) in Prometheus text format to reports/run_metrics.prom')
+    analyze_parser.add_argument('--batch', action='store_true', help='Analyze every export in the flow_path directory, or listed one per line in the flow_path manifest file, each into <output>/<agent name>')
+    analyze_parser.add_argument('--processes', type=int, default=DEFAULT_PROCESSES, help=f'Worker processes in batch mode (default: {DEFAULT_PROCESSES})')
+    analyze_parser.add_argument('--restart', action='store_true', help='Ignore the batch checkpoint and analyze every agent again')
+    analyze_parser.add_argument('--verbose', '-v', action='store_true', help='Enable verbose logging')
+    
+    # Invocations without a subcommand keep working as analyze
+    argv = sys.argv[1:]
+    if argv and argv[0] not in SUBCOMMANDS and argv[0] not in ('-h', '--help'):
+        argv = ['analyze'] + argv
+    args = parser.parse_args(argv)
+    
+    if args.command is None:
+        parser.print_help()
+        sys.exit(2)
+    
+    commands = {'consolidate': run_consolidate, 'validate': run_validate, 'replay': run_replay}
+    if args.command in commands:
+        try:
+            commands[args.command](args)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+    
+    check_analyze_args(analyze_parser, args)
+    
+    # Setup logging level
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    
+    options = dict(
+        api_key=args.api_key,
+        env_file=args.env_file,
+        load_workers=args.workers,
+        stream_context=args.stream_context,
+        stream_response=args.stream_response,
+        structured_report=args.structured_report,
+        context_cache=args.context_cache,
+        follow_up_questions=args.follow_up,
+        flow_questions=args.flow_questions,
+        context_ttl=args.context_ttl,
+        use_cache=not args.no_cache,
+        cache_dir=args.cache_dir,
+        map_reduce=args.map_reduce,
+        fan_out=args.fan_out,
+        llm_workers=args.llm_workers,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        graph_check=args.graph_check,
+        intent_overlap=args.intent_overlap,
+        entity_coverage=args.entity_coverage,
+        max_input_tokens=args.max_input_tokens or None,
+        exact_token_count=args.exact_token_count,
+        over_budget=args.over_budget,
+        data_format=args.data_format,
+        use_snapshot=not args.no_snapshot,
+        backend=args.backend,
+        backend_url=args.backend_url,
+        fake_options=dict(latency=args.fake_latency, failure_rate=args.fake_failure_rate),
+        prometheus_metrics=args.prometheus,
+        staging_policy=args.staging_policy,
+        staging_compression=args.staging_compression
+    )
+    if args.fake_response:
+        options['fake_options']['template'] = Path(args.fake_response).read_text(encoding='utf-8')
+    
+    if args.batch:
+        try:
+            run_batch(args, options)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+    
+    try:
+        # Initialize analyzer
+        analyzer = DialogFlowAnalyzer(flow_path=args.flow_path, output_path=args.output, **options)
+        
+        # Run analysis
+        if args.incremental:
+            results = analyzer.run_incremental_analysis()
+        else:
+            results = analyzer.run_full_analysis()
+        
+        print_analysis_summary(analyzer, results, args)
         
     except Exception as e:
         print(f"Error: {e}")
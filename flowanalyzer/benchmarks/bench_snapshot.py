@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark of cold (parse every file) vs warm (load the snapshot) export loads.
+
+Usage: python benchmarks/bench_snapshot.py [--scale N] [--repeat R] [--flow-path PATH]
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from file_loader import DialogFlowFileLoader
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / '..' / 'Flow'
+
+def replicate_export(flow_path: Path, target: Path, scale: int) -> Path:
+    """Copy the export with every flow, intent and entity type repeated scale times."""
+    target.mkdir(parents=True)
+    shutil.copy2(flow_path / "agent.json", target / "agent.json")
+    for directory in ("flows", "intents", "entityTypes"):
+        if not (flow_path / directory).exists():
+            continue
+        for item_dir in sorted((flow_path / directory).iterdir()):
+            for copy in range(scale):
+                name = item_dir.name if copy == 0 else f"{item_dir.name}_{copy}"
+                shutil.copytree(item_dir, target / directory / name)
+    return target
+
+def time_load(loader: DialogFlowFileLoader, flow_path: Path, repeat: int) -> float:
+    """Best wall time of repeat loads."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader.load_export(flow_path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark cold vs warm export loads')
+    parser.add_argument('--flow-path', default=str(FLOW_PATH), help='Export to replicate (default: the sample Flow export)')
+    parser.add_argument('--scale', type=int, default=50, help='Copies of every flow, intent and entity type (default: 50)')
+    parser.add_argument('--repeat', type=int, default=3, help='Loads per measurement, best is reported (default: 3)')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        flow_path = replicate_export(Path(args.flow_path), Path(temp_dir) / "export", args.scale)
+        snapshot_dir = Path(temp_dir) / "snapshots"
+        files = sum(1 for _ in flow_path.rglob("*.json"))
+        export_bytes = sum(path.stat().st_size for path in flow_path.rglob("*.json"))
+        
+        cold = time_load(DialogFlowFileLoader(), flow_path, args.repeat)
+        
+        loader = DialogFlowFileLoader(snapshot_dir=snapshot_dir)
+        start = time.perf_counter()
+        loader.load_export(flow_path)
+        first = time.perf_counter() - start
+        snapshot_stats = loader.load_stats['snapshot']
+        
+        warm = time_load(loader, flow_path, args.repeat)
+        assert loader.load_stats['snapshot']['status'] == 'hit'
+        
+        print(f"Export: {files} files, {export_bytes/1024:.0f} KB (scale {args.scale})")
+        print(f"Snapshot: {snapshot_stats['bytes']/1024:.0f} KB")
+        print(f"Cold load (parse):            {cold*1000:8.1f} ms")
+        print(f"First load (parse + snapshot): {first*1000:7.1f} ms")
+        print(f"Warm load (snapshot):         {warm*1000:8.1f} ms  ({cold/warm:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
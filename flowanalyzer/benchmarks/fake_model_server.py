@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for Gemini, for offline runs and load tests.
+
+Usage: python benchmarks/fake_model_server.py [--port 8765] [--latency 0.5] [--failure-rate 0.1]
+Then:  python analyzer.py Flow --backend http --backend-url http://127.0.0.1:8765/generate
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from model_backends import FakeBackend, FakeModelServer, DEFAULT_FAKE_TEMPLATE
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a fake Gemini model over HTTP')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds per request (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds per request (default: 0)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--response', help='File with the response template ({request}, {chars} and {preview} are filled in)')
+    parser.add_argument('--seed', type=int, help='Random seed for jitter and failures')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(message)s')
+    template = Path(args.response).read_text(encoding='utf-8') if args.response else DEFAULT_FAKE_TEMPLATE
+    backend = FakeBackend(template=template, latency=args.latency, jitter=args.jitter,
+                          failure_rate=args.failure_rate, seed=args.seed)
+    
+    with FakeModelServer(backend, args.host, args.port) as server:
+        print(f"Serving fake model at {server.url} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    print(f"Served {len(backend.calls)} request(s), {backend.failures} failed")
+
+if __name__ == "__main__":
+    main()
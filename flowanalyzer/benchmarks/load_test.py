@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Load test of the async client (concurrency, rate limits, retries, cache) against a fake model.
+
+Usage: python benchmarks/load_test.py [--requests 200] [--concurrency 8] [--latency 0.2]
+                                      [--failure-rate 0.1] [--url http://127.0.0.1:8765/generate]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from response_cache import ResponseCache
+from model_backends import FakeBackend, HttpBackend
+
+class TimedBackend:
+    """Wraps a backend to record the latency of every successful call."""
+    
+    def __init__(self, backend):
+        self.backend = backend
+        self.latencies = []
+    
+    def generate_content(self, contents):
+        start = time.perf_counter()
+        response = self.backend.generate_content(contents)
+        self.latencies.append(time.perf_counter() - start)
+        return response
+    
+    async def generate_content_async(self, contents):
+        start = time.perf_counter()
+        if hasattr(self.backend, 'generate_content_async'):
+            response = await self.backend.generate_content_async(contents)
+        else:
+            response = await asyncio.to_thread(self.backend.generate_content, contents)
+        self.latencies.append(time.perf_counter() - start)
+        return response
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the async client against a fake model')
+    parser.add_argument('--requests', type=int, default=200, help='Number of requests (default: 200)')
+    parser.add_argument('--distinct', type=int, help='Number of distinct requests; repeats are cache hits (default: all distinct)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Maximum requests in flight (default: 8)')
+    parser.add_argument('--requests-per-minute', type=float, help='Request rate limit')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds per request of the in-process fake (default: 0.2)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='Random extra seconds per request (default: 0.1)')
+    parser.add_argument('--failure-rate', type=float, default=0.05, help='Fraction of failing requests of the in-process fake (default: 0.05)')
+    parser.add_argument('--url', help='Load test a model served over HTTP instead of the in-process fake')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+    
+    backend = HttpBackend(args.url) if args.url else FakeBackend(
+        latency=args.latency, jitter=args.jitter, failure_rate=args.failure_rate, seed=args.seed
+    )
+    model = TimedBackend(backend)
+    distinct = args.distinct or args.requests
+    
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache(cache_dir) if distinct < args.requests else None
+        client = AsyncGeminiClient(
+            GeminiClient(model=model, cache=cache, max_input_tokens=None),
+            max_concurrency=args.concurrency,
+            requests_per_minute=args.requests_per_minute,
+            base_delay=0.05,
+            max_delay=1.0
+        )
+        requests = [("Analyze this.", f"context {index % distinct}", f"request_{index}") for index in range(args.requests)]
+        
+        start = time.perf_counter()
+        results = asyncio.run(client.analyze_many(requests, return_exceptions=True))
+        seconds = time.perf_counter() - start
+    
+    failed = sum(1 for result in results if isinstance(result, Exception))
+    latencies = sorted(model.latencies)
+    print(f"Requests: {args.requests} ({distinct} distinct) with concurrency {args.concurrency}")
+    print(f"Wall time: {seconds:.2f}s, {args.requests / seconds:.1f} requests/s")
+    print(f"Model calls: {client.stats['requests']}, retries: {client.stats['retries']}, "
+          f"cache hits: {client.stats['cache_hits']}, failed requests: {failed}")
+    if latencies:
+        print(f"Model latency: p50 {statistics.median(latencies)*1000:.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95) - 1]*1000:.0f} ms, max {latencies[-1]*1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: wall time and peak memory of the pipeline stages on synthetic exports.
+
+Stages: load (dict trees and agent model), consolidate (raw and compact),
+serialize (FlowAnalyzer._prepare_analysis_data, raw and compact) and analyze
+with a fake LLM (single request and map-reduce). Results can be saved as JSON
+and compared with a previous run to catch regressions.
+
+Usage: python benchmarks/run_benchmarks.py [--scales small medium] [--repeat R]
+                                           [--json results.json] [--baseline old.json]
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Callable, List, Optional
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from gemini_client import GeminiClient
+from flow_analyzer import FlowAnalyzer
+from synthetic_export import SCALES, generate_export
+
+RESULTS_VERSION = 1
+
+# A stage regresses when it is this much slower or bigger than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini response."""
+    
+    def __init__(self, text):
+        self.text = text
+
+class FakeModel:
+    """Fake model answering every request instantly with a fixed report."""
+    
+    def generate_content(self, contents):
+        return FakeResponse("| Priority | Issue | Location | Solution |\n|---|---|---|---|\n| High | Dead end | Page | Add a route |")
+
+def build_stages(flow_path: Path, work_dir: Path) -> Dict[str, Callable[[], Any]]:
+    """Build the benchmarked stage functions of an export, with their inputs prepared up front."""
+    for directory in ("consolidated", "raw", "compact"):
+        (work_dir / directory).mkdir()
+    
+    loader = DialogFlowFileLoader()
+    export_data = loader.load_export(flow_path)
+    consolidated_file = loader.create_consolidated_file(flow_path, work_dir / "consolidated")
+    consolidated_data = loader.load_consolidated_data(consolidated_file)
+    
+    def analyzer(compact: bool = False) -> FlowAnalyzer:
+        return FlowAnalyzer(GeminiClient(model=FakeModel(), max_input_tokens=None), compact=compact)
+    
+    return {
+        'load': lambda: loader.load_export(flow_path),
+        'load_model': lambda: loader.load_model(flow_path),
+        'consolidate_raw': lambda: loader.create_consolidated_file(flow_path, work_dir / "raw"),
+        'consolidate_compact': lambda: loader.create_consolidated_file(flow_path, work_dir / "compact", compact=True),
+        'serialize_raw': lambda: analyzer()._prepare_analysis_data(export_data),
+        'serialize_compact': lambda: analyzer(compact=True)._prepare_analysis_data(export_data),
+        'analyze': lambda: analyzer().analyze_flow(consolidated_data),
+        'analyze_map_reduce': lambda: analyzer().analyze_map_reduce(export_data, max_workers=4)
+    }
+
+def measure(stage: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Time repeat runs of a stage, then trace one more run for its peak memory."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stage()
+        times.append(time.perf_counter() - start)
+    
+    tracemalloc.start()
+    try:
+        stage()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'seconds': round(min(times), 6),
+        'median_seconds': round(statistics.median(times), 6),
+        'peak_bytes': peak_bytes
+    }
+
+def run_scale(scale: str, repeat: int, stages: Optional[List[str]] = None, **sizes) -> Dict[str, Any]:
+    """
+    Generate an export of a scale and measure every stage on it.
+    
+    Args:
+        scale: Name of a preset in SCALES
+        repeat: Timed runs per stage (the best is reported)
+        stages: Stage names to run (default: all)
+        sizes: Overrides of the preset's generate_export arguments
+    
+    Returns:
+        Export stats and per-stage measurements
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        flow_path = Path(temp_dir) / "export"
+        export_stats = generate_export(flow_path, **dict(SCALES[scale], **sizes))
+        stage_functions = build_stages(flow_path, Path(temp_dir))
+        
+        results = {}
+        for name, stage in stage_functions.items():
+            if stages is None or name in stages:
+                results[name] = measure(stage, repeat)
+        return {'export': export_stats, 'stages': results}
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Find the stages that got slower or bigger than in the baseline.
+    
+    Args:
+        results: Results of this run
+        baseline: Results of a previous run
+        tolerance: Allowed relative increase
+    
+    Returns:
+        One line per regression
+    """
+    regressions = []
+    for scale, scale_results in results['scales'].items():
+        baseline_stages = baseline.get('scales', {}).get(scale, {}).get('stages', {})
+        for name, measurement in scale_results['stages'].items():
+            previous = baseline_stages.get(name)
+            if not previous:
+                continue
+            for metric in ('seconds', 'peak_bytes'):
+                if previous[metric] and measurement[metric] > previous[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"{scale}/{name} {metric}: {previous[metric]} -> {measurement[metric]} "
+                        f"(+{measurement[metric] / previous[metric] - 1:.0%})"
+                    )
+    return regressions
+
+def format_results(results: Dict[str, Any]) -> str:
+    """Format the results as one table per scale."""
+    lines = []
+    for scale, scale_results in results['scales'].items():
+        export = scale_results['export']
+        lines.append(f"\n{scale}: {export['flows']} flows, {export['pages']} pages, {export['intents']} intents, "
+                     f"{export['phrases']} phrases, {export['entity_types']} entity types "
+                     f"({export['files']} files, {export['bytes']/1024:.0f} KB)")
+        lines.append(f"  {'stage':<22}{'best ms':>10}{'median ms':>12}{'peak MB':>10}")
+        for name, measurement in scale_results['stages'].items():
+            lines.append(f"  {name:<22}{measurement['seconds']*1000:>10.1f}{measurement['median_seconds']*1000:>12.1f}"
+                         f"{measurement['peak_bytes']/1024/1024:>10.1f}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analyzer pipeline on synthetic exports')
+    parser.add_argument('--scales', nargs='+', choices=list(SCALES), default=['small', 'medium'], help='Export scales to run (default: small medium)')
+    parser.add_argument('--stages', nargs='+', help='Only run these stages')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage, best is reported (default: 3)')
+    parser.add_argument('--json', help='Save the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with the results of a previous run and exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help=f'Allowed relative increase over the baseline (default: {DEFAULT_TOLERANCE})')
+    args = parser.parse_args()
+    
+    results = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'repeat': args.repeat,
+        'scales': {scale: run_scale(scale, args.repeat, args.stages) for scale in args.scales}
+    }
+    print(format_results(results))
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults: {args.json}")
+    
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}:")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+        print(f"\nNo regression over {args.tolerance:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: import time of analyzer.py (python -X importtime) and wall
+time of quick CLI commands.
+
+Heavy dependencies (the Gemini SDK, google.api_core/grpc, numpy, the HTTP
+client and server) must only be imported when a command uses them; any of them
+imported by `import analyzer` is reported as a regression. Results can be
+saved as JSON and compared with a previous run, like run_benchmarks.py.
+
+Usage: python benchmarks/startup_time.py [--repeat R] [--json results.json] [--baseline old.json]
+"""
+
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+RESULTS_VERSION = 1
+
+ANALYZER_DIR = Path(__file__).resolve().parent.parent
+SAMPLE_EXPORT = ANALYZER_DIR.parent / "Flow"
+
+# Modules that must not be imported by `import analyzer`
+HEAVY_MODULES = ['google.generativeai', 'google.api_core', 'grpc', 'numpy', 'urllib.request', 'http.server']
+
+# A measurement regresses when it is this much slower than the baseline
+DEFAULT_TOLERANCE = 0.25
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """
+    Parse the -X importtime report.
+    
+    Returns:
+        (module, self microseconds, cumulative microseconds, nesting level) per import
+    """
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        level = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        imports.append((name.strip(), int(self_us), int(cumulative_us), level))
+    return imports
+
+def measure_imports() -> Dict[str, Any]:
+    """Import analyzer in a fresh interpreter and break down its import time."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", "import analyzer"],
+        cwd=ANALYZER_DIR, capture_output=True, text=True, check=True
+    )
+    imports = parse_importtime(result.stderr)
+    
+    # Children are reported before their parent: analyzer's imports are the lines
+    # between the previous top-level import (e.g. site) and analyzer itself
+    end = next(index for index, (name, _, _, level) in enumerate(imports) if name == "analyzer" and level == 0)
+    start = max((index + 1 for index in range(end) if imports[index][3] == 0), default=0)
+    analyzer_imports = imports[start:end + 1]
+    
+    children = sorted(
+        ((name, cumulative) for name, _, cumulative, level in analyzer_imports if level == 1),
+        key=lambda item: item[1], reverse=True
+    )
+    heavy = sorted({
+        heavy_name for name, _, _, _ in analyzer_imports for heavy_name in HEAVY_MODULES
+        if name == heavy_name or name.startswith(heavy_name + ".")
+    })
+    
+    return {
+        'import_us': imports[end][2],
+        'modules': len(analyzer_imports),
+        'top_imports': children[:10],
+        'heavy_modules': heavy
+    }
+
+def measure_commands(repeat: int) -> Dict[str, float]:
+    """Best wall time of CLI commands that never call Gemini."""
+    commands = {'help': ["--help"]}
+    if SAMPLE_EXPORT.exists():
+        commands['validate'] = ["validate", str(SAMPLE_EXPORT)]
+    
+    results = {}
+    for name, arguments in commands.items():
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-W", "ignore", str(ANALYZER_DIR / "analyzer.py"), *arguments],
+                           capture_output=True, check=True)
+            times.append(time.perf_counter() - start)
+        results[name] = round(min(times), 4)
+    return results
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Find measurements that got slower than in the baseline, and heavy imports.
+    
+    Args:
+        results: Results of this run
+        baseline: Results of a previous run (None to only check heavy imports)
+        tolerance: Allowed relative increase
+    
+    Returns:
+        One line per regression
+    """
+    regressions = [f"heavy module imported at startup: {name}" for name in results['heavy_modules']]
+    if not baseline:
+        return regressions
+    
+    measurements = [('import_us', results['import_us'], baseline.get('import_us'))]
+    measurements += [(f"{name} seconds", seconds, baseline.get('commands', {}).get(name))
+                     for name, seconds in results['commands'].items()]
+    for name, value, previous in measurements:
+        if previous and value > previous * (1 + tolerance):
+            regressions.append(f"{name}: {previous} -> {value} (+{value / previous - 1:.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the startup time of analyzer.py')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per command, best is reported (default: 5)')
+    parser.add_argument('--json', help='Save the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with the results of a previous run')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help=f'Allowed relative increase over the baseline (default: {DEFAULT_TOLERANCE})')
+    args = parser.parse_args()
+    
+    results = {
+        'version': RESULTS_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        **measure_imports(),
+        'commands': measure_commands(args.repeat)
+    }
+    
+    print(f"import analyzer: {results['import_us']/1000:.1f} ms ({results['modules']} modules)")
+    for name, cumulative_us in results['top_imports']:
+        print(f"  {name:<32}{cumulative_us/1000:>8.1f} ms")
+    for name, seconds in results['commands'].items():
+        print(f"analyzer.py {name}: {seconds*1000:.0f} ms")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults: {args.json}")
+    
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"- {regression}")
+        sys.exit(1)
+    print("\nNo heavy module imported at startup" + (f", no regression over {args.tolerance:.0%} against {args.baseline}" if args.baseline else ""))
+
+if __name__ == "__main__":
+    main()
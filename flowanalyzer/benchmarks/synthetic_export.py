@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Synthetic DialogFlow CX export generator.
+
+Writes exports in the same layout as the sample Flow/ export (agent.json,
+flows/<flow>/<flow>.json with pages/, intents/<intent>/ with trainingPhrases/,
+entityTypes/<entity type>/ with entities/), sized by the number of flows,
+pages, intents, phrases and entity types. Output is deterministic for a seed.
+
+Usage: python benchmarks/synthetic_export.py OUTPUT [--flows N] [--pages M] [--intents K] [--phrases P] ...
+"""
+
+import json
+import uuid
+import random
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Benchmark scales: keyword arguments of generate_export
+SCALES = {
+    'small': dict(flows=2, pages=10, intents=20, phrases=20, entity_types=3, entity_values=10, synonyms=3),
+    'medium': dict(flows=10, pages=30, intents=200, phrases=50, entity_types=10, entity_values=100, synonyms=5),
+    'large': dict(flows=40, pages=50, intents=1000, phrases=100, entity_types=40, entity_values=500, synonyms=5)
+}
+
+WORDS = [
+    "book", "car", "rental", "tomorrow", "airport", "downtown", "cheap", "luxury", "return", "pickup",
+    "change", "cancel", "reservation", "price", "week", "weekend", "help", "agent", "payment", "card",
+    "insurance", "upgrade", "driver", "mileage", "location", "time", "date", "please", "need", "want"
+]
+
+START_FLOW_NAME = "Default Start Flow"
+
+def generate_export(output_path: Path, flows: int = 2, pages: int = 10, intents: int = 20, phrases: int = 20,
+                    entity_types: int = 3, entity_values: int = 10, synonyms: int = 3, seed: int = 0) -> Dict[str, int]:
+    """
+    Write a synthetic export.
+    
+    Every page has an entry message, a form parameter of one of the entity
+    types, two intent routes (to the next page and to a random page), a
+    condition route and an event handler. The last page of a flow routes to
+    the start of the next flow, and the last flow ends the session. About half
+    of the training phrases annotate an entity synonym as intent parameter.
+    
+    Args:
+        output_path: Export directory to create
+        flows: Number of flows (the first one is the start flow)
+        pages: Pages per flow
+        intents: Number of intents
+        phrases: Training phrases per intent
+        entity_types: Number of entity types
+        entity_values: Values per entity type
+        synonyms: Synonyms per entity value
+        seed: Random seed
+    
+    Returns:
+        Number of files, bytes and items written
+    """
+    rng = random.Random(seed)
+    output_path = Path(output_path)
+    stats = {'files': 0, 'bytes': 0, 'flows': flows, 'pages': flows * pages, 'intents': intents,
+             'phrases': intents * phrases, 'entity_types': entity_types}
+    
+    def new_id() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+    
+    def write(path: Path, data: Dict[str, Any]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+        path.write_text(text, encoding='utf-8')
+        stats['files'] += 1
+        stats['bytes'] += len(text.encode('utf-8'))
+    
+    def words(count: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+    
+    def messages(text: str) -> Dict[str, Any]:
+        return {'messages': [{'text': {'text': [text]}, 'languageCode': 'en'}]}
+    
+    entity_names = [f"entity_{index:03d}" for index in range(entity_types)]
+    intent_names = [f"intent_{index:04d}" for index in range(intents)]
+    flow_names = [START_FLOW_NAME] + [f"Flow {index:03d}" for index in range(1, flows)]
+    
+    write(output_path / "agent.json", {
+        'displayName': "Synthetic Agent",
+        'defaultLanguageCode': "en",
+        'timeZone': "America/Los_Angeles",
+        'startFlow': START_FLOW_NAME,
+        'enableSpellCorrection': True
+    })
+    
+    entity_synonyms: Dict[str, List[str]] = {}
+    for entity_name in entity_names:
+        entries = []
+        for value_index in range(entity_values):
+            value = f"{entity_name} value {value_index}"
+            entries.append({
+                'value': value,
+                'synonyms': [value] + [f"{words(2)} {value_index}.{synonym}" for synonym in range(synonyms - 1)],
+                'languageCode': 'en'
+            })
+        entity_synonyms[entity_name] = [synonym for entry in entries for synonym in entry['synonyms']]
+        write(output_path / "entityTypes" / entity_name / f"{entity_name}.json", {
+            'name': new_id(),
+            'displayName': entity_name,
+            'kind': "KIND_MAP",
+            'autoExpansionMode': "AUTO_EXPANSION_MODE_DEFAULT"
+        })
+        write(output_path / "entityTypes" / entity_name / "entities" / "en.json", {'entities': entries})
+    
+    for intent_name in intent_names:
+        parameters = []
+        if entity_names:
+            entity_name = rng.choice(entity_names)
+            parameters.append({'id': entity_name, 'entityType': f"@{entity_name}"})
+        write(output_path / "intents" / intent_name / f"{intent_name}.json", {
+            'name': new_id(),
+            'displayName': intent_name,
+            'parameters': parameters,
+            'priority': 500000,
+            'numTrainingPhrases': phrases
+        })
+        
+        training_phrases = []
+        for _ in range(phrases):
+            parts = [{'text': words(rng.randint(3, 8)) + " ", 'auto': True}]
+            if parameters and rng.random() < 0.5:
+                entity_name = parameters[0]['id']
+                parts.append({'text': rng.choice(entity_synonyms[entity_name]), 'parameterId': entity_name, 'auto': True})
+            training_phrases.append({'parts': parts, 'repeatCount': 1, 'languageCode': 'en'})
+        write(output_path / "intents" / intent_name / "trainingPhrases" / "en.json", {'trainingPhrases': training_phrases})
+    
+    for flow_index, flow_name in enumerate(flow_names):
+        page_names = [f"{flow_name} Page {index:03d}" for index in range(pages)]
+        
+        start_routes = []
+        if intent_names:
+            route = {'intent': rng.choice(intent_names), 'triggerFulfillment': messages(words(6)), 'name': new_id()}
+            if page_names:
+                route['targetPage'] = page_names[0]
+            start_routes.append(route)
+        write(output_path / "flows" / flow_name / f"{flow_name}.json", {
+            'name': new_id(),
+            'displayName': flow_name,
+            'transitionRoutes': start_routes,
+            'eventHandlers': [
+                {'event': "sys.no-match-default", 'triggerFulfillment': messages("Sorry, could you say that again?"), 'name': new_id()},
+                {'event': "sys.no-input-default", 'triggerFulfillment': messages("Are you still there?"), 'name': new_id()}
+            ]
+        })
+        
+        for page_index, page_name in enumerate(page_names):
+            if page_index + 1 < len(page_names):
+                next_target = {'targetPage': page_names[page_index + 1]}
+            elif flow_index + 1 < len(flow_names):
+                next_target = {'targetFlow': flow_names[flow_index + 1]}
+            else:
+                next_target = {'targetPage': "End Session"}
+            
+            form_parameters = []
+            if entity_names:
+                entity_name = rng.choice(entity_names)
+                form_parameters.append({
+                    'displayName': entity_name,
+                    'required': True,
+                    'entityType': f"@{entity_name}",
+                    'fillBehavior': {'initialPromptFulfillment': messages(f"Which {entity_name}?")}
+                })
+            
+            routes = []
+            if intent_names:
+                routes.append(dict({'intent': rng.choice(intent_names), 'triggerFulfillment': {}, 'name': new_id()}, **next_target))
+                routes.append({'intent': rng.choice(intent_names), 'triggerFulfillment': messages(words(5)),
+                               'targetPage': rng.choice(page_names), 'name': new_id()})
+            routes.append(dict({'condition': '$page.params.status = "FINAL"', 'triggerFulfillment': {}, 'name': new_id()}, **next_target))
+            
+            write(output_path / "flows" / flow_name / "pages" / f"{page_name}.json", {
+                'name': new_id(),
+                'displayName': page_name,
+                'form': {'parameters': form_parameters},
+                'entryFulfillment': messages(words(8) + "?"),
+                'transitionRoutes': routes,
+                'eventHandlers': [
+                    {'event': "sys.no-match-default", 'triggerFulfillment': messages(words(4)), 'name': new_id()}
+                ]
+            })
+    
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic DialogFlow CX export')
+    parser.add_argument('output', help='Export directory to create')
+    parser.add_argument('--scale', choices=sorted(SCALES), help='Preset sizes (individual options override them)')
+    parser.add_argument('--flows', type=int, help='Number of flows')
+    parser.add_argument('--pages', type=int, help='Pages per flow')
+    parser.add_argument('--intents', type=int, help='Number of intents')
+    parser.add_argument('--phrases', type=int, help='Training phrases per intent')
+    parser.add_argument('--entity-types', type=int, help='Number of entity types')
+    parser.add_argument('--entity-values', type=int, help='Values per entity type')
+    parser.add_argument('--synonyms', type=int, help='Synonyms per entity value')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+    
+    options = dict(SCALES[args.scale]) if args.scale else {}
+    for name in ('flows', 'pages', 'intents', 'phrases', 'entity_types', 'entity_values', 'synonyms'):
+        if getattr(args, name) is not None:
+            options[name] = getattr(args, name)
+    
+    stats = generate_export(Path(args.output), seed=args.seed, **options)
+    print(f"Generated {args.output}: {stats['flows']} flows, {stats['pages']} pages, {stats['intents']} intents, "
+          f"{stats['phrases']} phrases, {stats['entity_types']} entity types "
+          f"({stats['files']} files, {stats['bytes']/1024:.0f} KB)")
+
+if __name__ == "__main__":
+    main()
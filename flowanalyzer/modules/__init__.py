@@ -5,12 +5,58 @@ DialogFlow Flow Analyzer Modules Package
 from .file_loader import DialogFlowFileLoader
 from .flow_analyzer import FlowAnalyzer
 from .gemini_client import GeminiClient
+from .async_gemini_client import AsyncGeminiClient, RateLimiter
+from .model_backends import FakeBackend, HttpBackend, FakeModelServer, create_backend
+from .response_cache import ResponseCache
+from .run_metrics import RunMetrics
+from .staging_writer import StagingWriter
+from .export_manifest import ExportManifest
+from .export_snapshot import ExportSnapshot
+from .flow_partitioner import partition_export
+from .flow_graph import FlowGraph
+from .intent_overlap import IntentOverlapDetector
+from .entity_matcher import EntityMatcher
+from .token_budget import PromptTooLargeError
+from .compact_format import compact_json
+from .batch_runner import BatchRunner, discover_exports
+from .conversation_replay import ConversationReplayer
+from .agent_model import AgentModel
+from .json_stream import iter_array_items, StreamedArray
+from .structured_report import ReportValidationError, build_report, query_issues
+from .context_cache import CachedContext
 from .utils import setup_logging, create_output_directories
 
 __all__ = [
     'DialogFlowFileLoader',
     'FlowAnalyzer',
     'GeminiClient',
+    'AsyncGeminiClient',
+    'RateLimiter',
+    'FakeBackend',
+    'HttpBackend',
+    'FakeModelServer',
+    'create_backend',
+    'ResponseCache',
+    'RunMetrics',
+    'StagingWriter',
+    'ExportManifest',
+    'ExportSnapshot',
+    'partition_export',
+    'FlowGraph',
+    'IntentOverlapDetector',
+    'EntityMatcher',
+    'PromptTooLargeError',
+    'compact_json',
+    'BatchRunner',
+    'discover_exports',
+    'ConversationReplayer',
+    'AgentModel',
+    'iter_array_items',
+    'StreamedArray',
+    'ReportValidationError',
+    'build_report',
+    'query_issues',
+    'CachedContext',
     'setup_logging',
     'create_output_directories'
 ] 
\ No newline at end of file
@@ -0,0 +1,282 @@
+"""
+Agent Model Module
+Typed, indexed in-memory model of a DialogFlow export.
+"""
+
+import sys
+import logging
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, FrozenSet
+from urllib.parse import unquote
+
+def _name(value: Optional[str]) -> Optional[str]:
+    """Intern a name; names repeat across routes, pages and parameters."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _messages(fulfillment: Optional[Dict[str, Any]]) -> Tuple[str, ...]:
+    """Text responses of a fulfillment."""
+    texts = []
+    for message in (fulfillment or {}).get('messages', []):
+        texts.extend((message.get('text') or {}).get('text', []))
+    return tuple(texts)
+
+def _parameter_actions(fulfillment: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, Any], ...]:
+    """(parameter, value) presets of a fulfillment."""
+    return tuple(
+        (_name(action.get('parameter')), action.get('value'))
+        for action in (fulfillment or {}).get('setParameterActions', [])
+    )
+
+@dataclass
+class Route:
+    """A transition route or event handler."""
+    __slots__ = ('intent', 'condition', 'event', 'target_page', 'target_flow', 'messages', 'parameter_actions')
+    intent: Optional[str]
+    condition: Optional[str]
+    event: Optional[str]
+    target_page: Optional[str]
+    target_flow: Optional[str]
+    messages: Tuple[str, ...]
+    parameter_actions: Tuple[Tuple[str, Any], ...]
+    
+    @classmethod
+    def from_json(cls, route: Dict[str, Any]) -> 'Route':
+        """Build a route from a transitionRoutes or eventHandlers entry."""
+        fulfillment = route.get('triggerFulfillment')
+        return cls(
+            _name(route.get('intent')), route.get('condition'), _name(route.get('event')),
+            _name(route.get('targetPage')), _name(route.get('targetFlow')),
+            _messages(fulfillment), _parameter_actions(fulfillment)
+        )
+
+@dataclass
+class FormParameter:
+    """A form parameter of a page."""
+    __slots__ = ('name', 'entity_type', 'required', 'reprompt_handlers')
+    name: str
+    entity_type: Optional[str]
+    required: bool
+    reprompt_handlers: Tuple[Route, ...]
+
+@dataclass
+class Page:
+    """A page with its form, entry fulfillment, routes and prebuilt indexes."""
+    __slots__ = ('name', 'flow', 'form', 'entry_messages', 'entry_parameter_actions', 'routes',
+                 'event_handlers', 'route_groups', 'routes_by_intent', 'condition_routes', 'intents')
+    name: str
+    flow: str
+    form: Tuple[FormParameter, ...]
+    entry_messages: Tuple[str, ...]
+    entry_parameter_actions: Tuple[Tuple[str, Any], ...]
+    routes: Tuple[Route, ...]
+    event_handlers: Tuple[Route, ...]
+    route_groups: Tuple[str, ...]
+    # Intent -> its routes in evaluation order
+    routes_by_intent: Dict[str, Tuple[Route, ...]]
+    # Routes without an intent, in evaluation order
+    condition_routes: Tuple[Route, ...]
+    # Intents referenced by the page's routes
+    intents: FrozenSet[str]
+    
+    @classmethod
+    def from_json(cls, page: Dict[str, Any], name: str, flow: str) -> 'Page':
+        """Build a page (or a flow's start page) from its JSON."""
+        form = tuple(
+            FormParameter(
+                _name(parameter.get('displayName')),
+                _name(parameter.get('entityType')),
+                bool(parameter.get('required', False)),
+                tuple(Route.from_json(handler) for handler in (parameter.get('fillBehavior') or {}).get('repromptEventHandlers', []))
+            )
+            for parameter in (page.get('form') or {}).get('parameters', [])
+        )
+        routes = tuple(Route.from_json(route) for route in page.get('transitionRoutes', []))
+        
+        routes_by_intent: Dict[str, List[Route]] = {}
+        for route in routes:
+            if route.intent:
+                routes_by_intent.setdefault(route.intent, []).append(route)
+        
+        return cls(
+            _name(name), _name(flow), form,
+            _messages(page.get('entryFulfillment')), _parameter_actions(page.get('entryFulfillment')),
+            routes,
+            tuple(Route.from_json(handler) for handler in page.get('eventHandlers', [])),
+            tuple(_name(group) for group in page.get('transitionRouteGroups', [])),
+            {intent: tuple(intent_routes) for intent, intent_routes in routes_by_intent.items()},
+            tuple(route for route in routes if not route.intent),
+            frozenset(routes_by_intent)
+        )
+
+@dataclass
+class Flow:
+    """A flow with its pages indexed by display name."""
+    __slots__ = ('name', 'directory', 'start', 'pages')
+    name: str
+    directory: str
+    # The flow's own routes and event handlers, as a page named START_PAGE_NAME
+    start: Page
+    # Page display name -> page
+    pages: Dict[str, Page]
+
+@dataclass
+class Intent:
+    """An intent with its parameters and training phrases."""
+    __slots__ = ('name', 'directory', 'parameters', 'training_phrases')
+    name: str
+    directory: str
+    # Parameter id -> entity type
+    parameters: Dict[str, str]
+    # Language -> phrase texts
+    training_phrases: Dict[str, Tuple[str, ...]]
+
+@dataclass
+class EntityType:
+    """An entity type with a synonym index."""
+    __slots__ = ('name', 'directory', 'kind', 'values', 'synonyms')
+    name: str
+    directory: str
+    kind: Optional[str]
+    # Language -> entity values
+    values: Dict[str, Tuple[str, ...]]
+    # Language -> lower-cased synonym -> entity value
+    synonyms: Dict[str, Dict[str, str]]
+
+class AgentModel:
+    """
+    Typed model of a whole export, built once from the loader output.
+    
+    Keeps what the local checks need (routes, forms, parameter presets,
+    responses, training phrases, entity synonyms) in slotted objects with
+    interned names, and drops the rest of the JSON (resource UUIDs, language
+    codes, empty fulfillments), so it is much smaller than the dict trees it
+    is built from.
+    """
+    
+    # Display name of a flow's start page
+    START_PAGE_NAME = "Start Page"
+    
+    def __init__(self, start_flow: Optional[str], flows: Dict[str, Flow], intents: Dict[str, Intent],
+                 entity_types: Dict[str, EntityType]):
+        """
+        Initialize the model.
+        
+        Args:
+            start_flow: Display name of the agent's start flow
+            flows: Flows by display name
+            intents: Intents by display name
+            entity_types: Entity types by display name
+        """
+        self.start_flow = start_flow
+        self.flows = flows
+        self.intents = intents
+        self.entity_types = entity_types
+        
+        # Intent -> (flow, page) names of every page whose routes reference it
+        self.pages_by_intent: Dict[str, List[Tuple[str, str]]] = {}
+        for flow in flows.values():
+            for page in (flow.start, *flow.pages.values()):
+                for intent in page.intents:
+                    self.pages_by_intent.setdefault(intent, []).append((flow.name, page.name))
+    
+    @classmethod
+    def from_export(cls, export_data: Dict[str, Any]) -> 'AgentModel':
+        """
+        Build the model from loaded export data.
+        
+        Args:
+            export_data: Export data as returned by DialogFlowFileLoader.load_export
+        
+        Returns:
+            Agent model
+        """
+        logger = logging.getLogger(__name__)
+        
+        flows = {}
+        for flow_dir, flow_data in export_data.get('flows', {}).items():
+            config = flow_data.get('config', {})
+            flow_name = config.get('displayName') or unquote(flow_dir)
+            if flow_name in flows:
+                logger.warning(f"Duplicate flow display name '{flow_name}', using directory name '{flow_dir}'")
+                flow_name = flow_dir
+            pages = {}
+            for page_file, page_data in (flow_data.get('pages') or {}).items():
+                page_name = (page_data or {}).get('displayName') or unquote(page_file)
+                pages[_name(page_name)] = Page.from_json(page_data or {}, page_name, flow_name)
+            flows[_name(flow_name)] = Flow(_name(flow_name), flow_dir, Page.from_json(config, cls.START_PAGE_NAME, flow_name), pages)
+        
+        intents = {}
+        for intent_dir, intent_data in export_data.get('intents', {}).items():
+            config = (intent_data or {}).get('config', {})
+            intent_name = _name(config.get('displayName') or unquote(intent_dir))
+            intents[intent_name] = Intent(
+                intent_name, intent_dir,
+                {_name(parameter.get('id')): _name(parameter.get('entityType')) for parameter in config.get('parameters', [])},
+                {
+                    lang: tuple(
+                        ''.join(part.get('text', '') for part in phrase.get('parts', []))
+                        for phrase in (phrases or {}).get('trainingPhrases', [])
+                    )
+                    for lang, phrases in (intent_data.get('training_phrases') or {}).items()
+                }
+            )
+        
+        entity_types = {}
+        for entity_dir, entity_data in export_data.get('entity_types', {}).items():
+            config = (entity_data or {}).get('config', {})
+            entity_name = _name(config.get('displayName') or unquote(entity_dir))
+            values = {}
+            synonyms = {}
+            for lang, entities in (entity_data.get('entities') or {}).items():
+                # One pass: entries may be streamed from the file (see json_stream.StreamedArray)
+                lang_values = []
+                lang_synonyms = {}
+                for entry in (entities or {}).get('entities', []):
+                    value = _name(entry.get('value'))
+                    lang_values.append(value)
+                    for synonym in entry.get('synonyms', [entry.get('value')]):
+                        lang_synonyms[synonym.lower()] = value
+                values[lang] = tuple(lang_values)
+                synonyms[lang] = lang_synonyms
+            entity_types[entity_name] = EntityType(entity_name, entity_dir, config.get('kind'), values, synonyms)
+        
+        start_flow = export_data.get('agent', {}).get('startFlow')
+        if start_flow not in flows:
+            start_flow = next(iter(flows), None)
+        
+        return cls(start_flow, flows, intents, entity_types)
+    
+    def page(self, flow: str, name: str) -> Optional[Page]:
+        """
+        Look up a page; the flow's start page is START_PAGE_NAME.
+        
+        Args:
+            flow: Flow display name
+            name: Page display name
+        
+        Returns:
+            Page, or None if the flow or page does not exist
+        """
+        flow_model = self.flows.get(flow)
+        if flow_model is None:
+            return None
+        if name == self.START_PAGE_NAME:
+            return flow_model.start
+        return flow_model.pages.get(name)
+    
+    def entity_value(self, entity_type: str, text: str, lang: str = 'en') -> Optional[str]:
+        """
+        Resolve a synonym to its entity value.
+        
+        Args:
+            entity_type: Entity type display name (with or without '@')
+            text: Synonym text (case-insensitive)
+            lang: Language code
+        
+        Returns:
+            Entity value, or None if the text is not a synonym
+        """
+        entity_model = self.entity_types.get(entity_type.lstrip('@'))
+        if entity_model is None:
+            return None
+        return entity_model.synonyms.get(lang, {}).get(text.lower())
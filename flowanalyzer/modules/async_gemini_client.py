@@ -0,0 +1,290 @@
+"""
+Async Gemini Client Module
+Asyncio client for issuing many Gemini requests concurrently.
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Optional, List, Iterable, Union, Tuple
+from gemini_client import GeminiClient
+from token_budget import estimate_request_tokens
+from model_backends import TransientError
+
+# Errors that are retried with exponential backoff, besides the Google API ones (see transient_errors)
+BASE_TRANSIENT_ERRORS = (TransientError, ConnectionError, TimeoutError, asyncio.TimeoutError)
+
+_transient_errors: Optional[Tuple[type, ...]] = None
+
+def transient_errors() -> Tuple[type, ...]:
+    """
+    Get the errors that are retried with exponential backoff.
+    
+    google.api_core (and grpc with it) takes about 50ms to import, so its
+    exception types are only looked up once a request has failed.
+    
+    Returns:
+        Tuple of exception types
+    """
+    global _transient_errors
+    if _transient_errors is None:
+        try:
+            from google.api_core import exceptions as google_exceptions
+            google_errors = (
+                google_exceptions.TooManyRequests,
+                google_exceptions.ResourceExhausted,
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.InternalServerError,
+                google_exceptions.DeadlineExceeded,
+            )
+        except ImportError:
+            google_errors = ()
+        _transient_errors = google_errors + BASE_TRANSIENT_ERRORS
+    return _transient_errors
+
+class RateLimiter:
+    """
+    Token-bucket rate limiter for requests per minute and tokens per minute.
+    
+    Both buckets start full and refill continuously. A request larger than the
+    whole token budget is let through once the bucket is full, so it cannot
+    block forever.
+    """
+    
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            requests_per_minute: Maximum requests per minute (None for no limit)
+            tokens_per_minute: Maximum input tokens per minute (None for no limit)
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._request_allowance = float(requests_per_minute or 0)
+        self._token_allowance = float(tokens_per_minute or 0)
+        self._last_refill = time.monotonic()
+        
+        # Created per event loop, so the limiter can be reused across asyncio.run() calls
+        self._lock = None
+        self._loop = None
+        
+        # Total time callers spent waiting for the limiter
+        self.wait_seconds = 0.0
+    
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until one request of the given size fits in both budgets, then consume it.
+        
+        Args:
+            tokens: Estimated input tokens of the request
+        """
+        start = time.monotonic()
+        
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._lock = asyncio.Lock()
+        
+        while True:
+            async with self._lock:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self._request_allowance -= 1
+                    if self.tokens_per_minute:
+                        self._token_allowance -= min(tokens, self.tokens_per_minute)
+                    self.wait_seconds += time.monotonic() - start
+                    return
+            
+            await asyncio.sleep(wait)
+    
+    def _refill(self) -> None:
+        """Add the allowance accumulated since the last refill."""
+        now = time.monotonic()
+        elapsed_minutes = (now - self._last_refill) / 60
+        self._last_refill = now
+        
+        if self.requests_per_minute:
+            self._request_allowance = min(
+                float(self.requests_per_minute),
+                self._request_allowance + elapsed_minutes * self.requests_per_minute
+            )
+        if self.tokens_per_minute:
+            self._token_allowance = min(
+                float(self.tokens_per_minute),
+                self._token_allowance + elapsed_minutes * self.tokens_per_minute
+            )
+    
+    def _wait_time(self, tokens: int) -> float:
+        """Seconds until a request of the given size fits in both budgets."""
+        wait = 0.0
+        
+        if self.requests_per_minute and self._request_allowance < 1:
+            wait = max(wait, (1 - self._request_allowance) * 60 / self.requests_per_minute)
+        
+        if self.tokens_per_minute:
+            needed = min(tokens, self.tokens_per_minute)
+            if self._token_allowance < needed:
+                wait = max(wait, (needed - self._token_allowance) * 60 / self.tokens_per_minute)
+        
+        return wait
+
+class AsyncGeminiClient:
+    """
+    Asyncio wrapper around GeminiClient with bounded concurrency, rate limiting and retries.
+    
+    Request building, staging files and the response cache are shared with the
+    wrapped GeminiClient; only the model call itself is made asynchronously.
+    """
+    
+    def __init__(self, gemini_client: GeminiClient, max_concurrency: int = 4, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, max_retries: int = 3, base_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Initialize the async client.
+        
+        Args:
+            gemini_client: Configured synchronous client (model, staging, cache)
+            max_concurrency: Maximum number of requests in flight
+            requests_per_minute: Request rate limit (None for no limit)
+            tokens_per_minute: Input token rate limit (None for no limit)
+            max_retries: Retries per request on transient errors
+            base_delay: Delay before the first retry, doubled on each further retry
+            max_delay: Upper bound for the retry delay
+        """
+        self.logger = logging.getLogger(__name__)
+        self.gemini_client = gemini_client
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        
+        # Created per event loop, so the client can be reused across asyncio.run() calls
+        self._semaphore = None
+        self._loop = None
+        
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'retries': 0,
+            'failures': 0
+        }
+    
+    async def analyze_text(self, prompt: str, context: str, request_id: str = "default") -> str:
+        """
+        Analyze text using Gemini.
+        
+        Args:
+            prompt: Analysis prompt
+            context: Context data to analyze
+            request_id: Unique identifier for this request (used in staging files)
+        
+        Returns:
+            Analysis result
+        """
+        try:
+            contents, cache_key = self.gemini_client.prepare_text_request(prompt, context, request_id)
+            return await self._generate(contents, cache_key, request_id)
+        
+        except Exception as e:
+            self.logger.error(f"Error calling Gemini API for request {request_id}: {e}")
+            raise
+    
+    async def analyze_consolidated_data(self, prompt: str, consolidated_data: Union[str, Iterable[str]], request_id: str = "consolidated_analysis") -> str:
+        """
+        Analyze consolidated DialogFlow data.
+        
+        Args:
+            prompt: Analysis prompt
+            consolidated_data: Consolidated data as a string or an iterable of text sections
+            request_id: Unique identifier for this request
+        
+        Returns:
+            Analysis result
+        """
+        try:
+            contents, cache_key = self.gemini_client.prepare_consolidated_request(prompt, consolidated_data, request_id)
+            return await self._generate(contents, cache_key, request_id)
+        
+        except Exception as e:
+            self.logger.error(f"Error calling Gemini API with consolidated data for request {request_id}: {e}")
+            raise
+    
+    async def analyze_many(self, requests: List[Tuple[str, str, str]], return_exceptions: bool = False) -> List[Any]:
+        """
+        Run several analyze_text requests concurrently.
+        
+        Args:
+            requests: List of (prompt, context, request_id) tuples
+            return_exceptions: Return failures in the result list instead of raising the first one
+        
+        Returns:
+            Results in the same order as the requests
+        """
+        return await asyncio.gather(
+            *(self.analyze_text(prompt, context, request_id) for prompt, context, request_id in requests),
+            return_exceptions=return_exceptions
+        )
+    
+    async def _generate(self, contents: Union[str, List[str]], cache_key: Optional[str], request_id: str) -> str:
+        """
+        Return the cached response for a request, or call Gemini with retries and cache the result.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        tokens = estimate_request_tokens(contents)
+        
+        async with self._semaphore:
+            # Looked up once a slot is free, so queued duplicates reuse responses finished meanwhile
+            cached_response = self.gemini_client.lookup_cache(cache_key, request_id)
+            if cached_response is not None:
+                self.stats['cache_hits'] += 1
+                return cached_response
+            
+            attempt = 0
+            while True:
+                await self.rate_limiter.acquire(tokens)
+                self.stats['requests'] += 1
+                
+                try:
+                    with self.gemini_client.metrics.stage('llm_call'):
+                        response = await self._call_model(contents)
+                    break
+                
+                # The except expression is only evaluated when the call fails
+                except transient_errors() as e:
+                    if attempt >= self.max_retries:
+                        self.stats['failures'] += 1
+                        self.gemini_client.metrics.increment('failures')
+                        raise
+                    
+                    delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+                    delay *= random.uniform(0.5, 1.0)
+                    attempt += 1
+                    self.stats['retries'] += 1
+                    self.gemini_client.metrics.increment('retries')
+                    self.logger.warning(
+                        f"Transient error for request {request_id} ({e}); "
+                        f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                    )
+                    await asyncio.sleep(delay)
+                
+                except Exception:
+                    self.stats['failures'] += 1
+                    self.gemini_client.metrics.increment('failures')
+                    raise
+        
+        return self.gemini_client.handle_response(response, cache_key, request_id)
+    
+    async def _call_model(self, contents: Union[str, List[str]]) -> Any:
+        """Call the model, natively async if it supports it, otherwise in a worker thread."""
+        model = self.gemini_client.model
+        if hasattr(model, 'generate_content_async'):
+            return await model.generate_content_async(contents)
+        return await asyncio.to_thread(model.generate_content, contents)
@@ -0,0 +1,240 @@
+"""
+Batch Runner Module
+Analyzes many DialogFlow exports in a process pool with a resumable checkpoint.
+"""
+
+import os
+import json
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+# Files written to the batch output directory
+CHECKPOINT_FILE_NAME = "batch_checkpoint.json"
+SUMMARY_FILE_NAME = "batch_summary.json"
+
+CHECKPOINT_VERSION = 1
+
+# Default number of worker processes; workers mostly wait on Gemini, so more
+# processes than cores still overlap local work with LLM waits
+DEFAULT_PROCESSES = 4
+
+def discover_exports(path: Path) -> Dict[str, Path]:
+    """
+    Find the DialogFlow exports of a batch.
+    
+    A directory is searched for sub-directories containing an agent.json. A file
+    is read as a manifest with one export path per line (relative paths are
+    resolved against the manifest's directory; blank lines and lines starting
+    with '#' are skipped).
+    
+    Args:
+        path: Directory of exports or manifest file
+    
+    Returns:
+        Export paths by agent name (the export directory name), in batch order
+    """
+    path = Path(path)
+    if path.is_dir():
+        export_paths = [child for child in sorted(path.iterdir()) if (child / "agent.json").exists()]
+    else:
+        export_paths = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    export_path = Path(line)
+                    export_paths.append(export_path if export_path.is_absolute() else path.parent / export_path)
+    
+    exports = {}
+    for export_path in export_paths:
+        name = export_path.resolve().name
+        if name in exports:
+            raise ValueError(f"Duplicate agent name {name}: {exports[name]} and {export_path}")
+        exports[name] = export_path
+    return exports
+
+class BatchCheckpoint:
+    """
+    Per-agent outcome of a batch run, saved after every finished agent.
+    """
+    
+    def __init__(self, agents: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the checkpoint.
+        
+        Args:
+            agents: Entries by agent name ('flow_path', 'status', 'seconds',
+                'finished_at' and 'results' or 'error')
+        """
+        self.agents: Dict[str, Dict[str, Any]] = agents or {}
+    
+    @classmethod
+    def load(cls, checkpoint_file: Path) -> 'BatchCheckpoint':
+        """
+        Load a checkpoint, or return an empty one if it is missing or unreadable.
+        
+        Args:
+            checkpoint_file: Path to the checkpoint file
+        
+        Returns:
+            Loaded checkpoint
+        """
+        checkpoint_file = Path(checkpoint_file)
+        if not checkpoint_file.exists():
+            return cls()
+        
+        try:
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            if data.get('version') != CHECKPOINT_VERSION:
+                return cls()
+            
+            return cls(data.get('agents', {}))
+        
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Error loading checkpoint {checkpoint_file}: {e}")
+            return cls()
+    
+    def save(self, checkpoint_file: Path) -> None:
+        """
+        Save the checkpoint atomically, so an interrupted run never leaves a partial file.
+        
+        Args:
+            checkpoint_file: Path to the checkpoint file
+        """
+        checkpoint_file = Path(checkpoint_file)
+        temp_file = checkpoint_file.with_name(checkpoint_file.name + ".tmp")
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': CHECKPOINT_VERSION, 'agents': self.agents}, f, indent=2, ensure_ascii=False)
+        os.replace(temp_file, checkpoint_file)
+    
+    def is_completed(self, name: str, flow_path: Path) -> bool:
+        """Whether the agent was analyzed successfully from the same export path."""
+        entry = self.agents.get(name)
+        return bool(entry) and entry['status'] == 'completed' and entry['flow_path'] == str(flow_path)
+
+class BatchRunner:
+    """
+    Runs an analysis function for every export of a batch in a process pool.
+    
+    Each agent is analyzed in its own output directory (<output_path>/<agent name>).
+    Agents completed in a previous run with the same checkpoint are skipped, and
+    failed agents are retried.
+    """
+    
+    def __init__(self, output_path: Path, worker: Callable[[str, str], Dict[str, str]],
+                 processes: int = DEFAULT_PROCESSES, resume: bool = True):
+        """
+        Initialize the batch runner.
+        
+        Args:
+            output_path: Batch output directory
+            worker: Picklable function worker(flow_path, output_path) that analyzes one
+                export and returns its result paths (see DialogFlowAnalyzer.run_full_analysis)
+            processes: Number of worker processes (1 runs the agents serially in this process)
+            resume: Skip agents completed according to the checkpoint of a previous run
+        """
+        self.logger = logging.getLogger(__name__)
+        self.output_path = Path(output_path)
+        self.worker = worker
+        self.processes = max(1, int(processes or 1))
+        self.resume = resume
+        self.checkpoint_file = self.output_path / CHECKPOINT_FILE_NAME
+        self.summary_file = self.output_path / SUMMARY_FILE_NAME
+    
+    def run(self, exports: Dict[str, Path]) -> Dict[str, Any]:
+        """
+        Analyze every export of the batch.
+        
+        Args:
+            exports: Export paths by agent name (see discover_exports)
+        
+        Returns:
+            Aggregate summary, also saved to batch_summary.json
+        """
+        self.output_path.mkdir(parents=True, exist_ok=True)
+        checkpoint = BatchCheckpoint.load(self.checkpoint_file) if self.resume else BatchCheckpoint()
+        
+        skipped = [name for name, flow_path in exports.items() if checkpoint.is_completed(name, flow_path)]
+        pending = [name for name in exports if name not in skipped]
+        self.logger.info(f"Batch of {len(exports)} agent(s): {len(pending)} to analyze, {len(skipped)} already completed")
+        
+        start = time.perf_counter()
+        if self.processes == 1:
+            for name in pending:
+                self._record(checkpoint, name, exports[name], *self._run_inline(name, exports[name]))
+        else:
+            with ProcessPoolExecutor(max_workers=self.processes) as executor:
+                futures = {
+                    executor.submit(_timed_call, self.worker, str(exports[name]), str(self.output_path / name)): name
+                    for name in pending
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        results, seconds = future.result()
+                        self._record(checkpoint, name, exports[name], results, None, seconds)
+                    except Exception as e:
+                        self._record(checkpoint, name, exports[name], None, e, 0.0)
+        
+        summary = self._summarize(checkpoint, exports, skipped, time.perf_counter() - start)
+        with open(self.summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        
+        self.logger.info(
+            f"Batch finished in {summary['seconds']:.1f}s: {summary['completed']} completed, "
+            f"{summary['failed']} failed, {summary['skipped']} skipped"
+        )
+        return summary
+    
+    def _run_inline(self, name: str, flow_path: Path) -> Tuple[Optional[Dict[str, str]], Optional[Exception], float]:
+        """Analyze one export in this process."""
+        try:
+            results, seconds = _timed_call(self.worker, str(flow_path), str(self.output_path / name))
+            return results, None, seconds
+        except Exception as e:
+            return None, e, 0.0
+    
+    def _record(self, checkpoint: BatchCheckpoint, name: str, flow_path: Path,
+                results: Optional[Dict[str, str]], error: Optional[Exception], seconds: float) -> None:
+        """Record the outcome of one agent and save the checkpoint."""
+        entry = {
+            'flow_path': str(flow_path),
+            'status': 'failed' if error else 'completed',
+            'seconds': round(seconds, 3),
+            'finished_at': datetime.now().isoformat(timespec='seconds')
+        }
+        if error:
+            entry['error'] = f"{type(error).__name__}: {error}"
+            self.logger.error(f"Agent {name} failed: {entry['error']}")
+        else:
+            entry['results'] = results
+            self.logger.info(f"Agent {name} completed in {seconds:.1f}s")
+        
+        checkpoint.agents[name] = entry
+        checkpoint.save(self.checkpoint_file)
+    
+    def _summarize(self, checkpoint: BatchCheckpoint, exports: Dict[str, Path], skipped: List[str], seconds: float) -> Dict[str, Any]:
+        """Build the aggregate summary of the agents of this batch."""
+        agents = {name: checkpoint.agents[name] for name in exports if name in checkpoint.agents}
+        statuses = [entry['status'] for entry in agents.values()]
+        return {
+            'agents': len(exports),
+            'completed': statuses.count('completed') - len(skipped),
+            'failed': statuses.count('failed'),
+            'skipped': len(skipped),
+            'seconds': round(seconds, 3),
+            'agent_seconds': round(sum(entry['seconds'] for name, entry in agents.items() if name not in skipped), 3),
+            'results': agents
+        }
+
+def _timed_call(worker: Callable[[str, str], Dict[str, str]], flow_path: str, output_path: str) -> Tuple[Dict[str, str], float]:
+    """Run the worker and return its result with the elapsed seconds (runs in the worker process)."""
+    start = time.perf_counter()
+    results = worker(flow_path, output_path)
+    return results, time.perf_counter() - start
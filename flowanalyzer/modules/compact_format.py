@@ -0,0 +1,89 @@
+"""
+Compact Format Module
+Minified, boilerplate-free serialization of DialogFlow export data for prompts.
+"""
+
+import re
+import json
+from typing import Dict, Any
+
+# Keys that carry no information for the analysis
+DROPPED_KEYS = {'languageCode', 'auto'}
+
+# Keys dropped when they hold their default value
+DEFAULT_VALUES = {'repeatCount': 1}
+
+# Keys dropped when they hold a generated UUID
+ID_KEYS = {'name', 'id'}
+
+UUID_PATTERN = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+
+_MISSING = object()
+
+def phrase_text(phrase: Dict[str, Any]) -> str:
+    """
+    Collapse a training phrase to one string.
+    
+    Annotated parts are written as [text](parameterId).
+    
+    Args:
+        phrase: Training phrase with a 'parts' list
+    
+    Returns:
+        Phrase text
+    """
+    texts = []
+    for part in phrase.get('parts', []):
+        text = part.get('text', '')
+        texts.append(f"[{text}]({part['parameterId']})" if part.get('parameterId') else text)
+    
+    text = ''.join(texts)
+    repeat_count = phrase.get('repeatCount', 1)
+    return f"{text} (x{repeat_count})" if repeat_count != 1 else text
+
+def compact_data(value: Any) -> Any:
+    """
+    Strip analysis-irrelevant fields from export data.
+    
+    Drops language codes, auto-annotation flags, default repeat counts,
+    generated UUIDs and empty containers, and collapses training phrases
+    to plain strings.
+    
+    Args:
+        value: Parsed export JSON (any nesting level)
+    
+    Returns:
+        Compacted copy
+    """
+    if isinstance(value, dict):
+        if isinstance(value.get('parts'), list):
+            return phrase_text(value)
+        
+        compacted = {}
+        for key, item in value.items():
+            if key in DROPPED_KEYS or DEFAULT_VALUES.get(key, _MISSING) == item:
+                continue
+            if key in ID_KEYS and isinstance(item, str) and UUID_PATTERN.match(item):
+                continue
+            item = compact_data(item)
+            if item == {} or item == []:
+                continue
+            compacted[key] = item
+        return compacted
+    
+    if isinstance(value, list):
+        return [compact_data(item) for item in value]
+    
+    return value
+
+def compact_json(value: Any) -> str:
+    """
+    Serialize export data compactly.
+    
+    Args:
+        value: Parsed export JSON
+    
+    Returns:
+        Minified JSON of the compacted data
+    """
+    return json.dumps(compact_data(value), ensure_ascii=False, separators=(',', ':'))
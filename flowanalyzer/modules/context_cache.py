@@ -0,0 +1,146 @@
+"""
+Context Cache Module
+Prompt and export data uploaded once to the model's cached-content store and shared by later requests.
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+# Default lifetime of a cached context, renewed while it is in use
+DEFAULT_CONTEXT_TTL_SECONDS = 600
+
+# A context expiring within this many seconds is extended before it is used
+CONTEXT_REFRESH_MARGIN_SECONDS = 60
+
+# Fraction of the input price saved on cached tokens (Gemini bills them at a quarter of the input price)
+CACHED_TOKEN_DISCOUNT = 0.75
+
+class CachedContext:
+    """
+    A prompt and consolidated data shared by several requests.
+    
+    name is the backend's cached-content name. It is None until the first model
+    request uploads the contents (upload_pending), and stays None when the
+    backend cannot cache contents or the upload failed; requests then send the
+    full contents, so callers work the same either way. Every use is recorded
+    with its latency and token counts, see stats().
+    """
+    
+    def __init__(self, request_id: str, contents: List[str], key: Optional[str], tokens: int, ttl_seconds: float):
+        """
+        Initialize the context.
+        
+        Args:
+            request_id: Identifier of the context (used in staging files and logs)
+            contents: Parts of the prompt and consolidated data
+            key: Response cache key of the contents (None when response caching is disabled)
+            tokens: Input tokens of the contents
+            ttl_seconds: Lifetime requested for the cached content
+        """
+        self.request_id = request_id
+        self.contents = contents
+        self.key = key
+        self.tokens = tokens
+        self.ttl_seconds = ttl_seconds
+        self.name: Optional[str] = None
+        self.upload_pending = True
+        self.expire_time: Optional[float] = None
+        self.created: Optional[float] = None
+        self.deleted: Optional[float] = None
+        self.uploads: List[float] = []
+        self.uses: List[Dict[str, Any]] = []
+    
+    @property
+    def cached(self) -> bool:
+        """Whether requests refer to a live cached content instead of sending the contents."""
+        return self.name is not None and self.deleted is None
+    
+    def remaining_seconds(self, now: Optional[float] = None) -> float:
+        """Seconds until the cached content expires (0 when it is not cached)."""
+        if not self.cached or self.expire_time is None:
+            return 0.0
+        return max(0.0, self.expire_time - (now or time.time()))
+    
+    def record_upload(self, name: str, expire_time: float, seconds: float) -> None:
+        """
+        Record a (re-)upload of the contents.
+        
+        Args:
+            name: Cached-content name returned by the backend
+            expire_time: Expiry as a Unix timestamp
+            seconds: Duration of the upload
+        """
+        self.name = name
+        self.expire_time = expire_time
+        self.created = self.created or time.time()
+        self.deleted = None
+        self.uploads.append(round(seconds, 4))
+    
+    def record_use(self, request_id: str, seconds: float, usage_metadata: Any = None, from_response_cache: bool = False) -> Dict[str, Any]:
+        """
+        Record a request made with the context.
+        
+        Args:
+            request_id: Identifier of the request
+            seconds: Latency of the request
+            usage_metadata: usage_metadata of the response (None for response cache hits)
+            from_response_cache: The response came from the local response cache
+        
+        Returns:
+            The recorded use
+        """
+        prompt_tokens = getattr(usage_metadata, 'prompt_token_count', 0) or 0
+        cached_tokens = getattr(usage_metadata, 'cached_content_token_count', 0) or 0
+        use = {
+            'request_id': request_id,
+            'seconds': round(seconds, 4),
+            'cached': self.cached and not from_response_cache,
+            'from_response_cache': from_response_cache,
+            'prompt_tokens': prompt_tokens,
+            'cached_tokens': cached_tokens,
+            'uncached_tokens': prompt_tokens - cached_tokens,
+            'response_tokens': getattr(usage_metadata, 'candidates_token_count', 0) or 0
+        }
+        self.uses.append(use)
+        return use
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize the lifetime and reuse of the context.
+        
+        input_tokens_saved is the cached tokens weighted by CACHED_TOKEN_DISCOUNT,
+        i.e. the input tokens the cache saved in billing terms; storage_token_hours
+        is what the cached content is billed for while it is kept.
+        
+        Returns:
+            JSON-serializable stats
+        """
+        end = self.deleted or time.time()
+        if self.expire_time is not None:
+            end = min(end, self.expire_time)
+        model_uses = [use for use in self.uses if not use['from_response_cache']]
+        cached_tokens = sum(use['cached_tokens'] for use in self.uses)
+        
+        return {
+            'request_id': self.request_id,
+            'name': self.name,
+            'cached': self.cached,
+            'tokens': self.tokens,
+            'ttl_seconds': self.ttl_seconds,
+            'created': self.created,
+            'expire_time': self.expire_time,
+            'deleted': self.deleted,
+            'upload_seconds': self.uploads,
+            'uses': self.uses,
+            'totals': {
+                'uses': len(self.uses),
+                'model_requests': len(model_uses),
+                'response_cache_hits': len(self.uses) - len(model_uses),
+                'seconds': round(sum(use['seconds'] for use in self.uses), 4),
+                'mean_model_seconds': round(sum(use['seconds'] for use in model_uses) / len(model_uses), 4) if model_uses else None,
+                'cached_tokens': cached_tokens,
+                'uncached_tokens': sum(use['uncached_tokens'] for use in self.uses),
+                'input_tokens_saved': round(cached_tokens * CACHED_TOKEN_DISCOUNT),
+                'storage_token_hours': round(self.tokens * max(0.0, end - self.created) / 3600, 2) if self.created else 0.0
+            }
+        }
@@ -0,0 +1,530 @@
+"""
+Conversation Replay Module
+Local replay of exported test cases through the routes, forms and parameter actions of the flows.
+"""
+
+import re
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+from flow_graph import END_TARGETS, RETURN_TARGETS, CURRENT_PAGE_TARGET, START_PAGE_TARGET
+from agent_model import AgentModel, Page, Route, FormParameter
+
+# Page names used by test cases for the flow start and the end of the session
+START_PAGE_NAME = AgentModel.START_PAGE_NAME
+END_SESSION_NAME = "End Session"
+
+# Transitions followed within a single turn before the replay reports a loop
+MAX_TRANSITIONS_PER_TURN = 50
+
+# Tokens of route conditions ($session.params.x = "y" AND $page.params.status = "FINAL")
+CONDITION_TOKEN_PATTERN = re.compile(
+    r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*")|(?P<number>-?\d+(?:\.\d+)?)|(?P<op>!=|>=|<=|=|>|<|:|\(|\))'
+    r'|(?P<reference>\$[\w.-]+)|(?P<word>[A-Za-z_]\w*))'
+)
+
+class ConditionError(Exception):
+    """Raised for route conditions the replay cannot evaluate."""
+
+def evaluate_condition(condition: str, session_params: Dict[str, Any], page_status: str) -> bool:
+    """
+    Evaluate a route condition.
+    
+    Supports true/false, $session.params.*, $page.params.* (form parameters are
+    session parameters; $page.params.status is "FINAL" once the form is filled),
+    string, number and null literals, the comparisons = != > < >= <= and the
+    presence operator ':', combined with AND, OR, NOT and parentheses.
+    
+    Args:
+        condition: Condition text
+        session_params: Current session parameters
+        page_status: Value of $page.params.status
+    
+    Returns:
+        Whether the condition holds
+    
+    Raises:
+        ConditionError: If the condition uses syntax the replay does not support
+    """
+    tokens = _tokenize(condition)
+    position = 0
+    
+    def peek() -> Optional[Tuple[str, str]]:
+        return tokens[position] if position < len(tokens) else None
+    
+    def take() -> Tuple[str, str]:
+        nonlocal position
+        if position >= len(tokens):
+            raise ConditionError(f"Unexpected end of condition: {condition}")
+        position += 1
+        return tokens[position - 1]
+    
+    def is_word(token: Optional[Tuple[str, str]], word: str) -> bool:
+        return token is not None and token[0] == 'word' and token[1].upper() == word
+    
+    def value(token: Tuple[str, str]) -> Any:
+        kind, text = token
+        if kind == 'string':
+            return re.sub(r'\\(.)', r'\1', text[1:-1])
+        if kind == 'number':
+            return float(text)
+        if kind == 'reference':
+            if text == '$page.params.status':
+                return page_status
+            for prefix in ('$session.params.', '$page.params.'):
+                if text.startswith(prefix):
+                    return session_params.get(text[len(prefix):])
+            raise ConditionError(f"Unsupported reference {text}")
+        if kind == 'word' and text.lower() in ('true', 'false', 'null'):
+            return {'true': True, 'false': False, 'null': None}[text.lower()]
+        raise ConditionError(f"Unexpected '{text}' in condition: {condition}")
+    
+    def comparison() -> bool:
+        token = take()
+        if is_word(token, 'NOT'):
+            return not comparison()
+        if token == ('op', '('):
+            result = disjunction()
+            if take() != ('op', ')'):
+                raise ConditionError(f"Missing ')' in condition: {condition}")
+            return result
+        left = value(token)
+        operator = peek()
+        if operator is None or operator[0] != 'op' or operator[1] in ('(', ')'):
+            return bool(left)
+        take()
+        if operator[1] == ':':
+            take()
+            return left is not None
+        right = value(take())
+        return _compare(left, operator[1], right)
+    
+    def conjunction() -> bool:
+        result = comparison()
+        while is_word(peek(), 'AND'):
+            take()
+            result = comparison() and result
+        return result
+    
+    def disjunction() -> bool:
+        result = conjunction()
+        while is_word(peek(), 'OR'):
+            take()
+            result = conjunction() or result
+        return result
+    
+    result = disjunction()
+    if position != len(tokens):
+        raise ConditionError(f"Unexpected '{tokens[position][1]}' in condition: {condition}")
+    return result
+
+def _tokenize(condition: str) -> List[Tuple[str, str]]:
+    """Split a condition into (kind, text) tokens."""
+    tokens = []
+    position = 0
+    condition = condition.strip()
+    while position < len(condition):
+        match = CONDITION_TOKEN_PATTERN.match(condition, position)
+        if not match or match.end() == position:
+            raise ConditionError(f"Cannot parse condition: {condition}")
+        tokens.append((match.lastgroup, match.group(match.lastgroup)))
+        position = match.end()
+    return tokens
+
+def _compare(left: Any, operator: str, right: Any) -> bool:
+    """Compare two condition values, numerically when both look like numbers."""
+    try:
+        left, right = float(left), float(right)
+    except (TypeError, ValueError):
+        if isinstance(left, bool) or isinstance(right, bool) or left is None or right is None:
+            pass
+        else:
+            left, right = str(left), str(right)
+    
+    if operator == '=':
+        return left == right
+    if operator == '!=':
+        return left != right
+    try:
+        return {'>': left > right, '<': left < right, '>=': left >= right, '<=': left <= right}[operator]
+    except TypeError:
+        return False
+
+class ReplaySession:
+    """Conversation state of one replayed test case."""
+    
+    def __init__(self, flow: str):
+        """
+        Initialize a session on the start page of a flow.
+        
+        Args:
+            flow: Flow display name
+        """
+        self.warnings: List[str] = []
+        self.restart(flow)
+    
+    def restart(self, flow: str) -> None:
+        """Start a new conversation on the start page of a flow, keeping the warnings."""
+        self.flow = flow
+        self.page = START_PAGE_NAME
+        self.params: Dict[str, Any] = {}
+        self.previous: List[Tuple[str, str]] = []
+        self.flow_stack: List[Tuple[str, str]] = []
+        self.no_match_count = 0
+        self.ended = False
+        self.transitions = 0
+
+class ConversationReplayer:
+    """
+    Replays exported test cases against the loaded flows without Dialogflow or Gemini.
+    
+    There is no NLU: each turn uses the intent the test case expects
+    (virtualAgentOutput.triggeredIntent) and takes the values of the matched
+    intent's parameters, or of the current page's form parameters, from the
+    expected session parameters. Input after the end of the session starts a
+    new session on the start flow, as in the Dialogflow test console. Everything
+    else, which route is taken, parameter presets, form completion, condition
+    routes, event handlers and special targets, is interpreted from the export,
+    and the resulting page is compared with the expected currentPage.
+    """
+    
+    def __init__(self, model: AgentModel):
+        """
+        Initialize the replayer.
+        
+        Args:
+            model: Agent model of the export (see AgentModel.from_export)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.model = model
+        self.start_flow = model.start_flow
+    
+    def replay_all(self, test_cases: Dict[str, Any], max_workers: int = 1) -> Dict[str, Any]:
+        """
+        Replay every test case.
+        
+        Args:
+            test_cases: Test cases keyed by file name (see DialogFlowFileLoader.load_test_cases)
+            max_workers: Number of worker processes (1 replays serially in this process)
+        
+        Returns:
+            Report with per-test-case results and totals
+        """
+        start_time = time.perf_counter()
+        items = list(test_cases.items())
+        
+        if max_workers > 1 and len(items) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                chunksize = max(1, len(items) // (max_workers * 4))
+                results = list(executor.map(self._replay_item, items, chunksize=chunksize))
+        else:
+            results = [self._replay_item(item) for item in items]
+        
+        report = {
+            'test_cases': len(results),
+            'passed': sum(1 for result in results if result['passed']),
+            'failed': sum(1 for result in results if not result['passed']),
+            'turns': sum(result['turns'] for result in results),
+            'diverged_turns': sum(len(result['divergences']) for result in results),
+            'seconds': round(time.perf_counter() - start_time, 4),
+            'results': results
+        }
+        
+        self.logger.info(
+            f"Replayed {report['test_cases']} test case(s), {report['turns']} turn(s) in {report['seconds']:.3f}s: "
+            f"{report['passed']} passed, {report['failed']} diverged"
+        )
+        return report
+    
+    def _replay_item(self, item: Tuple[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Replay one (file name, test case) pair."""
+        return self.replay(item[1], item[0])
+    
+    def replay(self, test_case: Dict[str, Any], file_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Replay one test case.
+        
+        After a diverging turn the session is moved to the expected page and
+        parameters, so every later turn is checked on its own.
+        
+        Args:
+            test_case: Test case JSON
+            file_name: Test case file name, for the report
+        
+        Returns:
+            Result with the diverging turns
+        """
+        session = ReplaySession(self.start_flow)
+        turns = test_case.get('testCaseConversationTurns', [])
+        divergences = []
+        
+        for index, turn in enumerate(turns, start=1):
+            user_input = (turn.get('userInput') or {}).get('input') or {}
+            expected = turn.get('virtualAgentOutput') or {}
+            expected_page = expected.get('currentPage') or {}
+            expected_flow = expected_page.get('flow') or (expected.get('currentFlow') or {}).get('name') or session.flow
+            expected_params = expected.get('sessionParameters') or {}
+            
+            self._process_turn(session, user_input, expected)
+            
+            actual = (session.flow, session.page)
+            wanted = (expected_flow, expected_page.get('name'))
+            mismatches = self._parameter_mismatches(session.params, expected_params)
+            if actual != wanted:
+                divergences.append({
+                    'turn': index,
+                    'input': self._describe_input(user_input),
+                    'intent': (expected.get('triggeredIntent') or {}).get('name'),
+                    'expected_page': f"{wanted[0]}/{wanted[1]}",
+                    'actual_page': f"{actual[0]}/{actual[1]}",
+                    'parameter_mismatches': mismatches
+                })
+                # Continue from the expected state, if the export has that page
+                if wanted[1] == END_SESSION_NAME or self.model.page(*wanted):
+                    session.flow, session.page = wanted
+                    session.ended = wanted[1] == END_SESSION_NAME
+                    session.params = dict(expected_params)
+                else:
+                    session.warnings.append(f"Expected page {wanted[0]}/{wanted[1]} is not in the export")
+        
+        return {
+            'name': test_case.get('displayName') or file_name,
+            'file': file_name,
+            'tags': test_case.get('tags', []),
+            'turns': len(turns),
+            'passed': not divergences,
+            'divergences': divergences,
+            'warnings': session.warnings
+        }
+    
+    def _process_turn(self, session: ReplaySession, user_input: Dict[str, Any], expected: Dict[str, Any]) -> None:
+        """Apply one user turn to the session."""
+        session.transitions = 0
+        if session.ended:
+            session.restart(self.start_flow)
+        
+        event = (user_input.get('event') or {}).get('event')
+        intent = (expected.get('triggeredIntent') or {}).get('name')
+        expected_params = expected.get('sessionParameters') or {}
+        
+        if event:
+            self._handle_event(session, event.strip())
+            return
+        
+        if intent:
+            route = self._find_intent_route(session, intent)
+            if route:
+                session.no_match_count = 0
+                intent_model = self.model.intents.get(intent)
+                if intent_model:
+                    session.params.update(self._fills(session, expected_params, intent_model.parameters))
+                self._take(session, route)
+            else:
+                self._no_match(session)
+            return
+        
+        form_names = [parameter.name for parameter in self._page(session).form]
+        fills = self._fills(session, expected_params, form_names)
+        if fills:
+            session.no_match_count = 0
+            session.params.update(fills)
+            self._evaluate_conditions(session)
+        else:
+            self._no_match(session)
+    
+    def _fills(self, session: ReplaySession, expected_params: Dict[str, Any], names: Iterable[str]) -> Dict[str, Any]:
+        """Expected values of the given parameters that are new this turn (the replay's stand-in for NLU)."""
+        return {
+            name: value for name, value in expected_params.items()
+            if name in names and session.params.get(name) != value
+        }
+    
+    def _find_intent_route(self, session: ReplaySession, intent: str) -> Optional[Route]:
+        """First route for the intent whose condition holds: page routes first, then the flow's."""
+        page = self._page(session)
+        routes = page.routes_by_intent.get(intent, ())
+        start = self.model.flows[session.flow].start
+        if page is not start:
+            routes = routes + start.routes_by_intent.get(intent, ())
+        
+        for route in routes:
+            if self._condition_holds(session, route.condition):
+                return route
+        return None
+    
+    def _evaluate_conditions(self, session: ReplaySession) -> None:
+        """Take the first condition-only route that holds (the flow's own only count on its start page)."""
+        for route in self._page(session).condition_routes:
+            if route.condition and self._condition_holds(session, route.condition):
+                self._take(session, route)
+                return
+    
+    def _no_match(self, session: ReplaySession) -> None:
+        """Handle input nothing matched with sys.no-match-<n>, falling back to sys.no-match-default."""
+        session.no_match_count += 1
+        if not self._handle_event(session, f"sys.no-match-{session.no_match_count}"):
+            self._handle_event(session, "sys.no-match-default")
+    
+    def _handle_event(self, session: ReplaySession, event: str) -> bool:
+        """Run the first handler of the event: reprompt handlers of the parameter being filled, then page, then flow."""
+        page = self._page(session)
+        start = self.model.flows[session.flow].start
+        
+        handlers = []
+        unfilled = [parameter for parameter in page.form if self._is_unfilled(session, parameter)]
+        if unfilled:
+            handlers.extend(unfilled[0].reprompt_handlers)
+        handlers.extend(page.event_handlers)
+        if page is not start:
+            handlers.extend(start.event_handlers)
+        
+        for handler in handlers:
+            if handler.event == event and self._condition_holds(session, handler.condition):
+                self._take(session, handler)
+                return True
+        return False
+    
+    def _take(self, session: ReplaySession, route: Route) -> None:
+        """Run a route or event handler: its parameter presets, then its transition."""
+        self._apply_parameter_actions(session, route.parameter_actions)
+        
+        if route.target_flow:
+            self._enter_flow(session, route.target_flow)
+        elif route.target_page:
+            self._enter_page(session, route.target_page)
+    
+    def _enter_flow(self, session: ReplaySession, flow: str) -> None:
+        """Start another flow, remembering where to return on End Flow."""
+        if flow not in self.model.flows:
+            session.warnings.append(f"Unknown target flow {flow} from {session.flow}/{session.page}")
+            return
+        
+        session.flow_stack.append((session.flow, session.page))
+        session.flow = flow
+        session.page = START_PAGE_NAME
+        if self._count_transition(session):
+            self._evaluate_conditions(session)
+    
+    def _enter_page(self, session: ReplaySession, target: str) -> None:
+        """Transition to a page (or a special target) and run its entry behavior."""
+        if target in END_TARGETS:
+            if target == "End Flow" and session.flow_stack:
+                session.flow, session.page = session.flow_stack.pop()
+                if self._count_transition(session):
+                    self._evaluate_conditions(session)
+            else:
+                session.page = END_SESSION_NAME
+                session.ended = True
+            return
+        
+        if target in RETURN_TARGETS:
+            if not session.previous:
+                return
+            session.flow, target = session.previous.pop()
+        elif target == START_PAGE_TARGET:
+            target = START_PAGE_NAME
+        elif target == CURRENT_PAGE_TARGET:
+            target = session.page
+        
+        page = self.model.page(session.flow, target)
+        if page is None:
+            session.warnings.append(f"Unknown target page {target} from {session.flow}/{session.page}")
+            return
+        
+        if target != session.page:
+            session.previous.append((session.flow, session.page))
+        session.page = target
+        
+        if not self._count_transition(session):
+            return
+        self._apply_parameter_actions(session, page.entry_parameter_actions)
+        self._evaluate_conditions(session)
+    
+    def _count_transition(self, session: ReplaySession) -> bool:
+        """Count a transition, stopping the turn when the routes loop."""
+        session.transitions += 1
+        if session.transitions > MAX_TRANSITIONS_PER_TURN:
+            session.warnings.append(f"Transition loop stopped at {session.flow}/{session.page}")
+            return False
+        return True
+    
+    def _apply_parameter_actions(self, session: ReplaySession, actions: Tuple[Tuple[str, Any], ...]) -> None:
+        """Apply parameter presets (a null value clears the parameter)."""
+        for parameter, value in actions:
+            if isinstance(value, str) and value.startswith('$session.params.'):
+                value = session.params.get(value[len('$session.params.'):])
+            if value is None:
+                session.params.pop(parameter, None)
+            else:
+                session.params[parameter] = value
+    
+    def _condition_holds(self, session: ReplaySession, condition: Optional[str]) -> bool:
+        """Evaluate a route condition; a missing condition holds, an unsupported one does not."""
+        if not condition:
+            return True
+        try:
+            return evaluate_condition(condition, session.params, self._page_status(session))
+        except ConditionError as e:
+            warning = f"{e} (at {session.flow}/{session.page})"
+            if warning not in session.warnings:
+                session.warnings.append(warning)
+            return False
+    
+    def _page_status(self, session: ReplaySession) -> str:
+        """$page.params.status: FINAL once every required form parameter is filled."""
+        if any(self._is_unfilled(session, parameter) for parameter in self._page(session).form):
+            return ""
+        return "FINAL"
+    
+    def _is_unfilled(self, session: ReplaySession, parameter: FormParameter) -> bool:
+        """Whether a required form parameter still needs a value."""
+        return parameter.required and session.params.get(parameter.name) is None
+    
+    def _page(self, session: ReplaySession) -> Page:
+        """Current page (the flow's start page on START_PAGE_NAME)."""
+        return self.model.page(session.flow, session.page)
+    
+    def _parameter_mismatches(self, actual: Dict[str, Any], expected: Dict[str, Any]) -> Dict[str, List[str]]:
+        """Session parameters that differ from the expected ones."""
+        return {
+            'missing': sorted(name for name in expected if name not in actual),
+            'unexpected': sorted(name for name in actual if name not in expected),
+            'different': sorted(name for name in expected if name in actual and actual[name] != expected[name])
+        }
+    
+    def _describe_input(self, user_input: Dict[str, Any]) -> str:
+        """Short text of a user input for the report."""
+        if user_input.get('event'):
+            return f"event: {user_input['event'].get('event', '').strip()}"
+        return (user_input.get('text') or {}).get('text', '')
+
+def format_findings(report: Dict[str, Any], limit: int = 20) -> str:
+    """
+    Summarize a replay report as text.
+    
+    Args:
+        report: Report returned by ConversationReplayer.replay_all
+        limit: Maximum number of diverging turns listed
+    
+    Returns:
+        One line per diverging turn after a totals line
+    """
+    lines = [
+        f"Test case replay: {report['passed']} of {report['test_cases']} test case(s) passed, "
+        f"{report['diverged_turns']} of {report['turns']} turn(s) diverged ({report['seconds'] * 1000:.0f} ms)"
+    ]
+    
+    divergences = [(result, divergence) for result in report['results'] for divergence in result['divergences']]
+    for result, divergence in divergences[:limit]:
+        lines.append(
+            f"- {result['name']}, turn {divergence['turn']} (\"{divergence['input']}\"): "
+            f"expected {divergence['expected_page']}, got {divergence['actual_page']}"
+        )
+    if len(divergences) > limit:
+        lines.append(f"- ... and {len(divergences) - limit} more")
+    
+    warnings = sorted({warning for result in report['results'] for warning in result['warnings']})
+    lines.extend(f"- Warning: {warning}" for warning in warnings[:limit])
+    
+    return "\n".join(lines)
@@ -0,0 +1,398 @@
+"""
+Entity Matcher Module
+Local matching of entity synonyms in training phrases and test case inputs.
+"""
+
+import re
+import time
+import logging
+from collections import deque
+from typing import Dict, Any, List, Tuple, Iterator, Optional, Set
+
+# Entity kinds whose entries are patterns, not synonyms
+SKIPPED_KINDS = {'KIND_REGEXP'}
+
+_WHITESPACE = re.compile(r"\s+")
+_SPACES = str.maketrans({'\t': ' ', '\n': ' ', '\r': ' ', '\f': ' ', '\v': ' ', ' ': ' '})
+
+def fold_text(text: str) -> str:
+    """
+    Lower-case text and turn whitespace into spaces, keeping every character at its offset.
+    
+    Args:
+        text: Phrase or input text
+    
+    Returns:
+        Folded text of the same length
+    """
+    folded = text.lower()
+    if len(folded) != len(text):
+        # A few characters lower-case to several; leave those as they are
+        folded = ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+    return folded.translate(_SPACES)
+
+def normalize_synonym(synonym: str) -> str:
+    """
+    Normalize an entity synonym for matching.
+    
+    Args:
+        synonym: Synonym as written in the entity type
+    
+    Returns:
+        Folded synonym with collapsed, trimmed whitespace
+    """
+    return _WHITESPACE.sub(" ", fold_text(synonym)).strip()
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+class SynonymAutomaton:
+    """
+    Aho-Corasick automaton over normalized synonyms.
+    
+    A text is scanned once, whatever the number of synonyms. Matches must start
+    and end on word boundaries ("car" does not match in "scar"), and
+    overlapping matches are resolved leftmost-longest.
+    """
+    
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # Pattern ending at the node (-1 for none), and the nearest suffix node that ends one
+        self.terminal: List[int] = [-1]
+        self.output_link: List[int] = [0]
+        self.patterns: List[str] = []
+        self.pattern_ids: Dict[str, int] = {}
+    
+    def add(self, pattern: str) -> int:
+        """
+        Add a normalized pattern.
+        
+        Args:
+            pattern: Pattern text
+        
+        Returns:
+            Pattern id (the same for the same text)
+        """
+        if pattern in self.pattern_ids:
+            return self.pattern_ids[pattern]
+        
+        node = 0
+        for char in pattern:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.terminal.append(-1)
+                self.output_link.append(0)
+            node = next_node
+        
+        pattern_id = len(self.patterns)
+        self.patterns.append(pattern)
+        self.pattern_ids[pattern] = pattern_id
+        self.terminal[node] = pattern_id
+        return pattern_id
+    
+    def build(self) -> None:
+        """Compute the failure and output links; call after the last add()."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                suffix = self.fail[child]
+                self.output_link[child] = suffix if self.terminal[suffix] >= 0 else self.output_link[suffix]
+                queue.append(child)
+    
+    def find(self, text: str) -> List[Tuple[int, int, int]]:
+        """
+        Find the synonyms in a folded text.
+        
+        Args:
+            text: Text folded with fold_text
+        
+        Returns:
+            (start, end, pattern id) of non-overlapping matches, in text order
+        """
+        goto, fail, terminal, output_link, patterns = self.goto, self.fail, self.terminal, self.output_link, self.patterns
+        candidates = []
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            
+            match_node = node if terminal[node] >= 0 else output_link[node]
+            # Every pattern ending here ends with char, so the end boundary is checked once
+            end = index + 1
+            if not match_node or (end < len(text) and _is_word_char(char) and _is_word_char(text[end])):
+                continue
+            while match_node:
+                pattern_id = terminal[match_node]
+                start = end - len(patterns[pattern_id])
+                if start == 0 or not (_is_word_char(text[start - 1]) and _is_word_char(text[start])):
+                    candidates.append((start, end, pattern_id))
+                match_node = output_link[match_node]
+        
+        matches = []
+        covered = 0
+        for start, end, pattern_id in sorted(candidates, key=lambda match: (match[0], -match[1])):
+            if start >= covered:
+                matches.append((start, end, pattern_id))
+                covered = end
+        return matches
+
+def iter_phrases(intents: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any], str, Dict[str, Any]]]:
+    """
+    Iterate over the training phrases of the loaded intents.
+    
+    Args:
+        intents: Intents as returned by DialogFlowFileLoader.load_intents
+    
+    Yields:
+        (intent name, intent config, language code, phrase) tuples
+    """
+    for intent_dir, intent_data in intents.items():
+        config = (intent_data or {}).get('config', {})
+        intent_name = config.get('displayName', intent_dir)
+        for lang, phrases_data in (intent_data.get('training_phrases') or {}).items():
+            for phrase in (phrases_data or {}).get('trainingPhrases', []):
+                yield intent_name, config, phrase.get('languageCode', lang), phrase
+
+class EntityMatcher:
+    """
+    Matches the synonyms of the export's entity types in any text.
+    
+    Builds one SynonymAutomaton per language from the loaded entity types, so
+    annotating every training phrase and test case input is a single pass
+    over each text. Synonyms of several values or entity types are matched
+    once and reported as shared.
+    """
+    
+    def __init__(self, entity_types: Dict[str, Any]):
+        """
+        Initialize the matcher.
+        
+        Args:
+            entity_types: Entity types as returned by DialogFlowFileLoader.load_entity_types
+        """
+        self.logger = logging.getLogger(__name__)
+        self.automata: Dict[str, SynonymAutomaton] = {}
+        # Language -> pattern id -> (entity type, value) pairs
+        self.entities: Dict[str, List[List[Tuple[str, str]]]] = {}
+        # Same, as the report entries shared by every match of the pattern
+        self.entity_entries: Dict[str, List[List[Dict[str, str]]]] = {}
+        # Entity type -> values, in export order
+        self.values: Dict[str, List[str]] = {}
+        
+        for entity_dir, entity_data in entity_types.items():
+            config = (entity_data or {}).get('config', {})
+            if config.get('kind') in SKIPPED_KINDS:
+                continue
+            entity_name = config.get('displayName') or entity_dir
+            values = self.values.setdefault(entity_name, [])
+            known_values = set(values)
+            for lang, entities in (entity_data.get('entities') or {}).items():
+                automaton = self.automata.setdefault(lang, SynonymAutomaton())
+                pattern_entities = self.entities.setdefault(lang, [])
+                for entry in (entities or {}).get('entities', []):
+                    value = entry.get('value')
+                    if value is None:
+                        continue
+                    if value not in known_values:
+                        known_values.add(value)
+                        values.append(value)
+                    for synonym in entry.get('synonyms') or [value]:
+                        pattern = normalize_synonym(synonym)
+                        if not pattern:
+                            continue
+                        pattern_id = automaton.add(pattern)
+                        if pattern_id == len(pattern_entities):
+                            pattern_entities.append([])
+                        if (entity_name, value) not in pattern_entities[pattern_id]:
+                            pattern_entities[pattern_id].append((entity_name, value))
+        
+        for lang, automaton in self.automata.items():
+            automaton.build()
+            self.entity_entries[lang] = [
+                [{'entity_type': entity_type, 'value': value} for entity_type, value in entities]
+                for entities in self.entities[lang]
+            ]
+    
+    @property
+    def synonyms(self) -> int:
+        """Number of distinct normalized synonyms over all languages."""
+        return sum(len(automaton.patterns) for automaton in self.automata.values())
+    
+    def shared_synonyms(self) -> List[Dict[str, Any]]:
+        """
+        Find synonyms of more than one value or entity type.
+        
+        Returns:
+            One entry per shared synonym, with its entities and whether they
+            span several entity types
+        """
+        shared = []
+        for lang, automaton in sorted(self.automata.items()):
+            for pattern_id, pattern in enumerate(automaton.patterns):
+                entities = self.entities[lang][pattern_id]
+                if len(entities) > 1:
+                    shared.append({
+                        'synonym': pattern,
+                        'language': lang,
+                        'entities': [{'entity_type': entity_type, 'value': value} for entity_type, value in entities],
+                        'across_entity_types': len({entity_type for entity_type, _ in entities}) > 1
+                    })
+        return sorted(shared, key=lambda entry: (entry['language'], entry['synonym']))
+    
+    def annotate(self, text: str, lang: str = 'en') -> List[Dict[str, Any]]:
+        """
+        Find the entity synonyms in a text.
+        
+        Args:
+            text: Phrase or input text
+            lang: Language code of the text
+        
+        Returns:
+            Matches in text order, with their offsets in text, the matched
+            text and every (entity type, value) of the synonym
+        """
+        return self._annotate(text, lang)
+    
+    def _annotate(self, text: str, lang: str, matched: Optional[Set[Tuple[str, int]]] = None) -> List[Dict[str, Any]]:
+        """Find the entity synonyms in a text, adding the (language, pattern id) of each match to matched."""
+        automaton = self.automata.get(lang)
+        if automaton is None:
+            return []
+        
+        found = automaton.find(fold_text(text))
+        if matched is not None:
+            matched.update((lang, pattern_id) for _, _, pattern_id in found)
+        return [
+            {'start': start, 'end': end, 'text': text[start:end], 'entities': self.entity_entries[lang][pattern_id]}
+            for start, end, pattern_id in found
+        ]
+    
+    def analyze(self, intents: Dict[str, Any], test_cases: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Annotate every training phrase and test case input and check entity coverage.
+        
+        Args:
+            intents: Intents as returned by DialogFlowFileLoader.load_intents
+            test_cases: Test cases as returned by DialogFlowFileLoader.load_test_cases
+        
+        Returns:
+            Report with the matches, synonyms shared by several values or entity
+            types, synonyms in phrase parts left unannotated although the intent
+            has a parameter of that entity type, and values never mentioned
+        """
+        started = time.perf_counter()
+        matched_patterns = set()
+        
+        phrase_matches = []
+        missing_annotations = []
+        phrases = 0
+        for intent_name, config, lang, phrase in iter_phrases(intents):
+            phrases += 1
+            parts = phrase.get('parts', [])
+            text = ''.join(part.get('text', '') for part in parts)
+            matches = self._annotate(text, lang, matched_patterns)
+            if not matches:
+                continue
+            
+            annotated = []
+            offset = 0
+            for part in parts:
+                part_end = offset + len(part.get('text', ''))
+                if part.get('parameterId'):
+                    annotated.append((offset, part_end))
+                offset = part_end
+            parameter_types = {(parameter.get('entityType') or '').lstrip('@') for parameter in config.get('parameters', [])}
+            
+            for match in matches:
+                if any(start < match['end'] and match['start'] < end for start, end in annotated):
+                    continue
+                for entity in match['entities']:
+                    if entity['entity_type'] in parameter_types:
+                        missing_annotations.append({
+                            'intent': intent_name, 'phrase': text, 'text': match['text'],
+                            'entity_type': entity['entity_type'], 'value': entity['value']
+                        })
+                        break
+            phrase_matches.append({'intent': intent_name, 'language': lang, 'phrase': text, 'matches': matches})
+        
+        test_input_matches = []
+        test_inputs = 0
+        for file_name, test_case in (test_cases or {}).items():
+            for index, turn in enumerate(test_case.get('testCaseConversationTurns', []), start=1):
+                user_input = (turn.get('userInput') or {}).get('input') or {}
+                text = (user_input.get('text') or {}).get('text')
+                if not text:
+                    continue
+                test_inputs += 1
+                matches = self._annotate(text, user_input.get('languageCode', 'en'), matched_patterns)
+                if matches:
+                    test_input_matches.append({
+                        'test_case': test_case.get('displayName') or file_name, 'turn': index,
+                        'input': text, 'matches': matches
+                    })
+        
+        matched_values = {entity for lang, pattern_id in matched_patterns for entity in self.entities[lang][pattern_id]}
+        unmatched_values = {
+            entity_type: [value for value in values if (entity_type, value) not in matched_values]
+            for entity_type, values in sorted(self.values.items())
+        }
+        
+        report = {
+            'entity_types': len(self.values),
+            'synonyms': self.synonyms,
+            'phrases': phrases,
+            'matched_phrases': len(phrase_matches),
+            'test_inputs': test_inputs,
+            'matched_test_inputs': len(test_input_matches),
+            'shared_synonyms': self.shared_synonyms(),
+            'missing_annotations': missing_annotations,
+            'unmatched_values': {entity_type: values for entity_type, values in unmatched_values.items() if values},
+            'phrase_matches': phrase_matches,
+            'test_input_matches': test_input_matches,
+            'seconds': round(time.perf_counter() - started, 3)
+        }
+        self.logger.info(
+            f"Entity coverage: {report['synonyms']} synonyms of {report['entity_types']} entity types matched in "
+            f"{report['matched_phrases']} of {phrases} phrases and {report['matched_test_inputs']} of {test_inputs} "
+            f"test inputs, {len(report['shared_synonyms'])} shared synonym(s), "
+            f"{len(missing_annotations)} missing annotation(s) in {report['seconds']}s"
+        )
+        return report
+
+def format_findings(report: Dict[str, Any], limit: Optional[int] = 20) -> str:
+    """
+    Render entity coverage findings as markdown, for logs and for the analysis prompt.
+    
+    Args:
+        report: Findings from EntityMatcher.analyze
+        limit: Maximum number of entries per kind of finding
+    
+    Returns:
+        Markdown text (empty when there is nothing to report)
+    """
+    lines = []
+    
+    for shared in report['shared_synonyms'][:limit]:
+        owners = ', '.join(f"@{entity['entity_type']}:{entity['value']}" for entity in shared['entities'])
+        kind = "several entity types" if shared['across_entity_types'] else "several values"
+        lines.append(f"- Synonym of {kind}: \"{shared['synonym']}\" ({owners})")
+    for missing in report['missing_annotations'][:limit]:
+        lines.append(
+            f"- Unannotated entity: \"{missing['text']}\" (@{missing['entity_type']}:{missing['value']}) in "
+            f"\"{missing['phrase']}\" ({missing['intent']})"
+        )
+    for entity_type, values in list(report['unmatched_values'].items())[:limit]:
+        lines.append(f"- Entity values never used in training phrases or test cases: @{entity_type}: {', '.join(values)}")
+    
+    return "\n".join(lines)
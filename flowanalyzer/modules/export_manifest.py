@@ -0,0 +1,209 @@
+"""
+Export Manifest Module
+Tracks the files of a DialogFlow export to detect changes between runs.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Set, List
+
+# Manifest file stored in the output directory
+MANIFEST_FILE_NAME = "export_manifest.json"
+MANIFEST_VERSION = 1
+
+# Export sub-directories holding analysed files
+EXPORT_DIRECTORIES = ["intents", "flows", "entityTypes"]
+
+class ExportManifest:
+    """
+    Path, size, modification time and content hash of every export file.
+    """
+    
+    def __init__(self, files: Optional[Dict[str, Dict[str, Any]]] = None, units: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        Initialize the manifest.
+        
+        Args:
+            files: File entries keyed by path relative to the export root
+            units: Analysis unit entries keyed by unit name
+        """
+        self.logger = logging.getLogger(__name__)
+        self.files = files or {}
+        self.units = units or {}
+        
+        # Number of files whose content was hashed by the last scan
+        self.hashed_files = 0
+    
+    @classmethod
+    def load(cls, manifest_file: Path) -> 'ExportManifest':
+        """
+        Load a manifest, returning an empty one if it is missing or outdated.
+        
+        Args:
+            manifest_file: Path to the manifest file
+        
+        Returns:
+            Loaded manifest
+        """
+        manifest_file = Path(manifest_file)
+        if not manifest_file.exists():
+            return cls()
+        
+        try:
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            if data.get('version') != MANIFEST_VERSION:
+                logging.getLogger(__name__).info(f"Ignoring manifest with version {data.get('version')}: {manifest_file}")
+                return cls()
+            
+            return cls(data.get('files', {}), data.get('units', {}))
+        
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Error loading manifest {manifest_file}: {e}")
+            return cls()
+    
+    def save(self, manifest_file: Path) -> None:
+        """
+        Save the manifest.
+        
+        Args:
+            manifest_file: Path to the manifest file
+        """
+        data = {
+            'version': MANIFEST_VERSION,
+            'files': self.files,
+            'units': self.units
+        }
+        
+        with open(manifest_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, sort_keys=True)
+        
+        self.logger.info(f"Manifest saved: {manifest_file}")
+    
+    @classmethod
+    def scan(cls, flow_path: Path, previous: Optional['ExportManifest'] = None) -> 'ExportManifest':
+        """
+        Build the manifest of an export directory.
+        
+        Files whose size and modification time match the previous manifest keep
+        their recorded hash and are not read; only new or modified files are hashed.
+        
+        Args:
+            flow_path: Path to the DialogFlow export directory
+            previous: Manifest of the previous run
+        
+        Returns:
+            Manifest of the export as it is now
+        """
+        flow_path = Path(flow_path)
+        previous_files = previous.files if previous else {}
+        manifest = cls()
+        
+        root = str(flow_path)
+        for relative_path in cls._export_files(flow_path):
+            file_path = os.path.join(root, relative_path)
+            stat = os.stat(file_path)
+            entry = previous_files.get(relative_path)
+            
+            if not entry or entry['size'] != stat.st_size or entry['mtime'] != stat.st_mtime_ns:
+                entry = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime_ns,
+                    'sha256': cls._hash_file(file_path)
+                }
+                manifest.hashed_files += 1
+            
+            manifest.files[relative_path] = entry
+        
+        manifest.logger.info(f"Scanned {len(manifest.files)} export files, hashed {manifest.hashed_files}")
+        return manifest
+    
+    def changed_files(self, previous: 'ExportManifest') -> Set[str]:
+        """
+        Get the files added, modified or removed since a previous manifest.
+        
+        Args:
+            previous: Manifest of the previous run
+        
+        Returns:
+            Set of relative file paths
+        """
+        changed = {
+            path for path, entry in self.files.items()
+            if path not in previous.files or previous.files[path]['sha256'] != entry['sha256']
+        }
+        changed.update(path for path in previous.files if path not in self.files)
+        return changed
+    
+    def fingerprint(self, scope: List[str]) -> str:
+        """
+        Hash the content of every file within a scope.
+        
+        Args:
+            scope: File paths and directory prefixes (ending in '/') relative to the export root
+        
+        Returns:
+            Hex-encoded SHA-256 fingerprint
+        """
+        scope = set(scope)
+        hasher = hashlib.sha256()
+        for path in sorted(self.files):
+            if path in scope or self._item_prefix(path) in scope:
+                hasher.update(path.encode('utf-8'))
+                hasher.update(b'\0')
+                hasher.update(self.files[path]['sha256'].encode('ascii'))
+                hasher.update(b'\0')
+        return hasher.hexdigest()
+    
+    def item_names(self, directory: str) -> List[str]:
+        """
+        Get the names of the items (intents, flows, entity types) in an export directory.
+        
+        Args:
+            directory: Export sub-directory such as 'flows'
+        
+        Returns:
+            Sorted item directory names
+        """
+        names = set()
+        for path in self.files:
+            parts = path.split('/')
+            if len(parts) > 2 and parts[0] == directory:
+                names.add(parts[1])
+        return sorted(names)
+    
+    @staticmethod
+    def _export_files(flow_path: Path) -> List[str]:
+        """List the export files as sorted paths relative to the export root."""
+        export_files = []
+        if (flow_path / "agent.json").exists():
+            export_files.append("agent.json")
+        for directory in EXPORT_DIRECTORIES:
+            # Plain string paths: Path objects dominate the scan time of exports with thousands of files
+            directory_files = []
+            prefix_length = len(str(flow_path)) + 1
+            for root, _, files in os.walk(os.path.join(str(flow_path), directory)):
+                relative_root = root[prefix_length:].replace(os.sep, '/')
+                directory_files.extend(f"{relative_root}/{name}" for name in files if name.endswith('.json'))
+            export_files.extend(sorted(directory_files))
+        return export_files
+    
+    def _item_prefix(self, path: str) -> str:
+        """Get the item directory prefix of a path, e.g. 'flows/<flow>/'."""
+        parts = path.split('/')
+        if len(parts) > 2:
+            return f"{parts[0]}/{parts[1]}/"
+        return path
+    
+    @staticmethod
+    def _hash_file(file_path: Path) -> str:
+        """Compute the SHA-256 hash of a file."""
+        hasher = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
@@ -0,0 +1,125 @@
+"""
+Export Snapshot Module
+Versioned binary snapshots of parsed exports for fast warm starts.
+"""
+
+import os
+import gc
+import json
+import pickle
+import struct
+import hashlib
+import logging
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+# File layout: magic, format version (uint16), header length (uint32), JSON header, pickle payload
+SNAPSHOT_MAGIC = b"FLOWSNAP"
+SNAPSHOT_VERSION = 1
+HEADER_STRUCT = struct.Struct(">HI")
+
+def snapshot_file_name(flow_path: Path) -> str:
+    """
+    Get the snapshot file name of an export directory.
+    
+    Args:
+        flow_path: Path to the DialogFlow export directory
+    
+    Returns:
+        File name unique to the resolved export path
+    """
+    path_hash = hashlib.sha256(str(Path(flow_path).resolve()).encode('utf-8')).hexdigest()[:16]
+    return f"export_{path_hash}.snapshot"
+
+class ExportSnapshot:
+    """
+    Reads and writes snapshot files.
+    
+    The JSON header records the content hash of the export and the manifest
+    entries (size, mtime, hash) of its files, so validity can be checked
+    without unpickling the payload and, for unchanged files, without reading
+    them. Snapshots are pickles: only load them from a cache directory you
+    control.
+    """
+    
+    def __init__(self, snapshot_file: Path):
+        """
+        Initialize the snapshot.
+        
+        Args:
+            snapshot_file: Path to the snapshot file
+        """
+        self.logger = logging.getLogger(__name__)
+        self.snapshot_file = Path(snapshot_file)
+    
+    def read_header(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the header of the snapshot.
+        
+        Returns:
+            Header dictionary, or None if the file is missing, damaged or of another format version
+        """
+        if not self.snapshot_file.exists():
+            return None
+        
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                header, _ = self._read_header(f)
+            return header
+        except Exception as e:
+            self.logger.info(f"Ignoring unreadable snapshot {self.snapshot_file}: {e}")
+            return None
+    
+    def load(self) -> Tuple[Dict[str, Any], Any]:
+        """
+        Load the snapshot.
+        
+        Returns:
+            Tuple of (header, payload)
+        """
+        with open(self.snapshot_file, 'rb') as f:
+            header, payload_offset = self._read_header(f)
+            f.seek(payload_offset)
+            # The payload is millions of small containers; collecting while they are
+            # created only slows the load down (it holds no reference cycles)
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                return header, pickle.load(f)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+    
+    def save(self, header: Dict[str, Any], payload: Any) -> int:
+        """
+        Write the snapshot atomically.
+        
+        Args:
+            header: JSON-serializable header
+            payload: Picklable payload
+        
+        Returns:
+            Size of the snapshot file in bytes
+        """
+        self.snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        header_bytes = json.dumps(header, sort_keys=True).encode('utf-8')
+        temp_file = self.snapshot_file.with_name(self.snapshot_file.name + f".{os.getpid()}.tmp")
+        
+        with open(temp_file, 'wb') as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(HEADER_STRUCT.pack(SNAPSHOT_VERSION, len(header_bytes)))
+            f.write(header_bytes)
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.snapshot_file)
+        
+        return self.snapshot_file.stat().st_size
+    
+    def _read_header(self, f) -> Tuple[Dict[str, Any], int]:
+        """Read and check the fixed prefix and the JSON header."""
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            raise ValueError("not a snapshot file")
+        version, header_length = HEADER_STRUCT.unpack(f.read(HEADER_STRUCT.size))
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"snapshot format version {version}, expected {SNAPSHOT_VERSION}")
+        header = json.loads(f.read(header_length).decode('utf-8'))
+        return header, len(SNAPSHOT_MAGIC) + HEADER_STRUCT.size + header_length
@@ -3,32 +3,97 @@ DialogFlow File Loader Module
 Handles loading and parsing of DialogFlow export files.
 """
 
+import re
 import json
+import time
+import shutil
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Tuple, Union, Iterator, Iterable, NamedTuple, TextIO
+from export_manifest import ExportManifest
+from compact_format import compact_json
+from agent_model import AgentModel
+from export_snapshot import ExportSnapshot, snapshot_file_name
+from json_stream import iter_array_items, StreamedArray
+
+# Buffer size used when copying export files into the consolidated file
+COPY_CHUNK_SIZE = 1024 * 1024
+
+# Training phrase and entity files larger than this are streamed instead of parsed in full
+DEFAULT_STREAM_THRESHOLD = 4 * 1024 * 1024
+
+# Layout keys of the files holding one large array, and the key of that array
+STREAMED_LAYOUT_KEYS = {'training_phrases': 'trainingPhrases', 'entities': 'entities'}
+
+# Export directory of those files -> key of their array
+STREAMED_FILE_DIRS = {'trainingPhrases': 'trainingPhrases', 'entities': 'entities'}
+
+# Section markers written by create_consolidated_file
+SECTION_BEGIN_PATTERN = re.compile(r'^-{50}<(.+) Begins>-{50}$')
+SECTION_END_PATTERN = re.compile(r'^-{50}<(.+) Ends>-{50}$')
+ITEM_BEGIN_PATTERN = re.compile(r'^---<((?:intent|flow|entityType): .+) Begins>---$')
+ITEM_END_PATTERN = re.compile(r'^---<((?:intent|flow|entityType): .+) Ends>---$')
+
+
+class ConsolidatedSection(NamedTuple):
+    """
+    A piece of the consolidated file.
+    
+    section is the top-level block ('agent.json', 'intents', 'flows', 'entityTypes')
+    or None for the file header/footer. name is the item label such as
+    'intent: small_thank.thanks', or None for text between items.
+    """
+    section: Optional[str]
+    name: Optional[str]
+    text: str
+
 
 class DialogFlowFileLoader:
     """
     Loads and parses DialogFlow export files.
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 1, snapshot_dir: Optional[Path] = None,
+                 stream_threshold: int = DEFAULT_STREAM_THRESHOLD):
+        """
+        Initialize the file loader.
+        
+        Args:
+            max_workers: Number of threads used to load export files (1 loads serially)
+            snapshot_dir: Directory of binary snapshots of parsed exports (None disables snapshots)
+            stream_threshold: Size in bytes above which training phrase and entity
+                files are streamed item by item (by load_export with stream_arrays,
+                load_model and compact consolidation) instead of parsed in full
+        """
         self.logger = logging.getLogger(__name__)
+        self.max_workers = max(1, int(max_workers or 1))
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else None
+        self.stream_threshold = stream_threshold
+        
+        # Per-category timing stats of the most recent load
+        self.load_stats: Dict[str, Dict[str, Any]] = {}
+        
+        # Source and output sizes of the most recent consolidated file
+        self.consolidation_stats: Dict[str, Any] = {}
     
-    def create_consolidated_file(self, flow_path: Path, output_path: Path) -> str:
+    def create_consolidated_file(self, flow_path: Path, output_path: Path, compact: bool = False) -> str:
         """
         Create a consolidated file containing all DialogFlow data.
         
         Args:
             flow_path: Path to the DialogFlow export directory
             output_path: Path where the consolidated file should be saved
+            compact: Write each export file as minified JSON without
+                analysis-irrelevant fields instead of copying it verbatim
             
         Returns:
             Path to the created consolidated file
         """
         try:
             consolidated_file = output_path / "consolidated_dialogflow_data.txt"
+            self.consolidation_stats = {'format': 'compact' if compact else 'raw', 'source_bytes': 0}
             
             with open(consolidated_file, 'w', encoding='utf-8') as f:
                 f.write("=" * 80 + "\n")
@@ -39,8 +104,7 @@ class DialogFlowFileLoader:
                 agent_file = flow_path / "agent.json"
                 if agent_file.exists():
                     f.write("-" * 50 + "<agent.json Begins>" + "-" * 50 + "\n")
-                    with open(agent_file, 'r', encoding='utf-8') as agent_f:
-                        f.write(agent_f.read())
+                    self._copy_file(f, agent_file, compact)
                     f.write("\n" + "-" * 50 + "<agent.json Ends>" + "-" * 50 + "\n\n")
                 
                 # Load and write intents
@@ -49,7 +113,7 @@ class DialogFlowFileLoader:
                     f.write("-" * 50 + "<intents Begins>" + "-" * 50 + "\n")
                     for intent_dir in intents_path.iterdir():
                         if intent_dir.is_dir():
-                            self._write_intent_to_file(f, intent_dir)
+                            self._write_intent_to_file(f, intent_dir, compact)
                     f.write("-" * 50 + "<intents Ends>" + "-" * 50 + "\n\n")
                 
                 # Load and write flows
@@ -58,7 +122,7 @@ class DialogFlowFileLoader:
                     f.write("-" * 50 + "<flows Begins>" + "-" * 50 + "\n")
                     for flow_dir in flows_path.iterdir():
                         if flow_dir.is_dir():
-                            self._write_flow_to_file(f, flow_dir)
+                            self._write_flow_to_file(f, flow_dir, compact)
                     f.write("-" * 50 + "<flows Ends>" + "-" * 50 + "\n\n")
                 
                 # Load and write entity types
@@ -67,21 +131,26 @@ class DialogFlowFileLoader:
                     f.write("-" * 50 + "<entityTypes Begins>" + "-" * 50 + "\n")
                     for entity_dir in entity_types_path.iterdir():
                         if entity_dir.is_dir():
-                            self._write_entity_type_to_file(f, entity_dir)
+                            self._write_entity_type_to_file(f, entity_dir, compact)
                     f.write("-" * 50 + "<entityTypes Ends>" + "-" * 50 + "\n\n")
                 
                 f.write("=" * 80 + "\n")
                 f.write("END OF CONSOLIDATED DATA\n")
                 f.write("=" * 80 + "\n")
             
-            self.logger.info(f"Consolidated file created: {consolidated_file}")
+            stats = self.consolidation_stats
+            stats['output_bytes'] = consolidated_file.stat().st_size
+            self.logger.info(
+                f"Consolidated file created: {consolidated_file} "
+                f"({stats['format']}, {stats['source_bytes']:,} source bytes -> {stats['output_bytes']:,} bytes)"
+            )
             return str(consolidated_file)
             
         except Exception as e:
             self.logger.error(f"Error creating consolidated file: {e}")
             raise
     
-    def _write_intent_to_file(self, file_handle, intent_dir: Path) -> None:
+    def _write_intent_to_file(self, file_handle, intent_dir: Path, compact: bool = False) -> None:
         """Write a single intent to the consolidated file."""
         try:
             intent_name = intent_dir.name
@@ -91,8 +160,7 @@ class DialogFlowFileLoader:
             intent_config_file = intent_dir / f"{intent_name}.json"
             if intent_config_file.exists():
                 file_handle.write(f"\n---<{intent_name}.json Begins>---\n")
-                with open(intent_config_file, 'r', encoding='utf-8') as config_f:
-                    file_handle.write(config_f.read())
+                self._copy_file(file_handle, intent_config_file, compact)
                 file_handle.write(f"\n---<{intent_name}.json Ends>---\n")
             
             # Write training phrases
@@ -101,8 +169,7 @@ class DialogFlowFileLoader:
                 for lang_file in training_phrases_dir.glob("*.json"):
                     lang = lang_file.stem
                     file_handle.write(f"\n---<{intent_name}/trainingPhrases/{lang}.json Begins>---\n")
-                    with open(lang_file, 'r', encoding='utf-8') as lang_f:
-                        file_handle.write(lang_f.read())
+                    self._copy_file(file_handle, lang_file, compact)
                     file_handle.write(f"\n---<{intent_name}/trainingPhrases/{lang}.json Ends>---\n")
             
             file_handle.write(f"\n---<intent: {intent_name} Ends>---\n")
@@ -110,7 +177,7 @@ class DialogFlowFileLoader:
         except Exception as e:
             self.logger.error(f"Error writing intent {intent_dir.name} to consolidated file: {e}")
     
-    def _write_flow_to_file(self, file_handle, flow_dir: Path) -> None:
+    def _write_flow_to_file(self, file_handle, flow_dir: Path, compact: bool = False) -> None:
         """Write a single flow to the consolidated file."""
         try:
             flow_name = flow_dir.name
@@ -120,8 +187,7 @@ class DialogFlowFileLoader:
             flow_config_file = flow_dir / f"{flow_name}.json"
             if flow_config_file.exists():
                 file_handle.write(f"\n---<{flow_name}.json Begins>---\n")
-                with open(flow_config_file, 'r', encoding='utf-8') as config_f:
-                    file_handle.write(config_f.read())
+                self._copy_file(file_handle, flow_config_file, compact)
                 file_handle.write(f"\n---<{flow_name}.json Ends>---\n")
             
             # Write pages
@@ -130,8 +196,7 @@ class DialogFlowFileLoader:
                 for page_file in pages_dir.glob("*.json"):
                     page_name = page_file.stem
                     file_handle.write(f"\n---<{flow_name}/pages/{page_name}.json Begins>---\n")
-                    with open(page_file, 'r', encoding='utf-8') as page_f:
-                        file_handle.write(page_f.read())
+                    self._copy_file(file_handle, page_file, compact)
                     file_handle.write(f"\n---<{flow_name}/pages/{page_name}.json Ends>---\n")
             
             file_handle.write(f"\n---<flow: {flow_name} Ends>---\n")
@@ -139,7 +204,7 @@ class DialogFlowFileLoader:
         except Exception as e:
             self.logger.error(f"Error writing flow {flow_dir.name} to consolidated file: {e}")
     
-    def _write_entity_type_to_file(self, file_handle, entity_dir: Path) -> None:
+    def _write_entity_type_to_file(self, file_handle, entity_dir: Path, compact: bool = False) -> None:
         """Write a single entity type to the consolidated file."""
         try:
             entity_name = entity_dir.name
@@ -149,8 +214,7 @@ class DialogFlowFileLoader:
             entity_config_file = entity_dir / f"{entity_name}.json"
             if entity_config_file.exists():
                 file_handle.write(f"\n---<{entity_name}.json Begins>---\n")
-                with open(entity_config_file, 'r', encoding='utf-8') as config_f:
-                    file_handle.write(config_f.read())
+                self._copy_file(file_handle, entity_config_file, compact)
                 file_handle.write(f"\n---<{entity_name}.json Ends>---\n")
             
             # Write entities
@@ -159,15 +223,121 @@ class DialogFlowFileLoader:
                 for lang_file in entities_dir.glob("*.json"):
                     lang = lang_file.stem
                     file_handle.write(f"\n---<{entity_name}/entities/{lang}.json Begins>---\n")
-                    with open(lang_file, 'r', encoding='utf-8') as lang_f:
-                        file_handle.write(lang_f.read())
+                    self._copy_file(file_handle, lang_file, compact)
                     file_handle.write(f"\n---<{entity_name}/entities/{lang}.json Ends>---\n")
             
             file_handle.write(f"\n---<entityType: {entity_name} Ends>---\n")
             
         except Exception as e:
             self.logger.error(f"Error writing entity type {entity_dir.name} to consolidated file: {e}")
-
+            
+    def _copy_file(self, file_handle: TextIO, source_file: Path, compact: bool = False) -> None:
+        """
+        Copy a source file into the consolidated file.
+        
+        Files are copied in fixed-size chunks, or rewritten as compact JSON when
+        compact is set. Files that are not valid JSON are always copied verbatim.
+        """
+        if 'source_bytes' in self.consolidation_stats:
+            self.consolidation_stats['source_bytes'] += source_file.stat().st_size
+        
+        if compact:
+            try:
+                if self._is_streamed(source_file):
+                    self._write_compact_array(file_handle, source_file, STREAMED_FILE_DIRS[source_file.parent.name])
+                    return
+                with open(source_file, 'r', encoding='utf-8') as source_f:
+                    data = json.load(source_f)
+                file_handle.write(compact_json(data))
+                return
+            except ValueError as e:
+                self.logger.warning(f"Copying {source_file} verbatim, not valid JSON: {e}")
+        
+        with open(source_file, 'r', encoding='utf-8') as source_f:
+            shutil.copyfileobj(source_f, file_handle, COPY_CHUNK_SIZE)
+    
+    def _is_streamed(self, file_path: Path) -> bool:
+        """Whether a file is a training phrase or entity file large enough to stream."""
+        return file_path.parent.name in STREAMED_FILE_DIRS and file_path.stat().st_size > self.stream_threshold
+    
+    def _write_compact_array(self, file_handle: TextIO, source_file: Path, key: str) -> None:
+        """
+        Write a training phrase or entity file as compact JSON one array item at a time.
+        
+        The output matches compact_json of the whole file, except that other
+        keys of the file's object follow the array. If the file turns out to be
+        malformed, what was written of it is truncated again and the error raised.
+        """
+        start = file_handle.tell()
+        try:
+            others = {}
+            file_handle.write("{" + json.dumps(key, ensure_ascii=False) + ":[")
+            count = 0
+            for item in iter_array_items(source_file, key, others):
+                file_handle.write(("," if count else "") + compact_json(item))
+                count += 1
+            rest = compact_json(others)[1:-1]
+            if not count:
+                # compact_json drops empty arrays
+                file_handle.seek(start)
+                file_handle.truncate()
+                file_handle.write("{" + rest + "}")
+            else:
+                file_handle.write("]" + ("," + rest if rest else "") + "}")
+        except ValueError:
+            file_handle.seek(start)
+            file_handle.truncate()
+            raise
+    
+    def iter_consolidated_sections(self, consolidated_file_path: str) -> Iterator[ConsolidatedSection]:
+        """
+        Lazily iterate over the consolidated file, one tagged section at a time.
+        
+        Only the current item (a single intent, flow or entity type) is held in
+        memory. Joining the text of every yielded section reproduces the file
+        exactly.
+        
+        Args:
+            consolidated_file_path: Path to the consolidated file
+            
+        Yields:
+            ConsolidatedSection tuples in file order
+        """
+        section = None
+        item_name = None
+        buffer = []
+        
+        with open(consolidated_file_path, 'r', encoding='utf-8', newline='') as f:
+            for line in f:
+                stripped = line.rstrip('\r\n')
+                
+                if item_name is None and (SECTION_BEGIN_PATTERN.match(stripped) or ITEM_BEGIN_PATTERN.match(stripped)):
+                    # Flush whatever precedes the new block
+                    if buffer:
+                        yield ConsolidatedSection(section, None, ''.join(buffer))
+                        buffer = []
+                    
+                    section_match = SECTION_BEGIN_PATTERN.match(stripped)
+                    if section_match:
+                        section = section_match.group(1)
+                    else:
+                        item_name = ITEM_BEGIN_PATTERN.match(stripped).group(1)
+                
+                buffer.append(line)
+                
+                item_end = ITEM_END_PATTERN.match(stripped)
+                if item_name is not None and item_end and item_end.group(1) == item_name:
+                    yield ConsolidatedSection(section, item_name, ''.join(buffer))
+                    buffer = []
+                    item_name = None
+                elif item_name is None and SECTION_END_PATTERN.match(stripped):
+                    yield ConsolidatedSection(section, None, ''.join(buffer))
+                    buffer = []
+                    section = None
+        
+        if buffer:
+            yield ConsolidatedSection(section, item_name, ''.join(buffer))
+    
     def load_consolidated_data(self, consolidated_file_path: str) -> str:
         """
         Load the consolidated DialogFlow data file.
@@ -188,61 +358,226 @@ class DialogFlowFileLoader:
         except Exception as e:
             self.logger.error(f"Error loading consolidated data: {e}")
             raise
-
-    def load_intents(self, intents_path: Path) -> Dict[str, Any]:
+            
+    def load_export(self, flow_path: Path, stream_arrays: bool = False) -> Dict[str, Any]:
         """
-        Load all intents from the intents directory.
+        Load the complete DialogFlow export into dictionaries.
+        
+        When a snapshot directory is set, the parsed export is restored from its
+        snapshot if the content hash of the export files still matches, and
+        the snapshot is rewritten otherwise.
+        
+        With stream_arrays, the array of training phrase and entity files larger
+        than stream_threshold is a StreamedArray that reads the file one item at
+        a time on every iteration. Such exports bypass the snapshot, which would
+        hold them in full. Only use it when the data is iterated, not serialized.
         
         Args:
-            intents_path: Path to the intents directory
+            flow_path: Path to the DialogFlow export directory
+            stream_arrays: Stream the arrays of large training phrase and entity files
             
         Returns:
-            Dictionary of intent data
+            Dictionary with 'agent', 'intents', 'flows' and 'entity_types' keys
         """
-        intents_data = {}
+        flow_path = Path(flow_path)
+        self.load_stats = {}
+        
+        if self.snapshot_dir:
+            return self._load_export_snapshot(flow_path, stream_arrays)
+        
+        return self._parse_export(flow_path, stream_arrays=stream_arrays)
+    
+    def _load_export_snapshot(self, flow_path: Path, stream_arrays: bool = False) -> Dict[str, Any]:
+        """Load the export from its snapshot, or parse it and write a new snapshot."""
+        start = time.perf_counter()
+        snapshot = ExportSnapshot(self.snapshot_dir / snapshot_file_name(flow_path))
+        header = snapshot.read_header()
+        
+        # Unchanged files (same size and mtime as recorded in the header) are not re-hashed
+        manifest = ExportManifest.scan(flow_path, ExportManifest(header.get('files', {})) if header else None)
+        
+        if stream_arrays and any(
+            Path(path).parent.name in STREAMED_FILE_DIRS and entry['size'] > self.stream_threshold
+            for path, entry in manifest.files.items()
+        ):
+            self.load_stats['snapshot'] = {
+                'status': 'skipped',
+                'files': len(manifest.files),
+                'hashed_files': manifest.hashed_files,
+                'bytes': 0,
+                'seconds': round(time.perf_counter() - start, 4)
+            }
+            self.logger.info("Streaming large training phrase and entity files instead of loading the export snapshot")
+            return self._parse_export(flow_path, stream_arrays=True)
+        
+        export_hash = manifest.fingerprint(list(manifest.files))
+        
+        if header and header.get('export_hash') == export_hash:
+            try:
+                _, export_data = snapshot.load()
+                self.load_stats['snapshot'] = {
+                    'status': 'hit',
+                    'files': len(manifest.files),
+                    'hashed_files': manifest.hashed_files,
+                    'bytes': snapshot.snapshot_file.stat().st_size,
+                    'seconds': round(time.perf_counter() - start, 4)
+                }
+                self.logger.info(f"Loaded export from snapshot: {snapshot.snapshot_file}")
+                return export_data
+            except Exception as e:
+                self.logger.warning(f"Error loading snapshot {snapshot.snapshot_file}, parsing the export: {e}")
+        
+        export_data = self._parse_export(flow_path)
+        
+        snapshot_bytes = 0
+        try:
+            snapshot_bytes = snapshot.save({
+                'export_hash': export_hash,
+                'flow_path': str(flow_path.resolve()),
+                'files': manifest.files
+            }, export_data)
+            self.logger.info(f"Export snapshot saved: {snapshot.snapshot_file}")
+        except Exception as e:
+            self.logger.warning(f"Error saving snapshot {snapshot.snapshot_file}: {e}")
+        
+        self.load_stats['snapshot'] = {
+            'status': 'miss',
+            'files': len(manifest.files),
+            'hashed_files': manifest.hashed_files,
+            'bytes': snapshot_bytes,
+            'seconds': round(time.perf_counter() - start, 4)
+        }
+        return export_data
+    
+    def _parse_export(self, flow_path: Path, stream_arrays: bool = False) -> Dict[str, Any]:
+        """Parse every file of the export, leaving large arrays in their files when stream_arrays is set."""
+        export_data = {
+            'agent': {},
+            'intents': {},
+            'flows': {},
+            'entity_types': {}
+        }
         
-        for intent_dir in intents_path.iterdir():
-            if intent_dir.is_dir():
-                intent_name = intent_dir.name
-                intent_data = self._load_intent(intent_dir)
-                if intent_data:
-                    intents_data[intent_name] = intent_data
+        agent_file = flow_path / "agent.json"
+        if agent_file.exists():
+            export_data['agent'] = self.load_agent_config(agent_file)
         
-        return intents_data
+        intents_path = flow_path / "intents"
+        if intents_path.exists():
+            export_data['intents'] = self._load_category('intents', intents_path, self._intent_layout, stream_arrays=stream_arrays)
+        
+        flows_path = flow_path / "flows"
+        if flows_path.exists():
+            export_data['flows'] = self.load_flows(flows_path)
+        
+        entity_types_path = flow_path / "entityTypes"
+        if entity_types_path.exists():
+            export_data['entity_types'] = self._load_category(
+                'entity_types', entity_types_path, self._entity_type_layout, stream_arrays=stream_arrays
+            )
+        
+        return export_data
     
-    def _load_intent(self, intent_dir: Path) -> Optional[Dict[str, Any]]:
+    def load_model(self, flow_path: Path) -> AgentModel:
         """
-        Load a single intent from its directory.
+        Load the export into a typed agent model.
+        
+        The dict trees of load_export are only held while the model is built.
+        Training phrase and entity files larger than stream_threshold are read
+        one item at a time (see load_export), so the parsed phrase and entity
+        objects are never held at once. The model itself still keeps the text of
+        every phrase and every synonym.
         
         Args:
-            intent_dir: Path to the intent directory
+            flow_path: Path to the DialogFlow export directory
             
         Returns:
-            Intent data dictionary
+            Agent model of the export
         """
-        try:
-            intent_data = {}
-            
-            # Load intent configuration
-            intent_config_file = intent_dir / f"{intent_dir.name}.json"
-            if intent_config_file.exists():
-                with open(intent_config_file, 'r', encoding='utf-8') as f:
-                    intent_data['config'] = json.load(f)
+        return AgentModel.from_export(self.load_export(flow_path, stream_arrays=True))
+    
+    def load_selected(self, flow_path: Path, flows: Iterable[str] = (), intents: Iterable[str] = (),
+                      entity_types: Iterable[str] = ()) -> Dict[str, Any]:
+        """
+        Load only the given flows, intents and entity types of an export.
+        
+        Args:
+            flow_path: Path to the DialogFlow export directory
+            flows: Flow directory names to load
+            intents: Intent directory names to load
+            entity_types: Entity type directory names to load
             
-            # Load training phrases
-            training_phrases_dir = intent_dir / "trainingPhrases"
-            if training_phrases_dir.exists():
-                intent_data['training_phrases'] = {}
-                for lang_file in training_phrases_dir.glob("*.json"):
-                    lang = lang_file.stem
-                    with open(lang_file, 'r', encoding='utf-8') as f:
-                        intent_data['training_phrases'][lang] = json.load(f)
+        Returns:
+            Dictionary with 'agent', 'intents', 'flows' and 'entity_types' keys
+        """
+        flow_path = Path(flow_path)
+        self.load_stats = {}
+        
+        export_data = {
+            'agent': {},
+            'intents': {},
+            'flows': {},
+            'entity_types': {}
+        }
+        
+        agent_file = flow_path / "agent.json"
+        if agent_file.exists():
+            export_data['agent'] = self.load_agent_config(agent_file)
+        
+        if (flow_path / "intents").exists():
+            export_data['intents'] = self._load_category('intents', flow_path / "intents", self._intent_layout, intents)
+        
+        if (flow_path / "flows").exists():
+            export_data['flows'] = self._load_category('flows', flow_path / "flows", self._flow_layout, flows)
+        
+        if (flow_path / "entityTypes").exists():
+            export_data['entity_types'] = self._load_category(
+                'entity_types', flow_path / "entityTypes", self._entity_type_layout, entity_types
+            )
+        
+        return export_data
+    
+    def scan_export(self, flow_path: Path, previous: Optional[ExportManifest] = None) -> ExportManifest:
+        """
+        Build the manifest of an export, hashing only files changed since the previous manifest.
+        
+        Args:
+            flow_path: Path to the DialogFlow export directory
+            previous: Manifest of the previous run
             
-            return intent_data
+        Returns:
+            Manifest of the export as it is now
+        """
+        return ExportManifest.scan(Path(flow_path), previous)
+    
+    def load_intents(self, intents_path: Path) -> Dict[str, Any]:
+        """
+        Load all intents from the intents directory.
+        
+        Args:
+            intents_path: Path to the intents directory
             
-        except Exception as e:
-            self.logger.error(f"Error loading intent {intent_dir.name}: {e}")
-            return None
+        Returns:
+            Dictionary of intent data
+        """
+        return self._load_category('intents', intents_path, self._intent_layout)
+    
+    def _intent_layout(self, intent_dir: Path) -> Dict[str, Any]:
+        """Map the files of a single intent to their place in the intent data."""
+        layout = {}
+        
+        intent_config_file = intent_dir / f"{intent_dir.name}.json"
+        if intent_config_file.exists():
+            layout['config'] = intent_config_file
+        
+        training_phrases_dir = intent_dir / "trainingPhrases"
+        if training_phrases_dir.exists():
+            layout['training_phrases'] = {
+                lang_file.stem: lang_file
+                for lang_file in sorted(training_phrases_dir.glob("*.json"))
+            }
+        
+        return layout
     
     def load_flows(self, flows_path: Path) -> Dict[str, Any]:
         """
@@ -254,106 +589,237 @@ class DialogFlowFileLoader:
         Returns:
             Dictionary of flow data
         """
-        flows_data = {}
+        return self._load_category('flows', flows_path, self._flow_layout)
+    
+    def _flow_layout(self, flow_dir: Path) -> Dict[str, Any]:
+        """Map the files of a single flow to their place in the flow data."""
+        layout = {}
+        
+        flow_config_file = flow_dir / f"{flow_dir.name}.json"
+        if flow_config_file.exists():
+            layout['config'] = flow_config_file
         
-        for flow_dir in flows_path.iterdir():
-            if flow_dir.is_dir():
-                flow_name = flow_dir.name
-                flow_data = self._load_flow(flow_dir)
-                if flow_data:
-                    flows_data[flow_name] = flow_data
+        pages_dir = flow_dir / "pages"
+        if pages_dir.exists():
+            layout['pages'] = {
+                page_file.stem: page_file
+                for page_file in sorted(pages_dir.glob("*.json"))
+            }
         
-        return flows_data
+        return layout
     
-    def _load_flow(self, flow_dir: Path) -> Optional[Dict[str, Any]]:
+    def load_entity_types(self, entity_types_path: Path) -> Dict[str, Any]:
         """
-        Load a single flow from its directory.
+        Load all entity types from the entityTypes directory.
         
         Args:
-            flow_dir: Path to the flow directory
+            entity_types_path: Path to the entityTypes directory
             
         Returns:
-            Flow data dictionary
+            Dictionary of entity type data
         """
-        try:
-            flow_data = {}
-            
-            # Load flow configuration
-            flow_config_file = flow_dir / f"{flow_dir.name}.json"
-            if flow_config_file.exists():
-                with open(flow_config_file, 'r', encoding='utf-8') as f:
-                    flow_data['config'] = json.load(f)
-            
-            # Load pages
-            pages_dir = flow_dir / "pages"
-            if pages_dir.exists():
-                flow_data['pages'] = {}
-                for page_file in pages_dir.glob("*.json"):
-                    page_name = page_file.stem
-                    with open(page_file, 'r', encoding='utf-8') as f:
-                        flow_data['pages'][page_name] = json.load(f)
-            
-            return flow_data
-            
-        except Exception as e:
-            self.logger.error(f"Error loading flow {flow_dir.name}: {e}")
-            return None
+        return self._load_category('entity_types', entity_types_path, self._entity_type_layout)
     
-    def load_entity_types(self, entity_types_path: Path) -> Dict[str, Any]:
+    def _entity_type_layout(self, entity_dir: Path) -> Dict[str, Any]:
+        """Map the files of a single entity type to their place in the entity type data."""
+        layout = {}
+        
+        entity_config_file = entity_dir / f"{entity_dir.name}.json"
+        if entity_config_file.exists():
+            layout['config'] = entity_config_file
+        
+        entities_dir = entity_dir / "entities"
+        if entities_dir.exists():
+            layout['entities'] = {
+                lang_file.stem: lang_file
+                for lang_file in sorted(entities_dir.glob("*.json"))
+            }
+        
+        return layout
+    
+    def load_test_cases(self, test_cases_path: Path) -> Dict[str, Any]:
         """
-        Load all entity types from the entityTypes directory.
+        Load all test cases from the testCases directory.
         
         Args:
-            entity_types_path: Path to the entityTypes directory
+            test_cases_path: Path to the testCases directory
             
         Returns:
-            Dictionary of entity type data
+            Dictionary of test case data keyed by file name (without .json)
         """
-        entity_types_data = {}
+        start_time = time.perf_counter()
+        test_cases = {}
+        
+        files = sorted(Path(test_cases_path).glob("*.json"))
+        with self._create_executor() as executor:
+            parsed_files = list(self._map(executor, self._read_json_file, files))
+        
+        for test_case_file, (content, size) in zip(files, parsed_files):
+            if size is None:
+                self.logger.error(f"Error loading test case {test_case_file.stem}: {content}")
+                continue
+            test_cases[test_case_file.stem] = content
         
-        for entity_dir in entity_types_path.iterdir():
-            if entity_dir.is_dir():
-                entity_name = entity_dir.name
-                entity_data = self._load_entity_type(entity_dir)
-                if entity_data:
-                    entity_types_data[entity_name] = entity_data
+        elapsed = time.perf_counter() - start_time
+        total_bytes = sum(size for _, size in parsed_files if size is not None)
+        self.load_stats['test_cases'] = {
+            'items': len(test_cases),
+            'files': len(files),
+            'bytes': total_bytes,
+            'seconds': round(elapsed, 4),
+            'workers': self.max_workers
+        }
+        self.logger.info(f"Loaded {len(test_cases)} test cases ({total_bytes/1024:.1f} KB) in {elapsed:.3f}s")
         
-        return entity_types_data
+        return test_cases
     
-    def _load_entity_type(self, entity_dir: Path) -> Optional[Dict[str, Any]]:
+    def _load_category(self, category: str, category_path: Path, layout_fn: Callable[[Path], Dict[str, Any]],
+                       names: Optional[Iterable[str]] = None, stream_arrays: bool = False) -> Dict[str, Any]:
         """
-        Load a single entity type from its directory.
+        Load every item directory of a category (intents, flows or entity types).
+        
+        The directory walk and the JSON parsing are fanned out over a thread pool
+        when max_workers > 1. Items are always returned sorted by directory name,
+        so the result does not depend on the number of workers.
         
         Args:
-            entity_dir: Path to the entity type directory
+            category: Category name used for timing stats
+            category_path: Directory containing one sub-directory per item
+            layout_fn: Function mapping an item directory to its file layout
+            names: Item directory names to load (default: all items)
+            stream_arrays: Replace the array of training phrase and entity files
+                larger than stream_threshold with a StreamedArray instead of parsing them
             
         Returns:
-            Entity type data dictionary
+            Dictionary of item data keyed by directory name
         """
+        start_time = time.perf_counter()
+        category_data = {}
+        
+        if names is None:
+            item_dirs = sorted(
+                (item_dir for item_dir in category_path.iterdir() if item_dir.is_dir()),
+                key=lambda item_dir: item_dir.name
+            )
+        else:
+            item_dirs = [category_path / name for name in sorted(set(names)) if (category_path / name).is_dir()]
+        
+        with self._create_executor() as executor:
+            # Walk all item directories first, then parse every file in one batch
+            layouts = list(self._map(executor, lambda item_dir: self._walk_item(item_dir, layout_fn), item_dirs))
+            files = [file_path for layout in layouts if isinstance(layout, dict) for file_path in self._layout_files(layout)]
+            streamed = self._streamed_files(layouts) if stream_arrays else {}
+            parsed = [file_path for file_path in files if file_path not in streamed]
+            parsed_files = dict(zip(parsed, self._map(executor, self._read_json_file, parsed)))
+        
+        for file_path, key in streamed.items():
+            parsed_files[file_path] = ({key: StreamedArray(file_path, key)}, file_path.stat().st_size)
+        
+        for item_dir, layout in zip(item_dirs, layouts):
+            item_data = self._resolve_item(category, item_dir, layout, parsed_files)
+            if item_data:
+                category_data[item_dir.name] = item_data
+        
+        elapsed = time.perf_counter() - start_time
+        total_bytes = sum(size for _, size in parsed_files.values() if size is not None)
+        self.load_stats[category] = {
+            'items': len(category_data),
+            'files': len(files),
+            'bytes': total_bytes,
+            'streamed_files': len(streamed),
+            'seconds': round(elapsed, 4),
+            'workers': self.max_workers
+        }
+        self.logger.info(
+            f"Loaded {len(category_data)} {category} ({len(files)} files, {total_bytes/1024:.1f} KB) "
+            f"in {elapsed:.3f}s with {self.max_workers} worker(s)"
+        )
+        
+        return category_data
+    
+    def _streamed_files(self, layouts: List[Union[Dict[str, Any], Exception]]) -> Dict[Path, str]:
+        """Training phrase and entity files of the layouts larger than stream_threshold, with the key of their array."""
+        streamed = {}
+        for layout in layouts:
+            if not isinstance(layout, dict):
+                continue
+            for layout_key, array_key in STREAMED_LAYOUT_KEYS.items():
+                for file_path in layout.get(layout_key, {}).values():
+                    if file_path.stat().st_size > self.stream_threshold:
+                        streamed[file_path] = array_key
+        return streamed
+    
+    def _walk_item(self, item_dir: Path, layout_fn: Callable[[Path], Dict[str, Any]]) -> Union[Dict[str, Any], Exception]:
+        """Run a layout function, returning the exception instead of raising it."""
         try:
-            entity_data = {}
-            
-            # Load entity type configuration
-            entity_config_file = entity_dir / f"{entity_dir.name}.json"
-            if entity_config_file.exists():
-                with open(entity_config_file, 'r', encoding='utf-8') as f:
-                    entity_data['config'] = json.load(f)
-            
-            # Load entities
-            entities_dir = entity_dir / "entities"
-            if entities_dir.exists():
-                entity_data['entities'] = {}
-                for lang_file in entities_dir.glob("*.json"):
-                    lang = lang_file.stem
-                    with open(lang_file, 'r', encoding='utf-8') as f:
-                        entity_data['entities'][lang] = json.load(f)
-            
-            return entity_data
-            
+            return layout_fn(item_dir)
+        except Exception as e:
+            return e
+    
+    def _layout_files(self, layout: Dict[str, Any]) -> List[Path]:
+        """Flatten a file layout into the list of files it references."""
+        files = []
+        for value in layout.values():
+            if isinstance(value, dict):
+                files.extend(self._layout_files(value))
+            else:
+                files.append(value)
+        return files
+    
+    def _resolve_item(self, category: str, item_dir: Path, layout: Union[Dict[str, Any], Exception], parsed_files: Dict[Path, Tuple[Any, Optional[int]]]) -> Optional[Dict[str, Any]]:
+        """
+        Replace the file paths of a layout with their parsed JSON content.
+        
+        Returns None (and logs the error) if the item could not be walked or
+        any of its files failed to parse, so one broken item does not fail its category.
+        """
+        try:
+            if isinstance(layout, Exception):
+                raise layout
+            return self._fill_layout(layout, parsed_files)
         except Exception as e:
-            self.logger.error(f"Error loading entity type {entity_dir.name}: {e}")
+            self.logger.error(f"Error loading {category} {item_dir.name}: {e}")
             return None
     
+    def _fill_layout(self, layout: Dict[str, Any], parsed_files: Dict[Path, Tuple[Any, Optional[int]]]) -> Dict[str, Any]:
+        """Recursively substitute parsed content for file paths."""
+        item_data = {}
+        for key, value in layout.items():
+            if isinstance(value, dict):
+                item_data[key] = self._fill_layout(value, parsed_files)
+            else:
+                content, size = parsed_files[value]
+                if size is None:
+                    raise content
+                item_data[key] = content
+        return item_data
+    
+    def _read_json_file(self, file_path: Path) -> Tuple[Any, Optional[int]]:
+        """
+        Read and parse a JSON file.
+        
+        Returns:
+            Tuple of (parsed content, size in bytes), or (exception, None) on failure
+        """
+        try:
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            return json.loads(raw.decode('utf-8')), len(raw)
+        except Exception as e:
+            return e, None
+    
+    def _create_executor(self):
+        """Create the thread pool used for parallel loading, or a no-op context when serial."""
+        if self.max_workers > 1:
+            return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flow-loader")
+        return nullcontext()
+    
+    def _map(self, executor: Optional[ThreadPoolExecutor], fn: Callable, items: List[Any]):
+        """Map a function over items, in order, on the executor if there is one."""
+        if executor is None:
+            return map(fn, items)
+        return executor.map(fn, items)
+    
     def load_agent_config(self, agent_file: Path) -> Dict[str, Any]:
         """
         Load agent configuration from agent.json.
@@ -3,43 +3,105 @@ DialogFlow Flow Analyzer Module
 Analyzes DialogFlow flows using Gemini LLM.
 """
 
+import re
 import json
+import asyncio
 import logging
-from typing import Dict, Any
+from urllib.parse import unquote
+from typing import Dict, Any, List, Iterable, Union, Tuple, Optional, Callable
 from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from flow_partitioner import AGENT_UNIT, partition_export
+from compact_format import compact_json
+from structured_report import GENERATION_CONFIG, parse_report, structured_prompt
+from context_cache import DEFAULT_CONTEXT_TTL_SECONDS
+
+# Sort order of the priorities in the aggregated fan-out issue table; others sort last
+PRIORITY_ORDER = {'High': 0, 'Medium': 1, 'Low': 2}
+
+# Display name of a flow's start page in fan-out item names
+START_PAGE_NAME = "Start Page"
+
+# Question asking for the report when the analysis prompt and data are a cached context
+REPORT_QUESTION = "Analyze the consolidated DialogFlow data above following the analysis framework and output format."
+
+def parse_issue_table(report: str) -> List[Dict[str, str]]:
+    """
+    Parse the rows of the |Priority|Issue|Location|Solution| tables of a report.
+    
+    Header and separator rows, and rows with fewer than four cells, are skipped.
+    
+    Args:
+        report: Markdown report
+    
+    Returns:
+        Issues with 'priority', 'issue', 'location' and 'solution'
+    """
+    issues = []
+    for line in report.splitlines():
+        line = line.strip()
+        if not line.startswith('|') or not line.endswith('|'):
+            continue
+        cells = [cell.strip() for cell in line[1:-1].split('|')]
+        if len(cells) < 4 or cells[0].lower() == 'priority' or not cells[0].strip('-: '):
+            continue
+        # Solutions may contain '|'; the first three cells never should
+        priority, issue, location = cells[:3]
+        issues.append({
+            'priority': priority.strip('*').strip().capitalize(),
+            'issue': issue,
+            'location': location,
+            'solution': ' | '.join(cells[3:])
+        })
+    return issues
 
 class FlowAnalyzer:
     """
     Analyzes DialogFlow flows using Gemini LLM.
     """
     
-    def __init__(self, gemini_client: GeminiClient):
+    def __init__(self, gemini_client: GeminiClient, async_client: Optional[AsyncGeminiClient] = None, compact: bool = False):
         """
         Initialize the flow analyzer.
         
         Args:
             gemini_client: Gemini client instance
+            async_client: Async client used for concurrent requests (default: built from gemini_client)
+            compact: Serialize per-unit data as compact JSON (see compact_format) instead of indented JSON
         """
         self.logger = logging.getLogger(__name__)
         self.gemini_client = gemini_client
+        self.async_client = async_client
+        self.compact = compact
         self.analysis_prompt = self._load_analysis_prompt()
     
-    def analyze_flow(self, consolidated_data: str) -> str:
+    def analyze_flow(self, consolidated_data: Union[str, Iterable[str]], structural_findings: Optional[str] = None,
+                     on_chunk: Optional[Callable[[str], None]] = None) -> str:
         """
         Analyze a DialogFlow flow using consolidated data.
         
         Args:
-            consolidated_data: Complete consolidated DialogFlow data as string
+            consolidated_data: Complete consolidated DialogFlow data as string,
+                or an iterable of text sections streamed from the consolidated file
+            structural_findings: Findings of the local checks (see
+                flow_graph.format_findings and intent_overlap.format_findings),
+                added to the prompt so Gemini does not have to rediscover them
+            on_chunk: Stream the response and call this with every chunk as it arrives
             
         Returns:
             Analysis report
         """
         try:
+            prompt = self.analysis_prompt
+            if structural_findings is not None:
+                prompt = self.add_structural_findings(prompt, structural_findings)
+            
             # Analyze using Gemini with consolidated data
             analysis_result = self.gemini_client.analyze_consolidated_data(
-                self.analysis_prompt, 
+                prompt, 
                 consolidated_data,
-                request_id="flow_analysis"
+                request_id="flow_analysis",
+                on_chunk=on_chunk
             )
             
             return analysis_result
@@ -48,6 +110,131 @@ class FlowAnalyzer:
             self.logger.error(f"Error analyzing flow: {e}")
             raise
     
+    def analyze_flow_structured(self, consolidated_data: Union[str, Iterable[str]],
+                                structural_findings: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a DialogFlow flow and get the issues as validated JSON.
+        
+        The request asks for a response matching structured_report.REPORT_SCHEMA;
+        a response that does not match is never cached.
+        
+        Args:
+            consolidated_data: Complete consolidated DialogFlow data as string,
+                or an iterable of text sections streamed from the consolidated file
+            structural_findings: Findings of the local checks, added to the prompt
+            
+        Returns:
+            Report with 'summary' and 'issues' (see structured_report.parse_report)
+        
+        Raises:
+            ReportValidationError: If the response does not match the schema
+        """
+        try:
+            prompt = structured_prompt(self.analysis_prompt)
+            if structural_findings is not None:
+                prompt = self.add_structural_findings(prompt, structural_findings)
+            
+            analysis_result = self.gemini_client.analyze_consolidated_data(
+                prompt,
+                consolidated_data,
+                request_id="flow_analysis",
+                generation_config=GENERATION_CONFIG,
+                validate=parse_report
+            )
+            
+            return parse_report(analysis_result)
+            
+        except Exception as e:
+            self.logger.error(f"Error analyzing flow with structured output: {e}")
+            raise
+    
+    def analyze_flow_with_context(self, consolidated_data: Union[str, Iterable[str]], questions: Optional[Dict[str, str]] = None,
+                                  structural_findings: Optional[str] = None,
+                                  ttl_seconds: float = DEFAULT_CONTEXT_TTL_SECONDS) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """
+        Analyze a DialogFlow flow, then ask follow-up questions about the same data.
+        
+        The analysis prompt and the consolidated data are uploaded once as a
+        cached context (see GeminiClient.create_context); the report request and
+        every question only send the question. The context is deleted when all
+        answers are in, or expires at the end of its TTL if the run is interrupted.
+        
+        Args:
+            consolidated_data: Complete consolidated DialogFlow data as string,
+                or an iterable of text sections streamed from the consolidated file
+            questions: Follow-up questions keyed by name (see flow_questions)
+            structural_findings: Findings of the local checks, added to the prompt
+            ttl_seconds: Lifetime of the cached context
+            
+        Returns:
+            Tuple of (analysis report, answers keyed by question name, context stats)
+        """
+        try:
+            prompt = self.analysis_prompt
+            if structural_findings is not None:
+                prompt = self.add_structural_findings(prompt, structural_findings)
+            
+            context = self.gemini_client.create_context(prompt, consolidated_data, request_id="flow_analysis_context",
+                                                        ttl_seconds=ttl_seconds)
+            try:
+                report = self.gemini_client.analyze_with_context(context, REPORT_QUESTION, request_id="flow_analysis")
+                answers = {
+                    name: self.gemini_client.analyze_with_context(context, question, request_id=self._question_request_id(name))
+                    for name, question in (questions or {}).items()
+                }
+            finally:
+                self.gemini_client.delete_context(context)
+            
+            return report, answers, context.stats()
+            
+        except Exception as e:
+            self.logger.error(f"Error analyzing flow with a cached context: {e}")
+            raise
+    
+    def flow_questions(self, flow_names: Iterable[str]) -> Dict[str, str]:
+        """
+        Build one follow-up question per flow.
+        
+        Args:
+            flow_names: Flow display names
+            
+        Returns:
+            Questions keyed by "flow: <name>"
+        """
+        return {
+            f"flow: {name}": (
+                f"Focus only on the flow \"{name}\". Describe its main user journeys in a few sentences, then list "
+                f"every issue of its pages, routes, event handlers and forms in the output format."
+            )
+            for name in flow_names
+        }
+    
+    def _question_request_id(self, name: str) -> str:
+        """Build a file-name-safe request id for a follow-up question."""
+        return "follow_up_" + re.sub(r'[^A-Za-z0-9_.-]+', '_', name)
+    
+    def add_structural_findings(self, prompt: str, structural_findings: str) -> str:
+        """
+        Append locally computed structural findings to an analysis prompt.
+        
+        Args:
+            prompt: Analysis prompt
+            structural_findings: Markdown findings of the local checks (flow graph, intent overlap)
+            
+        Returns:
+            Prompt including the findings
+        """
+        return prompt + f"""
+## Pre-computed Structural Findings
+Deterministic local checks of the export already found the issues below (unreachable pages,
+dead ends, cycles without exit, references to missing pages, flows or intents, overlapping
+intents and near-duplicate training phrases). They are verified: include each of them in the
+output, and spend the analysis on issues these checks cannot find (user experience,
+intent coverage, error recovery, information flow).
+
+{structural_findings or "- No structural issues found."}
+"""
+    
     def analyze_flow_from_dict(self, flow_data: Dict[str, Any]) -> str:
         """
         Analyze a DialogFlow flow from dictionary data (legacy method for backward compatibility).
@@ -69,6 +256,355 @@ class FlowAnalyzer:
             self.logger.error(f"Error analyzing flow from dict: {e}")
             raise
     
+    def analyze_map_reduce(self, export_data: Dict[str, Any], max_workers: int = 4,
+                           structural_findings: Optional[str] = None) -> str:
+        """
+        Analyze a large export per flow and merge the results into one report.
+        
+        Map: the export is split into one unit per flow (pages plus the intents and
+        entity types they reference) and each unit is analyzed concurrently.
+        Reduce: the per-flow reports are sent back to Gemini to be merged into a
+        single prioritized issue table. Both steps go through the async client, so
+        the reduce request gets the same rate limits and retries as the map step.
+        A unit that still fails after its retries does not stop the others: the
+        reports of the other units are merged and the failed ones are listed.
+        Structural findings cover the whole export, so they are added to the
+        reduce prompt rather than to every unit (and appended to the report when
+        there is nothing to reduce).
+        
+        Args:
+            export_data: Export data as returned by DialogFlowFileLoader.load_export
+            max_workers: Maximum number of concurrent Gemini requests in the map step
+                (ignored when the analyzer was given an async client)
+            structural_findings: Local check findings to add to the reduce prompt
+            
+        Returns:
+            Merged analysis report
+        
+        Raises:
+            RuntimeError: If every unit failed
+        """
+        try:
+            async_client = self.async_client or AsyncGeminiClient(self.gemini_client, max_concurrency=max_workers)
+            units = partition_export(export_data)
+            self.logger.info(
+                f"Map step: analyzing {len(units)} unit(s) with up to {async_client.max_concurrency} concurrent request(s)"
+            )
+            
+            reports = asyncio.run(self._analyze_units_async(units, async_client))
+            failed = {unit_name: f"{type(error).__name__}: {error}" for unit_name, error in reports.items()
+                      if isinstance(error, Exception)}
+            results = {unit_name: {'report': report} for unit_name, report in reports.items() if unit_name not in failed}
+            if not results:
+                raise RuntimeError(f"All {len(failed)} map step request(s) failed")
+            if failed:
+                self.logger.warning(f"Map step: {len(failed)} of {len(reports)} unit(s) failed: {list(failed)}")
+            
+            unit_reports = self.merge_unit_reports(results)
+            if len(results) > 1:
+                self.logger.info("Reduce step: merging per-flow reports")
+                reduce_prompt = self._load_reduce_prompt()
+                if structural_findings is not None:
+                    reduce_prompt = self.add_structural_findings(reduce_prompt, structural_findings)
+                unit_reports = asyncio.run(async_client.analyze_consolidated_data(
+                    reduce_prompt,
+                    unit_reports,
+                    request_id="flow_analysis_reduce"
+                ))
+            elif structural_findings:
+                unit_reports += f"\n## Pre-computed Structural Findings\n\n{structural_findings.strip()}\n"
+            
+            return unit_reports + self._format_failed_units(failed)
+            
+        except Exception as e:
+            self.logger.error(f"Error in map-reduce analysis: {e}")
+            raise
+    
+    def analyze_incremental(self, unit_data: Dict[str, Dict[str, Any]], fingerprints: Dict[str, str],
+                            previous_results: Dict[str, Dict[str, Any]], max_workers: int = 4) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+        """
+        Re-analyze only the analysis units whose inputs changed and merge with previous results.
+        
+        Changed units are analyzed concurrently, like the map step of analyze_map_reduce.
+        
+        Args:
+            unit_data: Export data of every unit that needs analysis, keyed by unit name
+            fingerprints: Current input fingerprint of every unit in the export
+            previous_results: Results of the previous run, keyed by unit name
+            max_workers: Maximum number of concurrent Gemini requests
+                (ignored when the analyzer was given an async client)
+            
+        Returns:
+            Tuple of (merged report, results keyed by unit name)
+        """
+        try:
+            results = {}
+            changed_units = {}
+            
+            for unit_name, fingerprint in fingerprints.items():
+                previous = previous_results.get(unit_name)
+                if previous and previous.get('fingerprint') == fingerprint:
+                    self.logger.info(f"Reusing previous analysis of unchanged unit: {unit_name}")
+                    results[unit_name] = previous
+                else:
+                    changed_units[unit_name] = unit_data[unit_name]
+            
+            if changed_units:
+                async_client = self.async_client or AsyncGeminiClient(self.gemini_client, max_concurrency=max_workers)
+                self.logger.info(
+                    f"Analyzing {len(changed_units)} changed unit(s) with up to {async_client.max_concurrency} concurrent request(s)"
+                )
+                reports = asyncio.run(self._analyze_units_async(changed_units, async_client))
+                for unit_name, report in reports.items():
+                    if isinstance(report, Exception):
+                        raise report
+                    results[unit_name] = {'fingerprint': fingerprints[unit_name], 'report': report}
+                results = {unit_name: results[unit_name] for unit_name in fingerprints}
+            
+            removed_units = sorted(set(previous_results) - set(fingerprints))
+            if removed_units:
+                self.logger.info(f"Dropping results of removed units: {removed_units}")
+            
+            return self.merge_unit_reports(results), results
+            
+        except Exception as e:
+            self.logger.error(f"Error in incremental analysis: {e}")
+            raise
+    
+    def analyze_fan_out(self, export_data: Dict[str, Any], max_workers: int = 4,
+                        on_progress: Optional[Callable[[int, int, str, Dict[str, Any]], None]] = None) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+        """
+        Analyze every intent and every page with a focused prompt and aggregate the issues.
+        
+        Intents are checked for phrase quality and coverage, pages (and each flow's
+        start page) for handlers and reprompts. The requests run concurrently through
+        the async client, under its concurrency cap and rate limits. A failed request
+        does not stop the others: it is listed in the report and the results.
+        
+        Args:
+            export_data: Export data as returned by DialogFlowFileLoader.load_export
+            max_workers: Maximum number of concurrent Gemini requests
+                (ignored when the analyzer was given an async client)
+            on_progress: Called after every request with (completed, total, item name, result)
+            
+        Returns:
+            Tuple of (report with a single issue table sorted by priority, results keyed
+            by item name, each with 'kind', 'status' and 'issues' or 'error')
+        
+        Raises:
+            RuntimeError: If every request failed
+        """
+        try:
+            async_client = self.async_client or AsyncGeminiClient(self.gemini_client, max_concurrency=max_workers)
+            items = self.fan_out_items(export_data)
+            self.logger.info(
+                f"Fan-out: analyzing {len(items)} intent(s) and page(s) with up to {async_client.max_concurrency} concurrent request(s)"
+            )
+            
+            results = asyncio.run(self._analyze_items_async(items, async_client, on_progress))
+            failed = [name for name, result in results.items() if result['status'] == 'failed']
+            if failed and len(failed) == len(results):
+                raise RuntimeError(f"All {len(failed)} fan-out request(s) failed")
+            if failed:
+                self.logger.warning(f"Fan-out: {len(failed)} of {len(results)} request(s) failed: {failed}")
+            
+            return self.merge_fan_out_results(results), results
+            
+        except Exception as e:
+            self.logger.error(f"Error in fan-out analysis: {e}")
+            raise
+    
+    def fan_out_items(self, export_data: Dict[str, Any]) -> Dict[str, Tuple[str, str, str]]:
+        """
+        Build the fan-out requests: one per intent and one per page.
+        
+        Args:
+            export_data: Export data as returned by DialogFlowFileLoader.load_export
+            
+        Returns:
+            (kind, prompt, context) keyed by item name ("intent: <name>" or
+            "page: <flow> / <page>"), intents first
+        """
+        items = {}
+        intent_prompt = self._load_intent_prompt()
+        page_prompt = self._load_page_prompt()
+        
+        for intent_dir, intent_data in export_data.get('intents', {}).items():
+            config = (intent_data or {}).get('config', {})
+            intent_name = config.get('displayName') or unquote(intent_dir)
+            items[f"intent: {intent_name}"] = ('intent', intent_prompt, self._serialize({
+                'name': intent_name,
+                'config': config,
+                'training_phrases': intent_data.get('training_phrases', {})
+            }))
+        
+        for flow_dir, flow_data in export_data.get('flows', {}).items():
+            config = (flow_data or {}).get('config', {})
+            flow_name = config.get('displayName') or unquote(flow_dir)
+            # The start page is the flow itself: its routes and event handlers apply on every page
+            flow_handlers = {key: config[key] for key in ('transitionRoutes', 'eventHandlers', 'transitionRouteGroups') if key in config}
+            items[f"page: {flow_name} / {START_PAGE_NAME}"] = ('page', page_prompt, self._serialize({
+                'flow': flow_name,
+                'page': START_PAGE_NAME,
+                'start_page': config
+            }))
+            for page_file, page_data in (flow_data.get('pages') or {}).items():
+                page_name = (page_data or {}).get('displayName') or unquote(page_file)
+                items[f"page: {flow_name} / {page_name}"] = ('page', page_prompt, self._serialize({
+                    'flow': flow_name,
+                    'page': page_data or {},
+                    'flow_handlers': flow_handlers
+                }))
+        
+        return items
+    
+    async def _analyze_items_async(self, items: Dict[str, Tuple[str, str, str]], async_client: AsyncGeminiClient,
+                                   on_progress: Optional[Callable[[int, int, str, Dict[str, Any]], None]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Send the fan-out requests concurrently, reporting each one as it completes.
+        
+        Args:
+            items: (kind, prompt, context) keyed by item name
+            async_client: Client enforcing the concurrency and rate limits
+            on_progress: Progress callback (see analyze_fan_out)
+            
+        Returns:
+            Result keyed by item name, in the order of items
+        """
+        completed = 0
+        
+        async def analyze_item(name: str, kind: str, prompt: str, context: str) -> Dict[str, Any]:
+            nonlocal completed
+            try:
+                report = await async_client.analyze_text(prompt, context, request_id=self._item_request_id(name))
+                result = {'kind': kind, 'status': 'completed', 'issues': parse_issue_table(report)}
+            except Exception as e:
+                result = {'kind': kind, 'status': 'failed', 'error': f"{type(e).__name__}: {e}"}
+            
+            completed += 1
+            self.logger.info(f"Fan-out {completed}/{len(items)}: {name} {result['status']}")
+            if on_progress:
+                on_progress(completed, len(items), name, result)
+            return result
+        
+        names = list(items)
+        results = await asyncio.gather(*(analyze_item(name, *items[name]) for name in names))
+        return dict(zip(names, results))
+    
+    def _item_request_id(self, item_name: str) -> str:
+        """Build a file-name-safe request id for a fan-out item."""
+        return "fan_out_" + re.sub(r'[^A-Za-z0-9_.-]+', '_', item_name)
+    
+    def merge_fan_out_results(self, results: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Combine fan-out results into a single issue table sorted by priority.
+        
+        Identical rows reported by several requests appear once.
+        
+        Args:
+            results: Results keyed by item name (see analyze_fan_out)
+            
+        Returns:
+            Markdown report
+        """
+        issues = {}
+        for name, result in results.items():
+            for issue in result.get('issues', []):
+                location = issue['location'] or name.split(': ', 1)[1]
+                key = (issue['priority'], issue['issue'], location)
+                if key not in issues:
+                    issues[key] = dict(issue, location=location)
+        rows = sorted(issues.values(), key=lambda issue: (PRIORITY_ORDER.get(issue['priority'], len(PRIORITY_ORDER)),
+                                                          issue['location'].lower(), issue['issue'].lower()))
+        
+        completed = sum(1 for result in results.values() if result['status'] == 'completed')
+        sections = [
+            "# DialogFlow Flow Analysis Report\n",
+            f"Analyzed {completed} of {len(results)} intent(s) and page(s) with one request each.\n",
+            "|Priority|Issue\\Observation|Where the issue is located in |Solution|",
+            "|--------|-----------------|----------------------------|--------|"
+        ]
+        sections.extend(f"|{issue['priority']}|{issue['issue']}|{issue['location']}|{issue['solution']}|" for issue in rows)
+        
+        failed = {name: result['error'] for name, result in results.items() if result['status'] == 'failed'}
+        if failed:
+            sections.append("\n## Failed Requests\n")
+            sections.append("These intents and pages were not analyzed; run the analysis again to retry them.\n")
+            sections.extend(f"- {name}: {error}" for name, error in failed.items())
+        
+        return "\n".join(sections) + "\n"
+    
+    def _serialize(self, data: Dict[str, Any]) -> str:
+        """Serialize request data as compact or indented JSON."""
+        if self.compact:
+            return compact_json(data)
+        return json.dumps(data, indent=2, ensure_ascii=False)
+    
+    async def _analyze_units_async(self, units: Dict[str, Dict[str, Any]],
+                                   async_client: AsyncGeminiClient) -> Dict[str, Union[str, Exception]]:
+        """
+        Analyze several units concurrently.
+        
+        A failed unit does not cancel the others; its exception is returned in
+        place of its report, so the caller decides whether to go on without it.
+        
+        Args:
+            units: Export data keyed by unit name
+            async_client: Client enforcing the concurrency and rate limits
+            
+        Returns:
+            Report, or the exception of the failed request, keyed by unit name
+        """
+        unit_names = list(units)
+        reports = await asyncio.gather(*(
+            async_client.analyze_consolidated_data(
+                self.analysis_prompt,
+                self._prepare_analysis_data(units[unit_name]),
+                request_id=self._unit_request_id(unit_name)
+            )
+            for unit_name in unit_names
+        ), return_exceptions=True)
+        for report in reports:
+            # Cancellation and interrupts still stop the run
+            if isinstance(report, BaseException) and not isinstance(report, Exception):
+                raise report
+        return dict(zip(unit_names, reports))
+    
+    def _unit_request_id(self, unit_name: str) -> str:
+        """Build a file-name-safe request id for an analysis unit."""
+        return "flow_analysis_" + re.sub(r'[^A-Za-z0-9_.-]+', '_', unit_name)
+    
+    def merge_unit_reports(self, results: Dict[str, Dict[str, Any]]) -> str:
+        """
+        Combine per-unit reports into a single markdown report.
+        
+        Args:
+            results: Results keyed by unit name, each with a 'report'
+            
+        Returns:
+            Merged markdown report
+        """
+        sections = ["# DialogFlow Flow Analysis Report\n"]
+        
+        for unit_name in sorted(results, key=lambda name: (name == AGENT_UNIT, name)):
+            sections.append(f"## {self._unit_title(unit_name)}\n\n{results[unit_name]['report'].strip()}\n")
+        
+        return "\n".join(sections)
+    
+    def _unit_title(self, unit_name: str) -> str:
+        """Section title of an analysis unit."""
+        if unit_name == AGENT_UNIT:
+            return "Agent (intents and entity types not used by any flow)"
+        return "Flow: " + unit_name.split(':', 1)[1]
+    
+    def _format_failed_units(self, failed: Dict[str, str]) -> str:
+        """List the units whose analysis failed, or return an empty string if none did."""
+        if not failed:
+            return ""
+        lines = ["\n## Failed Flows\n", "These units were not analyzed; run the analysis again to retry them.\n"]
+        lines.extend(f"- {self._unit_title(unit_name)}: {error}" for unit_name, error in failed.items())
+        return "\n".join(lines) + "\n"
+    
     def _prepare_analysis_data(self, flow_data: Dict[str, Any]) -> str:
         """
         Prepare flow data for analysis.
@@ -88,6 +624,8 @@ class FlowAnalyzer:
                 'agent': flow_data.get('agent', {})
             }
             
+            if self.compact:
+                return compact_json(formatted_data)
             return json.dumps(formatted_data, indent=2, ensure_ascii=False)
             
         except Exception as e:
@@ -136,6 +674,79 @@ class FlowAnalyzer:
         
         return formatted_entities
     
+    def _load_reduce_prompt(self) -> str:
+        """Load the prompt that merges per-flow reports in map-reduce mode."""
+        return """
+# DialogFlow Flow Analysis - Merge Per-Flow Reports
+
+## Context
+You are an expert google DialogFlow architect. The same DialogFlow agent was analyzed one flow at a time;
+each section below is the report for one flow (or for the agent-level intents and entity types no flow uses).
+
+## Task
+1. Merge all issue tables into a single table.
+2. Remove duplicates: issues reported for the same shared intent or entity type in several flows appear once,
+   with every affected flow listed in the location.
+3. Keep every location specific (flow, page or intent name) and keep the proposed solutions.
+4. Sort the table by priority: High, then Medium, then Low.
+5. After the table, summarize cross-flow observations that only appear when the flows are viewed together.
+
+## Output Format
+
+|Priority|Issue\\Observation|Where the issue is located in |Solution|
+|--------|-----------------|----------------------------|--------|
+"""
+    
+    def _load_intent_prompt(self) -> str:
+        """Load the fan-out prompt for a single intent."""
+        return """
+# DialogFlow Intent Analysis
+
+## Context
+You are an expert google DialogFlow architect. Below is a single intent of a DialogFlow agent:
+its configuration, parameters and training phrases in every language.
+
+## Task
+Review only this intent:
+1. **Phrase Quality**: duplicate or near-duplicate phrases, phrases too short or too generic to
+   identify the intent, spelling mistakes, unannotated or wrongly annotated parameters.
+2. **Coverage**: missing ways users express the intent (synonyms, word order, questions vs. commands,
+   short answers), too few phrases, languages with noticeably fewer phrases than others.
+3. **Parameters**: parameters never annotated in a phrase, or annotated with an unsuitable entity type.
+
+## Output Format
+Only output the rows of this table, one per issue, without any other text. Name the intent and,
+where relevant, the phrase or parameter in the location.
+
+|Priority|Issue\\Observation|Where the issue is located in |Solution|
+|--------|-----------------|----------------------------|--------|
+"""
+    
+    def _load_page_prompt(self) -> str:
+        """Load the fan-out prompt for a single page."""
+        return """
+# DialogFlow Page Analysis
+
+## Context
+You are an expert google DialogFlow architect. Below is a single page of a DialogFlow flow, with the
+flow-level routes and event handlers that also apply on it (for a flow's start page, the flow itself).
+
+## Task
+Review only this page:
+1. **Handlers**: missing no-match and no-input event handlers, routes without a target or response,
+   conditions that can never be true, routes shadowed by earlier ones.
+2. **Reprompts**: form parameters without reprompt handlers, reprompts that repeat the initial prompt
+   verbatim, missing escalation or exit after repeated failures.
+3. **Dead Ends**: ways the conversation can stop on this page without a response or a way forward.
+
+## Output Format
+Only output the rows of this table, one per issue, without any other text. Name the flow and page and,
+where relevant, the route, handler or parameter in the location.
+
+|Priority|Issue\\Observation|Where the issue is located in |Solution|
+|--------|-----------------|----------------------------|--------|
+"""
+    
     def _load_analysis_prompt(self) -> str:
         """Load the analysis prompt."""
         return """
@@ -0,0 +1,355 @@
+"""
+Flow Graph Module
+Deterministic page graph of a DialogFlow export for structural checks.
+"""
+
+import logging
+from typing import Dict, Any, List, Set, NamedTuple
+from urllib.parse import unquote
+
+# Page every flow starts on; flow-level routes and event handlers belong to it
+START_PAGE = "Start"
+
+# Special targetPage values
+END_TARGETS = {"End Session", "End Flow"}
+RETURN_TARGETS = {"Previous Page"}
+CURRENT_PAGE_TARGET = "Current Page"
+START_PAGE_TARGET = "Start Page"
+
+# Edge targets that leave the graph
+END = "<end>"
+RETURN = "<return>"
+
+class Edge(NamedTuple):
+    """A possible transition between two pages."""
+    source: str
+    target: str
+    kind: str
+    trigger: str
+
+def page_id(flow_name: str, page_name: str) -> str:
+    """
+    Get the graph node id of a page.
+    
+    Args:
+        flow_name: Flow display name
+        page_name: Page display name
+    
+    Returns:
+        Node id
+    """
+    return f"{flow_name}/{page_name}"
+
+class FlowGraph:
+    """
+    Page graph built from the transition routes, event handlers and form
+    parameter reprompt handlers of every page.
+    
+    Nodes are pages (plus one Start node per flow); edges are the transitions
+    that name a targetPage or targetFlow. Routes and handlers without a target
+    keep the conversation on the current page and add no edge. The flow's own
+    intent routes and event handlers are in scope on every page of the flow,
+    so they count as exits of each page.
+    """
+    
+    def __init__(self, export_data: Dict[str, Any]):
+        """
+        Build the graph.
+        
+        Args:
+            export_data: Export data as returned by DialogFlowFileLoader.load_export
+        """
+        self.logger = logging.getLogger(__name__)
+        self.start_flow = export_data.get('agent', {}).get('startFlow')
+        
+        # Node id -> {'flow', 'page'}
+        self.nodes: Dict[str, Dict[str, str]] = {}
+        # Node id -> edges defined on the page itself
+        self.edges: Dict[str, List[Edge]] = {}
+        # Flow name -> edges of the flow's own routes and event handlers
+        self.flow_edges: Dict[str, List[Edge]] = {}
+        
+        self.missing_pages: List[Dict[str, str]] = []
+        self.missing_flows: List[Dict[str, str]] = []
+        self.missing_intents: List[Dict[str, str]] = []
+        
+        self._intent_names = self._known_intents(export_data.get('intents', {}))
+        self._build(export_data.get('flows', {}))
+    
+    def _known_intents(self, intents: Dict[str, Any]) -> Set[str]:
+        """Collect directory and display names of the loaded intents."""
+        names = set()
+        for intent_name, intent_data in intents.items():
+            names.add(intent_name)
+            names.add(unquote(intent_name))
+            display_name = (intent_data or {}).get('config', {}).get('displayName')
+            if display_name:
+                names.add(display_name)
+        return names
+    
+    def _build(self, flows: Dict[str, Any]) -> None:
+        """Create the nodes of every flow, then their edges."""
+        flow_pages = {}
+        for flow_dir, flow_data in flows.items():
+            flow_name = self._display_name(flow_data.get('config', {}), flow_dir)
+            if flow_name in flow_pages:
+                self.logger.warning(f"Duplicate flow display name '{flow_name}', using directory name '{flow_dir}'")
+                flow_name = flow_dir
+            start = page_id(flow_name, START_PAGE)
+            self.nodes[start] = {'flow': flow_name, 'page': START_PAGE}
+            
+            pages = {}
+            for page_file, page_data in (flow_data.get('pages') or {}).items():
+                page_name = self._display_name(page_data, page_file)
+                node = page_id(flow_name, page_name)
+                self.nodes[node] = {'flow': flow_name, 'page': page_name}
+                pages[node] = page_data
+            
+            flow_pages[flow_name] = (flow_data.get('config', {}), pages)
+        
+        for flow_name, (flow_config, pages) in flow_pages.items():
+            start = page_id(flow_name, START_PAGE)
+            self.edges[start] = self._page_edges(flow_name, start, flow_config)
+            self.flow_edges[flow_name] = [
+                edge for edge in self.edges[start] if edge.kind == 'event' or edge.trigger.startswith('intent:')
+            ]
+            for node, page_data in pages.items():
+                self.edges[node] = self._page_edges(flow_name, node, page_data)
+    
+    def _display_name(self, data: Dict[str, Any], file_name: str) -> str:
+        """Get the display name of a flow or page, falling back to its decoded file name."""
+        return (data or {}).get('displayName') or unquote(file_name)
+    
+    def _page_edges(self, flow_name: str, node: str, page_data: Dict[str, Any]) -> List[Edge]:
+        """Collect the outgoing edges of a page (or of a flow's Start node)."""
+        edges = []
+        
+        for route in page_data.get('transitionRoutes', []):
+            if route.get('intent'):
+                trigger = f"intent:{route['intent']}"
+                if route['intent'] not in self._intent_names:
+                    self.missing_intents.append({'source': node, 'intent': route['intent']})
+            else:
+                trigger = f"condition:{route.get('condition', '')}"
+            self._add_edge(edges, flow_name, node, route, 'route', trigger)
+        
+        for handler in page_data.get('eventHandlers', []):
+            self._add_edge(edges, flow_name, node, handler, 'event', f"event:{handler.get('event', '')}")
+        
+        for parameter in (page_data.get('form') or {}).get('parameters', []):
+            for handler in (parameter.get('fillBehavior') or {}).get('repromptEventHandlers', []):
+                trigger = f"reprompt:{parameter.get('displayName', '')}:{handler.get('event', '')}"
+                self._add_edge(edges, flow_name, node, handler, 'reprompt', trigger)
+        
+        return edges
+    
+    def _add_edge(self, edges: List[Edge], flow_name: str, node: str, item: Dict[str, Any], kind: str, trigger: str) -> None:
+        """Resolve the target of a route or handler and record the edge."""
+        target = None
+        
+        if item.get('targetPage'):
+            target_page = item['targetPage']
+            if target_page in END_TARGETS:
+                target = END
+            elif target_page in RETURN_TARGETS:
+                target = RETURN
+            elif target_page == CURRENT_PAGE_TARGET:
+                target = node
+            elif target_page == START_PAGE_TARGET:
+                target = page_id(flow_name, START_PAGE)
+            else:
+                target = page_id(flow_name, target_page)
+                if target not in self.nodes:
+                    self.missing_pages.append({'source': node, 'target': target_page, 'trigger': trigger})
+                    return
+        
+        elif item.get('targetFlow'):
+            target = page_id(item['targetFlow'], START_PAGE)
+            if target not in self.nodes:
+                self.missing_flows.append({'source': node, 'target': item['targetFlow'], 'trigger': trigger})
+                return
+        
+        if target is not None:
+            edges.append(Edge(node, target, kind, trigger))
+    
+    def exits(self, node: str) -> List[Edge]:
+        """
+        Get every edge that can leave a page.
+        
+        Args:
+            node: Page node id
+        
+        Returns:
+            The page's own edges followed by its flow's route and event edges
+        """
+        edges = list(self.edges.get(node, []))
+        if self.nodes[node]['page'] != START_PAGE:
+            edges.extend(self.flow_edges.get(self.nodes[node]['flow'], []))
+        return edges
+    
+    def start_nodes(self) -> List[str]:
+        """Get the nodes conversations start from: the start flow, or every flow if unknown."""
+        if self.start_flow and page_id(self.start_flow, START_PAGE) in self.nodes:
+            return [page_id(self.start_flow, START_PAGE)]
+        return sorted(node for node, info in self.nodes.items() if info['page'] == START_PAGE)
+    
+    def reachable(self) -> Set[str]:
+        """
+        Get every node reachable from the start nodes.
+        
+        Returns:
+            Set of node ids
+        """
+        seen = set(self.start_nodes())
+        pending = list(seen)
+        while pending:
+            node = pending.pop()
+            for edge in self.exits(node):
+                if edge.target in self.nodes and edge.target not in seen:
+                    seen.add(edge.target)
+                    pending.append(edge.target)
+        return seen
+    
+    def terminal_pages(self) -> List[Dict[str, Any]]:
+        """
+        Get the pages that define no transition to another page.
+        
+        Returns:
+            List of {'page', 'flow_level_exits'}; pages without flow-level exits are dead ends
+        """
+        terminal = []
+        for node in sorted(self.nodes):
+            if self.nodes[node]['page'] == START_PAGE:
+                continue
+            if not any(edge.target != node for edge in self.edges[node]):
+                has_flow_exits = any(edge.target != node for edge in self.flow_edges[self.nodes[node]['flow']])
+                terminal.append({'page': node, 'flow_level_exits': has_flow_exits})
+        return terminal
+    
+    def exitless_cycles(self) -> List[List[str]]:
+        """
+        Find groups of pages that lead to each other but never out of the group.
+        
+        Uses an iterative Tarjan strongly-connected-components pass. A component is
+        reported when it contains a cycle and none of its edges leaves it or ends
+        the session.
+        
+        Returns:
+            Sorted lists of node ids, one per trapping cycle
+        """
+        index = {}
+        lowlink = {}
+        on_stack = set()
+        stack = []
+        components = []
+        counter = 0
+        
+        for root in sorted(self.nodes):
+            if root in index:
+                continue
+            work = [(root, iter(self._successors(root)))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+            
+            while work:
+                node, successors = work[-1]
+                advanced = False
+                for successor in successors:
+                    if successor not in index:
+                        index[successor] = lowlink[successor] = counter
+                        counter += 1
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self._successors(successor))))
+                        advanced = True
+                        break
+                    if successor in on_stack:
+                        lowlink[node] = min(lowlink[node], index[successor])
+                if advanced:
+                    continue
+                
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+        
+        cycles = []
+        for component in components:
+            members = set(component)
+            targets = [edge.target for node in component for edge in self.exits(node)]
+            is_cycle = len(component) > 1 or component[0] in targets
+            if is_cycle and all(target in members for target in targets):
+                cycles.append(sorted(component))
+        return sorted(cycles)
+    
+    def _successors(self, node: str) -> List[str]:
+        """Get the pages a node can transition to."""
+        return [edge.target for edge in self.exits(node) if edge.target in self.nodes]
+    
+    def report(self) -> Dict[str, Any]:
+        """
+        Run every structural check.
+        
+        Returns:
+            Dictionary of findings
+        """
+        reachable = self.reachable()
+        return {
+            'start_nodes': self.start_nodes(),
+            'pages': sum(1 for info in self.nodes.values() if info['page'] != START_PAGE),
+            'edges': sum(len(edges) for edges in self.edges.values()),
+            'unreachable_flows': sorted(
+                info['flow'] for node, info in self.nodes.items() if info['page'] == START_PAGE and node not in reachable
+            ),
+            'unreachable_pages': sorted(
+                node for node, info in self.nodes.items() if info['page'] != START_PAGE and node not in reachable
+            ),
+            'terminal_pages': self.terminal_pages(),
+            'exitless_cycles': self.exitless_cycles(),
+            'missing_pages': self.missing_pages,
+            'missing_flows': self.missing_flows,
+            'missing_intents': self.missing_intents
+        }
+
+def format_findings(report: Dict[str, Any]) -> str:
+    """
+    Render graph findings as markdown, for logs and for the analysis prompt.
+    
+    Args:
+        report: Findings from FlowGraph.report
+    
+    Returns:
+        Markdown text (empty when there is nothing to report)
+    """
+    lines = []
+    
+    for flow_name in report['unreachable_flows']:
+        lines.append(f"- Unreachable flow: {flow_name} (no transition leads to it from {', '.join(report['start_nodes'])})")
+    for node in report['unreachable_pages']:
+        lines.append(f"- Unreachable page: {node} (no transition leads to it from {', '.join(report['start_nodes'])})")
+    for terminal in report['terminal_pages']:
+        if terminal['flow_level_exits']:
+            lines.append(f"- Terminal page: {terminal['page']} (only the flow-level routes lead away from it)")
+        else:
+            lines.append(f"- Dead end: {terminal['page']} (no transition leads away from it)")
+    for cycle in report['exitless_cycles']:
+        lines.append(f"- Cycle without exit: {' -> '.join(cycle)}")
+    for missing in report['missing_pages']:
+        lines.append(f"- Missing page: {missing['source']} targets '{missing['target']}' ({missing['trigger']})")
+    for missing in report['missing_flows']:
+        lines.append(f"- Missing flow: {missing['source']} targets flow '{missing['target']}' ({missing['trigger']})")
+    for missing in report['missing_intents']:
+        lines.append(f"- Missing intent: {missing['source']} routes on undefined intent '{missing['intent']}'")
+    
+    return "\n".join(lines)
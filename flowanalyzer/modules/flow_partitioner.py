@@ -0,0 +1,177 @@
+"""
+Flow Partitioner Module
+Splits a loaded DialogFlow export into per-flow analysis units.
+"""
+
+from typing import Dict, Any, Set, Tuple, List
+from urllib.parse import unquote
+
+# Unit holding the agent configuration plus the intents and entity types
+# that no flow references
+AGENT_UNIT = "agent"
+
+def flow_unit_name(flow_name: str) -> str:
+    """
+    Get the analysis unit name of a flow.
+    
+    Args:
+        flow_name: Flow directory name
+    
+    Returns:
+        Unit name
+    """
+    return f"flow:{flow_name}"
+
+def collect_flow_references(flow_data: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+    """
+    Collect the intents and custom entity types referenced by a flow.
+    
+    Looks at every 'intent' and 'entityType' field in the flow configuration
+    and its pages (transition routes, form parameters, ...). System entity
+    types (@sys.*) are ignored.
+    
+    Args:
+        flow_data: Flow data as returned by DialogFlowFileLoader.load_flows
+    
+    Returns:
+        Tuple of (intent names, entity type names)
+    """
+    intents = set()
+    entity_types = set()
+    pending = [flow_data]
+    
+    while pending:
+        node = pending.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key == 'intent' and isinstance(value, str) and value:
+                    intents.add(value)
+                elif key == 'entityType' and isinstance(value, str) and value.startswith('@') and not value.startswith('@sys.'):
+                    entity_types.add(value[1:])
+                else:
+                    pending.append(value)
+        elif isinstance(node, list):
+            pending.extend(node)
+    
+    return intents, entity_types
+
+def resolve_names(names: Set[str], available: List[str]) -> List[str]:
+    """
+    Map referenced display names to export directory names.
+    
+    Directory names may be URL-encoded versions of the display name.
+    
+    Args:
+        names: Referenced display names
+        available: Directory names present in the export
+    
+    Returns:
+        Sorted directory names that match a referenced name
+    """
+    return sorted(name for name in available if name in names or unquote(name) in names)
+
+def plan_units(flow_references: Dict[str, Tuple[Set[str], Set[str]]], intent_names: List[str], entity_type_names: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Decide which flow, intents and entity types belong to each analysis unit.
+    
+    Each flow gets a unit holding the intents and entity types it references.
+    Intents and entity types not referenced by any flow go into the agent unit,
+    which is only created when there are such leftovers (or no flows at all).
+    
+    Args:
+        flow_references: Referenced (intents, entity types) per flow directory name
+        intent_names: Intent directory names present in the export
+        entity_type_names: Entity type directory names present in the export
+    
+    Returns:
+        Dictionary of unit name to {'flow', 'intents', 'entity_types'}
+    """
+    plan = {}
+    referenced_intents = set()
+    referenced_entity_types = set()
+    
+    for flow_name in sorted(flow_references):
+        intent_refs, entity_refs = flow_references[flow_name]
+        unit_intents = resolve_names(intent_refs, intent_names)
+        unit_entity_types = resolve_names(entity_refs, entity_type_names)
+        referenced_intents.update(unit_intents)
+        referenced_entity_types.update(unit_entity_types)
+        
+        plan[flow_unit_name(flow_name)] = {
+            'flow': flow_name,
+            'intents': unit_intents,
+            'entity_types': unit_entity_types
+        }
+    
+    leftover_intents = sorted(set(intent_names) - referenced_intents)
+    leftover_entity_types = sorted(set(entity_type_names) - referenced_entity_types)
+    if leftover_intents or leftover_entity_types or not plan:
+        plan[AGENT_UNIT] = {
+            'flow': None,
+            'intents': leftover_intents,
+            'entity_types': leftover_entity_types
+        }
+    
+    return plan
+
+def unit_scope(unit_plan: Dict[str, Any]) -> List[str]:
+    """
+    Get the export paths an analysis unit depends on.
+    
+    Args:
+        unit_plan: Unit entry from plan_units
+    
+    Returns:
+        Sorted list of file paths and directory prefixes, relative to the export root
+    """
+    scope = ["agent.json"]
+    if unit_plan['flow'] is not None:
+        scope.append(f"flows/{unit_plan['flow']}/")
+    scope.extend(f"intents/{intent_name}/" for intent_name in unit_plan['intents'])
+    scope.extend(f"entityTypes/{entity_name}/" for entity_name in unit_plan['entity_types'])
+    return sorted(scope)
+
+def build_unit_data(unit_plan: Dict[str, Any], export_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the data of one analysis unit from the export data.
+    
+    Args:
+        unit_plan: Unit entry from plan_units
+        export_data: Export data holding at least the unit's flow, intents and entity types
+    
+    Returns:
+        Export data for the unit, in the same shape as export_data
+    """
+    flows = export_data.get('flows', {})
+    intents = export_data.get('intents', {})
+    entity_types = export_data.get('entity_types', {})
+    flow_name = unit_plan['flow']
+    
+    return {
+        'agent': export_data.get('agent', {}),
+        'flows': {flow_name: flows[flow_name]} if flow_name is not None else {},
+        'intents': {name: intents[name] for name in unit_plan['intents'] if name in intents},
+        'entity_types': {name: entity_types[name] for name in unit_plan['entity_types'] if name in entity_types}
+    }
+
+def partition_export(export_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a loaded export into one analysis unit per flow.
+    
+    Args:
+        export_data: Export data as returned by DialogFlowFileLoader.load_export
+    
+    Returns:
+        Dictionary of unit name to export data in the same shape as export_data
+    """
+    flow_references = {
+        flow_name: collect_flow_references(flow_data)
+        for flow_name, flow_data in export_data.get('flows', {}).items()
+    }
+    plan = plan_units(
+        flow_references,
+        list(export_data.get('intents', {})),
+        list(export_data.get('entity_types', {}))
+    )
+    
+    return {unit_name: build_unit_data(unit_plan, export_data) for unit_name, unit_plan in plan.items()}
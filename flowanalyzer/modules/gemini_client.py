@@ -4,20 +4,42 @@ Handles interactions with Google's Gemini API.
 """
 
 import os
+import time
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from functools import partial
+from typing import Dict, Any, Optional, List, Iterable, Union, Tuple, Callable
 from pathlib import Path
-import google.generativeai as genai
 from dotenv import load_dotenv
+from response_cache import ResponseCache
+from model_backends import GeminiBackend
+from run_metrics import RunMetrics
+from context_cache import CachedContext, DEFAULT_CONTEXT_TTL_SECONDS, CONTEXT_REFRESH_MARGIN_SECONDS
+from staging_writer import StagingWriter, StagingStream, PREVIEW_CHARS
+from token_budget import DEFAULT_MAX_INPUT_TOKENS, PromptTooLargeError, SectionTokenCounter, estimate_tokens
 
 DOTENV_AVAILABLE = True
 
+# Gemini model used for all analysis requests
+DEFAULT_MODEL_NAME = 'gemini-2.5-pro'
+
 class GeminiClient:
     """
     Client for interacting with Google's Gemini API.
+    
+    prepare_text_request, prepare_consolidated_request, lookup_cache and
+    handle_response are also used by AsyncGeminiClient, which only replaces
+    the model call itself.
+    
+    Both prepare methods size the request per section before anything is sent
+    and raise PromptTooLargeError when it exceeds max_input_tokens.
     """
     
-    def __init__(self, api_key: Optional[str] = None, staging_dir: Optional[str] = None, env_file: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, staging_dir: Optional[str] = None, env_file: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None, model: Optional[Any] = None,
+                 max_input_tokens: Optional[int] = DEFAULT_MAX_INPUT_TOKENS, exact_token_count: bool = False,
+                 metrics: Optional[RunMetrics] = None, staging_policy: str = 'preview',
+                 staging_compression: str = 'none', background_staging: bool = True):
         """
         Initialize the Gemini client.
         
@@ -25,6 +47,19 @@ class GeminiClient:
             api_key: Gemini API key
             staging_dir: Directory to save staging files for review
             env_file: Path to .env file (default: looks for .env in current directory)
+            cache: Response cache consulted before calling Gemini (None disables caching)
+            model: Model backend (see model_backends); when given, no API key is needed
+                and Gemini is not configured (default: GeminiBackend, created on first use)
+            max_input_tokens: Input token budget per request (None for no budget)
+            exact_token_count: Count input tokens with the API (one extra, free request)
+                instead of the local estimate when checking the budget
+            metrics: Run metrics receiving the prompt_build and llm_call stages, token
+                usage and cache hits (default: metrics kept by this client only)
+            staging_policy: 'off', 'preview' (prompts, context previews, responses)
+                or 'full' (also the complete contexts, stored once per content hash)
+            staging_compression: 'none', 'gzip' or 'zstd' compression of staging files
+            background_staging: Write staging files on a background thread; call
+                flush_staging() before reading them
         """
         self.logger = logging.getLogger(__name__)
         
@@ -34,20 +69,46 @@ class GeminiClient:
         # Get API key from parameter, environment variable, or .env file
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
         self.staging_dir = Path(staging_dir) if staging_dir else None
+        self.cache = cache
+        self.model_name = DEFAULT_MODEL_NAME
+        self.max_input_tokens = max_input_tokens
+        self.exact_token_count = exact_token_count
+        self.metrics = metrics or RunMetrics()
         
-        if not self.api_key:
+        # Prompt-size report of the most recent request
+        self.last_token_report: Optional[Dict[str, Any]] = None
+        
+        # Latency of the most recent response (see _record_response_stats)
+        self.last_response_stats: Optional[Dict[str, Any]] = None
+        
+        if model is None and not self.api_key:
             raise ValueError(
                 "Gemini API key is required. Set GEMINI_API_KEY environment variable, "
                 "pass api_key parameter, or add it to your .env file."
             )
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        # The Gemini SDK is only imported and configured when a request needs the model
+        self._model = model
+        self._model_lock = threading.Lock()
         
-        # Create staging directory if specified
-        if self.staging_dir:
-            self.staging_dir.mkdir(parents=True, exist_ok=True)
+        # Staging files are written off the request path (see StagingWriter)
+        self.staging = None
+        if self.staging_dir and staging_policy != 'off':
+            self.staging = StagingWriter(self.staging_dir, staging_policy, staging_compression,
+                                         background=background_staging, metrics=self.metrics)
+    
+    @property
+    def model(self) -> Any:
+        """Model backend, creating the Gemini backend on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    self._model = GeminiBackend(self.api_key, self.model_name)
+        return self._model
+    
+    @model.setter
+    def model(self, model: Any) -> None:
+        self._model = model
     
     def _load_env_file(self, env_file: Optional[str] = None) -> None:
         """
@@ -114,48 +175,292 @@ class GeminiClient:
             Analysis result
         """
         try:
-            # Combine prompt and context
-            full_prompt = f"{prompt}\n\nContext Data:\n{context}"
-            
-            # Save to staging file if staging directory is set
-            if self.staging_dir:
-                self._save_staging_file(request_id, prompt, context, full_prompt)
+            contents, cache_key = self.prepare_text_request(prompt, context, request_id)
             
             # Generate response
-            response = self.model.generate_content(full_prompt)
-            
-            if response.text:
-                # Save response to staging file
-                if self.staging_dir:
-                    self._save_response_file(request_id, response.text)
-                return response.text
-            else:
-                raise Exception("No response generated from Gemini")
+            return self._generate(contents, cache_key, request_id)
                 
         except Exception as e:
             self.logger.error(f"Error calling Gemini API: {e}")
             raise
     
-    def _save_staging_file(self, request_id: str, prompt: str, context: str, full_prompt: str) -> None:
+    def prepare_text_request(self, prompt: str, context: str, request_id: str) -> Tuple[str, Optional[str]]:
+        """
+        Build the contents of an analyze_text request and stage them for review.
+        
+        Args:
+            prompt: Analysis prompt
+            context: Context data to analyze
+            request_id: Unique identifier for this request
+        
+        Returns:
+            Tuple of (contents for generate_content, cache key or None when caching is disabled)
+        """
+        start = time.perf_counter()
+        
+        # Combine prompt and context
+        full_prompt = f"{prompt}\n\nContext Data:\n{context}"
+        
+        token_report = self.measure_request(full_prompt, request_id, {
+            'prompt': estimate_tokens(prompt),
+            'context': estimate_tokens(full_prompt) - estimate_tokens(prompt)
+        })
+        
+        # Save to staging file if staging directory is set
+        if self.staging:
+            self.staging.submit(partial(self._save_staging_file, request_id, prompt, context, token_report))
+        self.metrics.add_stage('prompt_build', seconds=time.perf_counter() - start, calls=1, request_chars=len(full_prompt))
+        self.check_token_budget(token_report)
+        
+        cache_key = None
+        if self.cache:
+            cache_key = ResponseCache.make_key(self.model_name, prompt, ["\n\nContext Data:\n", context])
+        
+        return full_prompt, cache_key
+    
+    def measure_request(self, contents: Union[str, List[str]], request_id: str, sections: Dict[str, int]) -> Dict[str, Any]:
+        """
+        Size a request and keep the result as last_token_report.
+        
+        Args:
+            contents: Contents passed to generate_content
+            request_id: Unique identifier for this request
+            sections: Estimated tokens per part of the request (prompt, agent.json,
+                intents, flows, entityTypes, ...)
+        
+        Returns:
+            Report with the request's input tokens, the budget and the per-section estimates
+        """
+        tokens = sum(sections.values())
+        exact = False
+        if self.exact_token_count:
+            try:
+                tokens = self.model.count_tokens(contents).total_tokens
+                exact = True
+            except Exception as e:
+                self.logger.warning(f"Exact token count failed for request {request_id}, using the estimate: {e}")
+        
+        self.last_token_report = {
+            'request_id': request_id,
+            'tokens': tokens,
+            'exact': exact,
+            'budget': self.max_input_tokens,
+            'sections': sections
+        }
+        breakdown = ", ".join(f"{name}: ~{count:,}" for name, count in sections.items())
+        self.logger.info(f"Request {request_id}: {'' if exact else '~'}{tokens:,} input tokens ({breakdown})")
+        return self.last_token_report
+    
+    def check_token_budget(self, report: Dict[str, Any]) -> None:
+        """
+        Fail fast when a measured request is over the input token budget.
+        
+        Args:
+            report: Report from measure_request
+        
+        Raises:
+            PromptTooLargeError: If the request exceeds max_input_tokens
+        """
+        if self.max_input_tokens and report['tokens'] > self.max_input_tokens:
+            raise PromptTooLargeError(report['request_id'], report['tokens'], self.max_input_tokens, report['sections'])
+    
+    def _generate(self, contents: Union[str, List[str]], cache_key: Optional[str], request_id: str,
+                  generation_config: Optional[Dict[str, Any]] = None, validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Return the cached response for a request, or call Gemini and cache the result.
+        
+        Args:
+            contents: Contents passed to generate_content
+            cache_key: Cache key of the request (None when caching is disabled)
+            request_id: Unique identifier for this request
+            generation_config: Generation config passed to the model (e.g. a response schema)
+            validate: Called with the response text before it is cached; raises if it is invalid
+            
+        Returns:
+            Response text
+        """
+        start = time.perf_counter()
+        cached_response = self.lookup_cache(cache_key, request_id)
+        if cached_response is not None:
+            end = time.perf_counter()
+            self._record_response_stats(request_id, start, end, 1, len(cached_response), streamed=False, cached=True, end=end)
+            return cached_response
+        
+        with self.metrics.stage('llm_call'):
+            if generation_config:
+                response = self.model.generate_content(contents, generation_config=generation_config)
+            else:
+                response = self.model.generate_content(contents)
+        
+        text = self.handle_response(response, cache_key, request_id, validate)
+        end = time.perf_counter()
+        self._record_response_stats(request_id, start, end, 1, len(text), streamed=False, cached=False, end=end)
+        return text
+    
+    def _generate_stream(self, contents: Union[str, List[str]], cache_key: Optional[str], request_id: str,
+                         on_chunk: Callable[[str], None]) -> str:
+        """
+        Stream a response, passing each chunk to on_chunk and to the staging response file as it arrives.
+        
+        A cached response is passed to on_chunk as a single chunk.
+        
+        Args:
+            contents: Contents passed to generate_content
+            cache_key: Cache key of the request (None when caching is disabled)
+            request_id: Unique identifier for this request
+            on_chunk: Called with the text of every chunk
+            
+        Returns:
+            Response text
+        """
+        start = time.perf_counter()
+        cached_response = self.lookup_cache(cache_key, request_id)
+        if cached_response is not None:
+            on_chunk(cached_response)
+            end = time.perf_counter()
+            self._record_response_stats(request_id, start, end, 1, len(cached_response), streamed=True, cached=True, end=end)
+            return cached_response
+        
+        response_file = self._open_response_file(request_id) if self.staging else None
+        parts = []
+        first_chunk = None
+        usage_metadata = None
+        try:
+            for chunk in self.model.generate_content(contents, stream=True):
+                # Chunks report the usage so far; the last one covers the whole response
+                usage_metadata = getattr(chunk, 'usage_metadata', None) or usage_metadata
+                text = chunk.text
+                if not text:
+                    continue
+                if first_chunk is None:
+                    first_chunk = time.perf_counter()
+                    self.logger.info(f"First response chunk for request {request_id} after {first_chunk - start:.2f}s")
+                parts.append(text)
+                on_chunk(text)
+                if response_file:
+                    response_file.write(text)
+        finally:
+            if response_file:
+                self._close_response_file(response_file)
+            self.metrics.add_stage('llm_call', seconds=time.perf_counter() - start, calls=1)
+        
+        text = ''.join(parts)
+        if not text:
+            raise Exception("No response generated from Gemini")
+        self.metrics.record_usage(usage_metadata)
+        self.metrics.add_stage('llm_call', response_chars=len(text))
+        if self.cache and cache_key:
+            self.cache.put(cache_key, text, self.model_name)
+        
+        self._record_response_stats(request_id, start, first_chunk, len(parts), len(text), streamed=True, cached=False)
+        return text
+    
+    def _record_response_stats(self, request_id: str, start: float, first_chunk: float, chunks: int, chars: int,
+                               streamed: bool, cached: bool, end: Optional[float] = None) -> None:
+        """Keep the time to first chunk and total latency of a response as last_response_stats."""
+        end = end or time.perf_counter()
+        self.last_response_stats = {
+            'request_id': request_id,
+            'streamed': streamed,
+            'cached': cached,
+            'first_chunk_seconds': round(first_chunk - start, 3),
+            'total_seconds': round(end - start, 3),
+            'chunks': chunks,
+            'chars': chars
+        }
+        self.logger.info(
+            f"Response for request {request_id}: first chunk after {first_chunk - start:.2f}s, "
+            f"complete after {end - start:.2f}s ({chunks} chunk(s), {chars:,} chars{', cached' if cached else ''})"
+        )
+    
+    def lookup_cache(self, cache_key: Optional[str], request_id: str) -> Optional[str]:
+        """
+        Look up a request in the response cache.
+        
+        Args:
+            cache_key: Cache key from prepare_text_request or prepare_consolidated_request
+            request_id: Unique identifier for this request
+        
+        Returns:
+            Cached response, or None on a miss or when caching is disabled
+        """
+        if not self.cache or not cache_key:
+            return None
+        
+        cached_response = self.cache.get(cache_key)
+        if cached_response is not None:
+            self.metrics.increment('cache_hits')
+            self.logger.info(f"Cache hit for request {request_id} ({cache_key[:12]})")
+            if self.staging:
+                self._save_response_file(request_id, cached_response)
+        else:
+            self.metrics.increment('cache_misses')
+            self.logger.info(f"Cache miss for request {request_id} ({cache_key[:12]})")
+        
+        return cached_response
+    
+    def handle_response(self, response: Any, cache_key: Optional[str], request_id: str,
+                        validate: Optional[Callable[[str], Any]] = None) -> str:
+        """
+        Validate a model response, then cache and stage its text.
+        
+        Args:
+            response: Response returned by the model
+            cache_key: Cache key of the request (None when caching is disabled)
+            request_id: Unique identifier for this request
+            validate: Called with the response text before it is cached; an invalid
+                response is staged for review but never cached
+        
+        Returns:
+            Response text
+        """
+        self.metrics.record_usage(getattr(response, 'usage_metadata', None))
+        if response.text:
+            self.metrics.add_stage('llm_call', response_chars=len(response.text))
+            if validate:
+                try:
+                    validate(response.text)
+                except Exception:
+                    if self.staging:
+                        self._save_response_file(request_id, response.text)
+                    raise
+            if self.cache and cache_key:
+                self.cache.put(cache_key, response.text, self.model_name)
+            # Save response to staging file
+            if self.staging:
+                self._save_response_file(request_id, response.text)
+            return response.text
+        else:
+            raise Exception("No response generated from Gemini")
+    
+    def _save_staging_file(self, request_id: str, prompt: str, context: str, token_report: Dict[str, Any]) -> None:
         """
-        Save prompt, context, and full prompt to staging file for review.
+        Save prompt and context to staging file for review (runs as a staging job).
+        
+        The full prompt is the prompt and the context joined by a header, so it is
+        described instead of written again. With the full staging policy the
+        complete context is stored as a blob named by its content hash.
         
         Args:
             request_id: Unique identifier for this request
             prompt: Original prompt
             context: Context data
-            full_prompt: Combined prompt and context
+            token_report: Prompt-size report from measure_request
         """
         try:
-            staging_file = self.staging_dir / f"staging_{request_id}.txt"
+            context_blob = self.staging.store_blob([context]) if self.staging.full else None
             
-            with open(staging_file, 'w', encoding='utf-8') as f:
+            with self.staging.open(f"staging_{request_id}.txt") as f:
                 f.write("=" * 80 + "\n")
                 f.write("DIALOGFLOW FLOW ANALYZER - STAGING FILE\n")
                 f.write("=" * 80 + "\n\n")
                 
                 f.write("REQUEST ID: " + request_id + "\n")
-                f.write("TIMESTAMP: " + str(Path().stat().st_mtime) + "\n\n")
+                f.write("TIMESTAMP: " + str(Path().stat().st_mtime) + "\n")
+                f.write("CONTEXT SIZE: " + str(len(context)) + " characters\n")
+                if context_blob:
+                    f.write("FULL CONTEXT: " + context_blob + "\n")
+                f.write(self._token_summary(token_report) + "\n\n")
                 
                 f.write("-" * 40 + "\n")
                 f.write("ORIGINAL PROMPT\n")
@@ -164,23 +469,20 @@ class GeminiClient:
                 f.write("\n\n")
                 
                 f.write("-" * 40 + "\n")
-                f.write("CONTEXT DATA\n")
+                f.write(f"CONTEXT DATA PREVIEW (First {PREVIEW_CHARS} chars)\n")
                 f.write("-" * 40 + "\n")
-                f.write(context)
+                f.write(self._preview([context], PREVIEW_CHARS))
                 f.write("\n\n")
                 
                 f.write("-" * 40 + "\n")
                 f.write("FULL PROMPT (SENT TO GEMINI)\n")
                 f.write("-" * 40 + "\n")
-                f.write(full_prompt)
-                f.write("\n\n")
+                f.write("ORIGINAL PROMPT + \"\\n\\nContext Data:\\n\" + CONTEXT DATA\n\n")
                 
                 f.write("=" * 80 + "\n")
                 f.write("END OF STAGING FILE\n")
                 f.write("=" * 80 + "\n")
             
-            self.logger.info(f"Staging file saved: {staging_file}")
-            
         except Exception as e:
             self.logger.error(f"Error saving staging file: {e}")
     
@@ -193,87 +495,334 @@ class GeminiClient:
             response: Response from Gemini
         """
         try:
-            response_file = self.staging_dir / f"response_{request_id}.txt"
-            
-            with open(response_file, 'w', encoding='utf-8') as f:
-                f.write("=" * 80 + "\n")
-                f.write("GEMINI RESPONSE\n")
-                f.write("=" * 80 + "\n\n")
-                
-                f.write("REQUEST ID: " + request_id + "\n")
-                f.write("TIMESTAMP: " + str(Path().stat().st_mtime) + "\n\n")
-                
-                f.write("-" * 40 + "\n")
-                f.write("RESPONSE CONTENT\n")
-                f.write("-" * 40 + "\n")
-                f.write(response)
-                f.write("\n\n")
-                
-                f.write("=" * 80 + "\n")
-                f.write("END OF RESPONSE\n")
-                f.write("=" * 80 + "\n")
-            
-            self.logger.info(f"Response file saved: {response_file}")
+            f = self._open_response_file(request_id)
+            f.write(response)
+            self._close_response_file(f)
             
         except Exception as e:
             self.logger.error(f"Error saving response file: {e}")
     
-    def analyze_consolidated_data(self, prompt: str, consolidated_data: str, request_id: str = "consolidated_analysis") -> str:
+    def _open_response_file(self, request_id: str) -> StagingStream:
+        """Open the staging response file of a request and write its header."""
+        f = self.staging.open_stream(f"response_{request_id}.txt")
+        f.write("=" * 80 + "\n")
+        f.write("GEMINI RESPONSE\n")
+        f.write("=" * 80 + "\n\n")
+        
+        f.write("REQUEST ID: " + request_id + "\n")
+        f.write("TIMESTAMP: " + str(Path().stat().st_mtime) + "\n\n")
+        
+        f.write("-" * 40 + "\n")
+        f.write("RESPONSE CONTENT\n")
+        f.write("-" * 40 + "\n")
+        return f
+    
+    def _close_response_file(self, f: StagingStream) -> None:
+        """Write the footer of a staging response file and close it."""
+        f.write("\n\n")
+        
+        f.write("=" * 80 + "\n")
+        f.write("END OF RESPONSE\n")
+        f.write("=" * 80 + "\n")
+        f.close()
+    
+    def flush_staging(self) -> None:
+        """Wait until every staging file has been written."""
+        if self.staging:
+            self.staging.flush()
+    
+    def analyze_consolidated_data(self, prompt: str, consolidated_data: Union[str, Iterable[str]], request_id: str = "consolidated_analysis",
+                                  on_chunk: Optional[Callable[[str], None]] = None, generation_config: Optional[Dict[str, Any]] = None,
+                                  validate: Optional[Callable[[str], Any]] = None) -> str:
         """
         Analyze consolidated DialogFlow data without chunking to preserve context.
         
         Args:
             prompt: Analysis prompt
-            consolidated_data: Complete consolidated DialogFlow data
+            consolidated_data: Complete consolidated DialogFlow data, either as one
+                string or as an iterable of text sections (e.g. from
+                DialogFlowFileLoader.iter_consolidated_sections). Sections are sent
+                as separate parts of a single request, which avoids building a
+                second, concatenated copy of the data; all sections are still
+                held in memory until the request completes.
             request_id: Unique identifier for this request
+            on_chunk: Stream the response and call this with the text of every chunk
+                as it arrives (the staging response file is written the same way)
+            generation_config: Generation config passed to the model, e.g. a response
+                schema (see structured_report); not supported with on_chunk
+            validate: Called with the response text before it is cached; raises if it is invalid
             
         Returns:
             Analysis result
         """
         try:
-            # Combine prompt and consolidated data
-            full_prompt = f"{prompt}\n\nConsolidated DialogFlow Data:\n{consolidated_data}"
+            if on_chunk and (generation_config or validate):
+                raise ValueError("Streamed responses cannot use a generation config or validation")
             
-            # Save to staging file if staging directory is set
-            if self.staging_dir:
-                self._save_consolidated_staging_file(request_id, prompt, consolidated_data, full_prompt)
+            contents, cache_key = self.prepare_consolidated_request(prompt, consolidated_data, request_id)
             
             # Generate response
-            response = self.model.generate_content(full_prompt)
-            
-            if response.text:
-                # Save response to staging file
-                if self.staging_dir:
-                    self._save_response_file(request_id, response.text)
-                return response.text
-            else:
-                raise Exception("No response generated from Gemini")
+            if on_chunk:
+                return self._generate_stream(contents, cache_key, request_id, on_chunk)
+            return self._generate(contents, cache_key, request_id, generation_config, validate)
                 
         except Exception as e:
             self.logger.error(f"Error calling Gemini API with consolidated data: {e}")
             raise
     
-    def _save_consolidated_staging_file(self, request_id: str, prompt: str, consolidated_data: str, full_prompt: str) -> None:
+    def prepare_consolidated_request(self, prompt: str, consolidated_data: Union[str, Iterable[str]], request_id: str) -> Tuple[Union[str, List[str]], Optional[str]]:
         """
-        Save consolidated data prompt and context to staging file for review.
+        Build the contents of an analyze_consolidated_data request and stage them for review.
+        
+        An iterable is consumed once: each section is hashed into the cache key
+        and counted as it is collected into the request contents.
+        
+        Args:
+            prompt: Analysis prompt
+            consolidated_data: Consolidated data as a string or an iterable of text sections
+            request_id: Unique identifier for this request
+        
+        Returns:
+            Tuple of (contents for generate_content, cache key or None when caching is disabled)
+        """
+        start = time.perf_counter()
+        header = "\n\nConsolidated DialogFlow Data:\n"
+        counter = SectionTokenCounter()
+        key_hasher = ResponseCache.key_hasher(self.model_name, prompt) if self.cache else None
+        if key_hasher:
+            key_hasher.update(header.encode('utf-8'))
+        
+        if isinstance(consolidated_data, str):
+            # Combine prompt and consolidated data
+            full_prompt = f"{prompt}{header}{consolidated_data}"
+            data_parts = [consolidated_data]
+            data_size = len(consolidated_data)
+            contents = full_prompt
+            counter.add(consolidated_data)
+            if key_hasher:
+                key_hasher.update(consolidated_data.encode('utf-8'))
+        else:
+            contents = [f"{prompt}{header}"]
+            data_size = 0
+            for part in consolidated_data:
+                if not part:
+                    continue
+                contents.append(part)
+                data_size += len(part)
+                counter.add(part)
+                if key_hasher:
+                    key_hasher.update(part.encode('utf-8'))
+            data_parts = contents[1:]
+        
+        token_report = self.measure_request(contents, request_id, {'prompt': estimate_tokens(f"{prompt}{header}"), **counter.sections})
+        
+        # Save to staging file if staging directory is set
+        if self.staging:
+            self.staging.submit(partial(self._save_consolidated_staging_file, request_id, prompt, data_parts, data_size, token_report))
+        self.metrics.add_stage('prompt_build', seconds=time.perf_counter() - start, calls=1,
+                               request_chars=len(f"{prompt}{header}") + data_size)
+        self.check_token_budget(token_report)
+        
+        return contents, key_hasher.hexdigest() if key_hasher else None
+    
+    def create_context(self, prompt: str, consolidated_data: Union[str, Iterable[str]], request_id: str = "context",
+                       ttl_seconds: float = DEFAULT_CONTEXT_TTL_SECONDS) -> CachedContext:
+        """
+        Prepare a prompt and consolidated data shared by several analyze_with_context requests.
+        
+        The contents are staged and checked against the token budget like an
+        analyze_consolidated_data request. They are uploaded to the backend's
+        cached-content store on the first request that is not answered from the
+        response cache. When the backend has no cached-content support (no
+        create_cached_content) or the upload fails, for instance because the
+        contents are below the API's minimum cache size, every request sends
+        the context in full.
+        
+        Args:
+            prompt: Analysis prompt (the framework every question refers to)
+            consolidated_data: Consolidated data as a string or an iterable of text sections
+            request_id: Identifier of the context
+            ttl_seconds: Lifetime of the cached content; extended while it is in use
+        
+        Returns:
+            Context to pass to analyze_with_context, extend_context and delete_context
+        """
+        contents, key = self.prepare_consolidated_request(prompt, consolidated_data, request_id)
+        return CachedContext(request_id, [contents] if isinstance(contents, str) else contents, key,
+                             self.last_token_report['tokens'], ttl_seconds)
+    
+    def _upload_context(self, context: CachedContext) -> None:
+        """Upload the contents of a context to the backend's cached-content store."""
+        start = time.perf_counter()
+        with self.metrics.stage('context_upload'):
+            cached_content = self.model.create_cached_content(context.contents, context.ttl_seconds, display_name=context.request_id)
+        context.record_upload(cached_content['name'], cached_content['expire_time'], time.perf_counter() - start)
+        self.logger.info(
+            f"Context {context.request_id} cached as {context.name} (~{context.tokens:,} tokens, "
+            f"expires in {context.remaining_seconds():.0f}s)"
+        )
+    
+    def analyze_with_context(self, context: CachedContext, question: str, request_id: str) -> str:
+        """
+        Ask a question about a context created with create_context.
+        
+        Only the question is sent once the context is cached; the first request
+        uploads it, a context close to expiry is extended first, and one that is
+        gone is uploaded again. Responses
+        are kept in the response cache like any other request, keyed by the context
+        contents and the question.
+        
+        Args:
+            context: Context from create_context
+            question: Question or instruction about the context
+            request_id: Unique identifier for this request (used in staging files)
+        
+        Returns:
+            Response text
+        """
+        try:
+            start = time.perf_counter()
+            token_report = self.measure_request(question, request_id, {
+                'context': context.tokens,
+                'question': estimate_tokens(question)
+            })
+            if self.staging:
+                description = f"(shared context {context.request_id}, see staging file consolidated_staging_{context.request_id}.txt)"
+                self.staging.submit(partial(self._save_staging_file, request_id, question, description, token_report))
+            self.metrics.add_stage('prompt_build', seconds=time.perf_counter() - start, calls=1, request_chars=len(question))
+            self.check_token_budget(token_report)
+            
+            cache_key = ResponseCache.make_key(self.model_name, question, [context.key]) if self.cache and context.key else None
+            cached_response = self.lookup_cache(cache_key, request_id)
+            if cached_response is not None:
+                context.record_use(request_id, time.perf_counter() - start, from_response_cache=True)
+                return cached_response
+            
+            if context.upload_pending:
+                context.upload_pending = False
+                if not hasattr(self.model, 'create_cached_content'):
+                    self.logger.info(f"The model backend has no context caching; requests with context {context.request_id} send it in full")
+                else:
+                    try:
+                        self._upload_context(context)
+                    except Exception as e:
+                        self.logger.warning(f"Context caching failed for {context.request_id}, requests will send it in full: {e}")
+            elif context.cached and context.remaining_seconds() < CONTEXT_REFRESH_MARGIN_SECONDS:
+                self._refresh_context(context)
+            
+            with self.metrics.stage('llm_call'):
+                if context.cached:
+                    response = self.model.generate_content(f"\n\nQuestion:\n{question}", cached_content=context.name)
+                else:
+                    response = self.model.generate_content(context.contents + [f"\n\nQuestion:\n{question}"])
+            
+            text = self.handle_response(response, cache_key, request_id)
+            use = context.record_use(request_id, time.perf_counter() - start, getattr(response, 'usage_metadata', None))
+            self.metrics.increment('context_cache_uses' if use['cached'] else 'context_full_sends')
+            self.logger.info(
+                f"Request {request_id} with context {context.request_id}: {use['seconds']:.2f}s, "
+                f"{use['cached_tokens']:,} cached and {use['uncached_tokens']:,} uncached input tokens"
+            )
+            return text
+            
+        except Exception as e:
+            self.logger.error(f"Error calling Gemini API with context {context.request_id}: {e}")
+            raise
+    
+    def _refresh_context(self, context: CachedContext) -> None:
+        """Extend a context about to expire, or upload it again when it is gone."""
+        try:
+            self.extend_context(context, context.ttl_seconds)
+        except Exception as e:
+            self.logger.warning(f"Could not extend context {context.request_id} ({e}), uploading it again")
+            try:
+                self._upload_context(context)
+            except Exception as upload_error:
+                self.logger.warning(f"Re-upload of context {context.request_id} failed, sending it in full: {upload_error}")
+                context.name = None
+    
+    def extend_context(self, context: CachedContext, ttl_seconds: float) -> None:
+        """
+        Extend the lifetime of a cached context.
+        
+        Args:
+            context: Context from create_context
+            ttl_seconds: New lifetime, counted from now
+        """
+        if not context.cached:
+            return
+        context.expire_time = self.model.update_cached_content(context.name, ttl_seconds)
+        self.logger.info(f"Context {context.request_id} extended, expires in {context.remaining_seconds():.0f}s")
+    
+    def delete_context(self, context: CachedContext) -> None:
+        """
+        Delete a cached context from the backend; it is no longer billed for storage.
+        
+        A failure is logged, not raised: the context expires at the end of its TTL anyway.
+        
+        Args:
+            context: Context from create_context
+        """
+        if not context.cached:
+            return
+        try:
+            self.model.delete_cached_content(context.name)
+            self.logger.info(f"Context {context.request_id} deleted ({context.name})")
+        except Exception as e:
+            self.logger.warning(f"Could not delete context {context.request_id} ({context.name}), it expires on its own: {e}")
+        context.deleted = time.time()
+    
+    def _token_summary(self, report: Dict[str, Any]) -> str:
+        """Describe a measured request's input tokens, for staging files."""
+        budget = f"{report['budget']:,}" if report['budget'] else "none"
+        lines = [f"INPUT TOKENS: {'' if report['exact'] else '~'}{report['tokens']:,} (budget: {budget})"]
+        lines.extend(f"  {name}: ~{count:,}" for name, count in report['sections'].items())
+        return "\n".join(lines)
+    
+    def _preview(self, parts: List[str], limit: int) -> str:
+        """Return the first `limit` characters of a list of text parts."""
+        preview = []
+        remaining = limit
+        for part in parts:
+            if remaining <= 0:
+                if part:
+                    preview.append("...")
+                    break
+                continue
+            preview.append(part[:remaining])
+            if len(part) > remaining:
+                preview.append("...")
+                break
+            remaining -= len(part)
+        
+        return ''.join(preview)
+    
+    def _save_consolidated_staging_file(self, request_id: str, prompt: str, data_parts: List[str], data_size: int,
+                                        token_report: Dict[str, Any]) -> None:
+        """
+        Save consolidated data prompt and context to staging file for review (runs as a staging job).
         
         Args:
             request_id: Unique identifier for this request
             prompt: Original prompt
-            consolidated_data: Complete consolidated data
-            full_prompt: Combined prompt and consolidated data
+            data_parts: Consolidated data as a list of text parts
+            data_size: Total number of characters in data_parts
+            token_report: Prompt-size report from measure_request
         """
         try:
-            staging_file = self.staging_dir / f"consolidated_staging_{request_id}.txt"
+            data_blob = self.staging.store_blob(data_parts) if self.staging.full else None
             
-            with open(staging_file, 'w', encoding='utf-8') as f:
+            with self.staging.open(f"consolidated_staging_{request_id}.txt") as f:
                 f.write("=" * 80 + "\n")
                 f.write("CONSOLIDATED DIALOGFLOW ANALYSIS - STAGING FILE\n")
                 f.write("=" * 80 + "\n\n")
                 
                 f.write("REQUEST ID: " + request_id + "\n")
                 f.write("TIMESTAMP: " + str(Path().stat().st_mtime) + "\n")
-                f.write("DATA SIZE: " + str(len(consolidated_data)) + " characters\n\n")
+                f.write("DATA SIZE: " + str(data_size) + " characters\n")
+                if data_blob:
+                    f.write("FULL DATA: " + data_blob + "\n")
+                f.write(self._token_summary(token_report) + "\n\n")
                 
                 f.write("-" * 40 + "\n")
                 f.write("ORIGINAL PROMPT\n")
@@ -282,22 +831,19 @@ class GeminiClient:
                 f.write("\n\n")
                 
                 f.write("-" * 40 + "\n")
-                f.write("CONSOLIDATED DATA PREVIEW (First 1000 chars)\n")
+                f.write(f"CONSOLIDATED DATA PREVIEW (First {PREVIEW_CHARS} chars)\n")
                 f.write("-" * 40 + "\n")
-                f.write(consolidated_data[:1000] + "..." if len(consolidated_data) > 1000 else consolidated_data)
+                f.write(self._preview(data_parts, PREVIEW_CHARS))
                 f.write("\n\n")
                 
                 f.write("-" * 40 + "\n")
-                f.write("FULL PROMPT PREVIEW (First 1500 chars)\n")
+                f.write("FULL PROMPT (SENT TO GEMINI)\n")
                 f.write("-" * 40 + "\n")
-                f.write(full_prompt[:1500] + "..." if len(full_prompt) > 1500 else full_prompt)
-                f.write("\n\n")
+                f.write("ORIGINAL PROMPT + \"\\n\\nConsolidated DialogFlow Data:\\n\" + CONSOLIDATED DATA\n\n")
                 
                 f.write("=" * 80 + "\n")
                 f.write("END OF CONSOLIDATED STAGING FILE\n")
                 f.write("=" * 80 + "\n")
             
-            self.logger.info(f"Consolidated staging file saved: {staging_file}")
-            
         except Exception as e:
-            self.logger.error(f"Error saving consolidated staging file: {e}") 
\ No newline at end of file
+            self.logger.error(f"Error saving consolidated staging file: {e}")
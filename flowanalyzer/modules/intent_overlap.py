@@ -0,0 +1,405 @@
+"""
+Intent Overlap Module
+Local detection of overlapping intents and near-duplicate training phrases.
+"""
+
+import re
+import time
+import logging
+from typing import Dict, Any, List, Tuple, Iterator, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Character n-gram length; words are padded with spaces so n-grams mark word edges
+NGRAM_SIZE = 4
+
+# N-grams found in more than this share of the phrases carry almost no signal
+MAX_DF_RATIO = 0.02
+# ...but small exports keep every n-gram
+MIN_DF_LIMIT = 200
+
+# Upper bound on the (phrase, phrase) products expanded at once
+BLOCK_PRODUCTS = 4_000_000
+
+# Row prefixes run until the remaining norm is below this share of the threshold; longer
+# prefixes cost more lookups but leave far fewer candidate pairs to verify
+PREFIX_RATIO = 0.8
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_phrase(text: str) -> str:
+    """
+    Normalize a training phrase for comparison.
+    
+    Args:
+        text: Phrase text
+    
+    Returns:
+        Lower-cased text with collapsed whitespace
+    """
+    return _WHITESPACE.sub(" ", text.lower()).strip()
+
+def iter_training_phrases(intents: Dict[str, Any]) -> Iterator[Tuple[str, str, str]]:
+    """
+    Iterate over the training phrases of the loaded intents.
+    
+    Args:
+        intents: Intents as returned by DialogFlowFileLoader.load_intents
+    
+    Yields:
+        (intent name, language code, phrase text) tuples
+    """
+    for intent_dir, intent_data in intents.items():
+        intent_name = intent_data.get('config', {}).get('displayName', intent_dir)
+        for lang, phrases_data in intent_data.get('training_phrases', {}).items():
+            for phrase in phrases_data.get('trainingPhrases', []):
+                text = ''.join(part.get('text', '') for part in phrase.get('parts', []))
+                if text.strip():
+                    yield intent_name, phrase.get('languageCode', lang), text
+
+class IntentOverlapDetector:
+    """
+    Character n-gram TF-IDF similarity between training phrases and intents.
+    
+    Phrases are turned into sparse, L2-normalized TF-IDF vectors held as flat
+    NumPy arrays (row, feature, weight). Similar phrase pairs are found through
+    an inverted index with prefix filtering, one block of phrases at a time, so
+    only promising pairs are ever touched and memory stays bounded. Intents are
+    compared through the normalized sum of their phrase vectors, in batches of
+    features of a dense Gram matrix.
+    """
+    
+    def __init__(self, phrase_threshold: float = 0.85, intent_threshold: float = 0.5,
+                 max_pairs: int = 500):
+        """
+        Initialize the detector.
+        
+        Args:
+            phrase_threshold: Minimum cosine similarity of two phrases of different intents to report
+            intent_threshold: Minimum cosine similarity of two intents to report
+            max_pairs: Maximum number of similar phrase pairs to report
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("numpy is required for the intent overlap check. Install with: pip install numpy")
+        
+        self.logger = logging.getLogger(__name__)
+        self.phrase_threshold = phrase_threshold
+        self.intent_threshold = intent_threshold
+        self.max_pairs = max_pairs
+    
+    def _vectorize(self, texts: List[str]) -> Tuple[Any, Any, Any, int]:
+        """
+        Build sparse TF-IDF vectors of character n-grams.
+        
+        Args:
+            texts: Normalized phrases
+        
+        Returns:
+            (rows, features, weights, feature count), sorted by row
+        """
+        # Character codes of all padded phrases, one after the other
+        padded = [f" {text} ".ljust(NGRAM_SIZE) for text in texts]
+        lengths = np.fromiter(map(len, padded), dtype=np.int64, count=len(padded))
+        alphabet, codes = np.unique(np.frombuffer(''.join(padded).encode('utf-32-le'), dtype=np.uint32), return_inverse=True)
+        
+        # N-grams that start and end within one phrase
+        owner = np.repeat(np.arange(len(texts)), lengths)
+        offset = np.arange(len(owner)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        valid = np.flatnonzero(offset <= lengths[owner] - NGRAM_SIZE)
+        rows = owner[valid]
+        if len(alphabet) ** NGRAM_SIZE < 2 ** 63:
+            ngrams = np.zeros(len(valid), dtype=np.int64)
+            for i in range(NGRAM_SIZE):
+                ngrams = ngrams * len(alphabet) + codes[valid + i]
+        else:
+            ngrams = np.stack([codes[valid + i] for i in range(NGRAM_SIZE)], axis=1)
+        features = np.unique(ngrams, return_inverse=True, axis=0 if ngrams.ndim > 1 else None)[1].ravel()
+        n_features = int(features.max()) + 1
+        
+        # Term frequencies: merge repeated n-grams of a phrase
+        keys, counts = np.unique(rows * n_features + features, return_counts=True)
+        rows, features = keys // n_features, keys % n_features
+        
+        # Drop the near-stopword n-grams, then weight by smoothed IDF
+        df = np.bincount(features, minlength=n_features)
+        df_limit = max(int(MAX_DF_RATIO * len(texts)), MIN_DF_LIMIT)
+        keep = df[features] <= df_limit
+        rows, features, counts = rows[keep], features[keep], counts[keep]
+        idf = np.log((1 + len(texts)) / (1 + df)) + 1
+        weights = (1 + np.log(counts)) * idf[features]
+        
+        return rows, features, self._normalize(rows, weights, len(texts)), n_features
+    
+    @staticmethod
+    def _normalize(rows: Any, weights: Any, n_rows: int) -> Any:
+        """L2-normalize the weights of each row."""
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n_rows))
+        norms[norms == 0] = 1
+        return weights / norms[rows]
+    
+    @staticmethod
+    def _blocks(work: Any, budget: float = BLOCK_PRODUCTS) -> List[Tuple[int, int]]:
+        """Split items into consecutive (start, end) blocks of about budget work each."""
+        cumulative = np.cumsum(work)
+        boundaries = [0]
+        while boundaries[-1] < len(work):
+            done = cumulative[boundaries[-1] - 1] if boundaries[-1] else 0
+            end = int(np.searchsorted(cumulative, done + budget, side='right'))
+            boundaries.append(min(max(end, boundaries[-1] + 1), len(work)))
+        return list(zip(boundaries, boundaries[1:]))
+    
+    @staticmethod
+    def _expand(starts: Any, counts: Any) -> Tuple[Any, Any]:
+        """Expand ranges into (range index, position) arrays."""
+        entry = np.repeat(np.arange(len(counts)), counts)
+        positions = starts[entry] + np.arange(len(entry)) - np.repeat(np.cumsum(counts) - counts, counts)
+        return entry, positions
+    
+    def _similar_pairs(self, rows: Any, features: Any, weights: Any, n_rows: int, n_features: int,
+                       threshold: float, groups: Optional[Any] = None) -> Tuple[Any, Any, Any]:
+        """
+        Find all row pairs with a cosine similarity of at least threshold.
+        
+        Uses prefix filtering: the features of each row are visited rarest first,
+        and only until the norm of the remaining ones drops below the threshold.
+        A pair can only reach the threshold if it shares a visited feature, so
+        only those are indexed and looked up; the candidates whose bound still
+        reaches the threshold are then verified with an exact dot product.
+        
+        Args:
+            rows, features, weights: Sparse normalized vectors, sorted by row and feature
+            n_rows: Number of rows
+            n_features: Number of features
+            threshold: Minimum similarity
+            groups: Optional group of every row; pairs within one group are skipped
+        
+        Returns:
+            (first rows, second rows, similarities) with first < second
+        """
+        # Visit the features of every row rarest first: one global order, by document frequency then id
+        df = np.bincount(features, minlength=n_features)
+        rank = np.empty(n_features, dtype=np.int64)
+        rank[np.lexsort((np.arange(n_features), df))] = np.arange(n_features)
+        order = np.lexsort((rank[features], rows))
+        sorted_rows, sorted_features, sorted_weights = rows[order], features[order], weights[order]
+        
+        # Prefix of every row: the features visited until the remaining norm drops below PREFIX_RATIO * threshold
+        squares = sorted_weights * sorted_weights
+        before = np.cumsum(squares) - squares
+        row_start = np.searchsorted(sorted_rows, np.arange(n_rows + 1))
+        remaining = np.bincount(sorted_rows, weights=squares, minlength=n_rows)[sorted_rows] - (before - before[row_start[sorted_rows]])
+        in_prefix = remaining >= (PREFIX_RATIO * threshold) ** 2 * (1 - 1e-9)
+        probe_rows, probe_features, probe_weights = sorted_rows[in_prefix], sorted_features[in_prefix], sorted_weights[in_prefix]
+        suffix_rows, suffix_features, suffix_weights = sorted_rows[~in_prefix], sorted_features[~in_prefix], sorted_weights[~in_prefix]
+        suffix_norm = np.sqrt(np.bincount(suffix_rows, weights=suffix_weights * suffix_weights, minlength=n_rows))
+        
+        # Rank of the last prefix feature of every row
+        probe_ptr = np.searchsorted(probe_rows, np.arange(n_rows + 1))
+        boundary = np.full(n_rows, -1, dtype=np.int64)
+        has_prefix = probe_ptr[1:] > probe_ptr[:-1]
+        boundary[has_prefix] = rank[probe_features[probe_ptr[1:][has_prefix] - 1]]
+        
+        # Inverted index of the prefixes only
+        order = np.argsort(probe_features, kind='stable')
+        index_rows, index_weights = probe_rows[order], probe_weights[order]
+        index_ptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(probe_features, minlength=n_features), out=index_ptr[1:])
+        
+        # Candidates: pairs sharing a prefix feature. Orient each pair so that x is the row whose prefix
+        # ends first; every feature of x's prefix that y has is then in y's prefix too, so the exact
+        # similarity is the prefix dot product plus x's suffix against y, bounded by x's suffix norm.
+        postings = index_ptr[probe_features + 1] - index_ptr[probe_features]
+        found_x, found_y, found_partial = [], [], []
+        for block_start, block_end in self._blocks(np.bincount(probe_rows, weights=postings, minlength=n_rows)):
+            lo, hi = probe_ptr[block_start], probe_ptr[block_end]
+            entry, positions = self._expand(index_ptr[probe_features[lo:hi]], postings[lo:hi])
+            first, second = probe_rows[lo:hi][entry], index_rows[positions]
+            upper = first < second
+            if groups is not None:
+                upper &= groups[first] != groups[second]
+            pair_keys, inverse = np.unique(first[upper] * n_rows + second[upper], return_inverse=True)
+            partial = np.bincount(inverse, weights=(probe_weights[lo:hi][entry] * index_weights[positions])[upper])
+            first, second = pair_keys // n_rows, pair_keys % n_rows
+            swap = boundary[first] > boundary[second]
+            x, y = np.where(swap, second, first), np.where(swap, first, second)
+            keep = partial + suffix_norm[x] >= threshold * (1 - 1e-9)
+            found_x.append(x[keep])
+            found_y.append(y[keep])
+            found_partial.append(partial[keep])
+        if not found_x:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, np.zeros(0)
+        x, y, partial = np.concatenate(found_x), np.concatenate(found_y), np.concatenate(found_partial)
+        
+        # Exact similarity: gather y's weight of every suffix feature of x from a small dense
+        # matrix of the y rows of the block, over the features those rows use
+        order = np.argsort(y, kind='stable')
+        x, y, partial = x[order], y[order], partial[order]
+        suffix_ptr = np.searchsorted(suffix_rows, np.arange(n_rows + 1))
+        suffix_length = np.diff(suffix_ptr)
+        row_ptr = np.searchsorted(rows, np.arange(n_rows + 1))
+        pair_ptr = np.searchsorted(y, np.arange(n_rows + 1))
+        # Features outside the block map to a trailing all-zero column
+        column = np.full(n_features, -1, dtype=np.int64)
+        similarity = partial.copy()
+        # A block of n entries over about n / mean length rows keeps the dense matrix near BLOCK_PRODUCTS cells
+        budget = np.sqrt(BLOCK_PRODUCTS * len(rows) / max(n_rows, 1))
+        for row_start, row_end in self._blocks(np.diff(row_ptr), budget):
+            lo, hi = row_ptr[row_start], row_ptr[row_end]
+            block_features = np.unique(features[lo:hi])
+            column[block_features] = np.arange(len(block_features))
+            dense = np.zeros((row_end - row_start, len(block_features) + 1))
+            dense[rows[lo:hi] - row_start, column[features[lo:hi]]] = weights[lo:hi]
+            
+            pairs = slice(pair_ptr[row_start], pair_ptr[row_end])
+            block_x = x[pairs]
+            entry, positions = self._expand(suffix_ptr[block_x], suffix_length[block_x])
+            gathered = dense[y[pairs][entry] - row_start, column[suffix_features[positions]]]
+            similarity[pairs] += np.bincount(entry, weights=suffix_weights[positions] * gathered, minlength=len(block_x))
+            column[block_features] = -1
+        
+        hits = similarity >= threshold
+        return np.minimum(x, y)[hits], np.maximum(x, y)[hits], similarity[hits]
+    
+    @staticmethod
+    def _gram_matrix(rows: Any, features: Any, weights: Any, n_rows: int) -> Any:
+        """
+        Dense matrix of all pairwise dot products of a few sparse rows.
+        
+        The rows are densified one batch of features at a time, so memory stays
+        at about BLOCK_PRODUCTS values plus the n_rows x n_rows result.
+        """
+        order = np.argsort(features, kind='stable')
+        rows, weights = rows[order], weights[order]
+        columns = np.unique(features[order], return_inverse=True)[1]
+        n_columns = int(columns[-1]) + 1 if len(columns) else 0
+        batch = max(BLOCK_PRODUCTS // max(n_rows, 1), 1)
+        
+        gram = np.zeros((n_rows, n_rows), dtype=np.float32)
+        for start in range(0, n_columns, batch):
+            lo, hi = np.searchsorted(columns, [start, start + batch])
+            dense = np.zeros((n_rows, min(batch, n_columns - start)), dtype=np.float32)
+            dense[rows[lo:hi], columns[lo:hi] - start] = weights[lo:hi]
+            gram += dense @ dense.T
+        return gram
+    
+    def analyze(self, intents: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Compare the training phrases of all intents.
+        
+        Args:
+            intents: Intents as returned by DialogFlowFileLoader.load_intents
+        
+        Returns:
+            Report with similar intent pairs, phrases shared by several intents
+            and near-duplicate phrases of different intents
+        """
+        started = time.perf_counter()
+        
+        # Exact duplicates are found by text; every distinct (intent, phrase) is vectorized once
+        phrase_intents: Dict[str, List[str]] = {}
+        for intent_name, _lang, text in iter_training_phrases(intents):
+            owners = phrase_intents.setdefault(normalize_phrase(text), [])
+            if intent_name not in owners:
+                owners.append(intent_name)
+        
+        texts, owners, text_ids = [], [], []
+        for text_id, (text, intent_names) in enumerate(phrase_intents.items()):
+            for intent_name in intent_names:
+                texts.append(text)
+                owners.append(intent_name)
+                text_ids.append(text_id)
+        
+        intent_names = sorted(set(owners))
+        intent_ids = {name: i for i, name in enumerate(intent_names)}
+        phrase_owner = np.asarray([intent_ids[name] for name in owners], dtype=np.int64)
+        text_ids = np.asarray(text_ids, dtype=np.int64)
+        
+        report = {
+            'phrases': len(texts),
+            'intents': len(intent_names),
+            'features': 0,
+            'similar_intents': [],
+            'duplicate_phrases': [
+                {'phrase': text, 'intents': sorted(names)}
+                for text, names in phrase_intents.items() if len(names) > 1
+            ],
+            'similar_phrases': [],
+            'seconds': 0.0
+        }
+        
+        if len(texts) > 1:
+            rows, features, weights, n_features = self._vectorize(texts)
+            report['features'] = n_features
+            
+            # Near-duplicate phrases of different intents
+            first, second, similarity = self._similar_pairs(
+                rows, features, weights, len(texts), n_features, self.phrase_threshold, phrase_owner
+            )
+            # Identical texts are already reported as shared phrases
+            cross = (phrase_owner[first] != phrase_owner[second]) & (text_ids[first] != text_ids[second])
+            first, second, similarity = first[cross], second[cross], similarity[cross]
+            top = np.argsort(-similarity, kind='stable')[:self.max_pairs]
+            report['similar_phrases'] = [
+                {
+                    'similarity': round(float(similarity[i]), 3),
+                    'intent_a': owners[first[i]], 'phrase_a': texts[first[i]],
+                    'intent_b': owners[second[i]], 'phrase_b': texts[second[i]]
+                }
+                for i in top
+            ]
+            
+            # Intent vectors: normalized sum of their phrase vectors
+            intent_keys, inverse = np.unique(phrase_owner[rows] * n_features + features, return_inverse=True)
+            intent_weights = np.bincount(inverse, weights=weights)
+            intent_rows, intent_features = intent_keys // n_features, intent_keys % n_features
+            intent_weights = self._normalize(intent_rows, intent_weights, len(intent_names))
+            gram = self._gram_matrix(intent_rows, intent_features, intent_weights, len(intent_names))
+            first, second = np.nonzero(np.triu(gram, 1) >= self.intent_threshold)
+            similarity = gram[first, second]
+            report['similar_intents'] = sorted(
+                (
+                    {'intents': [intent_names[a], intent_names[b]], 'similarity': round(float(s), 3)}
+                    for a, b, s in zip(first, second, similarity)
+                ),
+                key=lambda pair: -pair['similarity']
+            )
+        
+        report['seconds'] = round(time.perf_counter() - started, 3)
+        self.logger.info(
+            f"Intent overlap: {report['phrases']} phrases, {report['intents']} intents, "
+            f"{len(report['similar_intents'])} similar intent pair(s), "
+            f"{len(report['duplicate_phrases'])} shared phrase(s), "
+            f"{len(report['similar_phrases'])} near-duplicate pair(s) in {report['seconds']}s"
+        )
+        return report
+
+def format_findings(report: Dict[str, Any], limit: Optional[int] = 20) -> str:
+    """
+    Render intent overlap findings as markdown, for logs and for the analysis prompt.
+    
+    Args:
+        report: Findings from IntentOverlapDetector.analyze
+        limit: Maximum number of entries per kind of finding
+    
+    Returns:
+        Markdown text (empty when there is nothing to report)
+    """
+    lines = []
+    
+    for pair in report['similar_intents'][:limit]:
+        lines.append(f"- Overlapping intents: {pair['intents'][0]} and {pair['intents'][1]} (similarity {pair['similarity']})")
+    for duplicate in report['duplicate_phrases'][:limit]:
+        lines.append(f"- Phrase in several intents: \"{duplicate['phrase']}\" ({', '.join(duplicate['intents'])})")
+    for pair in report['similar_phrases'][:limit]:
+        lines.append(
+            f"- Near-duplicate phrases: \"{pair['phrase_a']}\" ({pair['intent_a']}) and "
+            f"\"{pair['phrase_b']}\" ({pair['intent_b']}), similarity {pair['similarity']}"
+        )
+    
+    return "\n".join(lines)
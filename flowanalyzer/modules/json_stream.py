@@ -0,0 +1,155 @@
+"""
+JSON Stream Module
+Incremental parsing of the large arrays in DialogFlow export files.
+"""
+
+import re
+import json
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, TextIO
+
+# Characters read from the file at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_DECODER = json.JSONDecoder()
+
+class _StreamReader:
+    """Buffered reader decoding one JSON value at a time from a text file."""
+    
+    def __init__(self, f: TextIO, file_path: Path, chunk_size: int):
+        self.f = f
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        # Characters dropped from the front of the buffer, for error offsets
+        self.consumed = 0
+        self.eof = False
+    
+    def _fill(self) -> None:
+        """Drop the consumed text and read more of the file."""
+        self.consumed += self.pos
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        # Read at least as much as is buffered, so a value spanning many chunks is re-decoded only a few times
+        data = self.f.read(max(self.chunk_size, len(self.buffer)))
+        if not data:
+            self.eof = True
+        self.buffer += data
+    
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at the end of the file)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ""
+            self._fill()
+    
+    def expect(self, char: str) -> None:
+        """Consume the next character, which must be char."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"{self.file_path}: expected '{char}' at offset {self.consumed + self.pos}, "
+                             f"found {repr(found) if found else 'end of file'}")
+        self.pos += 1
+    
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(f"{self.file_path}: {e.msg} at offset {self.consumed + e.pos}") from e
+                self._fill()
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+def iter_array_items(file_path: Path, key: str, others: Optional[Dict[str, Any]] = None,
+                     chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Iterate over the items of one array of a JSON object file without loading the file.
+    
+    Only one item (and one chunk of the file) is held at a time, so memory
+    does not grow with the length of the array.
+    
+    Args:
+        file_path: JSON file holding an object, e.g. trainingPhrases/en.json
+        key: Key of the array, e.g. 'trainingPhrases'
+        others: Dictionary receiving the other keys of the object (decoded in full)
+        chunk_size: Characters read at a time
+    
+    Yields:
+        Array items, in order
+    
+    Raises:
+        ValueError: If the file is not a JSON object or is malformed
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        reader = _StreamReader(f, Path(file_path), chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+        
+        while True:
+            name = reader.value()
+            if not isinstance(name, str):
+                raise ValueError(f"{file_path}: object key expected at offset {reader.consumed + reader.pos}")
+            reader.expect(':')
+            
+            if name == key and reader.peek() == '[':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield reader.value()
+                        if reader.peek() != ',':
+                            break
+                        reader.pos += 1
+                    reader.expect(']')
+            else:
+                value = reader.value()
+                if others is not None:
+                    others[name] = value
+            
+            if reader.peek() != ',':
+                break
+            reader.pos += 1
+        reader.expect('}')
+
+class StreamedArray:
+    """
+    Array of a JSON file that is read again, one item at a time, on every iteration.
+    
+    Stands in for the parsed list in loaded export data, so consumers that
+    only iterate over it work unchanged.
+    """
+    
+    __slots__ = ('file_path', 'key')
+    
+    def __init__(self, file_path: Path, key: str):
+        """
+        Initialize the array.
+        
+        Args:
+            file_path: JSON file holding the array
+            key: Key of the array in the file's object
+        """
+        self.file_path = Path(file_path)
+        self.key = key
+    
+    def __iter__(self) -> Iterator[Any]:
+        return iter_array_items(self.file_path, self.key)
+    
+    def __repr__(self) -> str:
+        return f"StreamedArray({str(self.file_path)!r}, {self.key!r})"
@@ -0,0 +1,454 @@
+"""
+Model Backends Module
+Interchangeable model backends: Gemini, an in-process fake and a local HTTP stub.
+"""
+
+import json
+import time
+import random
+import asyncio
+import logging
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, List, Union, Tuple, Iterator, Callable
+from token_budget import estimate_request_tokens
+
+# Backend names accepted by create_backend
+BACKEND_NAMES = ['gemini', 'fake', 'http']
+
+# Default response of the fake backend; {request} is the request number
+DEFAULT_FAKE_TEMPLATE = (
+    "# Fake Analysis Report\n\n"
+    "| Priority | Issue | Location | Solution |\n"
+    "|----------|-------|----------|----------|\n"
+    "| Low | Fake finding {request} | Request of {chars} characters | None needed |\n"
+)
+
+# HTTP statuses of the stub server that are retried as transient errors
+TRANSIENT_HTTP_STATUSES = {429, 500, 502, 503, 504}
+
+class TransientError(Exception):
+    """
+    Error worth retrying (rate limit, overload, timeout).
+    
+    Raised by model backends that do not use the google.api_core exception types.
+    """
+
+class ModelResponse:
+    """Response of a non-Gemini backend, with the attributes the clients read."""
+    
+    def __init__(self, text: str, usage_metadata: Optional[Any] = None):
+        self.text = text
+        self.usage_metadata = usage_metadata
+
+class ModelBackend(ABC):
+    """
+    Interface of the model used by GeminiClient and AsyncGeminiClient.
+    
+    generate_content(contents) returns an object with a text attribute;
+    contents is a prompt string or a list of text parts. With stream=True it
+    returns an iterable of such objects, one per chunk. A generation_config
+    (e.g. response_mime_type and response_schema) is only passed when a
+    request sets one. Backends may also
+    provide generate_content_async (otherwise the async client calls
+    generate_content in a worker thread) and count_tokens.
+    
+    Backends supporting context caching also provide create_cached_content,
+    update_cached_content and delete_cached_content, and accept a
+    cached_content name in generate_content (the request contents are then
+    sent after the cached contents).
+    """
+    
+    @abstractmethod
+    def generate_content(self, contents: Union[str, List[str]], stream: bool = False,
+                         generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        """Send a request and return its response (or its chunks when streaming)."""
+
+class GeminiBackend(ModelBackend):
+    """
+    Google Gemini through the google-generativeai SDK.
+    """
+    
+    def __init__(self, api_key: str, model_name: str):
+        """
+        Configure the SDK and create the model.
+        
+        Args:
+            api_key: Gemini API key
+            model_name: Gemini model name
+        """
+        import google.generativeai as genai
+        
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        # Cached-content name -> (CachedContent, model answering with it)
+        self.cached_contents: Dict[str, Tuple[Any, Any]] = {}
+    
+    def generate_content(self, contents: Union[str, List[str]], stream: bool = False,
+                         generation_config: Optional[Dict[str, Any]] = None, cached_content: Optional[str] = None) -> Any:
+        model = self.cached_contents[cached_content][1] if cached_content else self.model
+        return model.generate_content(contents, stream=stream, generation_config=generation_config)
+    
+    async def generate_content_async(self, contents: Union[str, List[str]], generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.model.generate_content_async(contents, generation_config=generation_config)
+    
+    def count_tokens(self, contents: Union[str, List[str]]) -> Any:
+        return self.model.count_tokens(contents)
+    
+    def create_cached_content(self, contents: List[str], ttl_seconds: float, display_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Upload contents to the Gemini cached-content store.
+        
+        Returns:
+            'name', 'expire_time' (Unix timestamp) and 'tokens' of the cached content
+        """
+        import datetime
+        from google.generativeai import caching
+        
+        cached = caching.CachedContent.create(model=self.model_name, display_name=display_name, contents=contents,
+                                              ttl=datetime.timedelta(seconds=ttl_seconds))
+        self.cached_contents[cached.name] = (cached, self.genai.GenerativeModel.from_cached_content(cached_content=cached))
+        return {'name': cached.name, 'expire_time': cached.expire_time.timestamp(), 'tokens': cached.usage_metadata.total_token_count}
+    
+    def update_cached_content(self, name: str, ttl_seconds: float) -> float:
+        """Extend a cached content to expire ttl_seconds from now; returns the new expiry timestamp."""
+        import datetime
+        
+        cached = self.cached_contents[name][0]
+        cached.update(ttl=datetime.timedelta(seconds=ttl_seconds))
+        return cached.expire_time.timestamp()
+    
+    def delete_cached_content(self, name: str) -> None:
+        """Delete a cached content."""
+        cached, _ = self.cached_contents.pop(name)
+        cached.delete()
+
+class FakeBackend(ModelBackend):
+    """
+    Local stand-in for Gemini with configurable latency, failures and responses.
+    
+    Responses come from respond if given, or cycle through the canned
+    responses if any are given, otherwise the template is formatted with
+    {request} (1-based request number), {chars} (request size) and {preview}
+    (first 80 characters of the request).
+    Requests asking for JSON (response_mime_type application/json) get a
+    one-issue report matching structured_report.REPORT_SCHEMA instead.
+    Failures are raised before the latency elapses, like a rejected request.
+    Requests are counted as in flight while their latency elapses.
+    Streamed responses arrive in chunks of chunk_size characters, the first
+    one after first_chunk_latency and the rest spread over the remaining latency.
+    Cached contents are kept in memory until they expire or are deleted;
+    requests referring to one report its tokens as cached_content_token_count.
+    """
+    
+    def __init__(self, responses: Optional[List[str]] = None, template: str = DEFAULT_FAKE_TEMPLATE,
+                 latency: float = 0.0, jitter: float = 0.0, failure_rate: float = 0.0, fail_first: int = 0,
+                 error: type = TransientError, seed: Optional[int] = None, chunk_size: int = 200,
+                 first_chunk_latency: Optional[float] = None, fail_on: Optional[str] = None,
+                 respond: Optional[Callable[[str], str]] = None):
+        """
+        Initialize the fake backend.
+        
+        Args:
+            responses: Canned responses, returned in turn
+            template: Response template used when no canned responses are given
+            latency: Seconds each request takes
+            jitter: Random extra seconds added to the latency (uniform in [0, jitter])
+            failure_rate: Probability that a request fails
+            fail_first: Number of initial requests that fail
+            error: Exception type raised for failed requests
+            seed: Random seed for jitter and failures
+            chunk_size: Characters per chunk of a streamed response
+            first_chunk_latency: Seconds until the first chunk of a streamed response
+                (default: a tenth of the latency)
+            fail_on: Requests containing this text fail
+            respond: Function returning the response to a request's text
+        """
+        self.responses = list(responses or [])
+        self.template = template
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.fail_first = fail_first
+        self.error = error
+        self.random = random.Random(seed)
+        self.chunk_size = max(1, chunk_size)
+        self.first_chunk_latency = first_chunk_latency
+        self.fail_on = fail_on
+        self.respond = respond
+        self.lock = threading.Lock()
+        
+        # Contents and generation config of every request, failed ones included
+        self.calls: List[str] = []
+        self.configs: List[Optional[Dict[str, Any]]] = []
+        self.failures = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        
+        # Cached-content name -> {'text', 'expire_time'}; uploads counts every create_cached_content
+        self.cached_contents: Dict[str, Dict[str, Any]] = {}
+        self.uploads = 0
+    
+    def generate_content(self, contents: Union[str, List[str]], stream: bool = False,
+                         generation_config: Optional[Dict[str, Any]] = None, cached_content: Optional[str] = None) -> Any:
+        delay, response = self._start(contents, generation_config, cached_content)
+        if stream:
+            return self._stream(delay, response)
+        with self._in_flight():
+            time.sleep(delay)
+        return response
+    
+    def _stream(self, delay: float, response: ModelResponse) -> Iterator[ModelResponse]:
+        """Yield a response in chunks over the request's latency."""
+        text = response.text
+        chunks = [text[index:index + self.chunk_size] for index in range(0, len(text), self.chunk_size)]
+        first_delay = min(delay, self.first_chunk_latency if self.first_chunk_latency is not None else delay / 10)
+        with self._in_flight():
+            time.sleep(first_delay)
+            for index, chunk in enumerate(chunks):
+                if index:
+                    time.sleep((delay - first_delay) / max(1, len(chunks) - 1))
+                yield ModelResponse(chunk, response.usage_metadata if index == len(chunks) - 1 else None)
+    
+    async def generate_content_async(self, contents: Union[str, List[str]],
+                                     generation_config: Optional[Dict[str, Any]] = None) -> ModelResponse:
+        delay, response = self._start(contents, generation_config)
+        with self._in_flight():
+            await asyncio.sleep(delay)
+        return response
+    
+    def count_tokens(self, contents: Union[str, List[str]]) -> Any:
+        return SimpleNamespace(total_tokens=estimate_request_tokens(contents))
+    
+    def create_cached_content(self, contents: List[str], ttl_seconds: float, display_name: Optional[str] = None) -> Dict[str, Any]:
+        text = ''.join(contents)
+        with self.lock:
+            self.uploads += 1
+            name = f"cachedContents/fake-{self.uploads}"
+            self.cached_contents[name] = {'text': text, 'expire_time': time.time() + ttl_seconds}
+            return {'name': name, 'expire_time': self.cached_contents[name]['expire_time'], 'tokens': estimate_request_tokens(text)}
+    
+    def update_cached_content(self, name: str, ttl_seconds: float) -> float:
+        with self.lock:
+            cached = self._cached_content(name)
+            cached['expire_time'] = time.time() + ttl_seconds
+            return cached['expire_time']
+    
+    def delete_cached_content(self, name: str) -> None:
+        with self.lock:
+            self._cached_content(name)
+            del self.cached_contents[name]
+    
+    def _cached_content(self, name: str) -> Dict[str, Any]:
+        """Look up a live cached content, failing like the API for unknown or expired ones."""
+        cached = self.cached_contents.get(name)
+        if cached is None or cached['expire_time'] <= time.time():
+            self.cached_contents.pop(name, None)
+            raise ValueError(f"Cached content {name} not found or expired")
+        return cached
+    
+    @contextmanager
+    def _in_flight(self) -> Iterator[None]:
+        """Count a request as in flight, keeping the highest count in max_in_flight."""
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+    
+    def _start(self, contents: Union[str, List[str]], generation_config: Optional[Dict[str, Any]] = None,
+               cached_content: Optional[str] = None) -> Tuple[float, ModelResponse]:
+        """Record a request, raise its failure or return its delay and response."""
+        text = ''.join(contents) if isinstance(contents, list) else contents
+        cached_tokens = 0
+        if cached_content:
+            with self.lock:
+                cached_tokens = estimate_request_tokens(self._cached_content(cached_content)['text'])
+        with self.lock:
+            self.calls.append(text)
+            self.configs.append(generation_config)
+            request = len(self.calls)
+            fails = (request <= self.fail_first or self.random.random() < self.failure_rate
+                     or (self.fail_on is not None and self.fail_on in text))
+            delay = self.latency + self.random.uniform(0, self.jitter) if self.jitter else self.latency
+            if fails:
+                self.failures += 1
+        
+        if fails:
+            raise self.error(f"Fake failure of request {request}")
+        
+        if self.respond:
+            response = self.respond(text)
+        elif self.responses:
+            response = self.responses[(request - 1) % len(self.responses)]
+        elif (generation_config or {}).get('response_mime_type') == 'application/json':
+            response = json.dumps({
+                'summary': f"Fake analysis of request {request}",
+                'issues': [{
+                    'priority': 'Low', 'issue': f"Fake finding {request}", 'flow': None, 'page': None, 'intent': None,
+                    'location': f"Request of {len(text)} characters", 'solution': "None needed"
+                }]
+            })
+        else:
+            response = self.template.format(request=request, chars=len(text), preview=text[:80])
+        prompt_tokens = estimate_request_tokens(text) + cached_tokens
+        response_tokens = estimate_request_tokens(response)
+        usage = SimpleNamespace(prompt_token_count=prompt_tokens, candidates_token_count=response_tokens,
+                                cached_content_token_count=cached_tokens, total_token_count=prompt_tokens + response_tokens)
+        return delay, ModelResponse(response, usage)
+
+class HttpBackend(ModelBackend):
+    """
+    Model served over HTTP, e.g. by FakeModelServer.
+    
+    POSTs {"contents": [...]} (and "generation_config" when set) as JSON and
+    reads {"text": ...}. Rate-limit and server error statuses raise
+    TransientError, so the async client retries them.
+    """
+    
+    def __init__(self, url: str, timeout: float = 300.0):
+        """
+        Initialize the HTTP backend.
+        
+        Args:
+            url: Endpoint URL
+            timeout: Request timeout in seconds
+        """
+        self.url = url
+        self.timeout = timeout
+    
+    def generate_content(self, contents: Union[str, List[str]], stream: bool = False,
+                         generation_config: Optional[Dict[str, Any]] = None) -> Any:
+        response = self._post(contents, generation_config)
+        # The stub answers in one piece; a stream is that single chunk
+        return [response] if stream else response
+    
+    def _post(self, contents: Union[str, List[str]], generation_config: Optional[Dict[str, Any]] = None) -> ModelResponse:
+        """POST a request and parse the answer."""
+        # Imported on use: urllib.request pulls in http.client and email (~20ms at startup)
+        import urllib.error
+        import urllib.request
+        
+        payload = {'contents': contents if isinstance(contents, list) else [contents]}
+        if generation_config:
+            payload['generation_config'] = generation_config
+        body = json.dumps(payload).encode('utf-8')
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                data = json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            if e.code in TRANSIENT_HTTP_STATUSES:
+                raise TransientError(f"HTTP {e.code} from {self.url}") from e
+            raise
+        usage = data.get('usage_metadata')
+        return ModelResponse(data['text'], SimpleNamespace(**usage) if usage else None)
+
+class FakeModelServer:
+    """
+    Local HTTP stub serving a FakeBackend, for load tests across processes.
+    
+    Failed requests are answered with status 503 when the backend raises
+    TransientError and 500 otherwise.
+    """
+    
+    def __init__(self, backend: FakeBackend, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialize the server.
+        
+        Args:
+            backend: Fake backend answering the requests
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free port)
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        self.logger = logging.getLogger(__name__)
+        self.backend = backend
+        logger = self.logger
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    payload = json.loads(self.rfile.read(length).decode('utf-8'))
+                    response = backend.generate_content(payload['contents'], generation_config=payload.get('generation_config'))
+                    usage = vars(response.usage_metadata) if response.usage_metadata else None
+                    self._reply(200, {'text': response.text, 'usage_metadata': usage})
+                except TransientError as e:
+                    self._reply(503, {'error': str(e)})
+                except Exception as e:
+                    self._reply(500, {'error': str(e)})
+            
+            def _reply(self, status: int, data: Dict[str, Any]) -> None:
+                body = json.dumps(data).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+        
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Endpoint URL of the server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/generate"
+    
+    def start(self) -> 'FakeModelServer':
+        """Serve requests in a background thread."""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.logger.info(f"Fake model server listening on {self.url}")
+        return self
+    
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread:
+            self.thread.join()
+    
+    def __enter__(self) -> 'FakeModelServer':
+        return self.start()
+    
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+def create_backend(name: str, api_key: Optional[str] = None, model_name: Optional[str] = None,
+                   url: Optional[str] = None, **fake_options) -> ModelBackend:
+    """
+    Create a model backend by name.
+    
+    Args:
+        name: 'gemini', 'fake' or 'http'
+        api_key: Gemini API key ('gemini')
+        model_name: Gemini model name ('gemini')
+        url: Endpoint URL ('http')
+        fake_options: Keyword arguments of FakeBackend ('fake')
+    
+    Returns:
+        Model backend
+    """
+    if name == 'gemini':
+        return GeminiBackend(api_key, model_name)
+    if name == 'fake':
+        return FakeBackend(**fake_options)
+    if name == 'http':
+        if not url:
+            raise ValueError("The http backend needs a URL")
+        return HttpBackend(url)
+    raise ValueError(f"Unknown model backend '{name}', expected one of {', '.join(BACKEND_NAMES)}")
@@ -0,0 +1,257 @@
+"""
+Response Cache Module
+Content-addressed on-disk cache for Gemini responses.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterable, Union, List, Tuple
+
+# Default cache limits
+DEFAULT_MAX_SIZE_BYTES = 100 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+# Eviction shrinks the cache to this fraction of max_size_bytes, so that the
+# next writes do not immediately trigger another eviction pass
+EVICTION_TARGET_RATIO = 0.9
+
+class ResponseCache:
+    """
+    Caches Gemini responses on disk, keyed by a hash of (model name, prompt, context).
+    
+    Entries are evicted least-recently-used first once the cache grows beyond
+    max_size_bytes, and are ignored once they are older than ttl_seconds.
+    
+    The total size is tracked with a running counter, so writes only scan the
+    cache directory when the counter goes over the limit. Eviction rescans the
+    directory and resynchronizes the counter with entries written by other
+    processes sharing the same cache_dir.
+    """
+    
+    def __init__(self, cache_dir: Union[str, Path], max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES, ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        """
+        Initialize the response cache.
+        
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_size_bytes: Maximum total size of all entries
+            ttl_seconds: Maximum age of an entry (None keeps entries forever)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.writes = 0
+        
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Running totals of the entries on disk
+        self._entry_count = 0
+        self._size_bytes = 0
+        for _, size, _ in self._scan():
+            self._entry_count += 1
+            self._size_bytes += size
+    
+    @staticmethod
+    def make_key(model_name: str, prompt: str, context: Union[str, Iterable[str]]) -> str:
+        """
+        Compute the cache key for a request.
+        
+        The context may be a single string or an iterable of parts; both hash
+        to the same key when the parts join to the same string.
+        
+        Args:
+            model_name: Name of the Gemini model
+            prompt: Analysis prompt
+            context: Context data sent after the prompt
+        
+        Returns:
+            Hex-encoded SHA-256 key
+        """
+        hasher = ResponseCache.key_hasher(model_name, prompt)
+        
+        if isinstance(context, str):
+            context = [context]
+        for part in context:
+            hasher.update(part.encode('utf-8'))
+        
+        return hasher.hexdigest()
+    
+    @staticmethod
+    def key_hasher(model_name: str, prompt: str) -> Any:
+        """
+        Start an incremental cache key computation.
+        
+        Feeding the context to the returned hasher part by part (UTF-8 encoded)
+        and taking hexdigest() gives the same key as make_key, without needing
+        all parts at once.
+        
+        Args:
+            model_name: Name of the Gemini model
+            prompt: Analysis prompt
+        
+        Returns:
+            hashlib SHA-256 object
+        """
+        hasher = hashlib.sha256()
+        hasher.update(model_name.encode('utf-8'))
+        hasher.update(b'\0')
+        hasher.update(prompt.encode('utf-8'))
+        hasher.update(b'\0')
+        return hasher
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+        
+        Args:
+            key: Cache key from make_key
+        
+        Returns:
+            Cached response text, or None on a miss
+        """
+        entry_file = self._entry_path(key)
+        
+        with self._lock:
+            try:
+                with open(entry_file, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+            except Exception as e:
+                self.logger.warning(f"Discarding unreadable cache entry {entry_file}: {e}")
+                self._remove(entry_file)
+                self.misses += 1
+                return None
+            
+            if self.ttl_seconds is not None and time.time() - entry.get('created_at', 0) > self.ttl_seconds:
+                self._remove(entry_file)
+                self.expired += 1
+                self.misses += 1
+                return None
+            
+            # Refresh the modification time, which orders entries for LRU eviction
+            try:
+                os.utime(entry_file)
+            except OSError:
+                pass
+            
+            self.hits += 1
+            return entry['response']
+    
+    def put(self, key: str, response: str, model_name: Optional[str] = None) -> None:
+        """
+        Store a response in the cache.
+        
+        Args:
+            key: Cache key from make_key
+            response: Response text to store
+            model_name: Model that produced the response (informational)
+        """
+        entry_file = self._entry_path(key)
+        entry = {
+            'key': key,
+            'model': model_name,
+            'created_at': time.time(),
+            'response': response
+        }
+        
+        with self._lock:
+            try:
+                previous_size = self._size(entry_file)
+                entry_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_file = entry_file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f, ensure_ascii=False)
+                os.replace(tmp_file, entry_file)
+                self.writes += 1
+                
+                if previous_size:
+                    self._size_bytes -= previous_size
+                else:
+                    self._entry_count += 1
+                self._size_bytes += self._size(entry_file)
+                
+                if self._size_bytes > self.max_size_bytes:
+                    self._evict()
+            
+            except Exception as e:
+                self.logger.error(f"Error writing cache entry {entry_file}: {e}")
+    
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            for entry_file in self.cache_dir.glob("*/*.json"):
+                self._remove(entry_file)
+            self._entry_count = 0
+            self._size_bytes = 0
+    
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size of the cache."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evictions': self.evictions,
+            'writes': self.writes,
+            'entries': self._entry_count,
+            'size_bytes': self._size_bytes
+        }
+    
+    def _entry_path(self, key: str) -> Path:
+        """Path of the file holding a cache entry."""
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def _scan(self) -> List[Tuple[float, int, Path]]:
+        """List (mtime, size, path) of every entry on disk."""
+        entries = []
+        for entry_file in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry_file.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_file))
+        return entries
+    
+    def _evict(self) -> None:
+        """Remove least-recently-used entries until the cache is back under its eviction target."""
+        entries = self._scan()
+        self._entry_count = len(entries)
+        self._size_bytes = sum(size for _, size, _ in entries)
+        
+        target_size = self.max_size_bytes * EVICTION_TARGET_RATIO
+        for _, _, entry_file in sorted(entries, key=lambda entry: entry[0]):
+            if self._size_bytes <= target_size:
+                break
+            self._remove(entry_file)
+            self.evictions += 1
+    
+    def _remove(self, entry_file: Path) -> None:
+        """Delete a cache entry, ignoring entries that are already gone."""
+        size = self._size(entry_file)
+        try:
+            entry_file.unlink()
+        except OSError:
+            return
+        self._entry_count -= 1
+        self._size_bytes -= size
+    
+    def _size(self, entry_file: Path) -> int:
+        """Size of a cache entry, or 0 if it disappeared."""
+        try:
+            return entry_file.stat().st_size
+        except OSError:
+            return 0
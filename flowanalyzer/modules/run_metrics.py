@@ -0,0 +1,214 @@
+"""
+Run Metrics Module
+Per-stage timings, sizes, token usage and cache/retry counters of an analysis run.
+"""
+
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, Iterator, List
+
+RUN_RECORD_VERSION = 1
+
+# Prefix of the Prometheus metric names
+PROMETHEUS_PREFIX = "flowanalyzer"
+
+# Stages recorded by the pipeline, in pipeline order
+PIPELINE_STAGES = ["load", "consolidate", "prompt_build", "llm_call", "report_write", "staging_write"]
+
+class RunMetrics:
+    """
+    Metrics of one analysis run.
+    
+    Stages accumulate their wall time ('seconds', summed over calls, so
+    concurrent LLM calls can add up to more than the run took), their number
+    of calls and any sizes passed to them ('bytes_read', 'bytes_written').
+    Counters hold run-wide totals such as tokens, cache hits and retries.
+    Safe to update from several threads.
+    """
+    
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        """
+        Initialize the metrics.
+        
+        Args:
+            labels: Labels identifying the run (e.g. agent, mode), added to
+                every Prometheus sample
+        """
+        self.logger = logging.getLogger(__name__)
+        self.labels = dict(labels or {})
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self.start = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, float] = {}
+        self.lock = threading.Lock()
+    
+    @contextmanager
+    def stage(self, name: str, **values: float) -> Iterator[None]:
+        """
+        Time a stage; the call and its values are added when the block exits.
+        
+        Args:
+            name: Stage name (see PIPELINE_STAGES)
+            values: Sizes to add to the stage, e.g. bytes_read
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, seconds=time.perf_counter() - start, calls=1, **values)
+    
+    def add_stage(self, name: str, **values: float) -> None:
+        """
+        Add values to a stage without timing it.
+        
+        Args:
+            name: Stage name
+            values: Values to add, e.g. bytes_written
+        """
+        with self.lock:
+            stage = self.stages.setdefault(name, {})
+            for key, value in values.items():
+                stage[key] = stage.get(key, 0) + value
+    
+    def increment(self, name: str, value: float = 1) -> None:
+        """
+        Add to a run-wide counter.
+        
+        Args:
+            name: Counter name, e.g. cache_hits
+            value: Amount to add
+        """
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+    
+    def record_usage(self, usage_metadata: Any) -> None:
+        """
+        Add the token counts of a model response.
+        
+        Args:
+            usage_metadata: usage_metadata of a Gemini (or fake) response; None is ignored
+        """
+        if usage_metadata is None:
+            return
+        self.increment('prompt_tokens', getattr(usage_metadata, 'prompt_token_count', 0) or 0)
+        self.increment('response_tokens', getattr(usage_metadata, 'candidates_token_count', 0) or 0)
+        cached_tokens = getattr(usage_metadata, 'cached_content_token_count', 0) or 0
+        if cached_tokens:
+            self.increment('cached_tokens', cached_tokens)
+    
+    def to_dict(self, status: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the run record.
+        
+        Args:
+            status: Outcome of the run ('success' or 'failure'), None while running
+        
+        Returns:
+            JSON-serializable run record
+        """
+        with self.lock:
+            stages = {name: dict(values) for name, values in self._ordered_stages()}
+            counters = dict(sorted(self.counters.items()))
+        
+        for values in stages.values():
+            values['seconds'] = round(values.get('seconds', 0), 4)
+        
+        return {
+            'version': RUN_RECORD_VERSION,
+            'labels': self.labels,
+            'status': status,
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'seconds': round(time.perf_counter() - self.start, 4),
+            'stages': stages,
+            'counters': counters
+        }
+    
+    def save(self, json_file: Path, status: Optional[str] = None, prometheus_file: Optional[Path] = None) -> Dict[str, Any]:
+        """
+        Save the run record as JSON and, optionally, in Prometheus text format.
+        
+        Args:
+            json_file: Path of the JSON run record
+            status: Outcome of the run
+            prometheus_file: Path of the Prometheus text file (e.g. for the
+                node_exporter textfile collector)
+        
+        Returns:
+            The saved run record
+        """
+        record = self.to_dict(status)
+        
+        Path(json_file).parent.mkdir(parents=True, exist_ok=True)
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(record, f, indent=2, ensure_ascii=False)
+        self.logger.info(f"Run metrics saved to: {json_file}")
+        
+        if prometheus_file:
+            Path(prometheus_file).parent.mkdir(parents=True, exist_ok=True)
+            # Written under a temporary name so a collector never reads a partial file
+            temp_file = Path(str(prometheus_file) + ".tmp")
+            temp_file.write_text(format_prometheus(record), encoding='utf-8')
+            temp_file.replace(prometheus_file)
+            self.logger.info(f"Prometheus metrics saved to: {prometheus_file}")
+        
+        return record
+    
+    def _ordered_stages(self) -> List:
+        """Stages in pipeline order, then any others by name."""
+        order = {name: index for index, name in enumerate(PIPELINE_STAGES)}
+        return sorted(self.stages.items(), key=lambda item: (order.get(item[0], len(order)), item[0]))
+
+def format_prometheus(record: Dict[str, Any], prefix: str = PROMETHEUS_PREFIX) -> str:
+    """
+    Format a run record in the Prometheus text exposition format.
+    
+    Stage values become <prefix>_stage_<value>{stage="..."} samples, counters
+    become <prefix>_<counter>_total, and the run duration and success are gauges.
+    
+    Args:
+        record: Run record from RunMetrics.to_dict
+        prefix: Metric name prefix
+    
+    Returns:
+        Prometheus text
+    """
+    samples: Dict[str, List[str]] = {}
+    types: Dict[str, str] = {}
+    
+    def add(name: str, kind: str, value: float, labels: Dict[str, str]) -> None:
+        all_labels = dict(record['labels'], **labels)
+        label_text = ','.join(f'{key}="{_escape_label(str(val))}"' for key, val in all_labels.items())
+        samples.setdefault(name, []).append(f"{name}{{{label_text}}} {_format_value(value)}" if label_text else f"{name} {_format_value(value)}")
+        types[name] = kind
+    
+    for stage, values in record['stages'].items():
+        for key, value in values.items():
+            name = f"{prefix}_stage_{key}" + ("" if key.endswith('_total') else "_total")
+            add(name, 'counter', value, {'stage': stage})
+    
+    for key, value in record['counters'].items():
+        add(f"{prefix}_{key}_total", 'counter', value, {})
+    
+    add(f"{prefix}_run_seconds", 'gauge', record['seconds'], {})
+    if record['status']:
+        add(f"{prefix}_run_success", 'gauge', 1 if record['status'] == 'success' else 0, {})
+    
+    lines = []
+    for name, name_samples in samples.items():
+        lines.append(f"# TYPE {name} {types[name]}")
+        lines.extend(name_samples)
+    return "\n".join(lines) + "\n"
+
+def _format_value(value: float) -> str:
+    """Format a sample value without losing digits of large counts."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _escape_label(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
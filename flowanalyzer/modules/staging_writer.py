@@ -0,0 +1,269 @@
+"""
+Staging Writer Module
+Writes staging files for review off the request path, optionally compressed.
+"""
+
+import os
+import gzip
+import time
+import queue
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional, List, Callable, Iterator, TextIO
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+# off: no staging files; preview: prompts, context previews and responses;
+# full: also the complete context, stored once per content hash
+STAGING_POLICIES = ['off', 'preview', 'full']
+
+STAGING_COMPRESSIONS = ['none', 'gzip', 'zstd']
+COMPRESSION_SUFFIXES = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+# Subdirectory of the content-addressed context blobs
+BLOB_DIR_NAME = "blobs"
+
+# Characters of context shown in staging files
+PREVIEW_CHARS = 1000
+
+class StagingStream:
+    """Text file written through a StagingWriter, one queued write per call."""
+    
+    def __init__(self, writer: 'StagingWriter', name: str):
+        self.writer = writer
+        self.name = name
+        self.file: Optional[TextIO] = None
+        writer.submit(self._open)
+    
+    def write(self, text: str) -> None:
+        self.writer.submit(lambda: self._write(text))
+    
+    def close(self) -> None:
+        self.writer.submit(self._close)
+    
+    def _open(self) -> None:
+        self.file = self.writer._open_file(self.writer.path(self.name))
+    
+    def _write(self, text: str) -> None:
+        self.file.write(text)
+        # Uncompressed streams can be followed while they are written
+        if self.writer.compression == 'none':
+            self.file.flush()
+    
+    def _close(self) -> None:
+        self.file.close()
+        self.writer._record_file(self.writer.path(self.name))
+
+class StagingWriter:
+    """
+    Writes staging files under a policy, with optional compression.
+    
+    Writes are jobs run in order on a background thread, so formatting and
+    disk I/O never delay the request that produced them; call flush() before
+    reading the files. Errors are logged, never raised: staging is for review
+    only. Complete contexts are stored as blobs named by their content hash and
+    referenced from the staging files, so repeated requests with the same
+    context store it once.
+    """
+    
+    def __init__(self, staging_dir: Path, policy: str = 'preview', compression: str = 'none',
+                 background: bool = True, metrics: Optional[Any] = None):
+        """
+        Initialize the staging writer.
+        
+        Args:
+            staging_dir: Directory of the staging files
+            policy: 'off', 'preview' or 'full' (see STAGING_POLICIES)
+            compression: 'none', 'gzip' or 'zstd' (requires the zstandard package)
+            background: Write on a background thread instead of in the caller
+            metrics: RunMetrics receiving the staging_write stage
+        """
+        if policy not in STAGING_POLICIES:
+            raise ValueError(f"Unknown staging policy '{policy}', expected one of {', '.join(STAGING_POLICIES)}")
+        if compression not in STAGING_COMPRESSIONS:
+            raise ValueError(f"Unknown staging compression '{compression}', expected one of {', '.join(STAGING_COMPRESSIONS)}")
+        if compression == 'zstd' and not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is required for zstd-compressed staging files. Install with: pip install zstandard")
+        
+        self.logger = logging.getLogger(__name__)
+        self.staging_dir = Path(staging_dir)
+        self.policy = policy
+        self.compression = compression
+        self.background = background
+        self.metrics = metrics
+        self.stats = {'files': 0, 'blobs': 0, 'reused_blobs': 0, 'bytes': 0, 'seconds': 0.0, 'errors': 0}
+        
+        self.queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.stored_blobs = set()
+        
+        if self.enabled:
+            self.staging_dir.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether any staging file is written."""
+        return self.policy != 'off'
+    
+    @property
+    def full(self) -> bool:
+        """Whether complete contexts are written."""
+        return self.policy == 'full'
+    
+    def path(self, name: str) -> Path:
+        """Path of a staging file, with the compression suffix."""
+        return self.staging_dir / (name + COMPRESSION_SUFFIXES[self.compression])
+    
+    def submit(self, job: Callable[[], None]) -> None:
+        """
+        Run a write job, on the background thread if enabled.
+        
+        Args:
+            job: Function writing staging files
+        """
+        if not self.background:
+            self._run(job)
+            return
+        
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._worker, name="staging-writer", daemon=True)
+                self.thread.start()
+        self.queue.put(job)
+    
+    @contextmanager
+    def open(self, name: str) -> Iterator[TextIO]:
+        """
+        Open a staging file for writing (call from a write job).
+        
+        Args:
+            name: File name without compression suffix
+        """
+        path = self.path(name)
+        f = self._open_file(path)
+        try:
+            yield f
+        finally:
+            f.close()
+            self._record_file(path)
+    
+    def open_stream(self, name: str) -> StagingStream:
+        """
+        Open a staging file written piece by piece, e.g. a streamed response.
+        
+        Args:
+            name: File name without compression suffix
+        
+        Returns:
+            Stream whose writes are queued like other jobs
+        """
+        return StagingStream(self, name)
+    
+    def store_blob(self, parts: List[str]) -> str:
+        """
+        Store text once per content hash (call from a write job).
+        
+        Args:
+            parts: Text parts, concatenated into the blob
+        
+        Returns:
+            Path of the blob relative to the staging directory
+        """
+        hasher = hashlib.sha256()
+        for part in parts:
+            hasher.update(part.encode('utf-8'))
+        name = f"{BLOB_DIR_NAME}/{hasher.hexdigest()[:16]}.txt"
+        path = self.path(name)
+        reference = str(path.relative_to(self.staging_dir))
+        
+        with self.lock:
+            if name in self.stored_blobs or path.exists():
+                self.stored_blobs.add(name)
+                self.stats['reused_blobs'] += 1
+                return reference
+        
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(path.name + f".{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with self._open_file(temp_path) as f:
+                for part in parts:
+                    f.write(part)
+            os.replace(temp_path, path)
+        except Exception:
+            temp_path.unlink(missing_ok=True)
+            raise
+        size = path.stat().st_size
+        with self.lock:
+            # Only a blob that exists is recorded, so no staging file refers to a missing one
+            self.stored_blobs.add(name)
+            self.stats['blobs'] += 1
+            self.stats['bytes'] += size
+        if self.metrics:
+            self.metrics.add_stage('staging_write', bytes_written=size)
+        return reference
+    
+    def flush(self) -> None:
+        """Wait until every submitted write has finished."""
+        if self.thread is not None:
+            self.queue.join()
+    
+    def close(self) -> None:
+        """Finish the submitted writes and stop the background thread."""
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.thread = None
+    
+    def _worker(self) -> None:
+        """Run queued jobs until the stop marker."""
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                self._run(job)
+            finally:
+                self.queue.task_done()
+    
+    def _run(self, job: Callable[[], None]) -> None:
+        """Run a job, logging instead of raising its errors."""
+        start = time.perf_counter()
+        try:
+            job()
+        except Exception as e:
+            with self.lock:
+                self.stats['errors'] += 1
+            self.logger.error(f"Error writing staging file: {e}")
+        seconds = time.perf_counter() - start
+        with self.lock:
+            self.stats['seconds'] += seconds
+        if self.metrics:
+            self.metrics.add_stage('staging_write', seconds=seconds, calls=1)
+    
+    def _open_file(self, path: Path) -> TextIO:
+        """Open a text file for writing with the configured compression."""
+        if self.compression == 'gzip':
+            # Level 6 writes about as fast as the disk on large contexts at a fraction of the size
+            return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+        if self.compression == 'zstd':
+            return zstandard.open(path, 'wt', encoding='utf-8')
+        return open(path, 'w', encoding='utf-8')
+    
+    def _record_file(self, path: Path) -> None:
+        """Count a finished staging file."""
+        size = path.stat().st_size
+        with self.lock:
+            self.stats['files'] += 1
+            self.stats['bytes'] += size
+        if self.metrics:
+            self.metrics.add_stage('staging_write', bytes_written=size)
+        self.logger.info(f"Staging file saved: {path}")
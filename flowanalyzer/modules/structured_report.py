@@ -0,0 +1,221 @@
+"""
+Structured Report Module
+JSON issue reports requested with a response schema, validated and indexed by flow, page and intent.
+"""
+
+import re
+import json
+from typing import Dict, Any, List, Optional
+
+# Version of the JSON report written to reports/flow_analysis_report.json
+REPORT_VERSION = 1
+
+# Allowed priorities, in sort order
+PRIORITIES = ['High', 'Medium', 'Low']
+
+# Text fields every issue must have
+REQUIRED_FIELDS = ('priority', 'issue', 'location', 'solution')
+
+# Fields naming the export object an issue is in; null when they do not apply
+SCOPE_FIELDS = ('flow', 'page', 'intent')
+
+# Response schema of the analysis request (OpenAPI subset accepted by Gemini)
+REPORT_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'summary': {'type': 'string'},
+        'issues': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': {
+                    'priority': {'type': 'string', 'enum': PRIORITIES},
+                    'issue': {'type': 'string'},
+                    'flow': {'type': 'string', 'nullable': True},
+                    'page': {'type': 'string', 'nullable': True},
+                    'intent': {'type': 'string', 'nullable': True},
+                    'location': {'type': 'string'},
+                    'solution': {'type': 'string'}
+                },
+                'required': list(REQUIRED_FIELDS)
+            }
+        }
+    },
+    'required': ['issues']
+}
+
+# Generation config asking Gemini for JSON matching REPORT_SCHEMA
+GENERATION_CONFIG = {'response_mime_type': 'application/json', 'response_schema': REPORT_SCHEMA}
+
+_CODE_FENCE = re.compile(r'^\s*```(?:json)?\s*\n(.*)\n\s*```\s*$', re.DOTALL)
+
+class ReportValidationError(ValueError):
+    """
+    Raised when a structured response is not JSON or does not match REPORT_SCHEMA.
+    """
+
+def structured_prompt(prompt: str) -> str:
+    """
+    Replace the markdown table output format of an analysis prompt with the JSON format.
+    
+    The schema is spelled out in the prompt as well, so backends without response
+    schema support can follow it, and so the response cache key changes with it.
+    
+    Args:
+        prompt: Analysis prompt ending with an '## Output Format' section
+    
+    Returns:
+        Prompt asking for a JSON report
+    """
+    head = prompt.split("## Output Format", 1)[0].rstrip()
+    return head + f"""
+
+## Output Format
+Return a single JSON object, without markdown, matching this schema:
+
+{json.dumps(REPORT_SCHEMA, indent=2)}
+
+- `issues`: one entry per issue or observation, most important first
+- `priority`: High, Medium or Low
+- `flow`, `page`, `intent`: display names of the flow, page and intent the issue is in, or null when it does not apply
+- `location`: where exactly the issue is (route, handler, parameter, training phrase, ...)
+- `solution`: the concrete change that fixes it
+- `summary`: a short overall assessment of the agent
+"""
+
+def parse_report(text: str) -> Dict[str, Any]:
+    """
+    Parse and validate a structured analysis response.
+    
+    Args:
+        text: Response text; a JSON object, optionally in a ```json code fence
+    
+    Returns:
+        Report with 'summary' and 'issues'; text fields are stripped and empty
+        flow, page and intent fields are None
+    
+    Raises:
+        ReportValidationError: If the text is not JSON or does not match REPORT_SCHEMA
+    """
+    fenced = _CODE_FENCE.match(text)
+    try:
+        data = json.loads(fenced.group(1) if fenced else text)
+    except json.JSONDecodeError as e:
+        raise ReportValidationError(f"Response is not JSON: {e}") from e
+    
+    if not isinstance(data, dict):
+        raise ReportValidationError(f"Response is a JSON {type(data).__name__}, expected an object")
+    if not isinstance(data.get('issues'), list):
+        raise ReportValidationError("issues: expected an array")
+    summary = data.get('summary')
+    if summary is not None and not isinstance(summary, str):
+        raise ReportValidationError("summary: expected a string")
+    
+    issues = []
+    for position, issue in enumerate(data['issues']):
+        if not isinstance(issue, dict):
+            raise ReportValidationError(f"issues[{position}]: expected an object")
+        normalized = {}
+        for field in REQUIRED_FIELDS:
+            value = issue.get(field)
+            if not isinstance(value, str) or not value.strip():
+                raise ReportValidationError(f"issues[{position}].{field}: expected a non-empty string")
+            normalized[field] = value.strip()
+        if normalized['priority'] not in PRIORITIES:
+            raise ReportValidationError(
+                f"issues[{position}].priority: expected one of {', '.join(PRIORITIES)}, got {normalized['priority']!r}"
+            )
+        for field in SCOPE_FIELDS:
+            value = issue.get(field)
+            if value is not None and not isinstance(value, str):
+                raise ReportValidationError(f"issues[{position}].{field}: expected a string or null")
+            normalized[field] = (value or '').strip() or None
+        issues.append(normalized)
+    
+    return {'summary': (summary or '').strip(), 'issues': issues}
+
+def build_report(report: Dict[str, Any], agent: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build the JSON report document: issues sorted by priority plus an index.
+    
+    The index maps each flow, page ("<flow> / <page>"), intent and priority to
+    the positions of its issues, so a dashboard can select the issues of one
+    object without scanning or parsing text.
+    
+    Args:
+        report: Validated report from parse_report
+        agent: Agent name recorded in the document
+    
+    Returns:
+        JSON-serializable report document
+    """
+    issues = sorted(report['issues'], key=lambda issue: PRIORITIES.index(issue['priority']))
+    index = {'flows': {}, 'pages': {}, 'intents': {}, 'priorities': {}}
+    for position, issue in enumerate(issues):
+        if issue['flow']:
+            index['flows'].setdefault(issue['flow'], []).append(position)
+            if issue['page']:
+                index['pages'].setdefault(f"{issue['flow']} / {issue['page']}", []).append(position)
+        if issue['intent']:
+            index['intents'].setdefault(issue['intent'], []).append(position)
+        index['priorities'].setdefault(issue['priority'], []).append(position)
+    
+    return {
+        'version': REPORT_VERSION,
+        'agent': agent,
+        'summary': report['summary'],
+        'counts': {priority: len(index['priorities'].get(priority, [])) for priority in PRIORITIES},
+        'issues': issues,
+        'index': index
+    }
+
+def query_issues(document: Dict[str, Any], flow: Optional[str] = None, page: Optional[str] = None,
+                 intent: Optional[str] = None, priority: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Select issues of a report document through its index.
+    
+    Args:
+        document: Report document from build_report (or loaded from its JSON file)
+        flow: Flow display name
+        page: Page display name (requires flow)
+        intent: Intent display name
+        priority: High, Medium or Low
+    
+    Returns:
+        Issues matching every given filter, in report order
+    """
+    index = document['index']
+    selections = []
+    if flow is not None:
+        selections.append(index['pages'].get(f"{flow} / {page}", []) if page is not None else index['flows'].get(flow, []))
+    if intent is not None:
+        selections.append(index['intents'].get(intent, []))
+    if priority is not None:
+        selections.append(index['priorities'].get(priority, []))
+    
+    if not selections:
+        return list(document['issues'])
+    positions = set(selections[0]).intersection(*selections[1:])
+    return [document['issues'][position] for position in sorted(positions)]
+
+def format_markdown(document: Dict[str, Any]) -> str:
+    """
+    Render a report document as the markdown report.
+    
+    Args:
+        document: Report document from build_report
+    
+    Returns:
+        Markdown report with the summary and the issue table
+    """
+    lines = ["# DialogFlow Flow Analysis Report\n"]
+    if document['summary']:
+        lines.append(f"{document['summary']}\n")
+    lines.append("|Priority|Issue\\Observation|Where the issue is located in |Solution|")
+    lines.append("|--------|-----------------|----------------------------|--------|")
+    for issue in document['issues']:
+        scope = ", ".join(f"{field} {issue[field]}" for field in SCOPE_FIELDS if issue[field])
+        location = f"{issue['location']} ({scope})" if scope and scope not in issue['location'] else issue['location']
+        cells = [issue['priority'], issue['issue'], location, issue['solution']]
+        lines.append("|" + "|".join(cell.replace('|', '\\|').replace('\n', ' ') for cell in cells) + "|")
+    return "\n".join(lines) + "\n"
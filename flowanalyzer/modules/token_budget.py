@@ -0,0 +1,104 @@
+"""
+Token Budget Module
+Local prompt-size estimation and input token budgets for Gemini requests.
+"""
+
+import re
+from typing import Dict, List, Optional, Union
+
+# Rough average of characters per token for JSON-heavy prompts
+CHARS_PER_TOKEN = 4
+
+# Input token limit of the default Gemini model
+DEFAULT_MAX_INPUT_TOKENS = 1_048_576
+
+# Top-level section markers written by DialogFlowFileLoader.create_consolidated_file
+SECTION_MARKER_PATTERN = re.compile(r'^-{50}<(.+) (Begins|Ends)>-{50}$', re.MULTILINE)
+
+# Label of text outside the agent.json/intents/flows/entityTypes sections
+OTHER_SECTION = "other"
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text (about 4 characters per token).
+    
+    Args:
+        text: Text to estimate
+    
+    Returns:
+        Estimated token count
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def estimate_request_tokens(contents: Union[str, List[str]]) -> int:
+    """
+    Roughly estimate the input tokens of a request.
+    
+    Args:
+        contents: Request contents
+    
+    Returns:
+        Estimated token count
+    """
+    if isinstance(contents, str):
+        contents = [contents]
+    return sum(estimate_tokens(part) for part in contents)
+
+class PromptTooLargeError(Exception):
+    """
+    Raised before a request is sent when its input exceeds the token budget.
+    """
+    
+    def __init__(self, request_id: str, tokens: int, budget: int, sections: Optional[Dict[str, int]] = None):
+        self.request_id = request_id
+        self.tokens = tokens
+        self.budget = budget
+        self.sections = sections or {}
+        breakdown = ", ".join(f"{name}: {count:,}" for name, count in self.sections.items())
+        super().__init__(
+            f"Request {request_id} needs about {tokens:,} input tokens, over the budget of {budget:,}"
+            + (f" ({breakdown})" if breakdown else "")
+        )
+
+class SectionTokenCounter:
+    """
+    Estimates tokens per consolidated-file section while the text is collected.
+    
+    Text can be added as one string or as many parts in file order; the
+    current section is carried across parts, so a section split over several
+    parts is counted as one.
+    """
+    
+    def __init__(self):
+        """Initialize an empty counter."""
+        self.sections: Dict[str, int] = {}
+        self._current = OTHER_SECTION
+    
+    def add(self, text: str) -> None:
+        """
+        Count the tokens of the next piece of text.
+        
+        Args:
+            text: Text following everything added before
+        """
+        position = 0
+        for marker in SECTION_MARKER_PATTERN.finditer(text):
+            if marker.group(2) == "Begins":
+                self._count(text[position:marker.start()])
+                self._current = marker.group(1)
+                position = marker.start()
+            else:
+                self._count(text[position:marker.end()])
+                self._current = OTHER_SECTION
+                position = marker.end()
+        self._count(text[position:])
+    
+    def _count(self, text: str) -> None:
+        """Add text to the current section."""
+        if text:
+            self.sections[self._current] = self.sections.get(self._current, 0) + estimate_tokens(text)
+    
+    @property
+    def total(self) -> int:
+        """Estimated tokens of all text added so far."""
+        return sum(self.sections.values())
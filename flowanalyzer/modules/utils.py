@@ -7,12 +7,14 @@ import logging
 from pathlib import Path
 from typing import Optional
 
-def setup_logging(log_dir: Optional[Path] = None) -> None:
+def setup_logging(log_dir: Optional[Path] = None, console: bool = True, force: bool = False) -> None:
     """
     Setup logging configuration.
     
     Args:
         log_dir: Directory for log files
+        console: Also log to the console
+        force: Replace an existing configuration (by default the first call wins)
     """
     # Create log directory if specified
     if log_dir:
@@ -26,9 +28,10 @@ def setup_logging(log_dir: Optional[Path] = None) -> None:
         level=logging.INFO,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         handlers=[
-            logging.StreamHandler(),
+            logging.StreamHandler() if console else logging.NullHandler(),
             logging.FileHandler(log_file) if log_file else logging.NullHandler()
-        ]
+        ],
+        force=force
     )
 
 def create_output_directories(output_path: Path) -> None:
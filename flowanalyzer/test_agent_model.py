@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the typed agent model.
+"""
+
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from agent_model import AgentModel
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def test_indexes():
+    """Pages, routes, intents and entity synonyms are looked up by name."""
+    model = DialogFlowFileLoader().load_model(FLOW_PATH)
+    
+    assert model.start_flow == 'Default Start Flow'
+    page = model.page('Default Start Flow', 'Confirm Location')
+    assert page.name == 'Confirm Location' and page.flow == 'Default Start Flow'
+    assert page.routes_by_intent['small_talk.confirmation.yes'][0].target_page == 'Drop Off Location'
+    assert 'small_talk.confirmation.no' in page.intents
+    assert model.page('Default Start Flow', 'Missing') is None
+    
+    start = model.page('Default Start Flow', AgentModel.START_PAGE_NAME)
+    assert start.routes_by_intent['car_rental.reservation_create'][0].target_page == 'Pickup Location'
+    assert any(handler.event == 'sys.no-match-default' for handler in start.event_handlers)
+    
+    payment = model.page('Default Start Flow', 'Payment')
+    assert [parameter.name for parameter in payment.form][:2] == ['card_type', 'card_number']
+    assert payment.condition_routes[0].condition == '$page.params.status = "FINAL"'
+    
+    rental_duration = model.page('Default Start Flow', 'Confirm Rental Duration')
+    no_route = rental_duration.routes_by_intent['small_talk.confirmation.no'][0]
+    assert ('pickup_location', None) in no_route.parameter_actions
+    
+    assert ('Default Start Flow', 'Confirm Location') in model.pages_by_intent['small_talk.confirmation.yes']
+    assert 'pickup_location' in model.intents['car_rental.reservation_create'].parameters
+    assert model.intents['car_rental.reservation_create'].training_phrases['en']
+    assert model.entity_value('@vehicle_model', 'chevy') == 'Chevrolet Tahoe'
+    assert model.entity_value('vehicle_model', 'unknown car') is None
+
+def test_smaller_than_dict_trees():
+    """The model takes much less memory than the loaded dict trees."""
+    loader = DialogFlowFileLoader()
+    
+    tracemalloc.start()
+    export_data = loader.load_export(FLOW_PATH)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    model = AgentModel.from_export(export_data)
+    del export_data
+    model_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    assert model.flows
+    assert model_bytes * 2 < dict_bytes
+
+if __name__ == "__main__":
+    test_indexes()
+    test_smaller_than_dict_trees()
+    print("All agent model tests passed")
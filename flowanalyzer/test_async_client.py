@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the async Gemini client.
+Uses a local fake model, so no API key or network access is needed.
+"""
+
+import os
+import sys
+import time
+import asyncio
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient, RateLimiter, TransientError
+from flow_analyzer import FlowAnalyzer
+from model_backends import FakeBackend
+
+def test_concurrency_is_bounded():
+    """No more than max_concurrency requests are in flight at once."""
+    model = FakeBackend(latency=0.05)
+    client = AsyncGeminiClient(GeminiClient(model=model), max_concurrency=3)
+    
+    requests = [("prompt", f"context {i}", f"request_{i}") for i in range(12)]
+    results = asyncio.run(client.analyze_many(requests))
+    
+    assert len(results) == 12
+    assert len(model.calls) == 12
+    assert model.max_in_flight == 3
+
+def test_transient_errors_are_retried():
+    """Transient errors are retried with backoff until the request succeeds."""
+    model = FakeBackend(template="analysis of request {request}", fail_first=2)
+    client = AsyncGeminiClient(GeminiClient(model=model), max_retries=3, base_delay=0.01)
+    
+    result = asyncio.run(client.analyze_text("prompt", "context", "retry_test"))
+    
+    assert result.startswith("analysis of")
+    assert len(model.calls) == 3
+    assert client.stats['retries'] == 2
+
+def test_retries_give_up_after_max_retries():
+    """The last transient error is raised once the retries are used up."""
+    model = FakeBackend(fail_first=5)
+    client = AsyncGeminiClient(GeminiClient(model=model), max_retries=1, base_delay=0.01)
+    
+    try:
+        asyncio.run(client.analyze_text("prompt", "context", "give_up_test"))
+        raise AssertionError("expected TransientError")
+    except TransientError:
+        pass
+    
+    assert len(model.calls) == 2
+    assert client.stats['failures'] == 1
+
+def test_rate_limiter_spaces_requests():
+    """A 600 requests/minute budget lets a burst of 600 through, then 10 per second."""
+    async def run():
+        limiter = RateLimiter(requests_per_minute=600)
+        start = time.monotonic()
+        for _ in range(600):
+            await limiter.acquire()
+        burst = time.monotonic() - start
+        for _ in range(3):
+            await limiter.acquire()
+        return burst, time.monotonic() - start
+    
+    burst, elapsed = asyncio.run(run())
+    assert burst < 0.2
+    assert 0.25 <= elapsed < 1.0
+
+def test_rate_limiter_spaces_tokens():
+    """A 6000 tokens/minute budget admits 6000 tokens at once, then 100 per second."""
+    async def run():
+        limiter = RateLimiter(tokens_per_minute=6000)
+        start = time.monotonic()
+        await limiter.acquire(4000)
+        await limiter.acquire(2000)
+        burst = time.monotonic() - start
+        await limiter.acquire(50)
+        return burst, time.monotonic() - start
+    
+    burst, elapsed = asyncio.run(run())
+    assert burst < 0.1
+    assert 0.4 <= elapsed < 1.0
+
+def test_rate_limiter_admits_oversized_request():
+    """A request larger than the whole token budget is let through once the bucket is full."""
+    async def run():
+        limiter = RateLimiter(tokens_per_minute=6000)
+        start = time.monotonic()
+        await limiter.acquire(10000)
+        return time.monotonic() - start
+    
+    assert asyncio.run(run()) < 0.1
+
+def test_reduce_request_uses_async_client():
+    """The map-reduce reduce request goes through the async client's retries."""
+    model = FakeBackend(template="analysis of request {request}")
+    client = AsyncGeminiClient(GeminiClient(model=model), max_retries=3, base_delay=0.01)
+    analyzer = FlowAnalyzer(client.gemini_client, client)
+    export_data = {
+        'agent': {},
+        'intents': {'greet': {}, 'bye': {}},
+        'flows': {'Main': {'config': {'transitionRoutes': [{'intent': 'greet'}]}}},
+        'entity_types': {}
+    }
+    
+    # The two map requests succeed, the reduce request fails once and is retried
+    original = model.generate_content_async
+    async def fail_reduce_once(contents, generation_config=None):
+        if "Merge Per-Flow Reports" in contents and not client.stats['retries']:
+            raise TransientError("503 Service Unavailable")
+        return await original(contents, generation_config)
+    model.generate_content_async = fail_reduce_once
+    
+    report = analyzer.analyze_map_reduce(export_data)
+    
+    assert report.startswith("analysis of")
+    assert client.stats['requests'] == 4
+    assert client.stats['retries'] == 1
+
+if __name__ == "__main__":
+    test_concurrency_is_bounded()
+    test_transient_errors_are_retried()
+    test_retries_give_up_after_max_retries()
+    test_rate_limiter_spaces_requests()
+    test_rate_limiter_spaces_tokens()
+    test_rate_limiter_admits_oversized_request()
+    test_reduce_request_uses_async_client()
+    print("All async client tests passed")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Offline tests for batch analysis of several exports.
+Uses fake workers, so no API key or network access is needed.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from batch_runner import BatchRunner, BatchCheckpoint, discover_exports
+
+def fake_worker(flow_path, output_path):
+    """Pretend to analyze an export; exports with a FAIL file fail."""
+    if Path(flow_path, 'FAIL').exists():
+        raise RuntimeError(f"cannot analyze {Path(flow_path).name}")
+    Path(output_path).mkdir(parents=True, exist_ok=True)
+    report = Path(output_path, 'report.md')
+    report.write_text(f"report of {flow_path} from process {os.getpid()}", encoding='utf-8')
+    return {'analysis_report': str(report)}
+
+def make_exports(root, names):
+    """Create minimal export directories."""
+    for name in names:
+        Path(root, name).mkdir(parents=True)
+        Path(root, name, 'agent.json').write_text('{}', encoding='utf-8')
+
+def test_discover_exports():
+    """Exports are found in a directory or read from a manifest."""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_exports(Path(tmp, 'exports'), ['b', 'a'])
+        Path(tmp, 'exports', 'not_an_export').mkdir()
+        assert list(discover_exports(Path(tmp, 'exports'))) == ['a', 'b']
+        
+        manifest = Path(tmp, 'agents.txt')
+        manifest.write_text("# nightly\nexports/b\n\n" + str(Path(tmp, 'exports', 'a')) + "\n", encoding='utf-8')
+        exports = discover_exports(manifest)
+        assert list(exports) == ['b', 'a']
+        assert exports['b'] == Path(tmp, 'exports', 'b')
+        
+        manifest.write_text("exports/a\nexports/a/\n", encoding='utf-8')
+        try:
+            discover_exports(manifest)
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+
+def test_failed_run_resumes():
+    """Completed agents are skipped on the next run and failed ones are retried."""
+    with tempfile.TemporaryDirectory() as tmp:
+        exports_dir = Path(tmp, 'exports')
+        make_exports(exports_dir, ['a', 'b', 'c'])
+        Path(exports_dir, 'b', 'FAIL').touch()
+        output_path = Path(tmp, 'out')
+        
+        summary = BatchRunner(output_path, fake_worker, processes=1).run(discover_exports(exports_dir))
+        assert (summary['completed'], summary['failed'], summary['skipped']) == (2, 1, 0)
+        assert "cannot analyze b" in summary['results']['b']['error']
+        assert Path(output_path, 'a', 'report.md').exists()
+        
+        checkpoint = BatchCheckpoint.load(output_path / 'batch_checkpoint.json')
+        assert checkpoint.agents['a']['status'] == 'completed'
+        assert checkpoint.agents['b']['status'] == 'failed'
+        
+        Path(exports_dir, 'b', 'FAIL').unlink()
+        summary = BatchRunner(output_path, fake_worker, processes=1).run(discover_exports(exports_dir))
+        assert (summary['completed'], summary['failed'], summary['skipped']) == (1, 0, 2)
+        assert json.loads(Path(output_path, 'batch_summary.json').read_text(encoding='utf-8')) == summary
+        
+        summary = BatchRunner(output_path, fake_worker, processes=1, resume=False).run(discover_exports(exports_dir))
+        assert (summary['completed'], summary['skipped']) == (3, 0)
+
+def test_process_pool():
+    """Agents run in worker processes, each into its own output directory."""
+    with tempfile.TemporaryDirectory() as tmp:
+        make_exports(Path(tmp, 'exports'), ['a', 'b', 'c', 'd'])
+        Path(tmp, 'exports', 'c', 'FAIL').touch()
+        output_path = Path(tmp, 'out')
+        
+        summary = BatchRunner(output_path, fake_worker, processes=2).run(discover_exports(Path(tmp, 'exports')))
+        assert (summary['completed'], summary['failed']) == (3, 1)
+        
+        for name in ('a', 'b', 'd'):
+            report = Path(summary['results'][name]['results']['analysis_report']).read_text(encoding='utf-8')
+            assert report.startswith(f"report of {Path(tmp, 'exports', name)}")
+            assert not report.endswith(f"process {os.getpid()}")
+
+if __name__ == "__main__":
+    test_discover_exports()
+    test_failed_run_resumes()
+    test_process_pool()
+    print("All batch runner tests passed")
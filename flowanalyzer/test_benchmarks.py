@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the synthetic export generator and the benchmark suite.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the modules and benchmarks directories to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+from file_loader import DialogFlowFileLoader
+from export_manifest import ExportManifest
+from flow_graph import FlowGraph
+from synthetic_export import generate_export, START_FLOW_NAME
+from run_benchmarks import run_scale, compare
+
+def test_generated_export_layout():
+    """The export has the requested size and a well-formed flow graph."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = Path(tmp) / "export"
+        stats = generate_export(flow_path, flows=3, pages=4, intents=5, phrases=6, entity_types=2, entity_values=3, synonyms=2)
+        
+        assert stats['files'] == 1 + 3 * (1 + 4) + 5 * 2 + 2 * 2
+        export_data = DialogFlowFileLoader().load_export(flow_path)
+        assert export_data['agent']['startFlow'] == START_FLOW_NAME
+        assert len(export_data['flows']) == 3
+        assert all(len(flow['pages']) == 4 for flow in export_data['flows'].values())
+        assert len(export_data['intents']) == 5
+        assert all(len(intent['training_phrases']['en']['trainingPhrases']) == 6 for intent in export_data['intents'].values())
+        assert len(export_data['entity_types']['entity_000']['entities']['en']['entities']) == 3
+        
+        report = FlowGraph(export_data).report()
+        assert report['pages'] == 12
+        assert not report['unreachable_pages'] and not report['missing_pages'] and not report['missing_intents']
+        
+        model = DialogFlowFileLoader().load_model(flow_path)
+        assert model.start_flow == START_FLOW_NAME
+        assert model.entity_value('entity_001', 'entity_001 value 2') == 'entity_001 value 2'
+
+def test_generator_is_deterministic():
+    """The same seed writes the same files."""
+    with tempfile.TemporaryDirectory() as tmp:
+        manifests = []
+        for name in ("a", "b"):
+            generate_export(Path(tmp) / name, seed=7)
+            manifests.append(ExportManifest.scan(Path(tmp) / name))
+        assert manifests[0].changed_files(manifests[1]) == set()
+
+def test_run_scale_and_compare():
+    """Every stage is measured, and slower or bigger stages are reported as regressions."""
+    results = {'scales': {'small': run_scale('small', 1, flows=1, pages=2, intents=3, phrases=2)}}
+    stages = results['scales']['small']['stages']
+    assert set(stages) >= {'load', 'consolidate_raw', 'serialize_compact', 'analyze', 'analyze_map_reduce'}
+    assert all(measurement['seconds'] > 0 and measurement['peak_bytes'] > 0 for measurement in stages.values())
+    
+    assert compare(results, results, 0.25) == []
+    baseline = {'scales': {'small': {'stages': {'load': dict(stages['load'], seconds=stages['load']['seconds'] / 2)}}}}
+    regressions = compare(results, baseline, 0.25)
+    assert len(regressions) == 1 and regressions[0].startswith('small/load seconds')
+
+if __name__ == "__main__":
+    test_generated_export_layout()
+    test_generator_is_deterministic()
+    test_run_scale_and_compare()
+    print("All benchmark tests passed")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the CLI subcommands and the lazy imports behind fast startup.
+"""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from pathlib import Path
+
+# Add the modules and benchmarks directories to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+from synthetic_export import generate_export
+from startup_time import measure_imports, compare
+
+ANALYZER = Path(os.path.dirname(os.path.abspath(__file__))) / "analyzer.py"
+FLOW_PATH = ANALYZER.parent.parent / "Flow"
+
+def run_cli(*arguments: str, cwd: str = None) -> subprocess.CompletedProcess:
+    """Run analyzer.py without an API key."""
+    env = dict(os.environ, GEMINI_API_KEY="")
+    return subprocess.run([sys.executable, "-W", "ignore", str(ANALYZER), *arguments],
+                          capture_output=True, text=True, cwd=cwd, env=env)
+
+def test_import_skips_heavy_modules():
+    """Importing analyzer imports neither the Gemini SDK, grpc nor numpy."""
+    results = measure_imports()
+    assert results['heavy_modules'] == []
+    assert compare(dict(results, commands={}), None, 0.25) == []
+
+def test_client_builds_model_lazily():
+    """A Gemini client with an API key does not import the SDK until the model is used."""
+    code = (
+        "import sys; sys.path.insert(0, 'modules')\n"
+        "from gemini_client import GeminiClient\n"
+        "client = GeminiClient(api_key='unused')\n"
+        "print('google.generativeai' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True,
+                            cwd=ANALYZER.parent, check=True)
+    assert result.stdout.strip() == "False"
+
+def test_validate_exit_status():
+    """validate passes a clean export and fails one with a missing page reference."""
+    result = run_cli("validate", str(FLOW_PATH))
+    assert result.returncode == 0, result.stdout
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = Path(tmp) / "export"
+        generate_export(flow_path, flows=1, pages=3, intents=2, phrases=2, entity_types=1, entity_values=2, synonyms=1)
+        page_file = next((flow_path / "flows").glob("*/pages/*.json"))
+        page = json.loads(page_file.read_text(encoding='utf-8'))
+        page['transitionRoutes'][0]['targetPage'] = "Missing Page"
+        page_file.write_text(json.dumps(page), encoding='utf-8')
+        
+        result = run_cli("validate", str(flow_path))
+        assert result.returncode == 1
+        assert "Missing Page" in result.stdout and "1 error(s)" in result.stdout
+        assert not (Path(tmp) / "output").exists()
+
+def test_consolidate_and_legacy_invocation():
+    """consolidate only writes the consolidated file; arguments without a subcommand still analyze."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_cli("consolidate", str(FLOW_PATH), "-o", "out", cwd=tmp)
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert (Path(tmp) / "out" / "consolidated_dialogflow_data.txt").exists()
+        assert not (Path(tmp) / "out" / "reports" / "flow_analysis_report.md").exists()
+        
+        result = run_cli(str(FLOW_PATH), "-o", "legacy", "--backend", "fake", cwd=tmp)
+        assert result.returncode == 0, result.stdout + result.stderr
+        assert (Path(tmp) / "legacy" / "reports" / "flow_analysis_report.md").exists()
+
+def test_replay_subcommand():
+    """replay writes the replay report of the sample export, whose test cases all pass."""
+    with tempfile.TemporaryDirectory() as tmp:
+        result = run_cli("replay", str(FLOW_PATH), "-o", "out", "--no-snapshot", cwd=tmp)
+        assert result.returncode == 0, result.stdout + result.stderr
+        report = json.loads((Path(tmp) / "out" / "reports" / "test_case_replay.json").read_text(encoding='utf-8'))
+        assert report['failed'] == 0 and report['passed'] > 0
+        assert not (Path(tmp) / "out" / "reports" / "flow_analysis_report.md").exists()
+
+if __name__ == "__main__":
+    test_import_skips_heavy_modules()
+    test_client_builds_model_lazily()
+    test_validate_exit_status()
+    test_consolidate_and_legacy_invocation()
+    test_replay_subcommand()
+    print("All CLI tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the compact consolidated format.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from compact_format import compact_data, compact_json
+from gemini_client import GeminiClient
+from model_backends import FakeBackend
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def test_compact_data():
+    """Boilerplate fields are dropped and training phrases collapse to strings."""
+    data = {
+        'trainingPhrases': [
+            {'id': '0b5b3b4c-8a35-4c2e-9f0a-3d1f0c2b7e11', 'parts': [{'text': 'drop off in '}, {'text': 'Kanab', 'parameterId': 'city', 'auto': True}], 'repeatCount': 1, 'languageCode': 'en'},
+            {'parts': [{'text': 'hi'}], 'repeatCount': 3}
+        ],
+        'name': 'small_talk',
+        'entryFulfillment': {},
+        'parameters': [{'id': 'city', 'entityType': '@sys.geo-city'}]
+    }
+    
+    assert compact_data(data) == {
+        'trainingPhrases': ['drop off in [Kanab](city)', 'hi (x3)'],
+        'name': 'small_talk',
+        'parameters': [{'id': 'city', 'entityType': '@sys.geo-city'}]
+    }
+    assert compact_json({'a': [1, 2], 'b': 'é'}) == '{"a":[1,2],"b":"é"}'
+
+def test_compact_consolidated_file():
+    """The compact file keeps the section layout, is smaller and reports both sizes."""
+    loader = DialogFlowFileLoader()
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_dir, compact_dir = Path(tmp, 'raw'), Path(tmp, 'compact')
+        raw_dir.mkdir()
+        compact_dir.mkdir()
+        
+        raw_file = loader.create_consolidated_file(FLOW_PATH, raw_dir)
+        raw_stats = loader.consolidation_stats
+        compact_file = loader.create_consolidated_file(FLOW_PATH, compact_dir, compact=True)
+        compact_stats = loader.consolidation_stats
+        
+        assert raw_stats['format'] == 'raw' and compact_stats['format'] == 'compact'
+        assert raw_stats['source_bytes'] == compact_stats['source_bytes'] > 0
+        assert compact_stats['output_bytes'] == Path(compact_file).stat().st_size
+        assert compact_stats['output_bytes'] < raw_stats['source_bytes'] < raw_stats['output_bytes']
+        
+        raw_sections = [(s.section, s.name) for s in loader.iter_consolidated_sections(raw_file)]
+        compact_sections = [(s.section, s.name) for s in loader.iter_consolidated_sections(compact_file)]
+        assert raw_sections == compact_sections
+        
+        text = Path(compact_file).read_text(encoding='utf-8')
+        assert '"languageCode"' not in text and '"repeatCount":1' not in text
+        # Every embedded file is still valid JSON
+        for line in text.splitlines():
+            if line.startswith('{'):
+                json.loads(line)
+
+def test_sections_reproduce_consolidated_file():
+    """Joined sections are the file byte for byte, and the raw file holds every export file verbatim."""
+    loader = DialogFlowFileLoader()
+    with tempfile.TemporaryDirectory() as tmp:
+        for compact in (False, True):
+            output_dir = Path(tmp, 'compact' if compact else 'raw')
+            output_dir.mkdir()
+            consolidated_file = loader.create_consolidated_file(FLOW_PATH, output_dir, compact=compact)
+            
+            content = Path(consolidated_file).read_bytes().decode('utf-8')
+            sections = list(loader.iter_consolidated_sections(consolidated_file))
+            assert ''.join(section.text for section in sections) == content
+            assert sum(1 for section in sections if section.name) > 0
+        
+        raw_content = Path(tmp, 'raw', 'consolidated_dialogflow_data.txt').read_bytes().decode('utf-8')
+        for source_file in (FLOW_PATH / "intents").glob("*/trainingPhrases/*.json"):
+            assert source_file.read_bytes().decode('utf-8') in raw_content
+        
+        # A streamed context reaches the model exactly as the loaded file does
+        backend = FakeBackend(responses=["report"])
+        client = GeminiClient(model=backend)
+        raw_file = str(Path(tmp, 'raw', 'consolidated_dialogflow_data.txt'))
+        client.analyze_consolidated_data("prompt", loader.load_consolidated_data(raw_file), "loaded")
+        client.analyze_consolidated_data("prompt", (section.text for section in loader.iter_consolidated_sections(raw_file)), "streamed")
+        assert backend.calls[0] == backend.calls[1] and raw_content in backend.calls[1]
+
+if __name__ == "__main__":
+    test_compact_data()
+    test_compact_consolidated_file()
+    test_sections_reproduce_consolidated_file()
+    print("All compact format tests passed")
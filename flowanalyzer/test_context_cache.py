@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the cached analysis context shared by the report and follow-up questions.
+Uses a local fake model, so no API key or network access is needed.
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+from gemini_client import GeminiClient
+from flow_analyzer import FlowAnalyzer
+from model_backends import FakeBackend, FakeModelServer, HttpBackend
+from response_cache import ResponseCache
+from analyzer import DialogFlowAnalyzer
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+DATA = "consolidated data " * 500
+
+def test_context_uploaded_once():
+    """The prompt and data are uploaded once; every request only sends its question."""
+    backend = FakeBackend(template="answer {request}")
+    analyzer = FlowAnalyzer(GeminiClient(model=backend))
+    
+    report, answers, stats = analyzer.analyze_flow_with_context(DATA, {'q1': "First question?", 'q2': "Second question?"})
+    
+    assert report == "answer 1" and answers == {'q1': "answer 2", 'q2': "answer 3"}
+    assert backend.uploads == 1 and backend.cached_contents == {}
+    assert all(DATA not in call for call in backend.calls)
+    assert "Second question?" in backend.calls[2]
+    assert stats['deleted'] is not None and not stats['cached']
+    assert stats['totals']['model_requests'] == 3
+    assert all(use['cached'] and use['cached_tokens'] > 1000 and use['uncached_tokens'] < 50 for use in stats['uses'])
+    assert stats['totals']['input_tokens_saved'] == round(stats['totals']['cached_tokens'] * 0.75)
+
+def test_expired_context_is_uploaded_again():
+    """A context past its lifetime cannot be extended and is uploaded again before the next request."""
+    backend = FakeBackend(template="answer {request}")
+    client = GeminiClient(model=backend)
+    context = client.create_context("prompt", DATA, ttl_seconds=0.05)
+    
+    client.analyze_with_context(context, "First?", request_id="first")
+    time.sleep(0.1)
+    assert client.analyze_with_context(context, "Second?", request_id="second") == "answer 2"
+    assert backend.uploads == 2 and len(context.uploads) == 2
+    
+    client.delete_context(context)
+    assert backend.cached_contents == {} and not context.cached
+
+def test_backend_without_caching_sends_full_context():
+    """Backends without cached contents get the full context with every question."""
+    backend = FakeBackend(template="answer {request}")
+    with FakeModelServer(backend) as server:
+        client = GeminiClient(model=HttpBackend(server.url))
+        context = client.create_context("prompt", DATA)
+        
+        client.analyze_with_context(context, "First?", request_id="first")
+        client.analyze_with_context(context, "Second?", request_id="second")
+        client.delete_context(context)
+    
+    assert backend.uploads == 0
+    assert all(DATA in call for call in backend.calls) and backend.calls[1].endswith("Second?")
+    assert context.stats()['name'] is None and context.stats()['totals']['cached_tokens'] == 0
+
+def test_response_cache_hits_skip_upload():
+    """When every answer is in the response cache the context is never uploaded."""
+    with tempfile.TemporaryDirectory() as tmp:
+        first = FakeBackend(template="answer {request}")
+        FlowAnalyzer(GeminiClient(model=first, cache=ResponseCache(tmp))).analyze_flow_with_context(DATA, {'q': "Question?"})
+        
+        second = FakeBackend(template="other {request}")
+        report, answers, stats = FlowAnalyzer(GeminiClient(model=second, cache=ResponseCache(tmp))).analyze_flow_with_context(
+            DATA, {'q': "Question?"}
+        )
+        assert (report, answers['q']) == ("answer 1", "answer 2")
+        assert second.uploads == 0 and second.calls == []
+        assert stats['totals']['response_cache_hits'] == 2 and stats['totals']['storage_token_hours'] == 0.0
+
+def test_analyzer_saves_answers_and_stats():
+    """A full run with follow-up and per-flow questions saves the answers and the context stats."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = DialogFlowAnalyzer(str(FLOW_PATH), tmp, backend='fake', use_cache=False, context_cache=True,
+                                      follow_up_questions=["Which intents lack phrases?"], flow_questions=True)
+        results = analyzer.run_full_analysis()
+        
+        answers = Path(results['follow_up_answers']).read_text(encoding='utf-8')
+        assert "## Question 1" in answers and "## Flow: Default Start Flow" in answers
+        with open(results['context_cache'], 'r', encoding='utf-8') as f:
+            stats = json.load(f)
+        assert stats['totals']['model_requests'] == len(analyzer.gemini_client.model.calls) == 3
+        assert analyzer.gemini_client.model.uploads == 1
+
+if __name__ == "__main__":
+    test_context_uploaded_once()
+    test_expired_context_is_uploaded_again()
+    test_backend_without_caching_sends_full_context()
+    test_response_cache_hits_skip_upload()
+    test_analyzer_saves_answers_and_stats()
+    print("All context cache tests passed")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the local entity coverage check.
+"""
+
+import os
+import re
+import sys
+import json
+import random
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+from entity_matcher import EntityMatcher, SynonymAutomaton, format_findings, fold_text
+from analyzer import DialogFlowAnalyzer
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def make_entity_type(name, entries, kind='KIND_MAP'):
+    """Build an entity type as returned by DialogFlowFileLoader.load_entity_types."""
+    return {
+        'config': {'displayName': name, 'kind': kind},
+        'entities': {'en': {'entities': [{'value': value, 'synonyms': synonyms} for value, synonyms in entries]}}
+    }
+
+def make_intent(name, parameters, *phrases):
+    """Build an intent; phrase parts are text or (text, parameter id) tuples."""
+    return {
+        'config': {'displayName': name, 'parameters': [{'id': id_, 'entityType': f"@{type_}"} for id_, type_ in parameters]},
+        'training_phrases': {'en': {'trainingPhrases': [
+            {'parts': [{'text': part} if isinstance(part, str) else {'text': part[0], 'parameterId': part[1]} for part in phrase]}
+            for phrase in phrases
+        ]}}
+    }
+
+ENTITY_TYPES = {
+    'vehicle': make_entity_type('vehicle', [('suv', ["SUV ", "sport utility vehicle"]), ('sedan', ["sedan", "car"]), ('van', ["van"])]),
+    'model': make_entity_type('model', [('tahoe', ["Tahoe", "SUV"]), ('versa', ["versa"])]),
+    'plate': make_entity_type('plate', [('[A-Z]{3}', ["[A-Z]{3}"])], kind='KIND_REGEXP')
+}
+
+INTENTS = {
+    'rent': make_intent('rent', [('vehicle', 'vehicle')],
+                        ["i want a ", ("sport utility vehicle", 'vehicle')],
+                        ["rent a car for my scar-free trip"]),
+    'chat': make_intent('chat', [], ["is a TAHOE an SUV?"])
+}
+
+TEST_CASES = {
+    'case': {'displayName': "Rent", 'testCaseConversationTurns': [
+        {'userInput': {'input': {'text': {'text': "a  Versa please"}, 'languageCode': 'en'}}},
+        {'userInput': {'input': {'event': {'event': "welcome"}}}}
+    ]}
+}
+
+def test_matches_and_findings():
+    """Matches respect word boundaries, shared synonyms and missing annotations are reported."""
+    matcher = EntityMatcher(ENTITY_TYPES)
+    assert [(match['text'], match['start']) for match in matcher.annotate("Is a TAHOE an SUV? scar, Sedans, car")] == \
+        [("TAHOE", 5), ("SUV", 14), ("car", 33)]
+    
+    report = matcher.analyze(INTENTS, TEST_CASES)
+    assert report['entity_types'] == 2 and report['phrases'] == 3 and report['test_inputs'] == 1
+    assert report['matched_phrases'] == 3 and report['matched_test_inputs'] == 1
+    assert [(shared['synonym'], shared['across_entity_types']) for shared in report['shared_synonyms']] == [('suv', True)]
+    assert report['missing_annotations'] == [
+        {'intent': 'rent', 'phrase': "rent a car for my scar-free trip", 'text': "car", 'entity_type': 'vehicle', 'value': 'sedan'}
+    ]
+    assert report['unmatched_values'] == {'vehicle': ['van']}
+    assert report['test_input_matches'][0]['matches'][0]['entities'] == [{'entity_type': 'model', 'value': 'versa'}]
+    
+    findings = format_findings(report)
+    assert "Synonym of several entity types: \"suv\" (@vehicle:suv, @model:tahoe)" in findings
+    assert "Unannotated entity: \"car\" (@vehicle:sedan)" in findings
+    assert "@vehicle: van" in findings
+
+def test_automaton_matches_brute_force():
+    """The automaton finds the same leftmost-longest matches as a regular expression."""
+    rng = random.Random(0)
+    words = ["a", "ab", "abc", "b", "bc", "c", "ca", "cab"]
+    patterns = sorted({" ".join(rng.choice(words) for _ in range(rng.randint(1, 3))) for _ in range(40)})
+    automaton = SynonymAutomaton()
+    for pattern in patterns:
+        automaton.add(pattern)
+    automaton.build()
+    
+    regex = re.compile(r"(?<!\w)(?:" + "|".join(re.escape(pattern) for pattern in sorted(patterns, key=len, reverse=True)) + r")(?!\w)")
+    for _ in range(300):
+        text = fold_text(" ".join(rng.choice(words + ["x", "abcx"]) for _ in range(rng.randint(1, 12))))
+        found = [(start, end) for start, end, _ in automaton.find(text)]
+        assert found == [match.span() for match in regex.finditer(text)], text
+
+def test_analyzer_saves_entity_coverage():
+    """A full run with the fake backend saves the findings and adds them to the prompt."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = DialogFlowAnalyzer(str(FLOW_PATH), tmp, backend='fake', use_cache=False, entity_coverage=True)
+        results = analyzer.run_full_analysis()
+        
+        with open(results['entity_coverage'], 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        assert report['matched_phrases'] > 0 and report['matched_test_inputs'] > 0
+        assert {shared['synonym'] for shared in report['shared_synonyms']} == {'sedan', 'suv'}
+        assert "Synonym of several entity types: \"suv\"" in analyzer.gemini_client.model.calls[0]
+
+if __name__ == "__main__":
+    test_matches_and_findings()
+    test_automaton_matches_brute_force()
+    test_analyzer_saves_entity_coverage()
+    print("All entity matcher tests passed")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline tests for per-intent and per-page fan-out analysis.
+Uses a local fake model, so no API key or network access is needed.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from flow_analyzer import FlowAnalyzer, parse_issue_table
+from model_backends import FakeBackend
+from analyzer import DialogFlowAnalyzer
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def respond(text):
+    """One issue row per request; intents get a header-less table."""
+    if '"training_phrases"' in text:
+        return "|Low|Few phrases||Add phrases|\n|High|Duplicate phrase|greet|Remove it|"
+    return "|Priority|Issue|Location|Solution|\n|---|---|---|---|\n|**medium**|No reprompt||Add a reprompt|"
+
+EXPORT_DATA = {
+    'agent': {'displayName': 'Agent'},
+    'intents': {
+        'greet': {'config': {'displayName': 'greet'}, 'training_phrases': {'en': {'trainingPhrases': []}}},
+        'order': {'config': {'displayName': 'order'}, 'training_phrases': {'en': {'trainingPhrases': []}}}
+    },
+    'flows': {
+        'Main': {'config': {'displayName': 'Main', 'eventHandlers': [{'event': 'sys.no-match-default'}]},
+                 'pages': {'Ask': {'displayName': 'Ask', 'form': {}}, 'Confirm': {'displayName': 'Confirm'}}}
+    },
+    'entity_types': {}
+}
+
+def test_parse_issue_table():
+    """Header and separator rows are skipped and priorities normalized."""
+    issues = parse_issue_table("Intro\n|Priority|Issue|Where|Solution|\n|--|--|--|--|\n| **HIGH** | Loop | Page A | Add exit | or skip |\n|x|y|")
+    assert issues == [{'priority': 'High', 'issue': 'Loop', 'location': 'Page A', 'solution': 'Add exit | or skip'}]
+
+def test_fan_out_aggregates_sorted_issues():
+    """Every intent and page gets one request and the issues end up in one sorted table."""
+    model = FakeBackend(latency=0.02, respond=respond)
+    analyzer = FlowAnalyzer(GeminiClient(model=model), AsyncGeminiClient(GeminiClient(model=model), max_concurrency=2))
+    progress = []
+    
+    report, results = analyzer.analyze_fan_out(EXPORT_DATA, on_progress=lambda done, total, name, result: progress.append((done, total)))
+    
+    assert list(results) == ['intent: greet', 'intent: order', 'page: Main / Start Page', 'page: Main / Ask', 'page: Main / Confirm']
+    assert len(model.calls) == 5 and model.max_in_flight == 2
+    assert sorted(progress) == [(done, 5) for done in range(1, 6)]
+    # Flow-level handlers are sent with every page
+    assert sum('sys.no-match-default' in call for call in model.calls) == 3
+    
+    rows = [line for line in report.splitlines() if line.startswith('|') and not line.startswith(('|Priority', '|---'))]
+    # The identical High row of both intents appears once; empty locations name the item
+    assert rows == [
+        "|High|Duplicate phrase|greet|Remove it|",
+        "|Medium|No reprompt|Main / Ask|Add a reprompt|",
+        "|Medium|No reprompt|Main / Confirm|Add a reprompt|",
+        "|Medium|No reprompt|Main / Start Page|Add a reprompt|",
+        "|Low|Few phrases|greet|Add phrases|",
+        "|Low|Few phrases|order|Add phrases|"
+    ]
+    assert "Failed Requests" not in report
+
+def test_partial_failure_is_reported():
+    """A failed request is listed while the others are aggregated; all failing raises."""
+    model = FakeBackend(fail_on='"Confirm"', error=ValueError, respond=respond)
+    analyzer = FlowAnalyzer(GeminiClient(model=model))
+    
+    report, results = analyzer.analyze_fan_out(EXPORT_DATA)
+    
+    failed = results['page: Main / Confirm']
+    assert failed == {'kind': 'page', 'status': 'failed', 'error': failed['error']}
+    assert failed['error'].startswith("ValueError: Fake failure of request")
+    assert "Analyzed 4 of 5" in report and f"- page: Main / Confirm: {failed['error']}" in report
+    assert "|Medium|No reprompt|Main / Ask|Add a reprompt|" in report
+    
+    try:
+        FlowAnalyzer(GeminiClient(model=FakeBackend(fail_on='"name"', error=ValueError))).analyze_fan_out(dict(EXPORT_DATA, flows={}))
+    except RuntimeError as e:
+        assert "All 2 fan-out request(s) failed" in str(e)
+    else:
+        raise AssertionError("no error when every request failed")
+
+def test_analyzer_saves_fan_out_results():
+    """A full run with the fake backend saves the per-item results next to the report."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = DialogFlowAnalyzer(str(FLOW_PATH), tmp, backend='fake', use_cache=False, fan_out=True)
+        results = analyzer.run_full_analysis()
+        
+        with open(results['fan_out_results'], 'r', encoding='utf-8') as f:
+            fan_out_results = json.load(f)
+        assert len(fan_out_results) == len(analyzer.gemini_client.model.calls)
+        assert all(result['status'] == 'completed' for result in fan_out_results.values())
+        with open(results['run_metrics'], 'r', encoding='utf-8') as f:
+            assert json.load(f)['labels']['mode'] == 'fan-out'
+
+if __name__ == "__main__":
+    test_parse_issue_table()
+    test_fan_out_aggregates_sorted_issues()
+    test_partial_failure_is_reported()
+    test_analyzer_saves_fan_out_results()
+    print("All fan-out tests passed")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Offline tests for parallel loading of export files.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def test_parallel_load_matches_serial_load():
+    """Four workers return the same data, in the same order, as one, and fill the stats of every category."""
+    serial = DialogFlowFileLoader(max_workers=1)
+    parallel = DialogFlowFileLoader(max_workers=4)
+    
+    serial_data = serial.load_export(FLOW_PATH)
+    parallel_data = parallel.load_export(FLOW_PATH)
+    
+    assert parallel_data == serial_data
+    for category in ('intents', 'flows', 'entity_types'):
+        assert list(parallel_data[category]) == sorted(serial_data[category])
+        assert set(parallel.load_stats[category]) >= {'items', 'files', 'bytes', 'seconds', 'workers'}
+        assert parallel.load_stats[category]['items'] == len(serial_data[category]) > 0
+        assert parallel.load_stats[category]['bytes'] == serial.load_stats[category]['bytes'] > 0
+        assert parallel.load_stats[category]['files'] >= parallel.load_stats[category]['items']
+        assert (serial.load_stats[category]['workers'], parallel.load_stats[category]['workers']) == (1, 4)
+
+def test_broken_item_is_skipped():
+    """An item with a malformed file is left out by every worker count; the others still load."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = Path(shutil.copytree(FLOW_PATH, Path(tmp) / "export"))
+        intent_dir = sorted(path for path in (flow_path / "intents").iterdir() if path.is_dir())[0]
+        (intent_dir / f"{intent_dir.name}.json").write_text('{"displayName": ', encoding='utf-8')
+        
+        results = [DialogFlowFileLoader(max_workers=workers).load_export(flow_path)['intents'] for workers in (1, 4)]
+        assert results[0] == results[1]
+        assert intent_dir.name not in results[0] and len(results[0]) == len(list((FLOW_PATH / "intents").iterdir())) - 1
+
+def test_load_selected_matches_full_load():
+    """Loading selected items returns the same data as the full load for those items."""
+    loader = DialogFlowFileLoader(max_workers=4)
+    full = loader.load_export(FLOW_PATH)
+    flow, intent = sorted(full['flows'])[0], sorted(full['intents'])[-1]
+    
+    selected = loader.load_selected(FLOW_PATH, flows=[flow], intents=[intent, "missing"])
+    assert selected['flows'] == {flow: full['flows'][flow]}
+    assert selected['intents'] == {intent: full['intents'][intent]}
+    assert selected['entity_types'] == {} and selected['agent'] == full['agent']
+
+if __name__ == "__main__":
+    test_parallel_load_matches_serial_load()
+    test_broken_item_is_skipped()
+    test_load_selected_matches_full_load()
+    print("All file loader tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the local flow graph checks.
+"""
+
+import os
+import sys
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from flow_graph import FlowGraph, format_findings
+
+def route(intent=None, condition=None, target_page=None, target_flow=None):
+    """Build a transition route."""
+    data = {'intent': intent} if intent else {'condition': condition or 'true'}
+    if target_page:
+        data['targetPage'] = target_page
+    if target_flow:
+        data['targetFlow'] = target_flow
+    return data
+
+def make_export():
+    """Two flows exercising every kind of finding."""
+    main_pages = {
+        'Ask': {'displayName': 'Ask', 'transitionRoutes': [route('yes', target_page='Confirm'), route('no', target_page='Loop A')]},
+        'Confirm': {'displayName': 'Confirm', 'transitionRoutes': [route(condition='true', target_page='End Session')]},
+        'Loop A': {'displayName': 'Loop A', 'transitionRoutes': [route(condition='true', target_page='Loop B')]},
+        'Loop B': {
+            'displayName': 'Loop B',
+            'transitionRoutes': [route(condition='true', target_page='Loop A')],
+            'eventHandlers': [{'event': 'sys.no-match-default', 'targetPage': 'Current Page'}]
+        },
+        'Stuck': {'displayName': 'Stuck', 'entryFulfillment': {}},
+        'Orphan': {'displayName': 'Orphan', 'transitionRoutes': [route(condition='true', target_page='Ask')]},
+        'Broken': {
+            'displayName': 'Broken',
+            'form': {'parameters': [{
+                'displayName': 'city',
+                'fillBehavior': {'repromptEventHandlers': [{'event': 'sys.no-match-default', 'targetPage': 'Gone'}]}
+            }]}
+        }
+    }
+    return {
+        'agent': {'startFlow': 'Main'},
+        'intents': {'yes': {'config': {'displayName': 'yes'}}, 'no': {}, 'help%20me': {}},
+        'flows': {
+            'Main': {
+                'config': {
+                    'displayName': 'Main',
+                    'transitionRoutes': [
+                        route('start', target_page='Ask'),
+                        route('help me', target_flow='Help'),
+                        route('escalate', target_flow='Missing Flow')
+                    ]
+                },
+                'pages': main_pages
+            },
+            'Help': {
+                'config': {'displayName': 'Help', 'transitionRoutes': [route(condition='true', target_page='Stuck')]},
+                'pages': {'Stuck': {'displayName': 'Stuck'}}
+            }
+        },
+        'entity_types': {}
+    }
+
+def test_graph_findings():
+    """Reachability, terminal pages, exitless cycles and missing references are found."""
+    export_data = make_export()
+    main_config = export_data['flows']['Main']['config']
+    report = FlowGraph(export_data).report()
+    
+    assert report['start_nodes'] == ['Main/Start']
+    assert report['unreachable_flows'] == []
+    assert report['unreachable_pages'] == ['Main/Broken', 'Main/Orphan', 'Main/Stuck']
+    assert {'page': 'Help/Stuck', 'flow_level_exits': False} in report['terminal_pages']
+    assert {'page': 'Main/Stuck', 'flow_level_exits': True} in report['terminal_pages']
+    assert report['missing_flows'] == [{'source': 'Main/Start', 'target': 'Missing Flow', 'trigger': 'intent:escalate'}]
+    assert report['missing_pages'][0]['target'] == 'Gone'
+    assert {missing['intent'] for missing in report['missing_intents']} == {'start', 'escalate'}
+    
+    # The flow-level intent routes are in scope on every page, so the loop can be left...
+    assert report['exitless_cycles'] == []
+    
+    # ...but without them it traps the user
+    main_config['transitionRoutes'] = [route(condition='true', target_page='Ask')]
+    report = FlowGraph(export_data).report()
+    assert ['Main/Loop A', 'Main/Loop B'] in report['exitless_cycles']
+    
+    findings = format_findings(report)
+    assert "Cycle without exit: Main/Loop A -> Main/Loop B" in findings
+    assert "Dead end: Help/Stuck" in findings
+
+def test_sample_export_is_consistent():
+    """The bundled sample export has every page reachable and no broken references."""
+    flow_path = os.path.join(os.path.dirname(__file__), '..', 'Flow')
+    report = FlowGraph(DialogFlowFileLoader().load_export(flow_path)).report()
+    
+    assert report['pages'] == 17
+    assert report['unreachable_flows'] == report['unreachable_pages'] == []
+    assert report['missing_pages'] == report['missing_flows'] == report['missing_intents'] == []
+
+if __name__ == "__main__":
+    test_graph_findings()
+    test_sample_export_is_consistent()
+    print("All flow graph tests passed")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Offline tests for incremental analysis: export manifest, flow partitioning
+and reuse of unchanged unit reports.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from gemini_client import GeminiClient
+from flow_analyzer import FlowAnalyzer
+from model_backends import FakeBackend
+from export_manifest import ExportManifest, MANIFEST_VERSION
+from flow_partitioner import AGENT_UNIT, collect_flow_references, resolve_names, plan_units, unit_scope
+
+def write_json(path, data):
+    """Write a JSON file, creating its directory."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+def make_export(root):
+    """Create a small export with two flows, two intents and one entity type."""
+    write_json(root / "agent.json", {"displayName": "Agent"})
+    write_json(root / "intents" / "greet" / "greet.json", {"displayName": "greet"})
+    write_json(root / "intents" / "bye" / "bye.json", {"displayName": "bye"})
+    write_json(root / "entityTypes" / "size" / "size.json", {"displayName": "size"})
+    write_json(root / "flows" / "Main" / "Main.json", {"displayName": "Main"})
+    write_json(root / "flows" / "Other" / "Other.json", {"displayName": "Other"})
+
+def test_scan_detects_changes():
+    """Only new or modified files are hashed, and content changes are reported."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_export(root)
+        
+        first = ExportManifest.scan(root)
+        assert first.hashed_files == 6
+        assert first.item_names('flows') == ["Main", "Other"]
+        assert first.changed_files(ExportManifest()) == set(first.files)
+        
+        second = ExportManifest.scan(root, first)
+        assert second.hashed_files == 0
+        assert second.changed_files(first) == set()
+        
+        # Rewriting the same content is rehashed but not reported as changed
+        greet = root / "intents" / "greet" / "greet.json"
+        greet.write_text(greet.read_text(encoding='utf-8'), encoding='utf-8')
+        os.utime(greet, ns=(0, 0))
+        third = ExportManifest.scan(root, second)
+        assert third.hashed_files == 1
+        assert third.changed_files(second) == set()
+        
+        write_json(root / "flows" / "Main" / "Main.json", {"displayName": "Main", "description": "changed"})
+        (root / "intents" / "bye" / "bye.json").unlink()
+        fourth = ExportManifest.scan(root, third)
+        assert fourth.changed_files(third) == {"flows/Main/Main.json", "intents/bye/bye.json"}
+
+def test_fingerprints_follow_scope():
+    """A unit fingerprint only changes when a file within its scope changes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_export(root)
+        before = ExportManifest.scan(root)
+        
+        write_json(root / "intents" / "greet" / "greet.json", {"displayName": "greet", "priority": 1})
+        after = ExportManifest.scan(root, before)
+        
+        main_scope = ["agent.json", "flows/Main/", "intents/greet/"]
+        other_scope = ["agent.json", "flows/Other/", "intents/bye/"]
+        assert before.fingerprint(main_scope) != after.fingerprint(main_scope)
+        assert before.fingerprint(other_scope) == after.fingerprint(other_scope)
+
+def test_manifest_round_trip():
+    """Saved manifests load back; other versions are ignored."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_export(root / "export")
+        manifest = ExportManifest.scan(root / "export")
+        manifest.units = {"flow:Main": {"fingerprint": "abc"}}
+        manifest.save(root / "manifest.json")
+        
+        loaded = ExportManifest.load(root / "manifest.json")
+        assert loaded.files == manifest.files
+        assert loaded.units == manifest.units
+        
+        data = json.loads((root / "manifest.json").read_text(encoding='utf-8'))
+        data['version'] = MANIFEST_VERSION + 1
+        write_json(root / "manifest.json", data)
+        assert ExportManifest.load(root / "manifest.json").files == {}
+        assert ExportManifest.load(root / "missing.json").files == {}
+
+def test_flow_references_and_name_resolution():
+    """Intents and custom entity types are collected; URL-encoded directories match."""
+    flow_data = {
+        'config': {'transitionRoutes': [{'intent': 'greet'}]},
+        'pages': {
+            'Order': {
+                'form': {'parameters': [
+                    {'displayName': 'size', 'entityType': '@size'},
+                    {'displayName': 'date', 'entityType': '@sys.date'}
+                ]},
+                'transitionRoutes': [{'intent': 'order food', 'condition': 'true'}]
+            }
+        }
+    }
+    
+    intents, entity_types = collect_flow_references(flow_data)
+    assert intents == {'greet', 'order food'}
+    assert entity_types == {'size'}
+    assert resolve_names(intents, ['greet', 'order%20food', 'bye']) == ['greet', 'order%20food']
+
+def test_plan_units():
+    """Each flow gets its referenced items; unreferenced items go to the agent unit."""
+    plan = plan_units(
+        {'Main': ({'greet'}, {'size'}), 'Other': ({'greet'}, set())},
+        ['bye', 'greet'],
+        ['size', 'unused']
+    )
+    
+    assert plan['flow:Main'] == {'flow': 'Main', 'intents': ['greet'], 'entity_types': ['size']}
+    assert plan['flow:Other'] == {'flow': 'Other', 'intents': ['greet'], 'entity_types': []}
+    assert plan[AGENT_UNIT] == {'flow': None, 'intents': ['bye'], 'entity_types': ['unused']}
+    assert unit_scope(plan['flow:Main']) == ['agent.json', 'entityTypes/size/', 'flows/Main/', 'intents/greet/']
+    
+    assert list(plan_units({'Main': (set(), set())}, [], [])) == ['flow:Main']
+    assert list(plan_units({}, [], [])) == [AGENT_UNIT]
+
+def test_analyze_incremental_reuses_unchanged_units():
+    """Units with an unchanged fingerprint reuse their previous report."""
+    model = FakeBackend(template="report {request}")
+    analyzer = FlowAnalyzer(GeminiClient(model=model))
+    previous = {
+        'flow:Main': {'fingerprint': 'same', 'report': 'old main report'},
+        'flow:Removed': {'fingerprint': 'x', 'report': 'gone'}
+    }
+    unit_data = {'flow:Other': {'agent': {}, 'flows': {'Other': {}}, 'intents': {}, 'entity_types': {}}}
+    
+    report, results = analyzer.analyze_incremental(unit_data, {'flow:Main': 'same', 'flow:Other': 'new'}, previous)
+    
+    assert len(model.calls) == 1
+    assert list(results) == ['flow:Main', 'flow:Other']
+    assert results['flow:Main']['report'] == 'old main report'
+    assert results['flow:Other'] == {'fingerprint': 'new', 'report': 'report 1'}
+    assert '## Flow: Main' in report and '## Flow: Other' in report and 'gone' not in report
+
+if __name__ == "__main__":
+    test_scan_detects_changes()
+    test_fingerprints_follow_scope()
+    test_manifest_round_trip()
+    test_flow_references_and_name_resolution()
+    test_plan_units()
+    test_analyze_incremental_reuses_unchanged_units()
+    print("All incremental analysis tests passed")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the local intent overlap check.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from intent_overlap import IntentOverlapDetector, format_findings, iter_training_phrases, normalize_phrase
+
+def make_intent(name, *phrases):
+    """Build an intent as returned by DialogFlowFileLoader.load_intents."""
+    return {
+        'config': {'displayName': name},
+        'training_phrases': {'en': {'trainingPhrases': [
+            {'parts': [{'text': part} for part in phrase], 'languageCode': 'en'} for phrase in phrases
+        ]}}
+    }
+
+INTENTS = {
+    'book': make_intent('book', ["book a car for ", "tomorrow"], ["i want to rent a car"], ["Reserve a vehicle"]),
+    'book_again': make_intent('book_again', ["book a car for tomorrow please"], ["i want to rent a car"]),
+    'cancel': make_intent('cancel', ["cancel my booking"], ["cancel my bookings"], ["stop"]),
+    'weather': make_intent('weather', ["what is the weather like"])
+}
+
+def test_overlap_findings():
+    """Shared and near-duplicate phrases of different intents are reported, not those within one intent."""
+    report = IntentOverlapDetector(phrase_threshold=0.7).analyze(INTENTS)
+    
+    assert report['phrases'] == 9
+    assert report['intents'] == 4
+    assert report['duplicate_phrases'] == [{'phrase': 'i want to rent a car', 'intents': ['book', 'book_again']}]
+    
+    pairs = {(pair['phrase_a'], pair['phrase_b']) for pair in report['similar_phrases']}
+    assert pairs == {('book a car for tomorrow', 'book a car for tomorrow please')}
+    assert all(pair['intent_a'] != pair['intent_b'] for pair in report['similar_phrases'])
+    
+    assert [pair['intents'] for pair in report['similar_intents']] == [['book', 'book_again']]
+    
+    findings = format_findings(report)
+    assert "Overlapping intents: book and book_again" in findings
+    assert "Phrase in several intents: \"i want to rent a car\" (book, book_again)" in findings
+
+def test_phrase_iteration():
+    """Phrase parts are joined and display names are used."""
+    phrases = list(iter_training_phrases(INTENTS))
+    assert phrases[0] == ('book', 'en', 'book a car for tomorrow')
+    assert normalize_phrase("  Reserve   a\tVehicle ") == "reserve a vehicle"
+
+def test_pairs_match_brute_force():
+    """Prefix filtering finds exactly the pairs a dense similarity matrix finds."""
+    flow_path = Path(os.path.dirname(__file__)) / '..' / 'Flow' / 'intents'
+    intents = DialogFlowFileLoader().load_intents(flow_path)
+    texts = list(dict.fromkeys(normalize_phrase(text) for _, _, text in iter_training_phrases(intents)))
+    
+    detector = IntentOverlapDetector()
+    rows, features, weights, n_features = detector._vectorize(texts)
+    dense = np.zeros((len(texts), n_features))
+    dense[rows, features] = weights
+    similarity = dense @ dense.T
+    
+    for threshold in (0.3, 0.6, 0.85):
+        first, second, found = detector._similar_pairs(rows, features, weights, len(texts), n_features, threshold)
+        expected = set(zip(*np.nonzero(np.triu(similarity, 1) >= threshold)))
+        assert set(zip(first.tolist(), second.tolist())) == expected
+        assert np.allclose(found, similarity[first, second])
+
+if __name__ == "__main__":
+    test_overlap_findings()
+    test_phrase_iteration()
+    test_pairs_match_brute_force()
+    print("All intent overlap tests passed")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the streaming parser of training phrase and entity files.
+"""
+
+import io
+import os
+import sys
+import json
+import pickle
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+# Add the modules and benchmarks directories to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+
+from json_stream import iter_array_items, StreamedArray
+from file_loader import DialogFlowFileLoader
+from intent_overlap import iter_training_phrases
+from entity_matcher import EntityMatcher
+from synthetic_export import generate_export
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def _phrase(index: int) -> dict:
+    return {
+        'id': f"phrase-{index}",
+        'parts': [{'text': f"réserver une voiture n°{index} \"vite\" 🚗 "}, {'text': "demain", 'parameterId': "date"}],
+        'repeatCount': 1 + index % 3,
+        'score': index / 7,
+        'languageCode': "fr"
+    }
+
+def test_items_match_json_load_at_any_chunk_size():
+    """Items, other keys and number/unicode values survive every chunk boundary."""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "fr.json"
+        data = {'before': {'nested': [1, 2.5e3]}, 'trainingPhrases': [_phrase(i) for i in range(40)], 'after': 12345}
+        file_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+        
+        for chunk_size in (1, 7, 64, 4096):
+            others = {}
+            items = list(iter_array_items(file_path, 'trainingPhrases', others, chunk_size=chunk_size))
+            assert items == data['trainingPhrases'], chunk_size
+            assert others == {'before': data['before'], 'after': 12345}
+        
+        file_path.write_text('{"trainingPhrases": [], "x": 1}', encoding='utf-8')
+        assert list(iter_array_items(file_path, 'trainingPhrases')) == []
+        file_path.write_text('{}', encoding='utf-8')
+        assert list(iter_array_items(file_path, 'trainingPhrases')) == []
+
+def test_malformed_files_raise_value_error():
+    """Truncated files and non-objects are reported with the file name."""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "en.json"
+        for text in ('{"entities": [{"value": "a"}, {"value": ', '[1, 2]', '{"entities": [1 2]}'):
+            file_path.write_text(text, encoding='utf-8')
+            try:
+                list(iter_array_items(file_path, 'entities', chunk_size=4))
+            except ValueError as e:
+                assert str(file_path) in str(e)
+            else:
+                raise AssertionError(f"no error for {text!r}")
+
+def test_streaming_memory_stays_flat():
+    """Peak memory of iterating a large file is a small fraction of parsing it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = Path(tmp) / "en.json"
+        file_path.write_text(json.dumps({'trainingPhrases': [_phrase(i) for i in range(20000)]}), encoding='utf-8')
+        
+        tracemalloc.start()
+        with open(file_path, 'r', encoding='utf-8') as f:
+            count = len(json.load(f)['trainingPhrases'])
+        _, parsed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        streamed_count = sum(1 for _ in StreamedArray(file_path, 'trainingPhrases'))
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        assert streamed_count == count == 20000
+        assert streamed_peak < parsed_peak / 10, (streamed_peak, parsed_peak)
+
+def test_load_model_streams_large_files():
+    """The agent model is the same whether phrase and entity files are streamed or parsed."""
+    parsed = DialogFlowFileLoader(stream_threshold=2**62).load_model(FLOW_PATH)
+    loader = DialogFlowFileLoader(stream_threshold=0)
+    streamed = loader.load_model(FLOW_PATH)
+    
+    assert loader.load_stats['intents']['streamed_files'] > 0
+    assert loader.load_stats['entity_types']['streamed_files'] > 0
+    assert {name: intent.training_phrases for name, intent in streamed.intents.items()} == \
+        {name: intent.training_phrases for name, intent in parsed.intents.items()}
+    assert {name: (entity.values, entity.synonyms) for name, entity in streamed.entity_types.items()} == \
+        {name: (entity.values, entity.synonyms) for name, entity in parsed.entity_types.items()}
+    
+    array = pickle.loads(pickle.dumps(StreamedArray(Path("entities/en.json"), 'entities')))
+    assert array.file_path == Path("entities/en.json") and array.key == 'entities'
+
+def test_load_export_streams_for_local_checks():
+    """Iterating over the phrases of a streamed export needs a fraction of the memory of a parsed one."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = Path(tmp) / "export"
+        generate_export(flow_path, flows=1, pages=2, intents=2, phrases=10000, entity_types=2, entity_values=20, synonyms=3)
+        peaks = {}
+        phrases = {}
+        for stream_arrays in (False, True):
+            tracemalloc.start()
+            export_data = DialogFlowFileLoader(stream_threshold=1024).load_export(flow_path, stream_arrays=stream_arrays)
+            phrases[stream_arrays] = sum(1 for _ in iter_training_phrases(export_data['intents']))
+            _, peaks[stream_arrays] = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del export_data
+        
+        assert phrases[True] == phrases[False] == 20000
+        assert peaks[True] < peaks[False] / 5, peaks
+        
+        parsed = DialogFlowFileLoader().load_export(flow_path)
+        loader = DialogFlowFileLoader(stream_threshold=0, snapshot_dir=Path(tmp) / "snapshots")
+        streamed = loader.load_export(flow_path, stream_arrays=True)
+        assert loader.load_stats['snapshot']['status'] == 'skipped' and not (Path(tmp) / "snapshots").exists()
+        reports = [EntityMatcher(data['entity_types']).analyze(data['intents'], {}) for data in (streamed, parsed)]
+        for report in reports:
+            report.pop('seconds')
+        assert reports[0] == reports[1]
+
+def test_compact_consolidation_streams_large_files():
+    """Compact consolidation writes the same text when large files are streamed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = Path(tmp) / "export"
+        generate_export(flow_path, flows=1, pages=2, intents=3, phrases=50, entity_types=2, entity_values=20, synonyms=3)
+        outputs = []
+        for threshold in (2**62, 0):
+            output_path = Path(tmp) / f"out_{threshold}"
+            output_path.mkdir()
+            consolidated = DialogFlowFileLoader(stream_threshold=threshold).create_consolidated_file(flow_path, output_path, compact=True)
+            outputs.append(Path(consolidated).read_text(encoding='utf-8'))
+        assert outputs[0] == outputs[1]
+        
+        # A malformed file is still copied verbatim, without a partial compact copy
+        phrase_file = next(flow_path.glob("intents/*/trainingPhrases/*.json"))
+        phrase_file.write_text('{"trainingPhrases": [{"parts": [{"text": "cut"}]}, {', encoding='utf-8')
+        handle = io.StringIO()
+        DialogFlowFileLoader(stream_threshold=0)._copy_file(handle, phrase_file, compact=True)
+        assert handle.getvalue() == phrase_file.read_text(encoding='utf-8')
+
+if __name__ == "__main__":
+    test_items_match_json_load_at_any_chunk_size()
+    test_malformed_files_raise_value_error()
+    test_streaming_memory_stays_flat()
+    test_load_model_streams_large_files()
+    test_load_export_streams_for_local_checks()
+    test_compact_consolidation_streams_large_files()
+    print("All JSON stream tests passed")
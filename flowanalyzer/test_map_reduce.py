@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Offline tests for map-reduce analysis of large exports.
+Uses a local fake model, so no API key or network access is needed.
+"""
+
+import os
+import sys
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from flow_analyzer import FlowAnalyzer
+from model_backends import FakeBackend
+from flow_partitioner import AGENT_UNIT, partition_export
+
+EXPORT_DATA = {
+    'agent': {'displayName': 'Agent'},
+    'intents': {
+        'greet': {'config': {'displayName': 'greet'}},
+        'order': {'config': {'displayName': 'order'}},
+        'unused': {'config': {'displayName': 'unused'}}
+    },
+    'flows': {
+        'Main': {'config': {'transitionRoutes': [{'intent': 'greet'}]}, 'pages': {}},
+        'Orders': {'config': {}, 'pages': {'Start': {'transitionRoutes': [{'intent': 'order'}, {'intent': 'greet'}]}}}
+    },
+    'entity_types': {}
+}
+
+def test_partition_export():
+    """Each flow unit holds its own flow and only the intents it references."""
+    units = partition_export(EXPORT_DATA)
+    
+    assert sorted(units) == [AGENT_UNIT, 'flow:Main', 'flow:Orders']
+    assert list(units['flow:Main']['flows']) == ['Main']
+    assert sorted(units['flow:Main']['intents']) == ['greet']
+    assert sorted(units['flow:Orders']['intents']) == ['greet', 'order']
+    assert list(units[AGENT_UNIT]['intents']) == ['unused']
+    assert units[AGENT_UNIT]['flows'] == {}
+    assert all(unit['agent'] == EXPORT_DATA['agent'] for unit in units.values())
+
+def test_map_reduce_merges_unit_reports():
+    """Every unit is analyzed once, then one reduce request merges the reports."""
+    model = FakeBackend(template="report {request}")
+    analyzer = FlowAnalyzer(GeminiClient(model=model))
+    
+    report = analyzer.analyze_map_reduce(EXPORT_DATA, max_workers=2)
+    
+    assert len(model.calls) == 4
+    reduce_request = model.calls[-1]
+    assert '## Flow: Main' in reduce_request and '## Flow: Orders' in reduce_request
+    assert reduce_request.index('## Flow: Orders') < reduce_request.index('## Agent')
+    assert report == "report 4"
+
+def test_single_unit_skips_reduce():
+    """An export with a single unit is returned without a reduce request."""
+    model = FakeBackend(template="report {request}")
+    analyzer = FlowAnalyzer(GeminiClient(model=model))
+    export_data = dict(EXPORT_DATA, flows={'Main': EXPORT_DATA['flows']['Main']}, intents={'greet': {}})
+    
+    report = analyzer.analyze_map_reduce(export_data, structural_findings="- Page Confirm is unreachable\n")
+    
+    assert len(model.calls) == 1
+    assert report.startswith("# DialogFlow Flow Analysis Report")
+    assert "## Flow: Main\n\nreport 1" in report
+    # Without a reduce request the findings are appended to the report
+    assert report.endswith("## Pre-computed Structural Findings\n\n- Page Confirm is unreachable\n")
+
+def test_failed_unit_is_listed():
+    """A unit failing after its retries is listed while the other reports are still reduced; all failing raises."""
+    backend = FakeBackend(template="report {request}", fail_first=1, error=ValueError)
+    client = GeminiClient(model=backend)
+    analyzer = FlowAnalyzer(client, AsyncGeminiClient(client, max_concurrency=1))
+    
+    report = analyzer.analyze_map_reduce(EXPORT_DATA)
+    
+    assert len(backend.calls) == 4
+    assert report.startswith("report 4\n## Failed Flows")
+    assert "- Flow: Main: ValueError: Fake failure of request 1" in report
+    reduce_request = backend.calls[-1]
+    assert '## Flow: Orders' in reduce_request and '## Agent' in reduce_request and '## Flow: Main' not in reduce_request
+    
+    try:
+        FlowAnalyzer(GeminiClient(model=FakeBackend(failure_rate=1.0, error=ValueError))).analyze_map_reduce(EXPORT_DATA)
+    except RuntimeError as e:
+        assert "All 3 map step request(s) failed" in str(e)
+    else:
+        raise AssertionError("no error when every unit failed")
+
+if __name__ == "__main__":
+    test_partition_export()
+    test_map_reduce_merges_unit_reports()
+    test_single_unit_skips_reduce()
+    test_failed_unit_is_listed()
+    print("All map-reduce tests passed")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the model backends: in-process fake and local HTTP stub.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from response_cache import ResponseCache
+from model_backends import FakeBackend, HttpBackend, FakeModelServer, ModelBackend, TransientError, create_backend
+
+def test_fake_backend_responses_and_failures():
+    """Canned responses cycle, templates are filled in, and the first requests can fail."""
+    canned = FakeBackend(responses=["first", "second"])
+    assert [canned.generate_content("a").text for _ in range(3)] == ["first", "second", "first"]
+    
+    templated = FakeBackend(template="request {request}: {chars} chars, {preview}", fail_first=1)
+    try:
+        templated.generate_content("hello")
+        raise AssertionError("expected TransientError")
+    except TransientError:
+        pass
+    response = templated.generate_content(["hel", "lo"])
+    assert response.text == "request 2: 5 chars, hello"
+    assert response.usage_metadata.prompt_token_count > 0
+    assert templated.calls == ["hello", "hello"] and templated.failures == 1
+    
+    slow = FakeBackend(latency=0.05)
+    start = time.perf_counter()
+    slow.generate_content("x")
+    assert time.perf_counter() - start >= 0.05
+
+def test_async_client_retries_fake_failures():
+    """Transient fake failures are retried, and latency overlaps across concurrent requests."""
+    backend = FakeBackend(latency=0.05, fail_first=2)
+    client = AsyncGeminiClient(GeminiClient(model=backend), max_concurrency=10, base_delay=0.01)
+    
+    requests = [("prompt", f"context {i}", f"request_{i}") for i in range(10)]
+    start = time.perf_counter()
+    results = asyncio.run(client.analyze_many(requests))
+    
+    assert len(results) == 10
+    assert client.stats['retries'] == 2 and client.stats['failures'] == 0
+    assert len(backend.calls) == 12
+    assert time.perf_counter() - start < 0.4
+
+def test_queued_duplicates_hit_the_cache():
+    """A request waiting for a slot reuses the response of an identical request finished meanwhile."""
+    backend = FakeBackend(latency=0.01)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        client = AsyncGeminiClient(GeminiClient(model=backend, cache=ResponseCache(cache_dir)), max_concurrency=1)
+        requests = [("prompt", f"context {i % 2}", f"request_{i}") for i in range(6)]
+        results = asyncio.run(client.analyze_many(requests))
+    
+    assert len(backend.calls) == 2
+    assert client.stats['cache_hits'] == 4
+    assert results[0] == results[2] == results[4]
+
+def test_http_stub_round_trip():
+    """The HTTP backend talks to the stub server, and 503 answers become transient errors."""
+    with FakeModelServer(FakeBackend(template="stub {request}", fail_first=1)) as server:
+        backend = HttpBackend(server.url, timeout=5)
+        try:
+            backend.generate_content("hello")
+            raise AssertionError("expected TransientError")
+        except TransientError:
+            pass
+        response = backend.generate_content(["hel", "lo"])
+        assert response.text == "stub 2"
+        assert response.usage_metadata.prompt_token_count > 0
+        
+        client = AsyncGeminiClient(GeminiClient(model=backend), max_concurrency=4)
+        results = asyncio.run(client.analyze_many([("p", f"c {i}", f"r{i}") for i in range(4)]))
+        assert sorted(results) == ["stub 3", "stub 4", "stub 5", "stub 6"]
+
+def test_create_backend():
+    """Backends are created by name and the http backend needs a URL."""
+    assert isinstance(create_backend('fake', latency=0.5), FakeBackend)
+    assert create_backend('http', url="http://localhost:1/generate").url.endswith("/generate")
+    for name, options in (('http', {}), ('unknown', {})):
+        try:
+            create_backend(name, **options)
+            raise AssertionError("expected ValueError")
+        except ValueError:
+            pass
+    
+    # A backend without generate_content fails when it is created, not on its first request
+    class IncompleteBackend(ModelBackend):
+        pass
+    try:
+        IncompleteBackend()
+        raise AssertionError("expected TypeError")
+    except TypeError as e:
+        assert "generate_content" in str(e)
+
+if __name__ == "__main__":
+    test_fake_backend_responses_and_failures()
+    test_async_client_retries_fake_failures()
+    test_queued_duplicates_hit_the_cache()
+    test_http_stub_round_trip()
+    test_create_backend()
+    print("All model backend tests passed")
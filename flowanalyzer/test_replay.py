@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the local test case replay.
+"""
+
+import os
+import sys
+import copy
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from agent_model import AgentModel
+from conversation_replay import ConversationReplayer, ConditionError, evaluate_condition, format_findings
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def load_sample():
+    """Load the sample export and its test cases."""
+    loader = DialogFlowFileLoader()
+    return loader.load_export(FLOW_PATH), loader.load_test_cases(FLOW_PATH / 'testCases')
+
+def test_sample_test_cases_pass():
+    """Every test case of the sample export ends each turn on the expected page."""
+    export_data, test_cases = load_sample()
+    assert len(test_cases) == 17
+    
+    report = ConversationReplayer(AgentModel.from_export(export_data)).replay_all(test_cases)
+    assert report['passed'] == report['test_cases'] == 17
+    assert report['turns'] == 233 and report['diverged_turns'] == 0
+    assert report['seconds'] < 1
+    assert not any(result['warnings'] for result in report['results'])
+
+def test_changed_route_diverges():
+    """Re-pointing a route makes the affected turns diverge, in serial and parallel replay alike."""
+    export_data, test_cases = load_sample()
+    export_data = copy.deepcopy(export_data)
+    page = export_data['flows']['Default Start Flow']['pages']['Confirm Location']
+    for route in page['transitionRoutes']:
+        if route.get('intent') == 'small_talk.confirmation.yes':
+            route['targetPage'] = 'Payment'
+    
+    replayer = ConversationReplayer(AgentModel.from_export(export_data))
+    report = replayer.replay_all(test_cases)
+    assert report['failed'] == 4 and report['diverged_turns'] == 4
+    divergence = next(result for result in report['results'] if result['divergences'])['divergences'][0]
+    assert divergence['expected_page'] == 'Default Start Flow/Drop Off Location'
+    assert divergence['actual_page'] == 'Default Start Flow/Payment'
+    assert "expected Default Start Flow/Drop Off Location, got Default Start Flow/Payment" in format_findings(report)
+    
+    parallel = replayer.replay_all(test_cases, max_workers=2)
+    assert parallel['results'] == report['results']
+
+def test_conditions():
+    """Route conditions are evaluated against session parameters and the form status."""
+    params = {'vehicle_type': 'economy_vehicle', 'count': 3}
+    assert evaluate_condition('$page.params.status = "FINAL"', params, "FINAL")
+    assert not evaluate_condition('$page.params.status = "FINAL"', params, "")
+    assert evaluate_condition('$session.params.vehicle_type = "economy_vehicle" AND $session.params.count >= 2', params, "")
+    assert evaluate_condition('NOT ($session.params.count > 5) OR false', params, "")
+    assert evaluate_condition('$session.params.missing = null', params, "")
+    assert evaluate_condition('true', {}, "")
+    try:
+        evaluate_condition('$sys.func.ADD(1, 2) = 3', params, "")
+        raise AssertionError("expected ConditionError")
+    except ConditionError:
+        pass
+
+if __name__ == "__main__":
+    test_sample_test_cases_pass()
+    test_changed_route_diverges()
+    test_conditions()
+    print("All replay tests passed")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the Gemini response cache.
+Uses a temporary cache directory and a local fake model.
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from gemini_client import GeminiClient
+from response_cache import ResponseCache
+from model_backends import FakeBackend
+
+def entry_file(cache, key):
+    """Path of a cache entry (cache_dir/<first two key chars>/<key>.json)."""
+    return Path(cache.cache_dir) / key[:2] / f"{key}.json"
+
+def test_keys():
+    """String and part-wise contexts share a key; other fields and boundaries do not."""
+    key = ResponseCache.make_key("model", "prompt", "context data")
+    
+    assert key == ResponseCache.make_key("model", "prompt", ["context ", "data"])
+    assert key == ResponseCache.make_key("model", "prompt", iter(["con", "text data"]))
+    assert key != ResponseCache.make_key("other-model", "prompt", "context data")
+    assert key != ResponseCache.make_key("model", "prompt ", "context data")
+    assert ResponseCache.make_key("model", "ab", "c") != ResponseCache.make_key("model", "a", "bc")
+    
+    hasher = ResponseCache.key_hasher("model", "prompt")
+    for part in ["context", " ", "data"]:
+        hasher.update(part.encode('utf-8'))
+    assert hasher.hexdigest() == key
+
+def test_get_and_put():
+    """Stored responses are returned and hits and misses are counted."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache(cache_dir)
+        key = ResponseCache.make_key("model", "prompt", "context")
+        
+        assert cache.get(key) is None
+        cache.put(key, "response", "model")
+        assert cache.get(key) == "response"
+        
+        stats = cache.stats
+        assert (stats['hits'], stats['misses'], stats['writes'], stats['entries']) == (1, 1, 1, 1)
+        assert stats['size_bytes'] == entry_file(cache, key).stat().st_size
+
+def test_expired_entries_are_ignored():
+    """Entries older than ttl_seconds count as misses and are removed."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache(cache_dir, ttl_seconds=0.05)
+        key = ResponseCache.make_key("model", "prompt", "context")
+        cache.put(key, "response")
+        
+        time.sleep(0.1)
+        
+        assert cache.get(key) is None
+        assert cache.stats['expired'] == 1
+        assert cache.stats['entries'] == 0
+        assert not entry_file(cache, key).exists()
+
+def test_least_recently_used_entries_are_evicted():
+    """Writes beyond max_size_bytes evict the entries read least recently."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = ResponseCache(cache_dir, max_size_bytes=1200)
+        keys = [ResponseCache.make_key("model", "prompt", name) for name in ("a", "b", "c")]
+        
+        cache.put(keys[0], "x" * 400)
+        cache.put(keys[1], "x" * 400)
+        now = time.time()
+        os.utime(entry_file(cache, keys[0]), (now - 200, now - 200))
+        os.utime(entry_file(cache, keys[1]), (now - 100, now - 100))
+        
+        # Reading "a" makes "b" the least recently used entry
+        assert cache.get(keys[0]) is not None
+        cache.put(keys[2], "x" * 400)
+        
+        assert cache.stats['evictions'] == 1
+        assert entry_file(cache, keys[0]).exists()
+        assert not entry_file(cache, keys[1]).exists()
+        assert entry_file(cache, keys[2]).exists()
+        
+        # The running totals match the directory, as rescanned by a new instance
+        reopened = ResponseCache(cache_dir, max_size_bytes=1200).stats
+        assert (cache.stats['entries'], cache.stats['size_bytes']) == (reopened['entries'], reopened['size_bytes'])
+        assert reopened['entries'] == 2
+
+def test_client_reuses_cached_responses():
+    """GeminiClient only calls the model once for a repeated request."""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        model = FakeBackend(template="analysis {request}")
+        client = GeminiClient(model=model, cache=ResponseCache(cache_dir))
+        
+        first = client.analyze_consolidated_data("prompt", "data", "cache_test")
+        second = client.analyze_consolidated_data("prompt", iter(["da", "ta"]), "cache_test")
+        
+        assert first == second == "analysis 1"
+        assert len(model.calls) == 1
+
+if __name__ == "__main__":
+    test_keys()
+    test_get_and_put()
+    test_expired_entries_are_ignored()
+    test_least_recently_used_entries_are_evicted()
+    test_client_reuses_cached_responses()
+    print("All response cache tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the run metrics.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+from run_metrics import RunMetrics, format_prometheus
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from response_cache import ResponseCache
+from model_backends import FakeBackend
+from analyzer import DialogFlowAnalyzer
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def test_stages_and_counters_accumulate():
+    """Stage calls add up and stages are listed in pipeline order."""
+    metrics = RunMetrics(labels={'agent': 'test'})
+    with metrics.stage('report_write', bytes_written=10):
+        pass
+    with metrics.stage('load', bytes_read=100):
+        pass
+    metrics.add_stage('load', bytes_read=50)
+    metrics.increment('cache_hits')
+    metrics.increment('cache_hits')
+    
+    record = metrics.to_dict('success')
+    assert list(record['stages']) == ['load', 'report_write']
+    assert record['stages']['load']['calls'] == 1 and record['stages']['load']['bytes_read'] == 150
+    assert record['counters'] == {'cache_hits': 2}
+    assert record['status'] == 'success' and record['labels'] == {'agent': 'test'}
+
+def test_prometheus_format():
+    """Stage values and counters become labelled samples with exact values."""
+    metrics = RunMetrics(labels={'agent': 'a "quoted" name'})
+    metrics.add_stage('llm_call', seconds=1.5, calls=2)
+    metrics.increment('prompt_tokens', 12345678)
+    text = format_prometheus(metrics.to_dict('failure'))
+    
+    assert '# TYPE flowanalyzer_stage_seconds_total counter' in text
+    assert 'flowanalyzer_stage_seconds_total{agent="a \\"quoted\\" name",stage="llm_call"} 1.5' in text
+    assert 'flowanalyzer_prompt_tokens_total{agent="a \\"quoted\\" name"} 12345678' in text
+    assert 'flowanalyzer_run_success{agent="a \\"quoted\\" name"} 0' in text
+
+def test_client_records_tokens_and_cache():
+    """Prompt build, model calls, token usage and cache hits are recorded by the client."""
+    with tempfile.TemporaryDirectory() as tmp:
+        metrics = RunMetrics()
+        client = GeminiClient(model=FakeBackend(responses=["report"]), cache=ResponseCache(Path(tmp)), metrics=metrics)
+        client.analyze_consolidated_data("prompt", "data", "first")
+        client.analyze_consolidated_data("prompt", "data", "second")
+        client.analyze_consolidated_data("prompt", "other data", "third", on_chunk=lambda text: None)
+        
+        record = metrics.to_dict()
+        assert record['stages']['prompt_build']['calls'] == 3
+        assert record['stages']['llm_call']['calls'] == 2
+        assert record['stages']['llm_call']['response_chars'] == 2 * len("report")
+        assert record['counters']['cache_hits'] == 1 and record['counters']['cache_misses'] == 2
+        assert record['counters']['prompt_tokens'] > 0 and record['counters']['response_tokens'] > 0
+
+def test_async_client_records_retries():
+    """Retries of transient errors are counted."""
+    client = AsyncGeminiClient(GeminiClient(model=FakeBackend(responses=["ok"], fail_first=2)), max_retries=3, base_delay=0.01)
+    assert asyncio.run(client.analyze_text("prompt", "context", "retried")) == "ok"
+    record = client.gemini_client.metrics.to_dict()
+    assert record['counters']['retries'] == 2
+    assert record['stages']['llm_call']['calls'] == 3
+
+def test_analyzer_saves_run_record():
+    """A full run saves the JSON run record and, when asked, the Prometheus file."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = DialogFlowAnalyzer(str(FLOW_PATH), tmp, backend='fake', use_cache=False, map_reduce=True,
+                                      prometheus_metrics=True)
+        results = analyzer.run_full_analysis()
+        
+        with open(results['run_metrics'], 'r', encoding='utf-8') as f:
+            record = json.load(f)
+        assert record['status'] == 'success' and record['labels'] == {'agent': 'Flow', 'mode': 'map-reduce'}
+        assert set(record['stages']) == {'load', 'consolidate', 'prompt_build', 'llm_call', 'report_write', 'staging_write'}
+        assert record['stages']['load']['bytes_read'] > 0
+        assert record['stages']['report_write']['bytes_written'] == Path(results['analysis_report']).stat().st_size
+        assert 'flowanalyzer_run_success{agent="Flow",mode="map-reduce"} 1' in Path(results['prometheus_metrics']).read_text()
+
+if __name__ == "__main__":
+    test_stages_and_counters_accumulate()
+    test_prometheus_format()
+    test_client_records_tokens_and_cache()
+    test_async_client_records_retries()
+    test_analyzer_saves_run_record()
+    print("All run metrics tests passed")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Offline tests for binary snapshots of parsed exports.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from file_loader import DialogFlowFileLoader
+from export_snapshot import ExportSnapshot, SNAPSHOT_MAGIC, snapshot_file_name
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def copy_export(root):
+    """Copy the sample export without its test cases."""
+    return Path(shutil.copytree(FLOW_PATH, root / "export", ignore=shutil.ignore_patterns("testCases")))
+
+def test_warm_load_matches_cold_load():
+    """The second load comes from the snapshot, without re-hashing, and equals a parse."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = copy_export(Path(tmp))
+        loader = DialogFlowFileLoader(snapshot_dir=Path(tmp) / "snapshots")
+        
+        cold = loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'miss'
+        assert loader.load_stats['snapshot']['bytes'] > 0
+        assert 'intents' in loader.load_stats
+        
+        warm = loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'hit'
+        assert loader.load_stats['snapshot']['hashed_files'] == 0
+        assert list(loader.load_stats) == ['snapshot']
+        
+        assert warm == cold == DialogFlowFileLoader().load_export(flow_path)
+
+def test_changed_export_invalidates_snapshot():
+    """Editing, adding or removing an export file makes the next load parse again."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = copy_export(Path(tmp))
+        loader = DialogFlowFileLoader(snapshot_dir=Path(tmp) / "snapshots")
+        loader.load_export(flow_path)
+        
+        agent_file = flow_path / "agent.json"
+        agent_file.write_text(agent_file.read_text(encoding='utf-8').replace('"displayName"', '"description": "edited", "displayName"', 1), encoding='utf-8')
+        export_data = loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'miss'
+        assert export_data['agent']['description'] == 'edited'
+        
+        # Touching a file without changing its content re-hashes it but keeps the snapshot
+        os.utime(agent_file, ns=(0, 0))
+        loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'hit'
+        assert loader.load_stats['snapshot']['hashed_files'] == 1
+        
+        shutil.rmtree(flow_path / "intents" / "small_thank.thanks")
+        export_data = loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'miss'
+        assert 'small_thank.thanks' not in export_data['intents']
+
+def test_unusable_snapshot_is_replaced():
+    """A damaged snapshot or one of another format version is ignored and rewritten."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = copy_export(Path(tmp))
+        snapshot_dir = Path(tmp) / "snapshots"
+        snapshot_file = snapshot_dir / snapshot_file_name(flow_path)
+        loader = DialogFlowFileLoader(snapshot_dir=snapshot_dir)
+        
+        snapshot_dir.mkdir()
+        snapshot_file.write_bytes(b"not a snapshot")
+        assert ExportSnapshot(snapshot_file).read_header() is None
+        loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'miss'
+        assert snapshot_file.read_bytes().startswith(SNAPSHOT_MAGIC)
+        
+        # Bump the format version stored after the magic
+        data = bytearray(snapshot_file.read_bytes())
+        data[len(SNAPSHOT_MAGIC) + 1] += 1
+        snapshot_file.write_bytes(bytes(data))
+        assert ExportSnapshot(snapshot_file).read_header() is None
+        loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'miss'
+        
+        loader.load_export(flow_path)
+        assert loader.load_stats['snapshot']['status'] == 'hit'
+
+if __name__ == "__main__":
+    test_warm_load_matches_cold_load()
+    test_changed_export_invalidates_snapshot()
+    test_unusable_snapshot_is_replaced()
+    print("All snapshot tests passed")
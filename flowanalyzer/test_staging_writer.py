@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Offline tests for the staging policies and the background staging writer.
+"""
+
+import os
+import sys
+import gzip
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+
+from staging_writer import StagingWriter, BLOB_DIR_NAME
+from gemini_client import GeminiClient
+from model_backends import FakeBackend
+
+CONTEXT = "context line\n" * 1000
+
+def test_writes_run_in_background_in_order():
+    """Jobs run on the writer thread in submission order; flush waits for them."""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = StagingWriter(Path(tmp))
+        release = threading.Event()
+        order = []
+        writer.submit(lambda: (release.wait(5), order.append('first')))
+        writer.submit(lambda: order.append('second'))
+        
+        # The caller is not blocked by the slow job
+        assert order == []
+        release.set()
+        writer.flush()
+        assert order == ['first', 'second']
+        assert writer.thread.name == "staging-writer"
+        writer.close()
+
+def test_errors_are_logged_not_raised():
+    """A failing job does not stop the writer or reach the caller."""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = StagingWriter(Path(tmp))
+        writer.submit(lambda: 1 / 0)
+        writer.submit(lambda: Path(tmp, "after.txt").write_text("ok"))
+        writer.flush()
+        assert writer.stats['errors'] == 1
+        assert Path(tmp, "after.txt").read_text() == "ok"
+
+def test_full_policy_stores_context_once_compressed():
+    """Complete contexts are stored once per content hash and referenced from staging files."""
+    with tempfile.TemporaryDirectory() as tmp:
+        staging_dir = Path(tmp) / "staging"
+        client = GeminiClient(model=FakeBackend(responses=["report"]), staging_dir=staging_dir,
+                              staging_policy='full', staging_compression='gzip')
+        client.analyze_text("prompt one", CONTEXT, "first")
+        client.analyze_text("prompt two", CONTEXT, "second")
+        client.flush_staging()
+        
+        blobs = list((staging_dir / BLOB_DIR_NAME).iterdir())
+        assert len(blobs) == 1 and blobs[0].name.endswith(".txt.gz")
+        with gzip.open(blobs[0], 'rt', encoding='utf-8') as f:
+            assert f.read() == CONTEXT
+        assert client.staging.stats['blobs'] == 1 and client.staging.stats['reused_blobs'] == 1
+        
+        with gzip.open(staging_dir / "staging_first.txt.gz", 'rt', encoding='utf-8') as f:
+            staging = f.read()
+        assert f"FULL CONTEXT: {BLOB_DIR_NAME}/{blobs[0].name}" in staging
+        # The context is neither written in full nor twice
+        assert staging.count("context line") < 100
+        with gzip.open(staging_dir / "response_second.txt.gz", 'rt', encoding='utf-8') as f:
+            assert "report" in f.read()
+
+def test_failed_blob_write_is_not_recorded():
+    """A blob whose write failed is neither recorded nor left behind, so the next store writes it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = StagingWriter(Path(tmp))
+        open_file = writer._open_file
+        
+        def failing_open(path):
+            raise OSError("disk full")
+        writer._open_file = failing_open
+        try:
+            writer.store_blob([CONTEXT])
+            raise AssertionError("expected OSError")
+        except OSError:
+            pass
+        assert writer.stored_blobs == set() and list(Path(tmp, BLOB_DIR_NAME).iterdir()) == []
+        
+        writer._open_file = open_file
+        reference = writer.store_blob([CONTEXT])
+        assert Path(tmp, reference).read_text(encoding='utf-8') == CONTEXT
+        assert writer.stats['blobs'] == 1 and writer.stats['reused_blobs'] == 0
+
+def test_preview_and_off_policies():
+    """Preview writes no blobs; off writes nothing."""
+    with tempfile.TemporaryDirectory() as tmp:
+        client = GeminiClient(model=FakeBackend(responses=["report"]), staging_dir=Path(tmp) / "preview")
+        client.analyze_consolidated_data("prompt", CONTEXT, "previewed")
+        client.flush_staging()
+        staging = (Path(tmp) / "preview" / "consolidated_staging_previewed.txt").read_text(encoding='utf-8')
+        assert "CONSOLIDATED DATA PREVIEW" in staging and "FULL DATA:" not in staging
+        assert not (Path(tmp) / "preview" / BLOB_DIR_NAME).exists()
+        
+        client = GeminiClient(model=FakeBackend(responses=["report"]), staging_dir=Path(tmp) / "off", staging_policy='off')
+        assert client.analyze_consolidated_data("prompt", CONTEXT, "unstaged") == "report"
+        assert client.staging is None and not (Path(tmp) / "off").exists()
+
+if __name__ == "__main__":
+    test_writes_run_in_background_in_order()
+    test_errors_are_logged_not_raised()
+    test_full_policy_stores_context_once_compressed()
+    test_failed_blob_write_is_not_recorded()
+    test_preview_and_off_policies()
+    print("All staging writer tests passed")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Offline tests for streamed Gemini responses.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+from gemini_client import GeminiClient
+from response_cache import ResponseCache
+from model_backends import FakeBackend
+from analyzer import DialogFlowAnalyzer
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+REPORT = "| Priority | Issue | Location | Solution |\n" + "| Low | Finding | Page | Fix |\n" * 20
+
+def test_chunks_reach_callback_and_staging():
+    """Chunks are passed on in order, staged, cached and timed."""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = FakeBackend(responses=[REPORT], latency=0.1, first_chunk_latency=0.01, chunk_size=50)
+        client = GeminiClient(model=backend, staging_dir=Path(tmp) / "staging", cache=ResponseCache(Path(tmp) / "cache"))
+        
+        chunks = []
+        result = client.analyze_consolidated_data("prompt", "data", "streamed", on_chunk=chunks.append)
+        
+        assert result == REPORT == ''.join(chunks)
+        assert len(chunks) == -(-len(REPORT) // 50)
+        stats = client.last_response_stats
+        assert stats['streamed'] and not stats['cached'] and stats['chunks'] == len(chunks)
+        assert stats['first_chunk_seconds'] < 0.05 <= stats['total_seconds']
+        client.flush_staging()
+        assert REPORT in (Path(tmp) / "staging" / "response_streamed.txt").read_text(encoding='utf-8')
+        
+        # A cached response arrives as one chunk without a model call
+        chunks = []
+        assert client.analyze_consolidated_data("prompt", "data", "streamed", on_chunk=chunks.append) == REPORT
+        assert chunks == [REPORT] and len(backend.calls) == 1
+        assert client.last_response_stats['cached']
+
+def test_non_streamed_response_is_timed():
+    """Without a callback the response is returned whole and its latency recorded."""
+    client = GeminiClient(model=FakeBackend(responses=["report"]))
+    assert client.analyze_consolidated_data("prompt", "data", "whole") == "report"
+    stats = client.last_response_stats
+    assert not stats['streamed'] and stats['chunks'] == 1
+    assert stats['first_chunk_seconds'] == stats['total_seconds']
+
+def test_analyzer_streams_report_file():
+    """The report is streamed to a partial file that replaces the report when complete."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = DialogFlowAnalyzer(
+            str(FLOW_PATH), tmp, backend='fake', use_cache=False, stream_response=True,
+            fake_options=dict(responses=[REPORT], chunk_size=64)
+        )
+        report_file = analyzer.analyze_flow(analyzer.load_dialogflow_data())
+        
+        assert Path(report_file).read_text(encoding='utf-8') == REPORT
+        assert not Path(report_file + ".partial").exists()
+        assert analyzer.gemini_client.last_response_stats['chunks'] > 1
+
+if __name__ == "__main__":
+    test_chunks_reach_callback_and_staging()
+    test_non_streamed_response_is_timed()
+    test_analyzer_streams_report_file()
+    print("All streaming tests passed")
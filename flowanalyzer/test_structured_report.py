@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Offline tests for structured JSON reports and their issue index.
+Uses a local fake model, so no API key or network access is needed.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add the modules directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.dirname(__file__))
+
+from gemini_client import GeminiClient
+from flow_analyzer import FlowAnalyzer
+from model_backends import FakeBackend
+from response_cache import ResponseCache
+from structured_report import (GENERATION_CONFIG, ReportValidationError, build_report, format_markdown,
+                               parse_report, query_issues)
+from analyzer import DialogFlowAnalyzer
+
+FLOW_PATH = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+
+def issue(priority, name, flow=None, page=None, intent=None):
+    return {'priority': priority, 'issue': name, 'flow': flow, 'page': page, 'intent': intent,
+            'location': f"{name} location", 'solution': f"Fix {name}"}
+
+RESPONSE = json.dumps({'summary': " Mostly fine ", 'issues': [
+    issue('Low', "Typo", intent="greet"),
+    issue('High', "Dead end", flow="Main", page="Confirm"),
+    issue('Medium', "No reprompt", flow="Main", page="Ask", intent=""),
+    issue('High', "Missing exit", flow="Orders")
+]})
+
+def test_parse_and_index():
+    """Valid responses are normalized, sorted by priority and indexed by flow, page and intent."""
+    report = parse_report("```json\n" + RESPONSE + "\n```")
+    assert report['summary'] == "Mostly fine"
+    assert report['issues'][2]['intent'] is None
+    
+    document = build_report(report, agent="Agent")
+    assert [entry['issue'] for entry in document['issues']] == ["Dead end", "Missing exit", "No reprompt", "Typo"]
+    assert document['counts'] == {'High': 2, 'Medium': 1, 'Low': 1}
+    assert document['index']['flows'] == {'Main': [0, 2], 'Orders': [1]}
+    assert document['index']['pages'] == {'Main / Confirm': [0], 'Main / Ask': [2]}
+    assert [entry['issue'] for entry in query_issues(document, flow="Main", priority="High")] == ["Dead end"]
+    assert [entry['issue'] for entry in query_issues(document, flow="Main", page="Ask")] == ["No reprompt"]
+    assert query_issues(document, intent="greet")[0]['issue'] == "Typo"
+    assert query_issues(document, intent="missing") == []
+    
+    markdown = format_markdown(document)
+    assert "|High|Dead end|Dead end location (flow Main, page Confirm)|Fix Dead end|" in markdown
+    assert markdown.index("Dead end") < markdown.index("Typo")
+
+def test_invalid_responses_raise():
+    """Responses that are not JSON or do not match the schema are rejected with the failing field."""
+    cases = {
+        "| High | Dead end | Main | Fix |": "not JSON",
+        "[]": "expected an object",
+        '{"summary": "x"}': "issues: expected an array",
+        json.dumps({'issues': [dict(issue('Urgent', "x"))]}): "issues[0].priority",
+        json.dumps({'issues': [dict(issue('Low', "x"), solution="")]}): "issues[0].solution",
+        json.dumps({'issues': [dict(issue('Low', "x"), flow=3)]}): "issues[0].flow"
+    }
+    for text, message in cases.items():
+        try:
+            parse_report(text)
+        except ReportValidationError as e:
+            assert message in str(e), (text, str(e))
+        else:
+            raise AssertionError(f"no error for {text}")
+
+def test_invalid_response_is_not_cached():
+    """The schema is requested from the model, and only a valid response is cached."""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ResponseCache(tmp)
+        model = FakeBackend(responses=['{"issues": "none"}', RESPONSE])
+        analyzer = FlowAnalyzer(GeminiClient(model=model, cache=cache))
+        
+        try:
+            analyzer.analyze_flow_structured("consolidated data")
+        except ReportValidationError:
+            pass
+        else:
+            raise AssertionError("invalid response accepted")
+        assert model.configs == [GENERATION_CONFIG]
+        
+        report = analyzer.analyze_flow_structured("consolidated data")
+        assert len(report['issues']) == 4 and len(model.configs) == 2
+        assert analyzer.analyze_flow_structured("consolidated data") == report
+        assert len(model.configs) == 2
+
+def test_analyzer_saves_json_and_markdown():
+    """A full run with the fake backend writes the indexed JSON report next to the markdown one."""
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = DialogFlowAnalyzer(str(FLOW_PATH), tmp, backend='fake', use_cache=False, structured_report=True)
+        results = analyzer.run_full_analysis()
+        
+        with open(results['structured_report'], 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        assert document['agent'] == FLOW_PATH.name and document['counts']['Low'] == 1
+        assert "Fake finding 1" in Path(results['analysis_report']).read_text(encoding='utf-8')
+        assert '"intent"' in analyzer.gemini_client.model.calls[0]
+
+if __name__ == "__main__":
+    test_parse_and_index()
+    test_invalid_responses_raise()
+    test_invalid_response_is_not_cached()
+    test_analyzer_saves_json_and_markdown()
+    print("All structured report tests passed")
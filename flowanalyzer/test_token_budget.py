@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Offline tests for prompt-size estimation and input token budgets.
+Uses a local fake model, so no API key or network access is needed.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add the modules and benchmarks directories to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
+sys.path.append(os.path.join(os.path.dirname(__file__), 'benchmarks'))
+sys.path.append(os.path.dirname(__file__))
+
+from file_loader import DialogFlowFileLoader
+from gemini_client import GeminiClient
+from async_gemini_client import AsyncGeminiClient
+from model_backends import FakeBackend
+from token_budget import PromptTooLargeError, SectionTokenCounter, estimate_tokens
+from synthetic_export import generate_export
+from analyzer import DialogFlowAnalyzer
+
+def make_consolidated_file(tmp):
+    """Write the consolidated file of the sample export and return its path."""
+    flow_path = Path(os.path.dirname(__file__)) / '..' / 'Flow'
+    return DialogFlowFileLoader().create_consolidated_file(flow_path, Path(tmp))
+
+def test_section_counts_match_streamed_parts():
+    """Counting the whole file or its streamed sections gives the same per-section estimates."""
+    with tempfile.TemporaryDirectory() as tmp:
+        loader = DialogFlowFileLoader()
+        consolidated_file = make_consolidated_file(tmp)
+        
+        whole = SectionTokenCounter()
+        whole.add(loader.load_consolidated_data(consolidated_file))
+        streamed = SectionTokenCounter()
+        for section in loader.iter_consolidated_sections(consolidated_file):
+            streamed.add(section.text)
+        
+        assert {'agent.json', 'intents', 'flows', 'entityTypes'} <= set(whole.sections)
+        assert whole.sections['intents'] > whole.sections['entityTypes']
+        # Each streamed part is rounded up separately
+        for name, count in whole.sections.items():
+            assert count <= streamed.sections[name] <= count + 200
+
+def test_over_budget_request_fails_before_sending():
+    """A request over the budget raises with its per-section sizes and never reaches the model."""
+    with tempfile.TemporaryDirectory() as tmp:
+        consolidated_data = DialogFlowFileLoader().load_consolidated_data(make_consolidated_file(tmp))
+        model = FakeBackend(responses=["report"])
+        client = GeminiClient(model=model, staging_dir=os.path.join(tmp, "staging"), max_input_tokens=1000)
+        
+        try:
+            client.analyze_consolidated_data("prompt", consolidated_data, "too_large")
+            raise AssertionError("expected PromptTooLargeError")
+        except PromptTooLargeError as e:
+            assert e.tokens > 1000 and e.budget == 1000
+            assert set(e.sections) >= {'prompt', 'intents', 'flows'}
+            estimated_tokens = e.tokens
+        
+        assert model.calls == []
+        client.flush_staging()
+        staging = Path(tmp, "staging", "consolidated_staging_too_large.txt").read_text(encoding='utf-8')
+        assert "INPUT TOKENS: ~" in staging and "budget: 1,000" in staging
+        
+        # The same request fits without a budget
+        client.max_input_tokens = None
+        assert client.analyze_consolidated_data("prompt", consolidated_data, "no_budget") == "report"
+        assert client.last_token_report['tokens'] == estimated_tokens
+
+def test_exact_token_count():
+    """The API count replaces the estimate when enabled, and the estimate is kept when it fails."""
+    model = FakeBackend()
+    # One token per word, so the exact count fits a budget the estimate exceeds
+    model.count_tokens = lambda contents: SimpleNamespace(total_tokens=len(''.join(contents).split()))
+    client = GeminiClient(model=model, exact_token_count=True, max_input_tokens=6)
+    
+    client.analyze_text("one two", "three four", "exact")
+    assert client.last_token_report['exact'] is True
+    assert client.last_token_report['tokens'] == 6
+    
+    def count_offline(contents):
+        raise ConnectionError("offline")
+    model.count_tokens = count_offline
+    client.max_input_tokens = None
+    client.analyze_text("one two", "three four", "estimated")
+    assert client.last_token_report['exact'] is False
+    assert client.last_token_report['tokens'] == estimate_tokens("one two") + client.last_token_report['sections']['context']
+
+def test_async_request_over_budget_is_not_retried():
+    """Over-budget requests fail fast in the async client too."""
+    model = FakeBackend()
+    client = AsyncGeminiClient(GeminiClient(model=model, max_input_tokens=10), base_delay=0.01)
+    
+    try:
+        asyncio.run(client.analyze_text("prompt", "x" * 100, "async_too_large"))
+        raise AssertionError("expected PromptTooLargeError")
+    except PromptTooLargeError:
+        pass
+    
+    assert model.calls == []
+    assert client.stats['retries'] == 0
+
+def test_fallback_keeps_structural_findings():
+    """An over-budget request falls back to map-reduce with the local check findings in the merge request."""
+    with tempfile.TemporaryDirectory() as tmp:
+        flow_path = Path(tmp) / "export"
+        generate_export(flow_path, flows=3, pages=3, intents=6, phrases=5)
+        analyzer = DialogFlowAnalyzer(str(flow_path), os.path.join(tmp, "output"), backend='fake', use_cache=False,
+                                      graph_check=True, max_input_tokens=8000)
+        
+        analyzer.run_full_analysis()
+        
+        calls = analyzer.gemini_client.model.calls
+        assert analyzer.map_reduce and len(calls) == 5
+        assert all("Pre-computed Structural Findings" not in call for call in calls[:-1])
+        assert "## Pre-computed Structural Findings" in calls[-1] and "Merge Per-Flow Reports" in calls[-1]
+
+if __name__ == "__main__":
+    test_section_counts_match_streamed_parts()
+    test_over_budget_request_fails_before_sending()
+    test_exact_token_count()
+    test_async_request_over_budget_is_not_retried()
+    test_fallback_keeps_structural_findings()
+    print("All token budget tests passed")